@@ -17,21 +17,23 @@ Phase 2 Features:
 
 import ast
 import json
+import os
 import re
+import time
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from utils import (
-    parse_gitignore,
-    should_include_file,
     get_relative_path,
     normalize_path,
-    detect_file_type,
     is_typescript_project,
 )
+from file_catalog import FileCatalog
+from module_resolver import ModuleResolver
+import metrics
 
-# Try to import enhanced AST analyzer
+# Try to import shared AST parse cache
 try:
     import sys
     # Add scripts directory to path
@@ -39,21 +41,60 @@ try:
     if str(scripts_dir) not in sys.path:
         sys.path.insert(0, str(scripts_dir))
 
-    from enhanced_ast_analyzer import EnhancedASTAnalyzer
-    ENHANCED_AST_AVAILABLE = True
+    from ast_extractors.ast_cache import ParsedModuleCache
+    AST_CACHE_AVAILABLE = True
 except ImportError:
-    ENHANCED_AST_AVAILABLE = False
+    AST_CACHE_AVAILABLE = False
+
+# 依赖缓存格式版本（提取规则变化时递增，使旧缓存失效）
+DEPENDENCY_CACHE_VERSION = 2
+DEPENDENCY_CACHE_FILE = "dependency_cache.json"
+
+CACHE_REQUESTS = metrics.counter('cache_requests', 'Cache lookups by cache and result')
+PARSE_FAILURES = metrics.counter('parse_failures', 'Files that could not be parsed')
+FILE_ANALYSIS_SECONDS = metrics.histogram(
+    'file_analysis_seconds', 'Per-file analysis time by stage', metrics.DURATION_BUCKETS
+)
+DEPENDENCY_EDGES = metrics.gauge('dependency_edges', 'Resolved file-to-file dependency edges')
 
 
 class DependencyAnalyzer:
     """依赖关系分析器（Phase 2：支持分层）"""
 
-    def __init__(self, root_path: Path, gitignore_path: Path = None, node_threshold: int = 25):
+    def __init__(self, root_path: Path, gitignore_path: Path = None, node_threshold: int = 25,
+                 catalog: FileCatalog = None, ast_cache: 'ParsedModuleCache' = None,
+                 cache_dir: Path = None, reuse_cache: bool = True,
+                 file_report: 'SlowFileReport' = None, source_roots: List[str] = None):
+        """
+        初始化依赖关系分析器
+
+        Args:
+            root_path: 项目根目录
+            gitignore_path: .gitignore 文件路径
+            node_threshold: 单张依赖图的节点数阈值
+            catalog: 已构建的文件目录（None 时自行遍历一次）
+            ast_cache: 共享的 AST 解析缓存（None 时自行创建）
+            cache_dir: 依赖缓存目录（None 表示不持久化，每次全量分析）
+            reuse_cache: 是否复用缓存（False 时全量分析，但仍会写入新缓存）
+            file_report: 最慢文件报告（非 None 时记录每个文件的分析耗时）
+            source_roots: 额外的 Python 源码根目录（见 ModuleResolver）
+        """
         self.root_path = normalize_path(root_path)
-        self.exclude_patterns = parse_gitignore(gitignore_path)
+        self.catalog = catalog if catalog is not None else FileCatalog(self.root_path, gitignore_path)
+        self.ast_cache = ast_cache
+        if self.ast_cache is None and AST_CACHE_AVAILABLE:
+            self.ast_cache = ParsedModuleCache()
         self.file_dependencies: Dict[str, Set[str]] = {}
         self.file_types: Dict[str, str] = {}
+        self.resolver: Optional[ModuleResolver] = None
+        self.resolved_dependencies: Dict[str, List[Tuple[str, str]]] = {}  # 文件 -> [(目标文件, 模块名)]
         self.node_threshold = node_threshold  # 节点数阈值
+        self.cache_file = Path(cache_dir) / DEPENDENCY_CACHE_FILE if cache_dir is not None else None
+        self.reuse_cache = reuse_cache
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.file_report = file_report
+        self.source_roots = source_roots
 
     def analyze_project(self) -> Dict:
         """
@@ -73,9 +114,41 @@ class DependencyAnalyzer:
         # 收集所有源代码文件
         source_files = self._collect_source_files()
 
-        # 分析每个文件的依赖
+        # 分析每个文件的依赖（指纹未变的文件直接使用缓存）
+        cached_entries = self._load_dependency_cache()
+        fresh_entries = {}
         for file_path in source_files:
-            self._analyze_file(file_path)
+            rel_path = str(get_relative_path(file_path, self.root_path))
+            file_type = self.file_types.get(str(file_path), 'other')
+            fingerprint = self._file_fingerprint(file_path)
+
+            cached = cached_entries.get(rel_path)
+            if (cached is not None and fingerprint is not None
+                    and cached.get('fingerprint') == fingerprint
+                    and cached.get('type') == file_type):
+                self.file_dependencies[rel_path] = set(cached.get('dependencies', []))
+                self.cache_hits += 1
+            else:
+                start = time.perf_counter()
+                self._analyze_file(file_path)
+                elapsed = time.perf_counter() - start
+                FILE_ANALYSIS_SECONDS.observe(elapsed, stage='dependencies')
+                if self.file_report is not None:
+                    self.file_report.add('DependencyAnalyzer', rel_path, elapsed)
+                self.cache_misses += 1
+
+            if fingerprint is not None:
+                fresh_entries[rel_path] = {
+                    'fingerprint': fingerprint,
+                    'type': file_type,
+                    'dependencies': sorted(self.file_dependencies[rel_path]),
+                }
+
+        CACHE_REQUESTS.inc(self.cache_hits, cache='dependency', result='hit')
+        CACHE_REQUESTS.inc(self.cache_misses, cache='dependency', result='miss')
+
+        # 只保留当前存在的文件
+        self._save_dependency_cache(fresh_entries)
 
         # 构建分层依赖图
         layered_graph = self._build_layered_dependency_graph()
@@ -83,23 +156,57 @@ class DependencyAnalyzer:
         return layered_graph
 
     def _collect_source_files(self) -> List[Path]:
-        """收集项目中所有源代码文件"""
+        """收集项目中所有源代码文件（来自共享的文件目录）"""
         source_files = []
 
-        for file_path in self.root_path.rglob('*'):
-            if not file_path.is_file():
-                continue
+        for entry in self.catalog.entries(['python', 'javascript', 'typescript']):
+            source_files.append(entry.path)
+            self.file_types[str(entry.path)] = entry.file_type
 
-            if not should_include_file(file_path, self.exclude_patterns, self.root_path):
-                continue
+        return source_files
 
-            # 只处理源代码文件
-            file_type = detect_file_type(file_path)
-            if file_type in ['python', 'javascript', 'typescript']:
-                source_files.append(file_path)
-                self.file_types[str(file_path)] = file_type
+    def _file_fingerprint(self, file_path: Path) -> Optional[str]:
+        """文件指纹（修改时间 + 大小），文件不可访问时返回 None"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
 
-        return source_files
+    def _load_dependency_cache(self) -> Dict[str, Dict]:
+        """加载持久化的依赖缓存（缺失、损坏或版本不符时返回空）"""
+        if self.cache_file is None or not self.reuse_cache or not self.cache_file.exists():
+            return {}
+
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache_data = json.load(f)
+        except (json.JSONDecodeError, OSError, UnicodeDecodeError):
+            return {}
+
+        if not isinstance(cache_data, dict) or cache_data.get('version') != DEPENDENCY_CACHE_VERSION:
+            return {}
+        files = cache_data.get('files')
+        return files if isinstance(files, dict) else {}
+
+    def _save_dependency_cache(self, entries: Dict[str, Dict]):
+        """保存依赖缓存（先写临时文件再替换，避免中断时留下损坏的缓存）"""
+        if self.cache_file is None:
+            return
+
+        cache_data = {
+            'version': DEPENDENCY_CACHE_VERSION,
+            'files': entries,
+        }
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(cache_data, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            # 缓存写入失败不影响分析结果
+            pass
 
     def _analyze_file(self, file_path: Path):
         """分析单个文件的依赖（Phase 3：扩展多语言）"""
@@ -125,59 +232,49 @@ class DependencyAnalyzer:
         self.file_dependencies[rel_path] = dependencies
 
     def _analyze_python_file(self, file_path: Path) -> Set[str]:
-        """分析 Python 文件的 import 依赖（使用增强提取器）"""
-        dependencies = set()
-
-        # Try enhanced extraction first
-        if ENHANCED_AST_AVAILABLE:
-            try:
-                analyzer = EnhancedASTAnalyzer(self.root_path)
-                extracted_data = analyzer.analyze_file(file_path)
-
-                if 'error' not in extracted_data:
-                    # Extract all dependency types
-                    all_deps = extracted_data.get('dependencies', {})
-
-                    # Import dependencies
-                    for dep in all_deps.get('imports', []):
-                        module = dep.get('module_path') if dep.get('module_path') else dep.get('name')
-                        if module:
-                            dependencies.add(module.split('.')[0])
-
-                    # Could also track calls and instantiations
-                    # For basic dependency graph, we focus on imports
+        """
+        分析 Python 文件的 import 依赖
 
-                    return dependencies
-            except Exception:
-                # Fallback to basic analysis
-                pass
+        依赖以模块说明符记录，供 ModuleResolver 解析：
+        - import a.b            -> "a.b"
+        - from a.b import c     -> "a.b.c"（c 可能是子模块，解析时按最长前缀匹配）
+        - from ..pkg import c   -> "..pkg.c"（保留相对层级）
+        """
+        dependencies = set()
 
-        # Fallback to basic analysis
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-
-            tree = ast.parse(source, filename=str(file_path))
+            if self.ast_cache is not None:
+                tree = self.ast_cache.get(file_path.resolve()).tree
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    source = f.read()
+                tree = ast.parse(source, filename=str(file_path))
 
             for node in ast.walk(tree):
                 # import xxx
                 if isinstance(node, ast.Import):
                     for alias in node.names:
-                        dependencies.add(alias.name.split('.')[0])
+                        dependencies.add(alias.name)
 
                 # from xxx import yyy
                 elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        dependencies.add(node.module.split('.')[0])
-
-        except (SyntaxError, UnicodeDecodeError):
+                    base = '.' * (node.level or 0) + (node.module or '')
+                    for alias in node.names:
+                        if alias.name == '*':
+                            dependencies.add(base)
+                        elif base.endswith('.') or not base:
+                            dependencies.add(base + alias.name)
+                        else:
+                            dependencies.add(f"{base}.{alias.name}")
+
+        except (SyntaxError, UnicodeDecodeError, OSError, ValueError):
             # 无法解析的文件，跳过
-            pass
+            PARSE_FAILURES.inc(stage='dependencies')
 
         return dependencies
 
     def _analyze_js_file(self, file_path: Path) -> Set[str]:
-        """分析 JavaScript/TypeScript 文件的依赖"""
+        """分析 JavaScript/TypeScript 文件的依赖（记录完整模块路径，含相对路径）"""
         dependencies = set()
 
         try:
@@ -191,23 +288,11 @@ class DependencyAnalyzer:
             ]
 
             for pattern in import_patterns:
-                matches = re.findall(pattern, content)
-                for match in matches:
-                    # 提取模块名（忽略相对路径和内置模块）
-                    if not match.startswith('.') and not match.startswith('/'):
-                        # 取第一段作为依赖
-                        dep = match.split('/')[0].split('@')[0]
-                        if dep:
-                            dependencies.add(dep)
+                dependencies.update(re.findall(pattern, content))
 
             # CommonJS: require('xxx')
             require_pattern = r"require\(['\"]([^'\"]+)['\"]\)"
-            matches = re.findall(require_pattern, content)
-            for match in matches:
-                if not match.startswith('.') and not match.startswith('/'):
-                    dep = match.split('/')[0]
-                    if dep:
-                        dependencies.add(dep)
+            dependencies.update(re.findall(require_pattern, content))
 
         except (UnicodeDecodeError, OSError):
             # 无法读取的文件，跳过
@@ -215,8 +300,25 @@ class DependencyAnalyzer:
 
         return dependencies
 
+    def _resolve_dependencies(self):
+        """用模块解析索引将每个文件的依赖解析为项目内文件（每条导入一次字典查找）"""
+        self.resolver = ModuleResolver(self.file_dependencies.keys(), self.root_path, self.source_roots)
+        self.resolved_dependencies = {}
+
+        for from_file, dependencies in self.file_dependencies.items():
+            targets = {}
+            for dep in sorted(dependencies):
+                resolved = self.resolver.resolve_module(dep, from_file)
+                if resolved and resolved[0] != from_file:
+                    targets.setdefault(resolved[0], resolved[1])
+            self.resolved_dependencies[from_file] = list(targets.items())
+
+        DEPENDENCY_EDGES.set(sum(len(targets) for targets in self.resolved_dependencies.values()))
+
     def _build_layered_dependency_graph(self) -> Dict:
         """构建分层依赖关系图"""
+        self._resolve_dependencies()
+
         # 获取所有文件的顶层文件夹
         file_folders = defaultdict(list)
         for file_path in self.file_dependencies.keys():
@@ -273,18 +375,17 @@ class DependencyAnalyzer:
 
         # 分析文件夹间的依赖
         folder_deps = defaultdict(set)
-        for file_path, dependencies in self.file_dependencies.items():
-            from_folder = file_path.split('/')[0] if '/' in file_path else '.'
-            for dep in dependencies:
-                # 找到依赖对应的文件夹
-                to_folder = self._find_dependency_folder(dep)
-                if to_folder and to_folder != from_folder:
+        for file_path, targets in self.resolved_dependencies.items():
+            from_folder = self.resolver.folder_of(file_path)
+            for to_file, _ in targets:
+                to_folder = self.resolver.folder_of(to_file)
+                if to_folder != from_folder:
                     folder_deps[from_folder].add(to_folder)
 
-        # 生成边
+        # 生成边（排序保证输出稳定，内容未变化的页面不会被重写）
         edges = []
-        for from_folder, to_folders in folder_deps.items():
-            for to_folder in to_folders:
+        for from_folder, to_folders in sorted(folder_deps.items()):
+            for to_folder in sorted(to_folders):
                 edges.append({
                     "from": from_folder,
                     "to": to_folder,
@@ -315,17 +416,16 @@ class DependencyAnalyzer:
                 "type": self.file_types.get(file_path, "unknown")
             })
 
-        # 生成边
+        # 生成边（只保留图内文件之间的依赖）
+        file_set = set(files)
         edges = []
         for from_file in files:
-            dependencies = self.file_dependencies.get(from_file, set())
-            for dep in dependencies:
-                to_file = self._find_dependency_file(dep, files)
-                if to_file and to_file in files:
+            for to_file, module_name in self.resolved_dependencies.get(from_file, []):
+                if to_file in file_set:
                     edges.append({
                         "from": from_file,
                         "to": to_file,
-                        "label": dep
+                        "label": module_name
                     })
 
         # 生成 Mermaid 图
@@ -356,23 +456,6 @@ class DependencyAnalyzer:
 
         return dict(subfolders)
 
-    def _find_dependency_folder(self, dep_name: str) -> str:
-        """查找依赖对应的文件夹"""
-        for file_path in self.file_dependencies.keys():
-            if dep_name.lower() in file_path.lower():
-                return file_path.split('/')[0] if '/' in file_path else '.'
-        return None
-
-    def _find_dependency_file(self, dep_name: str, file_list: List[str] = None) -> str:
-        """查找依赖对应的文件路径"""
-        if file_list is None:
-            file_list = list(self.file_dependencies.keys())
-
-        for file_path in file_list:
-            if dep_name.lower() in file_path.lower():
-                return file_path
-        return None
-
     def _generate_mermaid_graph(self, nodes: List[Dict], edges: List[Dict]) -> str:
         """生成 Mermaid 格式的依赖图"""
         lines = ["graph TD"]
@@ -529,11 +612,12 @@ def main():
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: analyze_dependencies.py <project-path> [gitignore-path] [--threshold N]")
+        print("Usage: analyze_dependencies.py <project-path> [gitignore-path] [--threshold N] [--cache-dir DIR]")
         print("\nExamples:")
         print("  analyze_dependencies.py /path/to/project")
         print("  analyze_dependencies.py /path/to/project /path/to/project/.gitignore")
         print("  analyze_dependencies.py /path/to/project .gitignore --threshold 30")
+        print("  analyze_dependencies.py /path/to/project --cache-dir docs/architecture/.cache")
         sys.exit(1)
 
     project_path = Path(sys.argv[1])
@@ -543,6 +627,7 @@ def main():
 
     gitignore_path = None
     node_threshold = 25
+    cache_dir = None
 
     # 解析参数
     i = 2
@@ -550,6 +635,9 @@ def main():
         if sys.argv[i] == "--threshold" and i + 1 < len(sys.argv):
             node_threshold = int(sys.argv[i + 1])
             i += 2
+        elif sys.argv[i] == "--cache-dir" and i + 1 < len(sys.argv):
+            cache_dir = Path(sys.argv[i + 1])
+            i += 2
         elif not sys.argv[i].startswith("--"):
             gitignore_path = Path(sys.argv[i])
             i += 1
@@ -557,7 +645,7 @@ def main():
             i += 1
 
     # 分析依赖关系
-    analyzer = DependencyAnalyzer(project_path, gitignore_path, node_threshold)
+    analyzer = DependencyAnalyzer(project_path, gitignore_path, node_threshold, cache_dir=cache_dir)
     result = analyzer.analyze_project()
 
     # 输出 JSON
@@ -4,20 +4,39 @@ AST extractors for enhanced code analysis.
 
 This package provides enhanced AST extraction capabilities for Python code,
 including comprehensive class, function, and dependency extraction.
+
+The public names below are imported lazily: importing one submodule
+(e.g. `ast_extractors.extraction_store`) does not load every extractor.
 """
 
-from .base_extractor import BaseExtractor
-from .class_extractor import ClassExtractor, ClassInfo
-from .function_extractor import FunctionExtractor, FunctionInfo, ParameterInfo
-from .dependency_extractor import DependencyExtractor, DependencyInfo
-
-__all__ = [
-    'BaseExtractor',
-    'ClassExtractor',
-    'ClassInfo',
-    'FunctionExtractor',
-    'FunctionInfo',
-    'ParameterInfo',
-    'DependencyExtractor',
-    'DependencyInfo',
-]
+import importlib
+
+# Public name -> submodule that defines it
+_EXPORTS = {
+    'ParsedModule': 'ast_cache',
+    'ParsedModuleCache': 'ast_cache',
+    'ExtractionStore': 'extraction_store',
+    'BaseExtractor': 'base_extractor',
+    'ClassExtractor': 'class_extractor',
+    'ClassInfo': 'class_extractor',
+    'FunctionExtractor': 'function_extractor',
+    'FunctionInfo': 'function_extractor',
+    'ParameterInfo': 'function_extractor',
+    'DependencyExtractor': 'dependency_extractor',
+    'DependencyInfo': 'dependency_extractor',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Parsed module cache for AST analysis.
+
+Reads and parses each Python file once per run so that every extractor
+(and the dependency analyzer) can share the same source and AST.
+Entries remember the file's stat fingerprint (mtime_ns, size), so later
+lookups of an unchanged file neither re-read nor re-hash it.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import ast
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class ParsedModule:
+    """Source and AST of a parsed file"""
+    source: str
+    tree: ast.Module
+    content_hash: str
+    fingerprint: Optional[Tuple[int, int]] = None
+
+
+class ParsedModuleCache:
+    """Per-run cache of parsed modules keyed by path and content hash"""
+
+    def __init__(self, max_entries: Optional[int] = 256):
+        """
+        Initialize parsed module cache.
+
+        Args:
+            max_entries: Maximum number of cached modules (None for unbounded).
+                Least recently used entries are evicted first.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.reads = 0
+        self._entries: 'OrderedDict[str, ParsedModule]' = OrderedDict()
+
+    def get(self, file_path: Path, data: Optional[bytes] = None) -> ParsedModule:
+        """
+        Get parsed module for a file, parsing it on first access.
+
+        Args:
+            file_path: Path to the Python file
+            data: Raw file content if the caller has already read it
+                (the file is not read again)
+
+        Returns:
+            ParsedModule with source, tree and content hash
+
+        Raises:
+            OSError, UnicodeDecodeError, SyntaxError: Same as reading and
+                parsing the file directly
+        """
+        key = str(file_path)
+        cached = self._entries.get(key)
+        stat = os.stat(file_path)
+        fingerprint = (stat.st_mtime_ns, stat.st_size)
+
+        # Unchanged since it was cached: no read, no hash
+        if cached is not None and cached.fingerprint == fingerprint:
+            return self._hit(key, cached)
+
+        if data is None:
+            with open(file_path, 'rb') as f:
+                data = f.read()
+            self.reads += 1
+        content_hash = hashlib.md5(data).hexdigest()
+
+        if cached is not None and cached.content_hash == content_hash:
+            cached.fingerprint = fingerprint
+            return self._hit(key, cached)
+
+        self.misses += 1
+        # Match text-mode reading (universal newlines)
+        source = data.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        module = ParsedModule(
+            source=source,
+            tree=ast.parse(source, filename=key),
+            content_hash=content_hash,
+            fingerprint=fingerprint
+        )
+
+        self._entries[key] = module
+        self._entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return module
+
+    def _hit(self, key: str, module: ParsedModule) -> ParsedModule:
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return module
+
+    def clear(self):
+        """Drop all cached modules (counters are kept)"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, misses, reads, entries and hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'reads': self.reads,
+            'entries': len(self._entries),
+            'hit_rate': self.hits / total if total else 0.0
+        }
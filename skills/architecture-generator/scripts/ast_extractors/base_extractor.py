@@ -8,24 +8,40 @@ Provides common functionality for all AST extractors.
 from abc import ABC, abstractmethod
 import ast
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
+
+from .ast_cache import ParsedModule, ParsedModuleCache
+from .extraction_engine import ExtractionEngine
 
 
 class BaseExtractor(ABC):
     """Base class for all AST extractors"""
 
-    def __init__(self, file_path: Path, root_path: Path):
+    def __init__(self, file_path: Path, root_path: Path,
+                 cache: Optional[ParsedModuleCache] = None,
+                 parsed: Optional[ParsedModule] = None):
         """
         Initialize base extractor.
 
         Args:
             file_path: Path to the file to analyze
             root_path: Project root path
+            cache: Shared parsed module cache (parses the file directly if None)
+            parsed: Already parsed module for file_path (takes precedence
+                over cache, so extractors of one file share a single lookup)
         """
         self.file_path = file_path
         self.root_path = root_path
-        self.source = self._load_source()
-        self.tree = self._parse_ast()
+        self.cache = cache
+        if parsed is None and cache is not None:
+            parsed = cache.get(file_path)
+        self.parsed = parsed
+        if parsed is not None:
+            self.source = parsed.source
+            self.tree = parsed.tree
+        else:
+            self.source = self._load_source()
+            self.tree = self._parse_ast()
 
     def _load_source(self) -> str:
         """
@@ -56,6 +72,27 @@ class BaseExtractor(ABC):
         """
         pass
 
+    def begin(self):
+        """Reset collected state before an ExtractionEngine traversal"""
+        pass
+
+    @abstractmethod
+    def finalize(self, engine) -> Any:
+        """
+        Build the extraction result after an ExtractionEngine traversal.
+
+        Args:
+            engine: ExtractionEngine that fed this extractor
+
+        Returns:
+            Same value as extract()
+        """
+        pass
+
+    def _extract_with_engine(self) -> Any:
+        """Run a single-extractor traversal and return its result"""
+        return ExtractionEngine(self.tree, [self]).run()[0]
+
     def extract_docstring(self, node: ast.AST) -> Optional[str]:
         """
         Extract docstring from AST node.
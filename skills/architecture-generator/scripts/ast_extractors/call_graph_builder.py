@@ -3,11 +3,209 @@
 Call graph builder for tracking function call relationships.
 
 Builds and manages a call graph showing which functions call which.
+
+Reachability is answered from an in-memory graph: call edges are resolved
+to symbol IDs once, strongly connected components are condensed with
+Tarjan's algorithm, and the reachable set of each component is an integer
+bitset over components, computed on demand on the condensation DAG.
 """
 
 import sqlite3
-from typing import List, Dict, Set
-from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+class CallGraph:
+    """In-memory call graph over symbol IDs with SCC-based reachability"""
+
+    def __init__(self, edges: Iterable[Tuple[Optional[int], int]]):
+        """
+        Build the graph and its strongly connected components.
+
+        Args:
+            edges: (caller_id, callee_id) pairs of resolved calls (duplicates
+                and edges without a caller are ignored)
+        """
+        # Dense node indexes and integer adjacency arrays
+        self.node_ids: List[int] = []
+        self.index: Dict[int, int] = {}
+        successors: List[Set[int]] = []
+        index = self.index
+        for caller_id, callee_id in edges:
+            if caller_id is None:
+                continue
+            caller = index.get(caller_id)
+            if caller is None:
+                caller = index[caller_id] = len(self.node_ids)
+                self.node_ids.append(caller_id)
+                successors.append(set())
+            callee = index.get(callee_id)
+            if callee is None:
+                callee = index[callee_id] = len(self.node_ids)
+                self.node_ids.append(callee_id)
+                successors.append(set())
+            successors[caller].add(callee)
+        self.successors = [sorted(targets) for targets in successors]
+
+        self.component_of: List[int] = []
+        self.components: List[List[int]] = []
+        self._find_components()
+
+        # Condensation DAG; a component is cyclic if it can reach itself
+        self.component_successors: List[List[int]] = []
+        self.cyclic: List[bool] = []
+        for component, members in enumerate(self.components):
+            targets = set()
+            cyclic = len(members) > 1
+            for node in members:
+                for target in self.successors[node]:
+                    target_component = self.component_of[target]
+                    if target_component == component:
+                        cyclic = True
+                    else:
+                        targets.add(target_component)
+            self.component_successors.append(sorted(targets))
+            self.cyclic.append(cyclic)
+
+        self._reach: List[Optional[int]] = [None] * len(self.components)
+
+    def _find_components(self):
+        """Tarjan's SCC algorithm (iterative, safe for deep call chains)
+
+        Components are numbered in completion order, which is a reverse
+        topological order of the condensation: every component reachable
+        from component c has a number lower than c.
+        """
+        count = len(self.node_ids)
+        order = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        self.component_of = [-1] * count
+        stack: List[int] = []
+        counter = 0
+
+        for root in range(count):
+            if order[root] != -1:
+                continue
+            work = [(root, 0)]
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+
+            while work:
+                node, position = work[-1]
+                targets = self.successors[node]
+                if position < len(targets):
+                    work[-1] = (node, position + 1)
+                    target = targets[position]
+                    if order[target] == -1:
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, 0))
+                    elif on_stack[target] and order[target] < low[node]:
+                        low[node] = order[target]
+                    continue
+
+                work.pop()
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == order[node]:
+                    component = len(self.components)
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        self.component_of[member] = component
+                        members.append(member)
+                        if member == node:
+                            break
+                    self.components.append(members)
+
+    def _component_reach(self, component: int) -> int:
+        """Bitset of components reachable from a component (memoized, iterative)"""
+        reach = self._reach
+        if reach[component] is not None:
+            return reach[component]
+
+        work = [component]
+        while work:
+            current = work[-1]
+            if reach[current] is not None:
+                work.pop()
+                continue
+            pending = [c for c in self.component_successors[current] if reach[c] is None]
+            if pending:
+                work.extend(pending)
+                continue
+            work.pop()
+            bits = 1 << current if self.cyclic[current] else 0
+            for target in self.component_successors[current]:
+                bits |= reach[target] | (1 << target)
+            reach[current] = bits
+        return reach[component]
+
+    def reachable_from(self, symbol_id: int) -> Set[int]:
+        """
+        Get all symbols transitively called by a symbol.
+
+        Args:
+            symbol_id: ID of the calling function
+
+        Returns:
+            Set of reachable symbol IDs (includes the symbol itself only
+            if it is part of a cycle)
+        """
+        node = self.index.get(symbol_id)
+        if node is None:
+            return set()
+        return {
+            self.node_ids[member]
+            for component in _iter_bits(self._component_reach(self.component_of[node]))
+            for member in self.components[component]
+        }
+
+    def can_reach(self, source_id: int, target_id: int) -> bool:
+        """
+        Check whether one symbol transitively calls another.
+
+        Args:
+            source_id: ID of the calling function
+            target_id: ID of the function that may be reached
+
+        Returns:
+            True if target is reachable from source through one or more calls
+        """
+        source = self.index.get(source_id)
+        target = self.index.get(target_id)
+        if source is None or target is None:
+            return False
+        source_component = self.component_of[source]
+        target_component = self.component_of[target]
+        # Components are numbered in reverse topological order
+        if target_component > source_component:
+            return False
+        if target_component == source_component:
+            return self.cyclic[source_component]
+        return bool(self._component_reach(source_component) >> target_component & 1)
+
+
+# Call edges resolved to function symbol IDs. Deduplicated in memory:
+# DISTINCT makes the planner walk callers in random order.
+_RESOLVED_EDGES_SQL = """
+    SELECT c.caller_id, s.id
+    FROM call_graph c
+    JOIN symbols s ON s.name = c.callee_name AND s.kind = 'function'
+"""
+
+
+def _iter_bits(bits: int) -> Iterator[int]:
+    """Yield the positions of set bits"""
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
 
 
 class CallGraphBuilder:
@@ -22,6 +220,7 @@ class CallGraphBuilder:
         """
         self.db_path = db_path
         self.conn = sqlite3.connect(db_path)
+        self._graph: Optional[CallGraph] = None
         self._init_db()
 
     def _init_db(self):
@@ -51,12 +250,81 @@ class CallGraphBuilder:
             callee_name: Name of the function being called
             line_number: Line number of the call
         """
+        self.add_calls([(caller_id, callee_name, line_number)])
+
+    def add_calls(self, calls: Iterable[Tuple[int, str, Optional[int]]]) -> int:
+        """
+        Add many function calls in a single transaction.
+
+        Args:
+            calls: (caller_id, callee_name, line_number) tuples (any iterable,
+                consumed once)
+
+        Returns:
+            Number of calls added
+        """
+        with self.conn:
+            count = self.conn.executemany(
+                "INSERT INTO call_graph (caller_id, callee_name, line_number) VALUES (?, ?, ?)",
+                calls
+            ).rowcount
+        self._graph = None
+        return count
+
+    def load_adjacency(self, resolve: bool = False) -> Dict[int, List]:
+        """
+        Load the whole call graph in a single scan.
+
+        Args:
+            resolve: Resolve callee names to function symbol IDs (one join;
+                names without a matching function are dropped)
+
+        Returns:
+            Dictionary mapping caller IDs to distinct callee names (in
+            insertion order), or to sorted callee IDs when resolve is True
+        """
         cursor = self.conn.cursor()
-        cursor.execute(
-            "INSERT INTO call_graph (caller_id, callee_name, line_number) VALUES (?, ?, ?)",
-            (caller_id, callee_name, line_number)
-        )
-        self.conn.commit()
+        if not resolve:
+            cursor.execute("SELECT caller_id, callee_name FROM call_graph")
+            names: Dict[int, Dict[str, None]] = {}
+            for caller_id, callee_name in cursor:
+                names.setdefault(caller_id, {})[callee_name] = None
+            return {caller_id: list(callees) for caller_id, callees in names.items()}
+
+        cursor.execute(_RESOLVED_EDGES_SQL)
+        ids: Dict[int, Set[int]] = {}
+        for caller_id, callee_id in cursor:
+            ids.setdefault(caller_id, set()).add(callee_id)
+        return {caller_id: sorted(callees) for caller_id, callees in ids.items()}
+
+    def resolve_callees(self, callee_names: Iterable[str]) -> Dict[str, List[int]]:
+        """
+        Resolve callee names to function symbol IDs with one set-based join.
+
+        Args:
+            callee_names: Names of called functions
+
+        Returns:
+            Dictionary mapping each resolvable name to its function IDs
+        """
+        cursor = self.conn.cursor()
+        with self.conn:
+            cursor.execute("CREATE TEMP TABLE IF NOT EXISTS callee_names (name TEXT PRIMARY KEY)")
+            cursor.execute("DELETE FROM callee_names")
+            cursor.executemany(
+                "INSERT OR IGNORE INTO callee_names (name) VALUES (?)",
+                ((name,) for name in callee_names)
+            )
+        cursor.execute("""
+            SELECT s.name, s.id
+            FROM callee_names n
+            JOIN symbols s ON s.name = n.name AND s.kind = 'function'
+            ORDER BY s.id
+        """)
+        resolved: Dict[str, List[int]] = {}
+        for name, symbol_id in cursor:
+            resolved.setdefault(name, []).append(symbol_id)
+        return resolved
 
     def get_callees(self, caller_id: int) -> List[str]:
         """
@@ -111,55 +379,75 @@ class CallGraphBuilder:
             for row in cursor.fetchall()
         ]
 
+    def load_graph(self) -> CallGraph:
+        """
+        Load the call graph into memory (cached until the graph changes).
+
+        Callee names are resolved to function symbol IDs in a single join.
+
+        Returns:
+            In-memory call graph over symbol IDs
+        """
+        if self._graph is None:
+            self._graph = CallGraph(self.conn.execute(_RESOLVED_EDGES_SQL))
+        return self._graph
+
+    def reachable_from(self, symbol_id: int) -> Set[int]:
+        """
+        Get all functions transitively called by a function.
+
+        Args:
+            symbol_id: ID of the calling function
+
+        Returns:
+            Set of reachable function IDs
+        """
+        return self.load_graph().reachable_from(symbol_id)
+
+    def can_reach(self, source_id: int, target_id: int) -> bool:
+        """
+        Check whether one function transitively calls another.
+
+        Args:
+            source_id: ID of the calling function
+            target_id: ID of the function that may be reached
+
+        Returns:
+            True if target is reachable from source
+        """
+        return self.load_graph().can_reach(source_id, target_id)
+
     def build_transitive_closure(self) -> Dict[int, Set[str]]:
         """
         Build transitive closure of call graph.
 
-        Computes all reachable functions for each function.
+        Computes all reachable functions for each function. Prefer
+        reachable_from / can_reach when only some callers are needed.
 
         Returns:
             Dictionary mapping function IDs to sets of reachable function names
         """
-        # Build adjacency list
-        graph = {}
-        cursor = self.conn.cursor()
-        cursor.execute("SELECT DISTINCT caller_id FROM call_graph")
+        direct = self.load_adjacency()
+        graph = self.load_graph()
 
-        for row in cursor.fetchall():
-            caller_id = row[0]
-            callees = self.get_callees(caller_id)
-            graph[caller_id] = set(callees)
+        # Names called from each component and everything it reaches,
+        # accumulated in reverse topological order (successors first)
+        component_names: List[Set[str]] = []
+        for component, members in enumerate(graph.components):
+            names = set()
+            for member in members:
+                names.update(direct.get(graph.node_ids[member], ()))
+            for target in graph.component_successors[component]:
+                names |= component_names[target]
+            component_names.append(names)
 
-        # Compute transitive closure using fixed-point iteration
         closure = {}
-        changed = True
-
-        # Initialize closure with direct calls
-        for caller_id, callees in graph.items():
-            closure[caller_id] = set(callees)
-
-        # Iteratively expand until no changes
-        while changed:
-            changed = False
-            for caller_id in closure:
-                current_size = len(closure[caller_id])
-                # Add callees of callees
-                new_callees = set()
-                for callee in list(closure[caller_id]):
-                    # Find caller IDs for this callee name
-                    cursor.execute(
-                        "SELECT id FROM symbols WHERE name = ? AND kind = 'function'",
-                        (callee,)
-                    )
-                    for row in cursor.fetchall():
-                        callee_id = row[0]
-                        if callee_id in closure:
-                            new_callees.update(closure[callee_id])
-
-                closure[caller_id].update(new_callees)
-                if len(closure[caller_id]) > current_size:
-                    changed = True
-
+        for caller_id, callees in direct.items():
+            node = graph.index.get(caller_id)
+            if node is None:
+                closure[caller_id] = set(callees)
+            else:
+                closure[caller_id] = set(component_names[graph.component_of[node]])
         return closure
 
     def close(self):
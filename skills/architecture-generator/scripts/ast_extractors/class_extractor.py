@@ -10,7 +10,9 @@ from dataclasses import dataclass
 from typing import List, Dict, Optional, Any
 import ast
 
+from .ast_cache import ParsedModuleCache
 from .base_extractor import BaseExtractor
+from .extraction_engine import ExtractionEngine, NestingIndex
 from .function_extractor import FunctionExtractor, FunctionInfo
 
 
@@ -33,6 +35,16 @@ class ClassInfo:
 class ClassExtractor(BaseExtractor):
     """Extract comprehensive class information"""
 
+    def __init__(self, file_path, root_path, cache=None, parsed=None):
+        """Initialize class extractor"""
+        if cache is None and parsed is None:
+            # Private cache so the method extractor reuses this parse
+            cache = ParsedModuleCache(max_entries=1)
+        super().__init__(file_path, root_path, cache, parsed)
+        self._function_extractor = None
+        self._nesting = None
+        self._top_level_nodes = []
+
     def extract(self) -> List[ClassInfo]:
         """
         Extract all classes from the file.
@@ -40,25 +52,51 @@ class ClassExtractor(BaseExtractor):
         Returns:
             List of ClassInfo objects
         """
-        classes = []
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.ClassDef):
-                # Only extract top-level classes (not nested ones here)
-                if self._is_top_level_class(node):
-                    class_info = self._extract_class(node)
-                    classes.append(class_info)
-        return classes
+        return self._extract_with_engine()
+
+    def begin(self):
+        """Reset collected class nodes"""
+        self._top_level_nodes = []
+
+    def visit_ClassDef(self, node: ast.ClassDef, scope):
+        """Collect module-level classes (nested ones are extracted by their parent)"""
+        self._top_level_nodes.append(node)
+
+    def finalize(self, engine) -> List[ClassInfo]:
+        """
+        Extract collected top-level classes.
+
+        Args:
+            engine: ExtractionEngine that fed this extractor
+
+        Returns:
+            List of ClassInfo objects
+        """
+        self._nesting = engine.nesting
+        self._get_function_extractor().use_function_facts(engine.function_facts)
+        return [
+            self._extract_class(node)
+            for node in self._top_level_nodes
+            if self._is_top_level_class(node)
+        ]
 
     def _is_top_level_class(self, node: ast.ClassDef) -> bool:
         """Check if class is at module level (not nested)"""
-        for parent in ast.walk(self.tree):
-            if isinstance(parent, ast.ClassDef):
-                if parent != node and node in ast.walk(parent):
-                    return False
-            elif isinstance(parent, ast.FunctionDef):
-                if node in ast.walk(parent):
-                    return False
-        return True
+        return self._get_nesting().is_top_level_class(node)
+
+    def _get_nesting(self) -> NestingIndex:
+        """Get nesting info for the tree (computed once per tree)"""
+        if self._nesting is None:
+            engine = ExtractionEngine(self.tree, [])
+            engine.run()
+            self._nesting = engine.nesting
+        return self._nesting
+
+    def _get_function_extractor(self) -> FunctionExtractor:
+        """Get the function extractor used for methods"""
+        if self._function_extractor is None:
+            self._function_extractor = FunctionExtractor(self.file_path, self.root_path, self.cache, self.parsed)
+        return self._function_extractor
 
     def _extract_class(self, node: ast.ClassDef) -> ClassInfo:
         """
@@ -118,7 +156,7 @@ class ClassExtractor(BaseExtractor):
         Returns:
             List of FunctionInfo objects
         """
-        extractor = FunctionExtractor(self.file_path, self.root_path)
+        extractor = self._get_function_extractor()
         methods = []
 
         for node in class_node.body:
@@ -174,11 +212,7 @@ class ClassExtractor(BaseExtractor):
         Returns:
             List of nested ClassInfo objects
         """
-        nested = []
-        for node in class_node.body:
-            if isinstance(node, ast.ClassDef):
-                nested.append(self._extract_class(node))
-        return nested
+        return [self._extract_class(node) for node in self._get_nesting().nested_classes(class_node)]
 
     def _is_abstract(self, node: ast.ClassDef) -> bool:
         """
@@ -7,12 +7,22 @@ function calls, class instantiations, and type annotations.
 """
 
 from dataclasses import dataclass
-from typing import List, Set, Optional
+from typing import List, Optional
 import ast
 
 from .base_extractor import BaseExtractor
 
 
+# Standard library modules
+STDLIB_MODULES = frozenset({
+    'os', 'sys', 'json', 're', 'pathlib', 'typing', 'datetime',
+    'collections', 'itertools', 'functools', 'math', 'random',
+    'time', 'uuid', 'hashlib', 'base64', 'pickle', 'io', 'logging',
+    'abc', 'dataclasses', 'enum', 'contextlib', 'asyncio',
+    'threading', 'multiprocessing', 'concurrent', 'queue'
+})
+
+
 @dataclass
 class DependencyInfo:
     """Dependency information"""
@@ -26,10 +36,10 @@ class DependencyInfo:
 class DependencyExtractor(BaseExtractor):
     """Enhanced dependency extraction"""
 
-    def __init__(self, file_path, root_path):
+    def __init__(self, file_path, root_path, cache=None, parsed=None):
         """Initialize dependency extractor"""
-        super().__init__(file_path, root_path)
-        self._imported_names = None
+        super().__init__(file_path, root_path, cache, parsed)
+        self.begin()
 
     def extract(self) -> dict:
         """
@@ -38,94 +48,184 @@ class DependencyExtractor(BaseExtractor):
         Returns:
             Dictionary with different dependency types
         """
-        self._imported_names = self._get_imported_names()
+        return self._extract_with_engine()
+
+    def begin(self):
+        """Reset collected dependencies"""
+        self._imported_names = set()
+        self._defined_names = set()
+        self._imports: List[DependencyInfo] = []
+        self._import_bindings: List[DependencyInfo] = []
+        self._call_candidates: List[tuple] = []
+        self._instantiations: List[DependencyInfo] = []
+        self._type_candidates: List[tuple] = []
+
+    def finalize(self, engine) -> dict:
+        """
+        Resolve collected candidates against the imported and defined names.
+
+        Args:
+            engine: ExtractionEngine that fed this extractor
 
+        Returns:
+            Dictionary with different dependency types
+        """
         return {
-            'imports': self._extract_imports(),
+            'imports': self._imports,
+            'import_bindings': self._import_bindings,
             'calls': self._extract_function_calls(),
-            'instantiations': self._extract_class_instantiations(),
+            'local_calls': self._extract_local_calls(),
+            'instantiations': self._instantiations,
             'type_hints': self._extract_type_dependencies()
         }
 
-    def _extract_imports(self) -> List[DependencyInfo]:
+    # Traversal handlers
+
+    def visit_Import(self, node: ast.Import, scope):
+        """Collect `import x` statements"""
+        for alias in node.names:
+            module_name = alias.name
+            self._imports.append(DependencyInfo(
+                name=module_name,
+                dep_type='import',
+                line_number=node.lineno,
+                is_external=self._is_external_module(module_name),
+                module_path=module_name
+            ))
+            self._imported_names.add(alias.name)
+            if alias.asname:
+                self._imported_names.add(alias.asname)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom, scope):
         """
-        Extract import statements.
+        Collect `from x import y` statements.
 
-        Returns:
-            List of import dependencies
+        Each imported name is also recorded as a binding: name is the local
+        name (the `as` alias if any) and module_path the full specifier of
+        the imported object, keeping the relative level
+        (`from ..pkg import c as d` -> name 'd', module_path '..pkg.c').
         """
-        imports = []
-
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    module_name = alias.name
-                    imports.append(DependencyInfo(
-                        name=module_name,
-                        dep_type='import',
-                        line_number=node.lineno,
-                        is_external=self._is_external_module(module_name),
-                        module_path=module_name
-                    ))
-
-            elif isinstance(node, ast.ImportFrom):
-                module_name = node.module if node.module else ''
-                for alias in node.names:
-                    imports.append(DependencyInfo(
-                        name=f"{module_name}.{alias.name}" if module_name else alias.name,
-                        dep_type='from_import',
-                        line_number=node.lineno,
-                        is_external=self._is_external_module(module_name),
-                        module_path=module_name
-                    ))
-
-        return imports
+        module_name = node.module if node.module else ''
+        prefix = '.' * (node.level or 0) + (f"{module_name}." if module_name else '')
+        for alias in node.names:
+            self._imports.append(DependencyInfo(
+                name=f"{module_name}.{alias.name}" if module_name else alias.name,
+                dep_type='from_import',
+                line_number=node.lineno,
+                is_external=self._is_external_module(module_name),
+                module_path=module_name
+            ))
+            if alias.name != '*':
+                self._import_bindings.append(DependencyInfo(
+                    name=alias.asname or alias.name,
+                    dep_type='from_import',
+                    line_number=node.lineno,
+                    is_external=self._is_external_module(module_name),
+                    module_path=prefix + alias.name
+                ))
+            self._imported_names.add(alias.name)
+            if alias.asname:
+                self._imported_names.add(alias.asname)
+
+    def visit_Call(self, node: ast.Call, scope):
+        """Collect call sites (filtered by imported names in finalize)"""
+        func_name = self._extract_call_name(node.func)
+        if not func_name:
+            return
+
+        # Calls that can target a function defined in this file: bare names
+        # and methods on self/cls (other attribute calls cannot be resolved)
+        func = node.func
+        is_local = isinstance(func, ast.Name) or (
+            isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+            and func.value.id in ('self', 'cls')
+        )
+        self._call_candidates.append((func_name, node.lineno, is_local))
+
+        if func_name[0].isupper():  # Class names typically start with uppercase
+            self._instantiations.append(DependencyInfo(
+                name=func_name,
+                dep_type='instantiation',
+                line_number=node.lineno,
+                is_external=self._is_external_module(func_name),
+                module_path=None
+            ))
+
+    def visit_FunctionDef(self, node: ast.FunctionDef, scope):
+        """Collect defined names and return type annotations"""
+        self._defined_names.add(node.name)
+        if node.returns:
+            for type_name in self._extract_type_names(node.returns):
+                self._type_candidates.append((type_name, node.lineno))
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node: ast.ClassDef, scope):
+        """Collect defined class names"""
+        self._defined_names.add(node.name)
+
+    def visit_arguments(self, node: ast.arguments, scope):
+        """Collect parameter annotations"""
+        line_number = node.lineno if hasattr(node, 'lineno') else 0
+
+        for arg in node.args + node.posonlyargs + node.kwonlyargs:
+            if arg.annotation:
+                for type_name in self._extract_type_names(arg.annotation):
+                    self._type_candidates.append((type_name, line_number))
+
+        # Check *args and **kwargs annotations
+        for arg in (node.vararg, node.kwarg):
+            if arg and arg.annotation:
+                for type_name in self._extract_type_names(arg.annotation):
+                    self._type_candidates.append((type_name, line_number))
+
+    def visit_AnnAssign(self, node: ast.AnnAssign, scope):
+        """Collect variable annotations"""
+        if node.annotation:
+            for type_name in self._extract_type_names(node.annotation):
+                self._type_candidates.append((type_name, node.lineno))
+
+    # Result builders
 
     def _extract_function_calls(self) -> List[DependencyInfo]:
         """
-        Extract function calls.
+        Extract calls to imported names.
 
         Returns:
             List of function call dependencies
         """
-        calls = []
-
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Call):
-                func_name = self._extract_call_name(node.func)
-                if func_name and func_name in self._imported_names:
-                    calls.append(DependencyInfo(
-                        name=func_name,
-                        dep_type='call',
-                        line_number=node.lineno,
-                        is_external=self._is_external_module(func_name),
-                        module_path=None
-                    ))
-
-        return calls
-
-    def _extract_class_instantiations(self) -> List[DependencyInfo]:
+        return [
+            DependencyInfo(
+                name=func_name,
+                dep_type='call',
+                line_number=line_number,
+                is_external=self._is_external_module(func_name),
+                module_path=None
+            )
+            for func_name, line_number, _ in self._call_candidates
+            if func_name in self._imported_names
+        ]
+
+    def _extract_local_calls(self) -> List[DependencyInfo]:
         """
-        Extract class instantiations.
+        Extract direct or self/cls calls to functions/classes defined in this
+        file that are not imported names (used for the symbol call graph;
+        calls to builtins and unknown attributes are dropped).
 
         Returns:
-            List of class instantiation dependencies
+            List of function call dependencies
         """
-        instantiations = []
-
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Call):
-                func_name = self._extract_call_name(node.func)
-                if func_name and func_name[0].isupper():  # Class names typically start with uppercase
-                    instantiations.append(DependencyInfo(
-                        name=func_name,
-                        dep_type='instantiation',
-                        line_number=node.lineno,
-                        is_external=self._is_external_module(func_name),
-                        module_path=None
-                    ))
-
-        return instantiations
+        return [
+            DependencyInfo(
+                name=func_name,
+                dep_type='call',
+                line_number=line_number,
+                is_external=False,
+                module_path=None
+            )
+            for func_name, line_number, is_local in self._call_candidates
+            if is_local and func_name in self._defined_names and func_name not in self._imported_names
+        ]
 
     def _extract_type_dependencies(self) -> List[DependencyInfo]:
         """
@@ -134,102 +234,17 @@ class DependencyExtractor(BaseExtractor):
         Returns:
             List of type annotation dependencies
         """
-        type_deps = []
-
-        for node in ast.walk(self.tree):
-            # Check function return type
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                if node.returns:
-                    type_names = self._extract_type_names(node.returns)
-                    for type_name in type_names:
-                        if type_name and type_name in self._imported_names:
-                            type_deps.append(DependencyInfo(
-                                name=type_name,
-                                dep_type='type_hint',
-                                line_number=node.lineno,
-                                is_external=self._is_external_module(type_name),
-                                module_path=None
-                            ))
-
-            # Check parameter annotations
-            elif isinstance(node, ast.arguments):
-                for arg in node.args + node.posonlyargs + node.kwonlyargs:
-                    if arg.annotation:
-                        type_names = self._extract_type_names(arg.annotation)
-                        for type_name in type_names:
-                            if type_name and type_name in self._imported_names:
-                                type_deps.append(DependencyInfo(
-                                    name=type_name,
-                                    dep_type='type_hint',
-                                    line_number=node.lineno if hasattr(node, 'lineno') else 0,
-                                    is_external=self._is_external_module(type_name),
-                                    module_path=None
-                                ))
-
-                # Check *args and **kwargs annotations
-                if node.vararg and node.vararg.annotation:
-                    type_names = self._extract_type_names(node.vararg.annotation)
-                    for type_name in type_names:
-                        if type_name and type_name in self._imported_names:
-                            type_deps.append(DependencyInfo(
-                                name=type_name,
-                                dep_type='type_hint',
-                                line_number=node.lineno if hasattr(node, 'lineno') else 0,
-                                is_external=self._is_external_module(type_name),
-                                module_path=None
-                            ))
-
-                if node.kwarg and node.kwarg.annotation:
-                    type_names = self._extract_type_names(node.kwarg.annotation)
-                    for type_name in type_names:
-                        if type_name and type_name in self._imported_names:
-                            type_deps.append(DependencyInfo(
-                                name=type_name,
-                                dep_type='type_hint',
-                                line_number=node.lineno if hasattr(node, 'lineno') else 0,
-                                is_external=self._is_external_module(type_name),
-                                module_path=None
-                            ))
-
-            # Check variable annotations
-            elif isinstance(node, ast.AnnAssign):
-                if node.annotation:
-                    type_names = self._extract_type_names(node.annotation)
-                    for type_name in type_names:
-                        if type_name and type_name in self._imported_names:
-                            type_deps.append(DependencyInfo(
-                                name=type_name,
-                                dep_type='type_hint',
-                                line_number=node.lineno,
-                                is_external=self._is_external_module(type_name),
-                                module_path=None
-                            ))
-
-        return type_deps
-
-    def _get_imported_names(self) -> Set[str]:
-        """
-        Get all imported names.
-
-        Returns:
-            Set of imported names
-        """
-        names = set()
-
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    names.add(alias.name)
-                    if alias.asname:
-                        names.add(alias.asname)
-
-            elif isinstance(node, ast.ImportFrom):
-                for alias in node.names:
-                    names.add(alias.name)
-                    if alias.asname:
-                        names.add(alias.asname)
-
-        return names
+        return [
+            DependencyInfo(
+                name=type_name,
+                dep_type='type_hint',
+                line_number=line_number,
+                is_external=self._is_external_module(type_name),
+                module_path=None
+            )
+            for type_name, line_number in self._type_candidates
+            if type_name and type_name in self._imported_names
+        ]
 
     def _extract_call_name(self, func: ast.expr) -> Optional[str]:
         """
@@ -295,18 +310,9 @@ class DependencyExtractor(BaseExtractor):
         Returns:
             True if module is likely external
         """
-        # Standard library modules
-        stdlib_modules = {
-            'os', 'sys', 'json', 're', 'pathlib', 'typing', 'datetime',
-            'collections', 'itertools', 'functools', 'math', 'random',
-            'time', 'uuid', 'hashlib', 'base64', 'pickle', 'io', 'logging',
-            'abc', 'dataclasses', 'enum', 'contextlib', 'asyncio',
-            'threading', 'multiprocessing', 'concurrent', 'queue'
-        }
-
         # Check if it's a standard library module
         module_base = name.split('.')[0]
-        if module_base in stdlib_modules:
+        if module_base in STDLIB_MODULES:
             return True
 
         # TODO: Could be enhanced to check against project structure
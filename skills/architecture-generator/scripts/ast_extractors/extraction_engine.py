@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Single-pass extraction engine for enhanced AST analysis.
+
+Traverses a module once and dispatches every node to the collectors
+(extractors) that handle its type, following the ast.NodeVisitor
+``visit_<NodeType>`` naming convention.
+
+Nodes are visited in the same breadth-first order as ``ast.walk`` so
+collectors produce the same ordering the per-extractor walks did.
+"""
+
+from collections import deque
+import ast
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+class FunctionFacts:
+    """Facts about a function body gathered during traversal"""
+
+    __slots__ = ('has_yield', 'await_count')
+
+    def __init__(self):
+        self.has_yield = False
+        self.await_count = 0
+
+
+class Scope:
+    """Lexical context of a node (what encloses it)"""
+
+    __slots__ = ('definition', 'depth', 'class_depth', 'sync_function_depth', 'functions')
+
+    def __init__(self, definition: Optional[ast.AST] = None, depth: int = 0,
+                 class_depth: int = 0, sync_function_depth: int = 0,
+                 functions: Tuple[FunctionFacts, ...] = ()):
+        self.definition = definition  # Nearest enclosing class/function node
+        self.depth = depth  # Number of enclosing class/function nodes
+        self.class_depth = class_depth
+        self.sync_function_depth = sync_function_depth
+        self.functions = functions
+
+
+class NestingIndex:
+    """Parent pointers and nesting depth of class/function definitions"""
+
+    def __init__(self):
+        self._scopes: Dict[ast.AST, Scope] = {}
+        self._nested_classes: Dict[ast.AST, List[ast.ClassDef]] = {}
+
+    def record(self, node: ast.AST, scope: Scope):
+        """
+        Record a definition node with the scope enclosing it.
+
+        Args:
+            node: ClassDef, FunctionDef or AsyncFunctionDef node
+            scope: Scope the node appears in
+        """
+        self._scopes[node] = scope
+        if isinstance(node, ast.ClassDef):
+            self._nested_classes[node] = [
+                child for child in node.body if isinstance(child, ast.ClassDef)
+            ]
+
+    def parent(self, node: ast.AST) -> Optional[ast.AST]:
+        """Nearest enclosing class/function node (None at module level)"""
+        return self._scopes[node].definition
+
+    def depth(self, node: ast.AST) -> int:
+        """Number of enclosing class/function nodes"""
+        return self._scopes[node].depth
+
+    def is_top_level_class(self, node: ast.ClassDef) -> bool:
+        """
+        Check if class is not nested in another class or (sync) function.
+
+        Classes inside async functions count as top-level, matching the
+        original ClassExtractor behaviour.
+        """
+        scope = self._scopes[node]
+        return scope.class_depth == 0 and scope.sync_function_depth == 0
+
+    def nested_classes(self, node: ast.ClassDef) -> List[ast.ClassDef]:
+        """Classes defined directly in a class body"""
+        return self._nested_classes[node]
+
+
+_ROOT_SCOPE = Scope()
+
+
+class ExtractionEngine(ast.NodeVisitor):
+    """Traverse an AST once and fan nodes out to collectors"""
+
+    def __init__(self, tree: ast.AST, collectors: Sequence[Any],
+                 timings: Optional[Dict[str, float]] = None):
+        """
+        Initialize extraction engine.
+
+        Args:
+            tree: AST to traverse
+            collectors: Objects defining ``visit_<NodeType>(node, scope)``
+                handlers, plus optional ``begin()`` and a
+                ``finalize(engine)`` returning the collector's result
+            timings: If given, seconds spent in each collector's handlers,
+                ``begin`` and ``finalize`` are added under its class name
+                (handlers are only wrapped for timing in that case)
+        """
+        self.tree = tree
+        self.collectors = list(collectors)
+        self.timings = timings
+        self.function_facts: Dict[ast.AST, FunctionFacts] = {}
+        self.nesting = NestingIndex()
+        self._dispatch = self._build_dispatch_table()
+
+    def _build_dispatch_table(self) -> Dict[str, List[Callable]]:
+        """Map node type names to collector handlers"""
+        table: Dict[str, List[Callable]] = {}
+        for collector in self.collectors:
+            for attr in dir(type(collector)):
+                if attr.startswith('visit_') and attr != 'visit_':
+                    handler = getattr(collector, attr)
+                    if self.timings is not None:
+                        handler = self._timed(handler, type(collector).__name__)
+                    table.setdefault(attr[len('visit_'):], []).append(handler)
+        return table
+
+    def _timed(self, func: Callable, name: str) -> Callable:
+        """Wrap a collector callable so its run time is added to timings[name]"""
+        timings = self.timings
+        timings.setdefault(name, 0.0)
+        perf_counter = time.perf_counter
+
+        def timed(*args):
+            start = perf_counter()
+            try:
+                return func(*args)
+            finally:
+                timings[name] += perf_counter() - start
+
+        return timed
+
+    def run(self) -> List[Any]:
+        """
+        Traverse the tree once.
+
+        Returns:
+            List of collector results, in collector order
+        """
+        for collector in self.collectors:
+            begin = getattr(collector, 'begin', None)
+            if begin is not None:
+                self._maybe_timed(begin, collector)()
+
+        self.function_facts = {}
+        self.nesting = NestingIndex()
+        self.visit(self.tree)
+
+        return [self._maybe_timed(collector.finalize, collector)(self) for collector in self.collectors]
+
+    def _maybe_timed(self, func: Callable, collector: Any) -> Callable:
+        if self.timings is None:
+            return func
+        return self._timed(func, type(collector).__name__)
+
+    def visit(self, node: ast.AST):
+        """Breadth-first traversal with collector dispatch"""
+        dispatch = self._dispatch
+        queue = deque([(node, _ROOT_SCOPE)])
+
+        while queue:
+            node, scope = queue.popleft()
+            node_type = node.__class__.__name__
+
+            handlers = dispatch.get(node_type)
+            if handlers:
+                for handler in handlers:
+                    handler(node, scope)
+
+            child_scope = self._child_scope(node, node_type, scope)
+            for child in ast.iter_child_nodes(node):
+                queue.append((child, child_scope))
+
+    def _child_scope(self, node: ast.AST, node_type: str, scope: Scope) -> Scope:
+        """Derive the scope seen by a node's children"""
+        if node_type == 'ClassDef':
+            self.nesting.record(node, scope)
+            return Scope(node, scope.depth + 1, scope.class_depth + 1,
+                         scope.sync_function_depth, scope.functions)
+
+        if node_type in ('FunctionDef', 'AsyncFunctionDef'):
+            self.nesting.record(node, scope)
+            facts = FunctionFacts()
+            self.function_facts[node] = facts
+            sync_depth = scope.sync_function_depth + (node_type == 'FunctionDef')
+            return Scope(node, scope.depth + 1, scope.class_depth,
+                         sync_depth, scope.functions + (facts,))
+
+        if node_type in ('Yield', 'YieldFrom'):
+            for facts in scope.functions:
+                facts.has_yield = True
+        elif node_type == 'Await':
+            for facts in scope.functions:
+                facts.await_count += 1
+
+        return scope
+
+    def get_function_facts(self, node: ast.AST) -> Optional[FunctionFacts]:
+        """
+        Get facts for a function node.
+
+        Args:
+            node: FunctionDef or AsyncFunctionDef node
+
+        Returns:
+            FunctionFacts if the node was traversed, None otherwise
+        """
+        return self.function_facts.get(node)
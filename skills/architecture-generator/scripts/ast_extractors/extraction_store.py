@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Persistent content-addressed store for extraction results.
+
+Keeps serialized ``EnhancedASTAnalyzer.analyze_file`` results in a SQLite
+file so that they survive across runs and branch switches. Entries are
+keyed by a hash of the file content, its relative path and the analyzer
+version, so touching mtimes (e.g. ``git checkout``) never forces a
+re-parse of unchanged content.
+
+The store is bounded: once the total payload size exceeds ``max_bytes``
+the least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional
+
+
+# Default size cap for stored payloads (compressed bytes)
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Evict down to this fraction of the cap so eviction is not run on every put
+EVICTION_TARGET = 0.9
+
+
+class ExtractionStore:
+    """Content-addressed, size-capped LRU store of extraction results"""
+
+    def __init__(self, db_path: Path, version: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        Initialize extraction store.
+
+        Args:
+            db_path: Path to the SQLite store file (parent directory is created)
+            version: Extractor version; entries from other versions never match
+            max_bytes: Maximum total size of stored payloads
+        """
+        self.db_path = Path(db_path)
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=30)
+        self._init_db()
+        self._total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()[0]
+
+    def _init_db(self):
+        """Initialize database schema"""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                payload BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_extractions_last_used ON extractions(last_used)"
+        )
+        self.conn.commit()
+
+    def key_for(self, rel_path: str, data: bytes) -> str:
+        """
+        Compute the store key for a file.
+
+        Args:
+            rel_path: Path relative to the project root (results embed it)
+            data: Raw file content
+
+        Returns:
+            Hex digest identifying content, path and extractor version
+        """
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(self.version.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(rel_path.encode('utf-8'))
+        digest.update(b'\0')
+        digest.update(data)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a stored result and mark it as recently used.
+
+        Args:
+            key: Key from key_for()
+
+        Returns:
+            Stored result, or None if absent or unreadable
+        """
+        row = self.conn.execute(
+            "SELECT payload FROM extractions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        try:
+            result = json.loads(zlib.decompress(row[0]).decode('utf-8'))
+        except (zlib.error, ValueError, UnicodeDecodeError):
+            self.misses += 1
+            return None
+
+        with self.conn:
+            self.conn.execute(
+                "UPDATE extractions SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Dict):
+        """
+        Store a result, evicting least recently used entries over the cap.
+
+        Args:
+            key: Key from key_for()
+            result: JSON-serializable extraction result
+        """
+        payload = zlib.compress(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+
+        with self.conn:
+            old = self.conn.execute(
+                "SELECT size FROM extractions WHERE key = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO extractions (key, payload, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, size, time.time())
+            )
+        self._total_bytes += size - (old[0] if old else 0)
+
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until under the eviction target"""
+        with self.conn:
+            # Other processes may share the store; start from the real total
+            self._total_bytes = self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM extractions"
+            ).fetchone()[0]
+            target = self.max_bytes * EVICTION_TARGET
+
+            doomed = []
+            cursor = self.conn.execute("SELECT key, size FROM extractions ORDER BY last_used")
+            for key, size in cursor:
+                if self._total_bytes <= target:
+                    break
+                doomed.append((key,))
+                self._total_bytes -= size
+
+            self.conn.executemany("DELETE FROM extractions WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def clear(self):
+        """Remove all stored results (counters are kept)"""
+        with self.conn:
+            self.conn.execute("DELETE FROM extractions")
+        self._total_bytes = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with hits, misses, evictions, entries, total_bytes and hit_rate
+        """
+        entries = self.conn.execute("SELECT COUNT(*) FROM extractions").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': entries,
+            'total_bytes': self._total_bytes,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        """Close the store"""
+        self.conn.close()
@@ -48,6 +48,11 @@ class FunctionInfo:
 class FunctionExtractor(BaseExtractor):
     """Extract comprehensive function information"""
 
+    def __init__(self, file_path, root_path, cache=None, parsed=None):
+        """Initialize function extractor"""
+        super().__init__(file_path, root_path, cache, parsed)
+        self._function_facts = None
+
     def extract(self) -> List[FunctionInfo]:
         """
         Extract all top-level functions from file.
@@ -55,6 +60,19 @@ class FunctionExtractor(BaseExtractor):
         Returns:
             List of FunctionInfo objects
         """
+        return self._extract_with_engine()
+
+    def finalize(self, engine) -> List[FunctionInfo]:
+        """
+        Extract top-level functions using facts gathered by the traversal.
+
+        Args:
+            engine: ExtractionEngine that fed this extractor
+
+        Returns:
+            List of FunctionInfo objects
+        """
+        self.use_function_facts(engine.function_facts)
         functions = []
         for node in self.tree.body:
             if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
@@ -62,6 +80,16 @@ class FunctionExtractor(BaseExtractor):
                 functions.append(func_info)
         return functions
 
+    def use_function_facts(self, function_facts: Dict):
+        """
+        Use yield/await facts precomputed by an ExtractionEngine instead of
+        walking each function body.
+
+        Args:
+            function_facts: Mapping of function node to FunctionFacts
+        """
+        self._function_facts = function_facts
+
     def _extract_function(self, node: ast.FunctionDef, is_method: bool = False) -> FunctionInfo:
         """
         Extract information from a FunctionDef or AsyncFunctionDef node.
@@ -212,6 +240,10 @@ class FunctionExtractor(BaseExtractor):
 
     def _is_generator(self, node: ast.FunctionDef) -> bool:
         """Check if function is a generator (contains yield)"""
+        facts = self._get_facts(node)
+        if facts is not None:
+            return facts.has_yield
+
         for child in ast.walk(node):
             if isinstance(child, (ast.Yield, ast.YieldFrom)):
                 return True
@@ -223,10 +255,7 @@ class FunctionExtractor(BaseExtractor):
         if not is_async:
             return False
 
-        for child in ast.walk(node):
-            if isinstance(child, (ast.Yield, ast.YieldFrom)):
-                return True
-        return False
+        return self._is_generator(node)
 
     def _extract_nested_functions(self, node: ast.FunctionDef) -> List['FunctionInfo']:
         """Extract nested functions"""
@@ -236,8 +265,18 @@ class FunctionExtractor(BaseExtractor):
                 nested.append(self._extract_function(child))
         return nested
 
+    def _get_facts(self, node: ast.FunctionDef):
+        """Get precomputed facts for a function node, if any"""
+        if self._function_facts is None:
+            return None
+        return self._function_facts.get(node)
+
     def _count_await_expressions(self, node: ast.FunctionDef) -> int:
         """Count number of await expressions in function"""
+        facts = self._get_facts(node)
+        if facts is not None:
+            return facts.await_count
+
         count = 0
         for child in ast.walk(node):
             if isinstance(child, ast.Await):
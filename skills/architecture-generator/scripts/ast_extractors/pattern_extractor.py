@@ -40,6 +40,11 @@ class LambdaInfo:
 class PatternExtractor(BaseExtractor):
     """Extract Python patterns"""
 
+    def __init__(self, file_path, root_path, cache=None, parsed=None):
+        """Initialize pattern extractor"""
+        super().__init__(file_path, root_path, cache, parsed)
+        self.begin()
+
     def extract(self) -> Dict[str, List]:
         """
         Extract all patterns.
@@ -47,88 +52,72 @@ class PatternExtractor(BaseExtractor):
         Returns:
             Dictionary with different pattern types
         """
-        return {
-            'exception_handlers': self._extract_exception_handlers(),
-            'context_managers': self._extract_context_managers(),
-            'lambdas': self._extract_lambdas()
-        }
+        return self._extract_with_engine()
 
-    def _extract_exception_handlers(self) -> List[ExceptionHandlerInfo]:
-        """
-        Extract exception handlers.
+    def begin(self):
+        """Reset collected patterns"""
+        self._handlers: List[ExceptionHandlerInfo] = []
+        self._managers: List[ContextManagerInfo] = []
+        self._lambdas: List[LambdaInfo] = []
 
-        Returns:
-            List of ExceptionHandlerInfo objects
-        """
-        handlers = []
-
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Try):
-                for handler in node.handlers:
-                    exception_types = []
-
-                    if handler.type:
-                        if isinstance(handler.type, ast.Tuple):
-                            # Multiple exception types: except (TypeError, ValueError) as e
-                            for exc_type in handler.type.elts:
-                                exception_types.append(ast.unparse(exc_type))
-                        else:
-                            # Single exception type: except TypeError as e
-                            exception_types.append(ast.unparse(handler.type))
-
-                    handlers.append(ExceptionHandlerInfo(
-                        exception_types=exception_types,
-                        variable_name=handler.name if handler.name else None,
-                        line_number=handler.lineno
-                    ))
-
-        return handlers
-
-    def _extract_context_managers(self) -> List[ContextManagerInfo]:
-        """
-        Extract context managers (with statements).
-
-        Returns:
-            List of ContextManagerInfo objects
+    def finalize(self, engine) -> Dict[str, List]:
         """
-        managers = []
+        Return collected patterns.
 
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.With):
-                for item in node.items:
-                    var_names = []
-
-                    if isinstance(item.optional_vars, ast.Name):
-                        var_names.append(item.optional_vars.id)
-                    elif isinstance(item.optional_vars, ast.Tuple):
-                        for elt in item.optional_vars.elts:
-                            if isinstance(elt, ast.Name):
-                                var_names.append(elt.id)
-
-                    managers.append(ContextManagerInfo(
-                        context_expr=ast.unparse(item.context_expr),
-                        variable_names=var_names,
-                        line_number=node.lineno
-                    ))
-
-        return managers
-
-    def _extract_lambdas(self) -> List[LambdaInfo]:
-        """
-        Extract lambda functions.
+        Args:
+            engine: ExtractionEngine that fed this extractor
 
         Returns:
-            List of LambdaInfo objects
+            Dictionary with different pattern types
         """
-        lambdas = []
-
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.Lambda):
-                args = [arg.arg for arg in node.args.args]
-                lambdas.append(LambdaInfo(
-                    arguments=args,
-                    body=ast.unparse(node.body),
-                    line_number=node.lineno
-                ))
-
-        return lambdas
+        return {
+            'exception_handlers': self._handlers,
+            'context_managers': self._managers,
+            'lambdas': self._lambdas
+        }
+
+    def visit_Try(self, node: ast.Try, scope):
+        """Collect exception handlers"""
+        for handler in node.handlers:
+            exception_types = []
+
+            if handler.type:
+                if isinstance(handler.type, ast.Tuple):
+                    # Multiple exception types: except (TypeError, ValueError) as e
+                    for exc_type in handler.type.elts:
+                        exception_types.append(ast.unparse(exc_type))
+                else:
+                    # Single exception type: except TypeError as e
+                    exception_types.append(ast.unparse(handler.type))
+
+            self._handlers.append(ExceptionHandlerInfo(
+                exception_types=exception_types,
+                variable_name=handler.name if handler.name else None,
+                line_number=handler.lineno
+            ))
+
+    def visit_With(self, node: ast.With, scope):
+        """Collect context managers (with statements)"""
+        for item in node.items:
+            var_names = []
+
+            if isinstance(item.optional_vars, ast.Name):
+                var_names.append(item.optional_vars.id)
+            elif isinstance(item.optional_vars, ast.Tuple):
+                for elt in item.optional_vars.elts:
+                    if isinstance(elt, ast.Name):
+                        var_names.append(elt.id)
+
+            self._managers.append(ContextManagerInfo(
+                context_expr=ast.unparse(item.context_expr),
+                variable_names=var_names,
+                line_number=node.lineno
+            ))
+
+    def visit_Lambda(self, node: ast.Lambda, scope):
+        """Collect lambda functions"""
+        self._lambdas.append(LambdaInfo(
+            arguments=[arg.arg for arg in node.args.args],
+            body=ast.unparse(node.body),
+            line_number=node.lineno
+        ))
@@ -26,10 +26,35 @@ class VariableInfo:
 class VariableExtractor(BaseExtractor):
     """Extract variable information"""
 
+    def __init__(self, file_path, root_path, cache=None, parsed=None):
+        """Initialize variable extractor"""
+        super().__init__(file_path, root_path, cache, parsed)
+        self._class_nodes = []
+
     def extract(self) -> Dict[str, List[VariableInfo]]:
         """
         Extract all variables.
 
+        Returns:
+            Dictionary with 'global' and 'class' keys
+        """
+        return self._extract_with_engine()
+
+    def begin(self):
+        """Reset collected class nodes"""
+        self._class_nodes = []
+
+    def visit_ClassDef(self, node: ast.ClassDef, scope):
+        """Collect every class (including nested ones)"""
+        self._class_nodes.append(node)
+
+    def finalize(self, engine) -> Dict[str, List[VariableInfo]]:
+        """
+        Build variables from module body and collected classes.
+
+        Args:
+            engine: ExtractionEngine that fed this extractor
+
         Returns:
             Dictionary with 'global' and 'class' keys
         """
@@ -122,9 +147,7 @@ class VariableExtractor(BaseExtractor):
         """
         variables = []
 
-        for node in ast.walk(self.tree):
-            if isinstance(node, ast.ClassDef):
-                class_vars = self.extract_class_variables(node)
-                variables.extend(class_vars)
+        for node in self._class_nodes:
+            variables.extend(self.extract_class_variables(node))
 
         return variables
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark for generate_architecture_docs.
+
+Generates a synthetic project (see synthetic_project.py), then runs the
+full pipeline in a fresh subprocess per measurement so peak RSS and import
+costs are not shared between runs:
+- full: first run on an empty output directory
+- incremental: re-run after modifying a few Python files
+
+Each run reports per-stage wall time (scan, dependencies, symbol_index,
+render, scan_cache) and peak RSS. Results are written as JSON and can be
+compared against a stored baseline; the exit code is 1 when any stage
+regressed beyond the tolerance.
+
+Usage:
+    python bench/run_benchmark.py --files 500 --repeat 3 --output result.json
+    python bench/run_benchmark.py --save-baseline bench/baselines/default.json
+    python bench/run_benchmark.py --baseline bench/baselines/default.json
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[1]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench.synthetic_project import ProjectSpec, generate_project, touch_files
+
+# 结果文件格式版本（字段变化时递增，比较时要求一致）
+RESULT_VERSION = 1
+
+# 默认回归阈值：相对基线变慢超过 25% 且绝对差值超过 50ms 才判定为回归
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA = 0.05
+
+
+def run_once(project: Path, output: Path, jobs: int = 1) -> Dict:
+    """在当前进程中运行一次完整流水线，返回 StageTimer 结果"""
+    from generate import generate_architecture_docs
+    from stage_timer import StageTimer
+
+    timer = StageTimer()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_architecture_docs(project, output_dir=output, jobs=jobs, timer=timer)
+    return timer.summary()
+
+
+def _run_child(project: Path, output: Path, jobs: int) -> Dict:
+    """在新的子进程中运行一次流水线（独立的峰值 RSS 与导入开销）"""
+    completed = subprocess.run(
+        [sys.executable, str(Path(__file__).resolve()), '--child',
+         str(project), str(output), '--jobs', str(jobs)],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"benchmark run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def _aggregate(runs: List[Dict]) -> Dict:
+    """多次运行取中位数"""
+    stage_names = list(runs[0]['stages'])
+    return {
+        'stages': {
+            name: {
+                'wall': statistics.median(run['stages'][name]['wall'] for run in runs),
+                'peak_rss_kb': _median_or_none(run['stages'][name]['peak_rss_kb'] for run in runs),
+            }
+            for name in stage_names
+        },
+        'total': statistics.median(run['total'] for run in runs),
+        'peak_rss_kb': _median_or_none(run['peak_rss_kb'] for run in runs),
+    }
+
+
+def _median_or_none(values) -> Optional[float]:
+    values = [value for value in values if value is not None]
+    return statistics.median(values) if values else None
+
+
+def run_benchmark(spec: ProjectSpec, repeat: int = 3, jobs: int = 1,
+                  work_dir: Optional[Path] = None) -> Dict:
+    """
+    生成合成项目并测量 full / incremental 两种场景
+
+    Args:
+        spec: 合成项目规格
+        repeat: 每个场景的重复次数（结果取中位数）
+        jobs: 符号索引并行进程数
+        work_dir: 临时项目目录的父目录（None 时使用系统临时目录）
+
+    Returns:
+        可序列化为 JSON 的基准结果
+    """
+    scenarios = {'full': [], 'incremental': []}
+    project_stats = None
+    touch_count = max(1, spec.files // 20)
+
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory(dir=work_dir) as tmp:
+            project = Path(tmp) / 'project'
+            output = Path(tmp) / 'docs'
+            project_stats = generate_project(project, spec)
+
+            scenarios['full'].append(_run_child(project, output, jobs))
+            touch_files(project, spec, touch_count)
+            # 保证修改时间变化（粗粒度 mtime 的文件系统）
+            time.sleep(0.01)
+            scenarios['incremental'].append(_run_child(project, output, jobs))
+
+    return {
+        'version': RESULT_VERSION,
+        'spec': spec.to_dict(),
+        'project': project_stats,
+        'repeat': repeat,
+        'jobs': jobs,
+        'touched_files': touch_count,
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'jinja2': importlib.util.find_spec('jinja2') is not None,
+        },
+        'scenarios': {name: _aggregate(runs) for name, runs in scenarios.items()},
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = DEFAULT_TOLERANCE,
+                    min_delta: float = DEFAULT_MIN_DELTA) -> List[str]:
+    """
+    与基线比较，返回回归描述列表（为空表示没有回归）
+
+    耗时：超过基线 (1 + tolerance) 倍且绝对差值超过 min_delta 秒；
+    峰值 RSS：超过基线 (1 + tolerance) 倍
+
+    Raises:
+        ValueError: 结果格式版本或项目规格与基线不同，无法比较
+    """
+    for key in ('version', 'spec', 'jobs'):
+        if current.get(key) != baseline.get(key):
+            raise ValueError(f"baseline {key} differs: {baseline.get(key)} != {current.get(key)}")
+
+    regressions = []
+    for scenario, result in current['scenarios'].items():
+        base = baseline['scenarios'].get(scenario)
+        if base is None:
+            continue
+
+        timings = [(name, stage['wall'], base['stages'][name]['wall'])
+                   for name, stage in result['stages'].items() if name in base['stages']]
+        timings.append(('total', result['total'], base['total']))
+        for name, value, reference in timings:
+            if value > reference * (1 + tolerance) and value - reference > min_delta:
+                regressions.append(
+                    f"{scenario}/{name}: {value:.3f}s vs baseline {reference:.3f}s "
+                    f"(+{(value / reference - 1) * 100 if reference else float('inf'):.0f}%)"
+                )
+
+        rss, base_rss = result.get('peak_rss_kb'), base.get('peak_rss_kb')
+        if rss and base_rss and rss > base_rss * (1 + tolerance):
+            regressions.append(
+                f"{scenario}/peak_rss: {rss / 1024:.1f} MB vs baseline {base_rss / 1024:.1f} MB"
+            )
+    return regressions
+
+
+def format_results(result: Dict) -> str:
+    """格式化为文本表格"""
+    lines = []
+    project = result['project']
+    lines.append(
+        f"Project: {project['python_files']} Python + {project['js_files']} JS/TS files, "
+        f"{project['lines']} lines (median of {result['repeat']} run(s))"
+    )
+    for scenario, data in result['scenarios'].items():
+        rss = data['peak_rss_kb']
+        lines.append(f"\n{scenario}: {data['total']:.3f}s"
+                     + (f", peak RSS {rss / 1024:.1f} MB" if rss else ""))
+        for name, stage in data['stages'].items():
+            lines.append(f"  {name:<14} {stage['wall']:8.3f}s")
+    return "\n".join(lines)
+
+
+def main():
+    import argparse
+
+    defaults = ProjectSpec()
+    parser = argparse.ArgumentParser(description="Benchmark generate_architecture_docs on a synthetic project")
+    parser.add_argument("--files", type=int, default=defaults.files, help="Number of source files")
+    parser.add_argument("--classes", type=int, default=defaults.classes_per_file, help="Classes per file")
+    parser.add_argument("--fanout", type=int, default=defaults.import_fanout, help="Imports per file")
+    parser.add_argument("--js-ratio", type=float, default=defaults.js_ratio, help="Share of JS/TS files")
+    parser.add_argument("--depth", type=int, default=defaults.nesting_depth, help="Max directory nesting depth")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Random seed")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per scenario (median is reported)")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Worker processes for symbol indexing")
+    parser.add_argument("--output", "-o", type=Path, default=None, help="Write results JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="Compare against this baseline JSON")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Store results as a baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Allowed relative slowdown (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument("--child", nargs=2, type=Path, metavar=("PROJECT", "OUTPUT"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_once(args.child[0], args.child[1], args.jobs)))
+        return
+
+    spec = ProjectSpec(args.files, args.classes, args.fanout, args.js_ratio, args.depth, args.seed)
+    result = run_benchmark(spec, repeat=args.repeat, jobs=args.jobs)
+    print(format_results(result))
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(result, indent=2) + "\n", encoding='utf-8')
+            print(f"\n💾 Results written to {path}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        try:
+            regressions = compare_results(result, baseline, tolerance=args.tolerance)
+        except ValueError as e:
+            print(f"\n❌ Cannot compare with baseline: {e}")
+            sys.exit(2)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"   - {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
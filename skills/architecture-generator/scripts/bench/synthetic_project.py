@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Synthetic monorepo generator for benchmarks.
+
+Generates a deterministic project (same spec and seed -> same bytes) with
+Python packages and JavaScript/TypeScript modules spread over a nested
+directory tree. Files import other generated modules of the same language
+so dependency resolution, call-graph resolution and the layered
+dependency graphs all see realistic edges.
+"""
+
+import json
+import posixpath
+import random
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+# 每层目录的子目录数
+BRANCHING = 4
+
+
+@dataclass
+class ProjectSpec:
+    """合成项目规格"""
+    files: int = 200               # 源文件总数（不含 __init__.py）
+    classes_per_file: int = 3      # 每个文件的类数量
+    import_fanout: int = 3         # 每个文件导入的其他模块数量
+    js_ratio: float = 0.25         # JavaScript/TypeScript 文件占比
+    nesting_depth: int = 3         # 最大目录嵌套深度
+    seed: int = 0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+def _plan_files(spec: ProjectSpec, rng: random.Random) -> List[Dict]:
+    """确定每个文件的路径、语言与模块名"""
+    js_count = round(spec.files * spec.js_ratio)
+    languages = ['js'] * js_count + ['py'] * (spec.files - js_count)
+    rng.shuffle(languages)
+
+    plans = []
+    for i, language in enumerate(languages):
+        depth = rng.randint(1, spec.nesting_depth) if spec.nesting_depth > 0 else 0
+        parts = [f"pkg{rng.randrange(BRANCHING)}"] if depth else []
+        parts += [f"sub{rng.randrange(BRANCHING)}" for _ in range(depth - 1)]
+        stem = f"module_{i}"
+        if language == 'js':
+            suffix = '.ts' if i % 2 else '.js'
+        else:
+            suffix = '.py'
+        plans.append({
+            'index': i,
+            'language': language,
+            'dirs': parts,
+            'path': posixpath.join(*parts, stem + suffix),
+            'module': '.'.join(parts + [stem]),
+            'stem': stem,
+        })
+    return plans
+
+
+def _python_source(plan: Dict, imports: List[Dict], spec: ProjectSpec) -> str:
+    lines = ['"""Generated module."""', '', 'import os', '']
+    for n, target in enumerate(imports):
+        lines.append(f"from {target['module']} import Model{target['index']}_0 as Dep{n}")
+    lines.append('')
+
+    index = plan['index']
+    for c in range(spec.classes_per_file):
+        base = f"Model{index}_{c - 1}" if c else 'object'
+        lines += [
+            '',
+            f"class Model{index}_{c}({base}):",
+            f'    """Model {c} of module {index}."""',
+            '',
+            f"    limit: int = {c + 1}",
+            '',
+            "    def __init__(self, name: str = 'item', *args, **kwargs):",
+            "        self.name = name",
+            "        self.items = list(args)",
+            '',
+            "    def load(self, path: str) -> list:",
+            "        with open(os.path.join(path, self.name)) as handle:",
+            "            return [line.strip() for line in handle]",
+            '',
+            "    def process(self, values):",
+            "        try:",
+            "            return [self.transform(value) for value in values]",
+            "        except (KeyError, ValueError):",
+            "            return []",
+            '',
+            "    def transform(self, value):",
+            f"        return helper_{index}(value) * self.limit",
+        ]
+        if imports:
+            lines += [
+                '',
+                "    def link(self):",
+                f"        return Dep{c % len(imports)}().process(self.items)",
+            ]
+        lines += [
+            '',
+            '    class Meta:',
+            f"        table = 'model_{index}_{c}'",
+        ]
+
+    lines += [
+        '',
+        '',
+        f"def helper_{index}(value):",
+        "    return value",
+        '',
+        '',
+        f"async def fetch_{index}(session, url, retries=3):",
+        "    for attempt in range(retries):",
+        "        response = await session.get(url)",
+        "        if response.ok:",
+        "            return response",
+        "    return None",
+        '',
+    ]
+    return '\n'.join(lines)
+
+
+def _js_source(plan: Dict, imports: List[Dict], spec: ProjectSpec) -> str:
+    lines = []
+    here = posixpath.dirname(plan['path'])
+    for n, target in enumerate(imports):
+        specifier = posixpath.relpath(posixpath.splitext(target['path'])[0], here or '.')
+        if not specifier.startswith('.'):
+            specifier = './' + specifier
+        lines.append(f"import {{ Model{target['index']}_0 as Dep{n} }} from '{specifier}';")
+    lines.append('')
+
+    index = plan['index']
+    for c in range(spec.classes_per_file):
+        extends = f" extends Model{index}_{c - 1}" if c else ''
+        lines += [
+            f"export class Model{index}_{c}{extends} {{",
+            "  constructor(name = 'item') {",
+            f"    {'super(name); ' if c else ''}this.name = name;",
+            "  }",
+            "",
+            "  process(values) {",
+            f"    return values.map((value) => helper{index}(value));",
+            "  }",
+        ]
+        if imports:
+            lines += [
+                "",
+                "  link() {",
+                f"    return new Dep{c % len(imports)}().process([this.name]);",
+                "  }",
+            ]
+        lines += ["}", ""]
+
+    lines += [
+        f"export function helper{index}(value) {{",
+        "  return value;",
+        "}",
+        "",
+        f"export const format{index} = (value) => String(value).trim();",
+        f"const double{index} = value => value * 2;",
+        "",
+    ]
+    return '\n'.join(lines)
+
+
+def generate_project(root: Path, spec: ProjectSpec) -> Dict:
+    """
+    在 root 下生成合成项目
+
+    Args:
+        root: 项目根目录（不存在时创建）
+        spec: 项目规格
+
+    Returns:
+        生成统计（文件数、行数等）
+    """
+    rng = random.Random(spec.seed)
+    plans = _plan_files(spec, rng)
+    by_language = {'py': [], 'js': []}
+    for plan in plans:
+        by_language[plan['language']].append(plan)
+
+    root.mkdir(parents=True, exist_ok=True)
+    stats = {'python_files': 0, 'js_files': 0, 'package_files': 0, 'lines': 0, 'bytes': 0}
+    packages = set()
+
+    for plan in plans:
+        pool = [other for other in by_language[plan['language']] if other is not plan]
+        imports = rng.sample(pool, min(spec.import_fanout, len(pool)))
+        if plan['language'] == 'py':
+            source = _python_source(plan, imports, spec)
+            stats['python_files'] += 1
+            for depth in range(1, len(plan['dirs']) + 1):
+                packages.add(posixpath.join(*plan['dirs'][:depth]))
+        else:
+            source = _js_source(plan, imports, spec)
+            stats['js_files'] += 1
+
+        path = root / plan['path']
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding='utf-8')
+        stats['lines'] += source.count('\n')
+        stats['bytes'] += len(source)
+
+    for package in sorted(packages):
+        (root / package / '__init__.py').write_text('', encoding='utf-8')
+    stats['package_files'] = len(packages)
+    return stats
+
+
+def touch_files(root: Path, spec: ProjectSpec, count: int) -> List[str]:
+    """
+    修改 count 个 Python 文件（追加一个函数），用于测量增量更新
+
+    Returns:
+        被修改文件的相对路径
+    """
+    rng = random.Random(spec.seed + 1)
+    plans = [plan for plan in _plan_files(spec, random.Random(spec.seed)) if plan['language'] == 'py']
+    touched = rng.sample(plans, min(count, len(plans)))
+    for plan in touched:
+        with open(root / plan['path'], 'a', encoding='utf-8') as f:
+            f.write(f"\n\ndef touched_{plan['index']}():\n    return helper_{plan['index']}(1)\n")
+    return [plan['path'] for plan in touched]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark project")
+    parser.add_argument("output", type=Path, help="Project root to create")
+    defaults = ProjectSpec()
+    parser.add_argument("--files", type=int, default=defaults.files)
+    parser.add_argument("--classes", type=int, default=defaults.classes_per_file)
+    parser.add_argument("--fanout", type=int, default=defaults.import_fanout)
+    parser.add_argument("--js-ratio", type=float, default=defaults.js_ratio)
+    parser.add_argument("--depth", type=int, default=defaults.nesting_depth)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+
+    spec = ProjectSpec(args.files, args.classes, args.fanout, args.js_ratio, args.depth, args.seed)
+    stats = generate_project(args.output, spec)
+    json.dump(stats, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
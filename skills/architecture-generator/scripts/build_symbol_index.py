@@ -11,22 +11,32 @@ Phase 2 Features:
 """
 
 import ast
-import json
+import bisect
 import os
 import re
 import sqlite3
+import time
+from itertools import accumulate
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from utils import (
-    parse_gitignore,
-    should_include_file,
     get_relative_path,
     normalize_path,
-    detect_file_type,
+    split_identifier,
+)
+from file_catalog import FileCatalog, SOURCE_FILE_TYPES
+import metrics
+from symbol_store import (
+    ROWS_MARKER,
+    SCHEMA_VERSION,
+    MetadataWriter,
+    create_tables as create_metadata_tables,
+    delete_metadata,
 )
 
-# Try to import enhanced AST analyzer
+# Enhanced AST analyzer: imported on first use (it loads every extractor),
+# so importing this module stays cheap for query-only callers
 try:
     import sys
     # Add scripts directory to path
@@ -34,10 +44,386 @@ try:
     if str(scripts_dir) not in sys.path:
         sys.path.insert(0, str(scripts_dir))
 
-    from enhanced_ast_analyzer import EnhancedASTAnalyzer
-    ENHANCED_AST_AVAILABLE = True
+    from ast_extractors.extraction_store import DEFAULT_MAX_BYTES
 except ImportError:
-    ENHANCED_AST_AVAILABLE = False
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# enhanced_ast_analyzer 模块（None 表示尚未导入，False 表示不可用）
+_enhanced_ast = None
+
+
+def _load_enhanced_ast():
+    """
+    导入增强提取器（只在第一次提取 Python 文件时导入）
+
+    Returns:
+        enhanced_ast_analyzer 模块；不可用时返回 None
+    """
+    global _enhanced_ast
+    if _enhanced_ast is None:
+        try:
+            import enhanced_ast_analyzer
+            _enhanced_ast = enhanced_ast_analyzer
+        except ImportError:
+            _enhanced_ast = False
+    return _enhanced_ast or None
+
+
+# 构建阶段的 SQLite PRAGMA 取值范围
+JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+SYNCHRONOUS_MODES = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+
+# 调用点解析（s 为被调用符号，c 为 call_graph 行，caller 为调用方符号）：
+# 调用方文件内定义了同名函数/类时只连接到本文件的定义（按 (file_path, name) 索引查找）
+_NO_LOCAL_DEFINITION_SQL = """NOT EXISTS (
+    SELECT 1 FROM symbols l
+    WHERE l.file_path = caller.file_path AND l.name = c.callee_name AND l.kind IN ('function', 'class')
+)"""
+# 否则按调用方文件的 from 导入（imported_names i）连接到导入来源文件中的原名称符号；
+# 来源文件自身再导入了该名称（如包 __init__.py 的再导出）时跟随一层（r），
+# 再导出指向外部模块时不连接
+_IMPORT_TARGET_FILE_SQL = "CASE WHEN r.file_path IS NULL THEN i.source_file ELSE r.source_file END"
+_IMPORT_TARGET_NAME_SQL = "CASE WHEN r.file_path IS NULL THEN i.source_name ELSE r.source_name END"
+_CALL_DEP_TYPE_SQL = "CASE s.kind WHEN 'class' THEN 'instantiation' ELSE 'call' END"
+
+# JavaScript/TypeScript 符号（单次扫描，命名分组区分类型）：
+# 类定义 class MyClass、函数定义 function myFunc(、箭头函数 const myFunc = (...) =>
+# 开头的前瞻只允许各分支的首字母，跳过其余位置（类定义分支没有固定前缀）
+_JS_SYMBOL_RE = re.compile(
+    r'(?=[cdeflv])(?:'
+    r'(?:export\s+)?(?:default\s+)?class\s+(?P<class>\w+)'
+    r'|function\s+(?P<function>\w+)\s*\('
+    r'|(?:const|let|var)\s+(?P<arrow>\w+)\s*=\s*(?:\([^)]*\)|\w+)\s*=>'
+    r')'
+)
+_JS_SYMBOL_KINDS = {'class': 'class', 'function': 'function', 'arrow': 'function'}
+
+FILES_INDEXED = metrics.counter('files_indexed', 'Source files extracted into the symbol index')
+EXTRACTION_FALLBACKS = metrics.counter(
+    'extraction_fallbacks', 'Python files indexed with basic extraction after enhanced extraction failed'
+)
+SYMBOL_ROWS = metrics.counter('symbol_rows', 'Symbol rows inserted into or removed from the index')
+CALL_EDGES = metrics.counter('call_edges_resolved', 'Call sites resolved into symbol dependency edges')
+SQLITE_WRITE_SECONDS = metrics.counter('sqlite_write_seconds', 'Time spent in symbol index write transactions')
+
+# 符号记录：(name, kind, line_number, end_line_number, parent_index, metadata)
+# parent_index 指向同一文件记录列表中父符号的下标（None 表示无父符号）；
+# metadata 为字典，已作为子符号记录的列表用 ROWS_MARKER 代替（见 symbol_store）
+SymbolRecord = Tuple[str, str, int, Optional[int], Optional[int], Optional[Dict]]
+
+
+class FileSymbolExtractor:
+    """单文件符号提取器（不访问数据库，可在工作进程中运行）"""
+
+    def __init__(self, root_path: Path, db_path: str = "symbols.db",
+                 ast_cache: 'ParsedModuleCache' = None,
+                 store_path: Optional[str] = None,
+                 store_max_bytes: int = DEFAULT_MAX_BYTES,
+                 profile: bool = False):
+        """
+        初始化符号提取器
+
+        Args:
+            root_path: 项目根目录
+            db_path: 数据库文件路径（传给增强分析器）
+            ast_cache: 共享的 AST 解析缓存（None 时由增强分析器自行创建）
+            store_path: 持久化提取结果缓存的文件路径（None 表示不使用）
+            store_max_bytes: 提取结果缓存的容量上限
+            profile: 是否记录每个文件各提取器的耗时（见 last_timings）
+        """
+        self.root_path = normalize_path(root_path)
+        self.db_path = db_path
+        self.ast_cache = ast_cache
+        self.store_path = store_path
+        self.store_max_bytes = store_max_bytes
+        self.store: Optional['ExtractionStore'] = None
+        self._enhanced_analyzer = None
+        self.profile = profile
+        # 最近一次 extract 的耗时（提取器名 -> 秒），仅 profile 时记录
+        self.last_timings: Optional[Dict[str, float]] = None
+
+    def extract(self, file_path: Path, file_type: str,
+                rel_path: str) -> Tuple[List[SymbolRecord], Optional[str]]:
+        """
+        提取单个文件的符号记录
+
+        Args:
+            file_path: 文件绝对路径
+            file_type: 文件类型
+            rel_path: 相对路径
+
+        Returns:
+            (符号记录列表, 警告信息)
+        """
+        self.last_timings = {} if self.profile else None
+        if file_type == 'python':
+            return self._extract_python_file(file_path, rel_path)
+        elif file_type in ['javascript', 'typescript']:
+            start = time.perf_counter()
+            records = self._extract_js_file(file_path, rel_path)
+            if self.last_timings is not None:
+                self.last_timings['js_symbols'] = time.perf_counter() - start
+            return records, None
+        return [], None
+
+    def _extract_python_file(self, file_path: Path,
+                             rel_path: str) -> Tuple[List[SymbolRecord], Optional[str]]:
+        """提取 Python 文件符号（使用增强提取器）"""
+        warning = None
+
+        # Try enhanced extraction first
+        enhanced = _load_enhanced_ast()
+        if enhanced is not None:
+            try:
+                if self._enhanced_analyzer is None:
+                    if self.store_path is not None:
+                        self.store = enhanced.ExtractionStore(
+                            Path(self.store_path), enhanced.ANALYZER_VERSION, self.store_max_bytes
+                        )
+                    self._enhanced_analyzer = enhanced.EnhancedASTAnalyzer(
+                        self.root_path, self.db_path, cache=self.ast_cache, store=self.store
+                    )
+                extracted_data = self._enhanced_analyzer.analyze_file(file_path, self.last_timings)
+
+                if 'error' not in extracted_data:
+                    # Use enhanced extraction results
+                    return self._enhanced_data_to_records(extracted_data, rel_path), None
+            except Exception as e:
+                warning = f"   ⚠ Enhanced extraction failed for {rel_path}: {e}, falling back to basic"
+
+        # Fallback to basic extraction
+        return self._extract_python_file_basic(file_path, rel_path), warning
+
+    def _enhanced_data_to_records(self, extracted_data: Dict, rel_path: str) -> List[SymbolRecord]:
+        """将增强提取的数据转换为符号记录（子符号的内容只存在子符号记录中）"""
+        records: List[SymbolRecord] = []
+
+        # Index file symbol
+        records.append((
+            Path(rel_path).name, 'file', 1,
+            extracted_data.get('line_count', 1), None,
+            _with_row_markers(extracted_data, ('classes', 'functions'))
+        ))
+        file_index = 0
+
+        # Index classes
+        for class_data in extracted_data.get('classes', []):
+            class_index = len(records)
+            records.append((
+                class_data['name'], 'class',
+                class_data['line_number'], class_data['end_line_number'],
+                file_index, _with_row_markers(class_data, ('methods', 'nested_classes'))
+            ))
+
+            # Index methods
+            for method in class_data.get('methods', []):
+                records.append((
+                    method['name'], 'function',
+                    method['line_number'], method['end_line_number'],
+                    class_index, method
+                ))
+
+            # Index nested classes（其方法不单独建记录，保留在嵌套类的 metadata 中）
+            for nested_class in class_data.get('nested_classes', []):
+                records.append((
+                    nested_class['name'], 'class',
+                    nested_class['line_number'], nested_class['end_line_number'],
+                    class_index, nested_class
+                ))
+
+        # Index top-level functions
+        for func_data in extracted_data.get('functions', []):
+            records.append((
+                func_data['name'], 'function',
+                func_data['line_number'], func_data['end_line_number'],
+                file_index, func_data
+            ))
+
+        return records
+
+    def _extract_python_file_basic(self, file_path: Path, rel_path: str) -> List[SymbolRecord]:
+        """基本 Python 文件符号提取（回退方案）"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                source = f.read()
+
+            tree = ast.parse(source, filename=str(file_path))
+
+            # 文件级符号
+            records: List[SymbolRecord] = [
+                (Path(rel_path).name, 'file', 1, len(source.splitlines()), None, None)
+            ]
+
+            # 遍历 AST
+            for node in ast.walk(tree):
+                if isinstance(node, ast.ClassDef):
+                    # 类定义
+                    records.append((
+                        node.name, 'class', node.lineno,
+                        getattr(node, 'end_lineno', node.lineno), 0,
+                        {
+                            'bases': [ast.unparse(base) for base in node.bases]
+                        }
+                    ))
+
+                elif isinstance(node, ast.FunctionDef):
+                    # 函数定义
+                    records.append((
+                        node.name, 'function', node.lineno,
+                        getattr(node, 'end_lineno', node.lineno), 0,
+                        {
+                            'args': [arg.arg for arg in node.args.args],
+                            'returns': ast.unparse(node.returns) if node.returns else None
+                        }
+                    ))
+
+                elif isinstance(node, ast.AsyncFunctionDef):
+                    # 异步函数定义
+                    records.append((
+                        node.name, 'function', node.lineno,
+                        getattr(node, 'end_lineno', node.lineno), 0,
+                        {
+                            'async': True,
+                            'args': [arg.arg for arg in node.args.args],
+                            'returns': ast.unparse(node.returns) if node.returns else None
+                        }
+                    ))
+
+            return records
+
+        except (SyntaxError, UnicodeDecodeError):
+            # 无法解析的文件，只记录文件级符号
+            return [(Path(rel_path).name, 'file', 1, 1, None, None)]
+
+    def _extract_js_file(self, file_path: Path, rel_path: str) -> List[SymbolRecord]:
+        """提取 JavaScript/TypeScript 文件符号（基于正则）"""
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        except (UnicodeDecodeError, OSError):
+            # 无法读取的文件
+            return []
+
+        lines = content.splitlines()
+
+        # 文件符号
+        records: List[SymbolRecord] = [
+            (Path(rel_path).name, 'file', 1, len(lines), None, None)
+        ]
+
+        # 按类定义、函数定义、箭头函数分组，保持与逐个模式扫描相同的记录顺序
+        groups: Dict[str, List[SymbolRecord]] = {name: [] for name in _JS_SYMBOL_KINDS}
+        line_starts = _line_starts(content)
+        for match in _JS_SYMBOL_RE.finditer(content):
+            group = match.lastgroup
+            line_num = bisect.bisect_right(line_starts, match.start())
+            groups[group].append((match.group(group), _JS_SYMBOL_KINDS[group], line_num, None, 0, None))
+
+        for group_records in groups.values():
+            records.extend(group_records)
+
+        return records
+
+
+def _line_starts(content: str) -> List[int]:
+    """
+    每行起始偏移（升序），bisect_right(starts, offset) 即 offset 所在的行号（从 1 开始）
+
+    一次线性扫描代替逐个匹配统计前缀换行数，大文件上每次查询为 O(log n)
+    """
+    return [0, *accumulate(len(line) + 1 for line in content.split('\n'))]
+
+
+def _with_row_markers(data: Dict, child_keys: Tuple[str, ...]) -> Dict:
+    """浅拷贝 metadata，已作为子符号记录的列表替换为 ROWS_MARKER"""
+    return {
+        key: ROWS_MARKER if key in child_keys and isinstance(value, list) else value
+        for key, value in data.items()
+    }
+
+
+def _call_sites(records: List[SymbolRecord]) -> List[Tuple[int, str, int]]:
+    """
+    从文件记录的依赖信息中取出调用点，并归属到包含调用行的最内层符号
+
+    Args:
+        records: 单个文件的符号记录（第一条为文件记录）
+
+    Returns:
+        (记录下标, 被调用名称, 行号) 列表；模块级调用归属到文件记录
+    """
+    metadata = records[0][5] if records else None
+    dependencies = metadata.get('dependencies') if isinstance(metadata, dict) else None
+    if not isinstance(dependencies, dict):
+        return []
+
+    sites = {
+        (dep['name'], dep['line_number'])
+        for category in ('calls', 'local_calls', 'instantiations')
+        for dep in dependencies.get(category, ())
+        if dep.get('line_number')
+    }
+    if not sites:
+        return []
+
+    # 按行号标记所属符号：外层先标记，内层（起始行更晚或范围更小）覆盖
+    last_line = max(line for _, line in sites)
+    owner = [0] * (last_line + 1)
+    spans = sorted(
+        (record[2], -record[3], index)
+        for index, record in enumerate(records) if index and record[2] and record[3]
+    )
+    for start, neg_end, index in spans:
+        end = min(-neg_end, last_line)
+        if start <= end:
+            owner[start:end + 1] = [index] * (end - start + 1)
+
+    return [(owner[line], name, line) for name, line in sorted(sites, key=lambda site: (site[1], site[0]))]
+
+
+def _import_bindings(records: List[SymbolRecord]) -> List[Tuple[str, str, str]]:
+    """
+    文件通过 from 导入绑定的名称（不含 * 导入）
+
+    Args:
+        records: 单个文件的符号记录（第一条为文件记录）
+
+    Returns:
+        (本文件中的名称, 导入说明符, 原名称) 列表，按导入顺序；
+        from ..pkg import c as d -> ('d', '..pkg.c', 'c')
+    """
+    metadata = records[0][5] if records else None
+    dependencies = metadata.get('dependencies') if isinstance(metadata, dict) else None
+    if not isinstance(dependencies, dict):
+        return []
+
+    return [
+        (dep['name'], dep['module_path'], dep['module_path'].rsplit('.', 1)[-1])
+        for dep in dependencies.get('import_bindings', ())
+        if dep.get('name') and dep.get('module_path')
+    ]
+
+
+# 工作进程内的提取器（由 _init_worker 创建）
+_worker_extractor: Optional[FileSymbolExtractor] = None
+
+
+def _init_worker(root_path: Path, db_path: str, store_path: Optional[str], store_max_bytes: int,
+                 profile: bool = False):
+    """工作进程初始化"""
+    global _worker_extractor
+    # fork 启动时会继承主进程已有的指标数值，清空后只向主进程发送本进程的增量
+    metrics.REGISTRY.reset()
+    _worker_extractor = FileSymbolExtractor(
+        root_path, db_path, store_path=store_path, store_max_bytes=store_max_bytes, profile=profile
+    )
+
+
+def _extract_in_worker(task: Tuple[Path, str, str]):
+    """工作进程任务：提取单个文件的符号记录（附带各提取器耗时与指标增量）"""
+    file_path, file_type, rel_path = task
+    records, warning = _worker_extractor.extract(file_path, file_type, rel_path)
+    return rel_path, records, warning, _worker_extractor.last_timings, metrics.REGISTRY.drain()
 
 
 class SymbolIndexBuilder:
@@ -48,6 +434,17 @@ class SymbolIndexBuilder:
         root_path: Path,
         db_path: str = "symbols.db",
         gitignore_path: Path = None,
+        catalog: FileCatalog = None,
+        ast_cache: 'ParsedModuleCache' = None,
+        jobs: int = 1,
+        batch_size: int = 5000,
+        journal_mode: Optional[str] = 'WAL',
+        synchronous: Optional[str] = 'NORMAL',
+        extraction_cache: Optional[Path] = None,
+        extraction_cache_max_bytes: int = DEFAULT_MAX_BYTES,
+        compress_metadata: bool = True,
+        file_report: 'SlowFileReport' = None,
+        source_roots: Optional[Iterable[str]] = None,
     ):
         """
         初始化符号索引构建器
@@ -56,16 +453,59 @@ class SymbolIndexBuilder:
             root_path: 项目根目录
             db_path: 数据库文件路径
             gitignore_path: .gitignore 文件路径
+            catalog: 已构建的文件目录（None 时自行遍历一次）
+            ast_cache: 共享的 AST 解析缓存（None 时自行创建）
+            jobs: 并行提取的进程数（1 为串行，0 为 CPU 核数）
+            batch_size: 每个写入事务的最大行数
+            journal_mode: 构建阶段的 journal_mode PRAGMA（None 表示不修改）
+            synchronous: 构建阶段的 synchronous PRAGMA（None 表示不修改）
+            extraction_cache: 持久化提取结果缓存的文件路径（按内容寻址，跨运行、跨分支复用；None 表示不使用）
+            extraction_cache_max_bytes: 提取结果缓存的容量上限（超出时按 LRU 淘汰）
+            compress_metadata: 是否用 zlib 压缩较大的残余 metadata（见 symbol_store）
+            file_report: 最慢文件报告（非 None 时记录每个文件各提取器的耗时）
+            source_roots: 额外的 Python 源码根目录（解析 from 导入的来源文件，见 ModuleResolver）
 
         注意：
             - 当前版本使用 SQLite 作为符号索引后端
             - Serena MCP 集成正在开发中
             - 如需使用 Serena，请在 Claude Code 中通过自然语言调用
+            - 并行模式下仅提取在工作进程中执行，写入由主进程按文件顺序完成，
+              因此结果与进程数无关
         """
         self.root_path = normalize_path(root_path)
         self.db_path = db_path
-        self.exclude_patterns = parse_gitignore(gitignore_path)
+        self.catalog = catalog if catalog is not None else FileCatalog(self.root_path, gitignore_path)
         self.conn: Optional[sqlite3.Connection] = None
+        self.jobs = jobs if jobs and jobs > 0 else (os.cpu_count() or 1)
+        self.extractor = FileSymbolExtractor(
+            self.root_path, db_path, ast_cache,
+            store_path=str(extraction_cache) if extraction_cache is not None else None,
+            store_max_bytes=extraction_cache_max_bytes,
+            profile=file_report is not None
+        )
+        self.file_report = file_report
+        self.source_roots = list(source_roots or ())
+        self._resolver: Optional['ModuleResolver'] = None
+
+        if journal_mode is not None and journal_mode.upper() not in JOURNAL_MODES:
+            raise ValueError(f"Invalid journal_mode: {journal_mode}")
+        if synchronous is not None and synchronous.upper() not in SYNCHRONOUS_MODES:
+            raise ValueError(f"Invalid synchronous: {synchronous}")
+        self.batch_size = max(1, batch_size)
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.compress_metadata = compress_metadata
+
+        # 批量写入状态
+        self._pending: List[Tuple] = []
+        self._pending_calls: List[Tuple[int, str, int]] = []
+        self._pending_imports: List[Tuple[str, str, str, Optional[str], str]] = []
+        self._next_id = 1
+        self._has_existing_rows = False
+        self.rows_inserted = 0
+        self.write_seconds = 0.0
+        self.fts_available = False
+        self.metadata_writer: Optional[MetadataWriter] = None
 
         print("   💾 Using SQLite for symbol indexing")
         print("   💡 提示：在 Claude Code 中可使用 Serena MCP 进行符号级分析")
@@ -79,23 +519,225 @@ class SymbolIndexBuilder:
         """
         # 初始化数据库
         self._init_database()
+        self._reindex_all()
+
+        # 关闭数据库连接
+        self.conn.close()
 
+        return self.db_path
+
+    def _reindex_all(self):
+        """重新索引全部源代码文件（数据库已初始化）"""
         # 收集所有源代码文件
         source_files = self._collect_source_files()
+        tasks = [
+            (file_path, self.catalog.file_type(file_path),
+             str(get_relative_path(file_path, self.root_path)))
+            for file_path in source_files
+        ]
+
+        # 全量重建：删除所有已索引文件的符号（含依赖、调用边与 metadata），
+        # 否则行号变化的符号、旧 metadata 与旧调用边会残留在索引中
+        indexed = [row[0] for row in self.conn.execute("SELECT DISTINCT file_path FROM symbols ORDER BY 1")]
+        self._remove_files(indexed)
+        self._has_existing_rows = False
+
+        self._write_tasks(tasks)
+
+    def update_index(self, changed_files: List[Path], deleted_files: List[str]) -> Optional[str]:
+        """
+        增量更新符号索引：删除变更/已删除文件的旧记录，只重新提取变更文件
+
+        Args:
+            changed_files: 新增或修改的文件（绝对路径，非源码文件会被忽略）
+            deleted_files: 已删除文件的相对路径
+
+        Returns:
+            数据库文件路径
+        """
+        # 初始化数据库；结构过旧的索引已被删除重建，只写变更文件会丢失其余文件，改为全量索引
+        if self._init_database():
+            print("   🔄 Symbol index was recreated, reindexing all files")
+            self._reindex_all()
+            self.conn.close()
+            return self.db_path
+
+        tasks = []
+        for file_path in changed_files:
+            file_type = self.catalog.file_type(file_path)
+            if file_type in SOURCE_FILE_TYPES:
+                tasks.append((file_path, file_type, str(get_relative_path(file_path, self.root_path))))
+
+        # 新增或删除文件后，其他文件中未解析或指向已删除文件的导入需要重新解析
+        files_changed = bool(deleted_files) or any(
+            self.conn.execute("SELECT 1 FROM symbols WHERE file_path = ? LIMIT 1", (rel_path,)).fetchone() is None
+            for _, _, rel_path in tasks
+        )
+
+        removed = self._remove_files([rel_path for _, _, rel_path in tasks] + list(deleted_files))
+        print(f"   🔄 Incremental update: {len(tasks)} file(s) to reindex, {removed} stale symbol(s) removed")
 
-        # 索引每个文件
-        for file_path in source_files:
-            self._index_file(file_path)
+        if files_changed:
+            self._reresolve_imports()
+        self._write_tasks(tasks)
 
         # 关闭数据库连接
         self.conn.close()
 
         return self.db_path
 
-    def _init_database(self):
-        """初始化 SQLite 数据库"""
+    def _write_tasks(self, tasks: List[Tuple[Path, str, str]]):
+        """提取并按文件顺序写入（最后一个事务中解析调用关系）"""
+        start = time.perf_counter()
+        first_new_id = self._next_id
+        for rel_path, file_type, records, warning, timings in self._extract_all(tasks):
+            if warning:
+                print(warning)
+                EXTRACTION_FALLBACKS.inc()
+            if timings and self.file_report is not None:
+                self.file_report.add_all(rel_path, timings)
+            FILES_INDEXED.inc(language=file_type)
+            self._write_records(rel_path, records)
+        self._flush(resolve_from=first_new_id)
+        elapsed = time.perf_counter() - start
+
+        rate = self.rows_inserted / elapsed if elapsed > 0 else 0
+        print(f"   ⚡ Inserted {self.rows_inserted} rows in {elapsed:.2f}s "
+              f"({rate:,.0f} rows/s, {self.write_seconds:.2f}s in SQLite)")
+
+        # 提取结果缓存统计（并行模式下命中发生在工作进程中，不在此统计）
+        store = self.extractor.store
+        if store is not None:
+            stats = store.get_stats()
+            print(f"   🗃️  Extraction cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['evictions']} evicted")
+
+    def _remove_files(self, rel_paths: List[str]) -> int:
+        """
+        在一个事务中删除文件的全部符号（含子符号）及其依赖、调用边、搜索词元和规范化 metadata
+
+        Args:
+            rel_paths: 文件相对路径
+
+        Returns:
+            删除的符号数
+        """
+        if not rel_paths:
+            return 0
+
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS stale_files (path TEXT PRIMARY KEY)")
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS stale_ids (id INTEGER PRIMARY KEY)")
+            self.conn.execute("DELETE FROM stale_files")
+            self.conn.execute("DELETE FROM stale_ids")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO stale_files (path) VALUES (?)",
+                ((rel_path,) for rel_path in rel_paths)
+            )
+
+            # 文件内的符号，以及（防御性地）挂在它们下面的子符号
+            self.conn.execute("""
+                INSERT INTO stale_ids (id)
+                SELECT id FROM symbols WHERE file_path IN (SELECT path FROM stale_files)
+            """)
+            while self.conn.execute("""
+                INSERT OR IGNORE INTO stale_ids (id)
+                SELECT id FROM symbols WHERE parent_id IN (SELECT id FROM stale_ids)
+            """).rowcount > 0:
+                pass
+
+            self.conn.execute("""
+                DELETE FROM dependencies
+                WHERE from_symbol IN (SELECT id FROM stale_ids)
+                   OR to_symbol IN (SELECT id FROM stale_ids)
+            """)
+            self.conn.execute(
+                "DELETE FROM call_graph WHERE caller_id IN (SELECT id FROM stale_ids)"
+            )
+            self.conn.execute(
+                "DELETE FROM imported_names WHERE file_path IN (SELECT path FROM stale_files)"
+            )
+            stale_rows = self.conn.execute(
+                "SELECT id, name FROM symbols WHERE id IN (SELECT id FROM stale_ids)"
+            ).fetchall()
+            self.conn.executemany(
+                "DELETE FROM symbol_tokens WHERE token = ? AND symbol_id = ?",
+                ((token, symbol_id) for symbol_id, token in self._token_rows(stale_rows))
+            )
+            if self.fts_available:
+                # 外部内容表需用原值删除
+                self.conn.execute("""
+                    INSERT INTO symbols_fts (symbols_fts, rowid, name)
+                    SELECT 'delete', id, name FROM symbols WHERE id IN (SELECT id FROM stale_ids)
+                """)
+            delete_metadata(self.conn, 'stale_ids')
+            removed = self.conn.execute(
+                "DELETE FROM symbols WHERE id IN (SELECT id FROM stale_ids)"
+            ).rowcount
+
+        SYMBOL_ROWS.inc(removed, op='removed')
+        return removed
+
+    def _extract_all(
+        self, tasks: List[Tuple[Path, str, str]]
+    ) -> Iterator[Tuple[str, str, List[SymbolRecord], Optional[str], Optional[Dict[str, float]]]]:
+        """按任务顺序产出 (相对路径, 文件类型, 记录, 警告, 耗时)（并行时结果顺序不变）"""
+        if self.jobs <= 1 or len(tasks) < 2:
+            for file_path, file_type, rel_path in tasks:
+                records, warning = self.extractor.extract(file_path, file_type, rel_path)
+                yield rel_path, file_type, records, warning, self.extractor.last_timings
+            return
+
+        import multiprocessing
+
+        # 先在主进程导入提取器，fork 出的工作进程直接继承
+        _load_enhanced_ast()
+        workers = min(self.jobs, len(tasks))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with multiprocessing.Pool(
+            workers,
+            initializer=_init_worker,
+            initargs=(self.root_path, self.db_path,
+                      self.extractor.store_path, self.extractor.store_max_bytes,
+                      self.extractor.profile)
+        ) as pool:
+            # imap 保持输入顺序，符号 ID 与串行模式一致；工作进程中的指标合并到主进程
+            results = pool.imap(_extract_in_worker, tasks, chunksize=chunksize)
+            for (_, file_type, _), (rel_path, records, warning, timings, drained) in zip(tasks, results):
+                metrics.REGISTRY.merge(drained)
+                yield rel_path, file_type, records, warning, timings
+
+    def _init_database(self) -> bool:
+        """
+        初始化 SQLite 数据库（结构版本过旧的已有索引会被删除重建）
+
+        Returns:
+            已有索引是否因结构版本过旧被删除（此时数据库为空，需要全量索引）
+        """
         self.conn = sqlite3.connect(self.db_path)
         cursor = self.conn.cursor()
+        rebuilt = False
+
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        has_symbols = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'symbols'"
+        ).fetchone()
+        if has_symbols and version < SCHEMA_VERSION:
+            print(f"   ♻️  Symbol index schema v{version} is outdated (current v{SCHEMA_VERSION}), rebuilding")
+            self.conn.close()
+            for suffix in ('', '-wal', '-shm'):
+                path = Path(self.db_path + suffix)
+                if path.exists():
+                    path.unlink()
+            self.conn = sqlite3.connect(self.db_path)
+            cursor = self.conn.cursor()
+            rebuilt = True
+
+        # 构建阶段的写入优化（取值已在构造函数中校验）
+        if self.journal_mode is not None:
+            cursor.execute(f"PRAGMA journal_mode={self.journal_mode.upper()}")
+        if self.synchronous is not None:
+            cursor.execute(f"PRAGMA synchronous={self.synchronous.upper()}")
 
         # 创建符号表
         cursor.execute("""
@@ -124,284 +766,328 @@ class SymbolIndexBuilder:
             )
         """)
 
+        # 创建调用表（与 CallGraphBuilder 的表结构相同）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS call_graph (
+                caller_id INTEGER,
+                callee_name TEXT NOT NULL,
+                line_number INTEGER,
+                FOREIGN KEY (caller_id) REFERENCES symbols(id)
+            )
+        """)
+
+        # 各文件通过 from 导入绑定的名称及其来源（限定跨文件的调用解析）：
+        # name 为本文件中的名称（as 别名），module 为导入说明符，
+        # source_file/source_name 为解析到的项目文件与原名称（外部模块为 NULL）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS imported_names (
+                file_path TEXT NOT NULL,
+                name TEXT NOT NULL,
+                module TEXT NOT NULL,
+                source_file TEXT,
+                source_name TEXT NOT NULL,
+                PRIMARY KEY (file_path, name)
+            ) WITHOUT ROWID
+        """)
+
         # 创建索引
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbols_name ON symbols(name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbols_kind ON symbols(kind)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbols_file ON symbols(file_path)")
+        # (file_path, name) 同时用于按文件查询与本文件调用解析
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbols_file_name ON symbols(file_path, name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_deps_from ON dependencies(from_symbol)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_deps_to ON dependencies(to_symbol)")
-
-        self.conn.commit()
-
-    def _collect_source_files(self) -> List[Path]:
-        """收集所有源代码文件"""
-        source_files = []
-
-        for file_path in self.root_path.rglob('*'):
-            if not file_path.is_file():
-                continue
-
-            if not should_include_file(file_path, self.exclude_patterns, self.root_path):
-                continue
-
-            file_type = detect_file_type(file_path)
-            if file_type in ['python', 'javascript', 'typescript']:
-                source_files.append(file_path)
-
-        return source_files
-
-    def _index_file(self, file_path: Path):
-        """索引单个文件"""
-        file_type = detect_file_type(file_path)
-        rel_path = str(get_relative_path(file_path, self.root_path))
-
-        if file_type == 'python':
-            self._index_python_file(file_path, rel_path)
-        elif file_type in ['javascript', 'typescript']:
-            self._index_js_file(file_path, rel_path)
-
-    def _index_python_file(self, file_path: Path, rel_path: str):
-        """索引 Python 文件（使用增强提取器）"""
-        # Try enhanced extraction first
-        if ENHANCED_AST_AVAILABLE:
-            try:
-                analyzer = EnhancedASTAnalyzer(self.root_path, self.db_path)
-                extracted_data = analyzer.analyze_file(file_path)
-
-                if 'error' not in extracted_data:
-                    # Use enhanced extraction results
-                    self._index_enhanced_data(extracted_data, rel_path)
-                    return
-            except Exception as e:
-                print(f"   ⚠ Enhanced extraction failed for {rel_path}: {e}, falling back to basic")
-
-        # Fallback to basic extraction
-        self._index_python_file_basic(file_path, rel_path)
-
-    def _index_enhanced_data(self, extracted_data: Dict, rel_path: str):
-        """索引增强提取的数据"""
-        # Index file symbol
-        file_id = self._add_symbol(
-            name=Path(rel_path).name,
-            kind='file',
-            file_path=rel_path,
-            line_number=1,
-            end_line_number=extracted_data.get('line_count', 1),
-            metadata=json.dumps(extracted_data)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_graph_caller ON call_graph(caller_id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_call_graph_callee ON call_graph(callee_name)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_imported_names_source ON imported_names(source_file, source_name)"
         )
 
-        # Index classes
-        for class_data in extracted_data.get('classes', []):
-            class_id = self._add_symbol(
-                name=class_data['name'],
-                kind='class',
-                file_path=rel_path,
-                line_number=class_data['line_number'],
-                end_line_number=class_data['end_line_number'],
-                parent_id=file_id,
-                metadata=json.dumps(class_data)
-            )
-
-            # Index methods
-            for method in class_data.get('methods', []):
-                self._add_symbol(
-                    name=method['name'],
-                    kind='function',
-                    file_path=rel_path,
-                    line_number=method['line_number'],
-                    end_line_number=method['end_line_number'],
-                    parent_id=class_id,
-                    metadata=json.dumps(method)
-                )
-
-            # Index nested classes
-            for nested_class in class_data.get('nested_classes', []):
-                nested_id = self._add_symbol(
-                    name=nested_class['name'],
-                    kind='class',
-                    file_path=rel_path,
-                    line_number=nested_class['line_number'],
-                    end_line_number=nested_class['end_line_number'],
-                    parent_id=class_id,
-                    metadata=json.dumps(nested_class)
-                )
-
-        # Index top-level functions
-        for func_data in extracted_data.get('functions', []):
-            self._add_symbol(
-                name=func_data['name'],
-                kind='function',
-                file_path=rel_path,
-                line_number=func_data['line_number'],
-                end_line_number=func_data['end_line_number'],
-                parent_id=file_id,
-                metadata=json.dumps(func_data)
-            )
-
-    def _index_python_file_basic(self, file_path: Path, rel_path: str):
-        """基本 Python 文件索引（回退方案）"""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                source = f.read()
-
-            tree = ast.parse(source, filename=str(file_path))
-
-            # 索引文件级符号
-            file_id = self._add_symbol(
-                name=Path(rel_path).name,
-                kind='file',
-                file_path=rel_path,
-                line_number=1,
-                end_line_number=len(source.splitlines())
-            )
+        self._init_search_tables(cursor)
+        create_metadata_tables(cursor)
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 
-            # 遍历 AST
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    # 类定义
-                    self._add_symbol(
-                        name=node.name,
-                        kind='class',
-                        file_path=rel_path,
-                        line_number=node.lineno,
-                        end_line_number=getattr(node, 'end_lineno', node.lineno),
-                        parent_id=file_id,
-                        metadata=json.dumps({
-                            'bases': [ast.unparse(base) for base in node.bases]
-                        })
-                    )
+        self.conn.commit()
 
-                elif isinstance(node, ast.FunctionDef):
-                    # 函数定义
-                    self._add_symbol(
-                        name=node.name,
-                        kind='function',
-                        file_path=rel_path,
-                        line_number=node.lineno,
-                        end_line_number=getattr(node, 'end_lineno', node.lineno),
-                        parent_id=file_id,
-                        metadata=json.dumps({
-                            'args': [arg.arg for arg in node.args.args],
-                            'returns': ast.unparse(node.returns) if node.returns else None
-                        })
-                    )
+        # 符号 ID 在内存中分配，从现有最大值之后开始
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM symbols")
+        max_id = cursor.fetchone()[0]
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'symbols'")
+        row = cursor.fetchone()
+        self._next_id = max(max_id, row[0] if row else 0) + 1
+        self._has_existing_rows = max_id > 0
+        self._pending = []
+        self._pending_calls = []
+        self._pending_imports = []
+        self.metadata_writer = MetadataWriter(self.conn, compress=self.compress_metadata)
+        return rebuilt
+
+    def _init_search_tables(self, cursor: sqlite3.Cursor):
+        """
+        创建符号搜索用的辅助表（已有数据库首次创建时从 symbols 回填）
 
-                elif isinstance(node, ast.AsyncFunctionDef):
-                    # 异步函数定义
-                    self._add_symbol(
-                        name=node.name,
-                        kind='function',
-                        file_path=rel_path,
-                        line_number=node.lineno,
-                        end_line_number=getattr(node, 'end_lineno', node.lineno),
-                        parent_id=file_id,
-                        metadata=json.dumps({
-                            'async': True,
-                            'args': [arg.arg for arg in node.args.args],
-                            'returns': ast.unparse(node.returns) if node.returns else None
-                        })
-                    )
+        - idx_symbols_name_nocase：不区分大小写的精确与前缀匹配
+        - symbol_tokens：名称按 camelCase/snake_case 拆分后的词元
+        - symbols_fts：FTS5 trigram 外部内容表（子串与模糊匹配），在 _flush 与
+          _remove_files 中批量同步（逐行触发器会使写入慢数倍）；
+          SQLite 不支持 FTS5/trigram 时跳过，查询端回退到 LIKE 扫描
+        """
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_symbols_name_nocase ON symbols(name COLLATE NOCASE)")
 
-        except (SyntaxError, UnicodeDecodeError):
-            # 无法解析的文件，只记录文件级符号
-            self._add_symbol(
-                name=Path(rel_path).name,
-                kind='file',
-                file_path=rel_path,
-                line_number=1,
-                end_line_number=1
+        has_tokens = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'symbol_tokens'"
+        ).fetchone()
+        # 单一 B 树（无 rowid、无二级索引）；删除时由名称重新拆分出主键
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS symbol_tokens (
+                token TEXT NOT NULL,
+                symbol_id INTEGER NOT NULL,
+                PRIMARY KEY (token, symbol_id)
+            ) WITHOUT ROWID
+        """)
+        if not has_tokens:
+            rows = cursor.execute("SELECT id, name FROM symbols").fetchall()
+            cursor.executemany(
+                "INSERT INTO symbol_tokens (symbol_id, token) VALUES (?, ?)",
+                self._token_rows(rows)
             )
 
-    def _index_js_file(self, file_path: Path, rel_path: str):
-        """索引 JavaScript/TypeScript 文件（基于正则）"""
+        has_fts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'symbols_fts'"
+        ).fetchone()
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            lines = content.splitlines()
+            cursor.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS symbols_fts
+                USING fts5(name, content='symbols', content_rowid='id', tokenize='trigram')
+            """)
+        except sqlite3.OperationalError:
+            self.fts_available = False
+            return
+
+        if not has_fts:
+            cursor.execute("INSERT INTO symbols_fts (symbols_fts) VALUES ('rebuild')")
+        self.fts_available = True
+
+    @staticmethod
+    def _token_rows(rows: Iterable[Tuple]) -> Iterator[Tuple[int, str]]:
+        """(symbol_id, name, ...) -> (symbol_id, token) 行"""
+        for row in rows:
+            for token in split_identifier(row[1]):
+                yield row[0], token
 
-            # 索引文件
-            file_id = self._add_symbol(
-                name=Path(rel_path).name,
-                kind='file',
-                file_path=rel_path,
-                line_number=1,
-                end_line_number=len(lines)
+    def _collect_source_files(self) -> List[Path]:
+        """收集所有源代码文件（来自共享的文件目录）"""
+        return self.catalog.source_files()
+
+    @property
+    def resolver(self) -> 'ModuleResolver':
+        """Python 模块解析器（基于文件目录中的全部 Python 文件，第一次使用时建立）"""
+        if self._resolver is None:
+            from module_resolver import ModuleResolver
+
+            self._resolver = ModuleResolver(
+                (entry.rel_path for entry in self.catalog.entries(['python'])),
+                source_roots=self.source_roots
+            )
+        return self._resolver
+
+    def _reresolve_imports(self):
+        """重新解析未解析或指向已不存在文件的导入（新增、删除文件后调用）"""
+        with self.conn:
+            rows = self.conn.execute(
+                "SELECT file_path, name, module, source_file FROM imported_names"
+            ).fetchall()
+            updates = []
+            for file_path, name, module, source_file in rows:
+                resolved = self.resolver.resolve(module, file_path)
+                if resolved != source_file:
+                    updates.append((resolved, file_path, name))
+            self.conn.executemany(
+                "UPDATE imported_names SET source_file = ? WHERE file_path = ? AND name = ?", updates
             )
 
-            # 类定义: class MyClass { ... }
-            class_pattern = r'(?:export\s+)?(?:default\s+)?class\s+(\w+)'
-            for match in re.finditer(class_pattern, content):
-                line_num = content[:match.start()].count('\n') + 1
-                self._add_symbol(
-                    name=match.group(1),
-                    kind='class',
-                    file_path=rel_path,
-                    line_number=line_num,
-                    parent_id=file_id
-                )
-
-            # 函数定义: function myFunc(...) { ... }
-            func_pattern = r'function\s+(\w+)\s*\('
-            for match in re.finditer(func_pattern, content):
-                line_num = content[:match.start()].count('\n') + 1
-                self._add_symbol(
-                    name=match.group(1),
-                    kind='function',
-                    file_path=rel_path,
-                    line_number=line_num,
-                    parent_id=file_id
-                )
-
-            # 箭头函数: const myFunc = (...) => { ... }
-            arrow_pattern = r'(?:const|let|var)\s+(\w+)\s*=\s*(?:\([^)]*\)|\w+)\s*=>'
-            for match in re.finditer(arrow_pattern, content):
-                line_num = content[:match.start()].count('\n') + 1
-                self._add_symbol(
-                    name=match.group(1),
-                    kind='function',
-                    file_path=rel_path,
-                    line_number=line_num,
-                    parent_id=file_id
-                )
+    def _write_records(self, rel_path: str, records: List[SymbolRecord]):
+        """
+        缓冲单个文件的符号记录（在内存中分配 ID 并解析父符号 ID）
 
-        except (UnicodeDecodeError, OSError):
-            # 无法读取的文件
-            pass
+        已存在的符号（name, kind, file_path, line_number 相同）沿用现有 ID，
+        与逐行 INSERT 时的唯一约束处理一致。
+        """
+        known = self._load_existing_ids(rel_path) if self._has_existing_rows else {}
+        ids: List[int] = []
+        new_ids: Set[int] = set()
+
+        for name, kind, line_number, end_line_number, parent_index, metadata in records:
+            key = (name, kind, line_number)
+            symbol_id = known.get(key) if line_number is not None else None
+
+            if symbol_id is None:
+                symbol_id = self._next_id
+                self._next_id += 1
+                parent_id = ids[parent_index] if parent_index is not None else None
+                self._pending.append((
+                    symbol_id, name, kind, rel_path, line_number, end_line_number, parent_id,
+                    self.metadata_writer.encode(symbol_id, rel_path, metadata)
+                ))
+                if line_number is not None:
+                    known[key] = symbol_id
+                new_ids.add(symbol_id)
+
+            ids.append(symbol_id)
+
+        # 调用点只为新写入的符号记录（沿用的符号已有调用记录）
+        for index, callee_name, line_number in _call_sites(records):
+            if ids[index] in new_ids:
+                self._pending_calls.append((ids[index], callee_name, line_number))
+        for name, module, source_name in _import_bindings(records):
+            self._pending_imports.append((rel_path, name, module, self.resolver.resolve(module, rel_path), source_name))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def _load_existing_ids(self, rel_path: str) -> Dict[Tuple, int]:
+        """获取文件在数据库中已有符号的 ID"""
+        cursor = self.conn.execute("""
+            SELECT id, name, kind, line_number FROM symbols WHERE file_path = ?
+        """, (rel_path,))
+        return {(name, kind, line): symbol_id for symbol_id, name, kind, line in cursor}
+
+    def _flush(self, resolve_from: Optional[int] = None):
+        """
+        在一个事务中写入缓冲的符号（及其规范化 metadata 与调用点）
 
-    def _add_symbol(self, name: str, kind: str, file_path: str,
-                   line_number: int, end_line_number: int = None,
-                   parent_id: int = None, metadata: str = None) -> int:
-        """添加符号到数据库"""
-        cursor = self.conn.cursor()
+        Args:
+            resolve_from: 本次写入的第一个符号 ID；给出时在同一事务中把调用点
+                解析为 dependencies 中的符号边
+        """
+        if not self._pending and resolve_from is None:
+            return
 
-        try:
-            cursor.execute("""
+        start = time.perf_counter()
+        with self.conn:
+            self.conn.executemany("""
                 INSERT INTO symbols
-                (name, kind, file_path, line_number, end_line_number, parent_id, metadata)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (name, kind, file_path, line_number, end_line_number, parent_id, metadata))
-
-            self.conn.commit()
-            return cursor.lastrowid
-        except sqlite3.IntegrityError:
-            # 符号已存在，返回现有 ID
-            cursor.execute("""
-                SELECT id FROM symbols
-                WHERE name = ? AND kind = ? AND file_path = ? AND line_number = ?
-            """, (name, kind, file_path, line_number))
-            result = cursor.fetchone()
-            return result[0] if result else None
+                (id, name, kind, file_path, line_number, end_line_number, parent_id, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, self._pending)
+            self.conn.executemany(
+                "INSERT INTO symbol_tokens (symbol_id, token) VALUES (?, ?)",
+                self._token_rows(self._pending)
+            )
+            if self.fts_available:
+                self.conn.executemany(
+                    "INSERT INTO symbols_fts (rowid, name) VALUES (?, ?)",
+                    ((row[0], row[1]) for row in self._pending)
+                )
+            self.metadata_writer.flush()
+            self.conn.executemany(
+                "INSERT INTO call_graph (caller_id, callee_name, line_number) VALUES (?, ?, ?)",
+                self._pending_calls
+            )
+            # 同一名称多次导入时后面的绑定生效
+            self.conn.executemany("""
+                INSERT OR REPLACE INTO imported_names (file_path, name, module, source_file, source_name)
+                VALUES (?, ?, ?, ?, ?)
+            """, self._pending_imports)
+            if resolve_from is not None:
+                self._resolve_calls(resolve_from)
+        elapsed = time.perf_counter() - start
+        self.write_seconds += elapsed
+        SQLITE_WRITE_SECONDS.inc(elapsed)
+
+        self.rows_inserted += len(self._pending)
+        SYMBOL_ROWS.inc(len(self._pending), op='inserted')
+        self._pending = []
+        self._pending_calls = []
+        self._pending_imports = []
+
+    def _resolve_calls(self, first_new_id: int):
+        """
+        把调用点解析为符号边（集合 JOIN，调用方负责事务）
+
+        只处理涉及新符号的边：新符号发出的调用，以及已有符号对新符号的调用
+        （被删除符号的边已在 _remove_files 中删除）。调用方文件内定义了同名
+        符号时只连接到本文件的定义（按 (file_path, name) 索引查找）；否则按
+        调用方文件的 from 导入连接到来源文件中的原名称符号（as 别名按原名称
+        解析，包的再导出跟随一层），不按名称连接到其他文件中的同名符号。
+        调用函数记为 'call'，调用类记为 'instantiation'。
+        """
+        # CROSS JOIN 固定连接顺序：先确定调用方文件，再按索引查找被调用符号
+        resolved = self.conn.execute(f"""
+            INSERT INTO dependencies (from_symbol, to_symbol, dep_type)
+            SELECT DISTINCT c.caller_id, s.id, {_CALL_DEP_TYPE_SQL}
+            FROM call_graph c
+            CROSS JOIN symbols caller ON caller.id = c.caller_id
+            CROSS JOIN symbols s ON s.file_path = caller.file_path AND s.name = c.callee_name
+            WHERE c.caller_id >= ? AND s.kind IN ('function', 'class')
+        """, (first_new_id,)).rowcount
+        resolved += self.conn.execute(f"""
+            INSERT INTO dependencies (from_symbol, to_symbol, dep_type)
+            SELECT DISTINCT c.caller_id, s.id, {_CALL_DEP_TYPE_SQL}
+            FROM call_graph c
+            CROSS JOIN symbols caller ON caller.id = c.caller_id
+            CROSS JOIN imported_names i ON i.file_path = caller.file_path AND i.name = c.callee_name
+            LEFT JOIN imported_names r ON r.file_path = i.source_file AND r.name = i.source_name
+            CROSS JOIN symbols s ON s.file_path = {_IMPORT_TARGET_FILE_SQL}
+                                AND s.name = {_IMPORT_TARGET_NAME_SQL}
+            WHERE c.caller_id >= ? AND s.kind IN ('function', 'class') AND {_NO_LOCAL_DEFINITION_SQL}
+        """, (first_new_id,)).rowcount
+
+        # 已有调用点指向新符号的边（从新符号出发，调用方不与上面重叠）
+        has_old_calls = self.conn.execute(
+            "SELECT 1 FROM call_graph WHERE caller_id < ? LIMIT 1", (first_new_id,)
+        ).fetchone()
+        if has_old_calls:
+            resolved += self.conn.execute(f"""
+                INSERT INTO dependencies (from_symbol, to_symbol, dep_type)
+                SELECT DISTINCT c.caller_id, s.id, {_CALL_DEP_TYPE_SQL}
+                FROM symbols s
+                CROSS JOIN call_graph c ON c.callee_name = s.name
+                CROSS JOIN symbols caller ON caller.id = c.caller_id
+                WHERE s.id >= ? AND s.kind IN ('function', 'class') AND c.caller_id < ?
+                  AND s.file_path = caller.file_path
+            """, (first_new_id, first_new_id)).rowcount
+            # 直接导入：来源文件没有再导出该名称
+            resolved += self.conn.execute(f"""
+                INSERT INTO dependencies (from_symbol, to_symbol, dep_type)
+                SELECT DISTINCT c.caller_id, s.id, {_CALL_DEP_TYPE_SQL}
+                FROM symbols s
+                CROSS JOIN imported_names i ON i.source_file = s.file_path AND i.source_name = s.name
+                CROSS JOIN call_graph c ON c.callee_name = i.name
+                CROSS JOIN symbols caller ON caller.id = c.caller_id
+                WHERE s.id >= ? AND s.kind IN ('function', 'class') AND c.caller_id < ?
+                  AND caller.file_path = i.file_path
+                  AND NOT EXISTS (
+                      SELECT 1 FROM imported_names r WHERE r.file_path = i.source_file AND r.name = i.source_name
+                  )
+                  AND {_NO_LOCAL_DEFINITION_SQL}
+            """, (first_new_id, first_new_id)).rowcount
+            # 经来源文件再导出
+            resolved += self.conn.execute(f"""
+                INSERT INTO dependencies (from_symbol, to_symbol, dep_type)
+                SELECT DISTINCT c.caller_id, s.id, {_CALL_DEP_TYPE_SQL}
+                FROM symbols s
+                CROSS JOIN imported_names r ON r.source_file = s.file_path AND r.source_name = s.name
+                CROSS JOIN imported_names i ON i.source_file = r.file_path AND i.source_name = r.name
+                CROSS JOIN call_graph c ON c.callee_name = i.name
+                CROSS JOIN symbols caller ON caller.id = c.caller_id
+                WHERE s.id >= ? AND s.kind IN ('function', 'class') AND c.caller_id < ?
+                  AND caller.file_path = i.file_path AND {_NO_LOCAL_DEFINITION_SQL}
+            """, (first_new_id, first_new_id)).rowcount
+        CALL_EDGES.inc(resolved)
 
 
 def main():
     import sys
 
     if len(sys.argv) < 2:
-        print("Usage: build_symbol_index.py <project-path> [--output db_path]")
+        print("Usage: build_symbol_index.py <project-path> [--output db_path] [--jobs N] "
+              "[--extraction-cache path] [--no-compress-metadata]")
         print("\nExamples:")
         print("  build_symbol_index.py /path/to/project")
         print("  build_symbol_index.py /path/to/project --output /path/to/symbols.db")
+        print("  build_symbol_index.py /path/to/project --jobs 8")
+        print("  build_symbol_index.py /path/to/project --extraction-cache .cache/extractions.db")
         print("\n注意：")
         print("  - 此脚本使用 SQLite 构建符号索引")
         print("  - Serena MCP 集成正在开发中")
@@ -413,13 +1099,34 @@ def main():
         print(f"Error: Path does not exist: {project_path}")
         sys.exit(1)
 
-    # 解析输出路径
     output_path = "symbols.db"
-    if len(sys.argv) > 2 and sys.argv[2] == "--output" and len(sys.argv) > 3:
-        output_path = sys.argv[3]
+    jobs = 1
+    extraction_cache = None
+    compress_metadata = True
+
+    # 解析参数
+    i = 2
+    while i < len(sys.argv):
+        if sys.argv[i] == "--output" and i + 1 < len(sys.argv):
+            output_path = sys.argv[i + 1]
+            i += 2
+        elif sys.argv[i] == "--jobs" and i + 1 < len(sys.argv):
+            jobs = int(sys.argv[i + 1])
+            i += 2
+        elif sys.argv[i] == "--extraction-cache" and i + 1 < len(sys.argv):
+            extraction_cache = Path(sys.argv[i + 1])
+            i += 2
+        elif sys.argv[i] == "--no-compress-metadata":
+            compress_metadata = False
+            i += 1
+        else:
+            i += 1
 
     # 构建索引
-    builder = SymbolIndexBuilder(project_path, db_path=output_path)
+    builder = SymbolIndexBuilder(
+        project_path, db_path=output_path, jobs=jobs, extraction_cache=extraction_cache,
+        compress_metadata=compress_metadata
+    )
     db_path = builder.build_index()
 
     print(f"✅ Symbol index built successfully: {db_path}")
@@ -434,8 +1141,6 @@ def main():
     cursor.execute("SELECT kind, COUNT(*) FROM symbols GROUP BY kind")
     kind_stats = cursor.fetchall()
 
-    cursor.execute("SELECT COUNT(*) FROM files")  # Note: 'files' is not a table, fix this
-    # Actually, we should query symbols where kind='file'
     cursor.execute("SELECT COUNT(*) FROM symbols WHERE kind='file'")
     file_count = cursor.fetchone()[0]
 
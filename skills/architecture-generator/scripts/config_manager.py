@@ -7,13 +7,14 @@ Supports .architecture-generator.yaml configuration files.
 Configuration options:
 - node_threshold: Dependency graph node threshold
 - max_depth: Maximum scan depth
+- collapse_files: Max files listed per directory in the file tree
 - incremental: Enable/disable incremental scanning
 - exclude: Additional exclude patterns
 - output_dir: Custom output directory
+- source_roots: Extra Python source roots for import resolution
 - index_type: 'auto', 'sqlite' (future: 'serena')
 """
 
-import yaml
 from pathlib import Path
 from typing import Dict, List, Optional
 
@@ -21,9 +22,11 @@ from typing import Dict, List, Optional
 DEFAULT_CONFIG = {
     'node_threshold': 25,
     'max_depth': None,
+    'collapse_files': None,
     'incremental': True,
     'exclude': [],
     'output_dir': 'docs/static/architecture',
+    'source_roots': [],
     'index_type': 'auto',
     'include_tests': True,
 }
@@ -53,7 +56,9 @@ class Config:
             self._load_config()
 
     def _load_config(self):
-        """加载 YAML 配置文件"""
+        """加载 YAML 配置文件（只在配置文件存在时导入 yaml）"""
+        import yaml
+
         try:
             with open(self.config_file, 'r', encoding='utf-8') as f:
                 user_config = yaml.safe_load(f)
@@ -85,6 +90,9 @@ node_threshold: 25
 # 最大扫描深度（null 表示无限制）
 max_depth: null
 
+# 文件树中每个目录最多列出的文件数，其余折叠为 "… N more files"（null 表示不折叠）
+collapse_files: null
+
 # 是否启用增量扫描（只扫描修改过的文件）
 incremental: true
 
@@ -98,6 +106,9 @@ exclude:
 # 输出目录（相对于项目根目录）
 output_dir: docs/static/architecture
 
+# 额外的 Python 源码根目录（相对路径）；src/ 与包含顶层包的目录会自动识别
+source_roots: []
+
 # 符号索引类型：auto, sqlite, serena
 # - auto: 自动选择（优先 Serena，降级到 SQLite）
 # - sqlite: 强制使用 SQLite
@@ -5,35 +5,62 @@ Enhanced AST analyzer - Main orchestrator for all extractors.
 Provides a unified interface for comprehensive Python code analysis.
 """
 
+import time
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from ast_extractors.ast_cache import ParsedModuleCache
 from ast_extractors.class_extractor import ClassExtractor
 from ast_extractors.function_extractor import FunctionExtractor
 from ast_extractors.dependency_extractor import DependencyExtractor
 from ast_extractors.variable_extractor import VariableExtractor, VariableInfo
 from ast_extractors.pattern_extractor import PatternExtractor
+from ast_extractors.extraction_engine import ExtractionEngine
+from ast_extractors.extraction_store import ExtractionStore
+import metrics
+
+
+# Version of the analyze_file output; bump whenever extractor output changes
+# so persisted results from older versions are not reused
+ANALYZER_VERSION = '4'
+
+CACHE_REQUESTS = metrics.counter('cache_requests', 'Cache lookups by cache and result')
+PARSE_FAILURES = metrics.counter('parse_failures', 'Files that could not be parsed')
+FILE_ANALYSIS_SECONDS = metrics.histogram(
+    'file_analysis_seconds', 'Per-file analysis time by stage', metrics.DURATION_BUCKETS
+)
 
 
 class EnhancedASTAnalyzer:
     """Enhanced AST analyzer that orchestrates all extractors"""
 
-    def __init__(self, project_path: Path, db_path: str = "symbols.db"):
+    def __init__(self, project_path: Path, db_path: str = "symbols.db",
+                 cache: Optional[ParsedModuleCache] = None,
+                 store: Optional[ExtractionStore] = None):
         """
         Initialize enhanced AST analyzer.
 
         Args:
             project_path: Path to project root
             db_path: Path to SQLite database for call graph
+            cache: Parsed module cache shared across analyzers (a private
+                one is created if None)
+            store: Persistent extraction store; results for unchanged
+                content are returned without parsing (None to disable)
         """
         self.project_path = project_path.resolve()
+        self.cache = cache if cache is not None else ParsedModuleCache()
+        self.store = store
 
-    def analyze_file(self, file_path: Path) -> Dict:
+    def analyze_file(self, file_path: Path, timings: Optional[Dict[str, float]] = None) -> Dict:
         """
         Analyze a single file with enhanced extraction.
 
         Args:
             file_path: Path to file to analyze
+            timings: If given, seconds spent parsing, in each extractor
+                (by class name), in the shared traversal and converting
+                results are added to it (nothing is added for store hits)
 
         Returns:
             Dictionary containing all extracted information
@@ -41,6 +68,21 @@ class EnhancedASTAnalyzer:
         file_path = file_path.resolve()
         rel_path = str(file_path.relative_to(self.project_path))
 
+        store_key = None
+        data = None  # Content read for the store key, reused by the parse cache
+        if self.store is not None:
+            try:
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                store_key = self.store.key_for(rel_path, data)
+            except OSError:
+                store_key = None
+            if store_key is not None:
+                stored = self.store.get(store_key)
+                CACHE_REQUESTS.inc(cache='extraction', result='miss' if stored is None else 'hit')
+                if stored is not None:
+                    return stored
+
         result = {
             'file_path': rel_path,
             'classes': [],
@@ -50,34 +92,49 @@ class EnhancedASTAnalyzer:
             'patterns': {}
         }
 
+        start = time.perf_counter()
         try:
-            # Extract classes
-            class_extractor = ClassExtractor(file_path, self.project_path)
-            classes = class_extractor.extract()
-            result['classes'] = [self._class_to_dict(c, rel_path) for c in classes]
+            # One cache lookup per file; all extractors share the parsed module
+            parsed_module = self.cache.get(file_path, data)
+            class_extractor = ClassExtractor(file_path, self.project_path, self.cache, parsed_module)
+            func_extractor = FunctionExtractor(file_path, self.project_path, self.cache, parsed_module)
+            dep_extractor = DependencyExtractor(file_path, self.project_path, self.cache, parsed_module)
+            var_extractor = VariableExtractor(file_path, self.project_path, self.cache, parsed_module)
+            pattern_extractor = PatternExtractor(file_path, self.project_path, self.cache, parsed_module)
+            parsed = time.perf_counter()
+            recorded = sum(timings.values()) if timings is not None else 0.0
+
+            # One traversal feeds all extractors
+            engine = ExtractionEngine(class_extractor.tree, [
+                class_extractor,
+                func_extractor,
+                dep_extractor,
+                var_extractor,
+                pattern_extractor,
+            ], timings=timings)
+            classes, functions, dependencies, variables, patterns = engine.run()
+            traversed = time.perf_counter()
 
-            # Extract functions
-            func_extractor = FunctionExtractor(file_path, self.project_path)
-            functions = func_extractor.extract()
+            result['classes'] = [self._class_to_dict(c, rel_path) for c in classes]
             result['functions'] = [self._function_to_dict(f, rel_path) for f in functions]
-
-            # Extract dependencies
-            dep_extractor = DependencyExtractor(file_path, self.project_path)
-            dependencies = dep_extractor.extract()
             result['dependencies'] = self._dependencies_to_dict(dependencies, rel_path)
-
-            # Extract variables
-            var_extractor = VariableExtractor(file_path, self.project_path)
-            variables = var_extractor.extract()
             result['variables'] = self._variables_to_dict(variables, rel_path)
-
-            # Extract patterns
-            pattern_extractor = PatternExtractor(file_path, self.project_path)
-            patterns = pattern_extractor.extract()
             result['patterns'] = self._patterns_to_dict(patterns, rel_path)
 
+            if timings is not None:
+                collectors = sum(timings.values()) - recorded
+                timings['parse'] = timings.get('parse', 0.0) + parsed - start
+                timings['traversal'] = timings.get('traversal', 0.0) + traversed - parsed - collectors
+                timings['to_dict'] = timings.get('to_dict', 0.0) + time.perf_counter() - traversed
+
         except Exception as e:
             result['error'] = str(e)
+            PARSE_FAILURES.inc(stage='symbols')
+
+        FILE_ANALYSIS_SECONDS.observe(time.perf_counter() - start, stage='symbols')
+
+        if store_key is not None and 'error' not in result:
+            self.store.put(store_key, result)
 
         return result
 
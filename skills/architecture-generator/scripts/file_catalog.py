@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Shared file catalog for architecture generator.
+
+Walks the project tree exactly once (os.scandir) and hands the result to
+every pipeline stage:
+- scan_file_structure: file tree rendering and statistics
+- analyze_dependencies: source file collection
+- build_symbol_index: source file collection
+- generate: incremental scan bookkeeping
+
+Excluded directories are pruned during the walk instead of being
+descended into and filtered afterwards. Exclusion uses a compiled
+IgnoreMatcher; nested .gitignore files apply to their own subtree.
+"""
+
+import os
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils import (
+    ALLOWED_HIDDEN_FILES,
+    parse_gitignore,
+    detect_file_type,
+    get_default_excludes,
+    normalize_path,
+)
+from ignore_matcher import IgnoreMatcher
+import metrics
+
+
+# 需要做源码分析的文件类型
+SOURCE_FILE_TYPES = ('python', 'javascript', 'typescript')
+
+FILES_SCANNED = metrics.counter('files_scanned', 'Files found by the project scan')
+PATHS_IGNORED = metrics.counter('paths_ignored', 'Paths skipped by hidden-file or ignore rules')
+
+
+@dataclass
+class CatalogEntry:
+    """目录遍历得到的单个条目"""
+    path: Path
+    rel_path: str  # 相对项目根目录，使用 / 分隔
+    name: str
+    is_dir: bool
+    depth: int  # 根目录下的直接子项为 0
+    file_type: Optional[str] = None  # 仅文件有值
+
+
+class FileCatalog:
+    """文件目录（单次遍历，供所有阶段共享）"""
+
+    def __init__(self, root_path: Path, gitignore_path: Optional[Path] = None,
+                 extra_patterns: Optional[List[str]] = None,
+                 nested_gitignore: bool = True):
+        """
+        初始化文件目录
+
+        Args:
+            root_path: 项目根目录
+            gitignore_path: .gitignore 文件路径
+            extra_patterns: 额外的排除模式
+            nested_gitignore: 是否读取子目录中的 .gitignore（仅作用于所在子树）
+        """
+        self.root_path = normalize_path(root_path)
+        self.exclude_patterns = get_default_excludes()
+        self.exclude_patterns.extend(parse_gitignore(gitignore_path))
+        if extra_patterns:
+            self.exclude_patterns.extend(extra_patterns)
+        self.nested_gitignore = nested_gitignore
+        self.matcher = IgnoreMatcher(self.exclude_patterns)
+
+        self._children: Dict[str, List[CatalogEntry]] = {}
+        self._files: List[CatalogEntry] = []
+        self._file_types: Dict[str, str] = {}
+        self._built = False
+
+    def build(self) -> 'FileCatalog':
+        """
+        遍历项目目录（重复调用不会重新遍历）
+
+        Returns:
+            自身，便于链式调用
+        """
+        if self._built:
+            return self
+
+        ignored = Counter()
+        stack = [(str(self.root_path), '', 0)]
+        while stack:
+            dir_path, rel_dir, depth = stack.pop()
+            try:
+                with os.scandir(dir_path) as it:
+                    dir_entries = list(it)
+            except OSError:
+                self._children[rel_dir] = []
+                continue
+
+            # 子目录中的 .gitignore 只作用于该子树
+            if rel_dir and self.nested_gitignore:
+                for dir_entry in dir_entries:
+                    if dir_entry.name == '.gitignore':
+                        self.matcher.add_gitignore(Path(dir_entry.path), rel_dir)
+                        break
+
+            entries = []
+            for dir_entry in dir_entries:
+                rel_path = f"{rel_dir}/{dir_entry.name}" if rel_dir else dir_entry.name
+
+                try:
+                    is_dir = dir_entry.is_dir()
+                    # 不跟随目录符号链接，避免循环
+                    descend = is_dir and not dir_entry.is_symlink()
+                except OSError:
+                    is_dir = descend = False
+
+                if not self._is_included(dir_entry.name, rel_path, is_dir):
+                    hidden = dir_entry.name.startswith('.') and dir_entry.name not in ALLOWED_HIDDEN_FILES
+                    ignored['dir' if is_dir else 'file', 'hidden' if hidden else 'pattern'] += 1
+                    continue
+
+                entry = CatalogEntry(
+                    path=Path(dir_entry.path),
+                    rel_path=rel_path,
+                    name=dir_entry.name,
+                    is_dir=is_dir,
+                    depth=depth,
+                    file_type=None if is_dir else detect_file_type(Path(dir_entry.name)),
+                )
+                entries.append((entry, descend))
+
+            entries.sort(key=lambda item: (not item[0].is_dir, item[0].name))
+            self._children[rel_dir] = [entry for entry, _ in entries]
+
+            for entry, _ in entries:
+                if not entry.is_dir:
+                    self._files.append(entry)
+                    self._file_types[str(entry.path)] = entry.file_type
+
+            # 逆序压栈，保证按排序顺序访问子目录
+            for entry, descend in reversed(entries):
+                if descend:
+                    stack.append((str(entry.path), entry.rel_path, depth + 1))
+                elif entry.is_dir:
+                    self._children[entry.rel_path] = []
+
+        self._built = True
+        FILES_SCANNED.inc(len(self._files))
+        for (kind, reason), count in ignored.items():
+            PATHS_IGNORED.inc(count, kind=kind, reason=reason)
+        return self
+
+    def _is_included(self, name: str, rel_path: str, is_dir: bool) -> bool:
+        """
+        判断条目是否应包含（与 utils.should_include_file 规则一致）
+
+        父目录已在遍历时判定为包含，这里只需匹配条目本身。
+        """
+        if name.startswith('.') and name not in ALLOWED_HIDDEN_FILES:
+            return False
+        return self.matcher.match(rel_path, is_dir) is not True
+
+    def children(self, rel_dir: str = '') -> List[CatalogEntry]:
+        """
+        获取目录的直接子项（目录在前，按名称排序）
+
+        Args:
+            rel_dir: 相对目录路径，'' 表示根目录
+
+        Returns:
+            子项列表
+        """
+        self.build()
+        return self._children.get(rel_dir, [])
+
+    def entries(self, file_types: Optional[Iterable[str]] = None) -> List[CatalogEntry]:
+        """
+        获取文件条目
+
+        Args:
+            file_types: 文件类型过滤（None 表示全部）
+
+        Returns:
+            文件条目列表
+        """
+        self.build()
+        if file_types is None:
+            return list(self._files)
+        wanted = set(file_types)
+        return [entry for entry in self._files if entry.file_type in wanted]
+
+    def files(self, file_types: Optional[Iterable[str]] = None) -> List[Path]:
+        """
+        获取文件路径（绝对路径）
+
+        Args:
+            file_types: 文件类型过滤（None 表示全部）
+
+        Returns:
+            文件路径列表
+        """
+        return [entry.path for entry in self.entries(file_types)]
+
+    def source_files(self) -> List[Path]:
+        """获取需要做源码分析的文件（Python、JavaScript、TypeScript）"""
+        return self.files(SOURCE_FILE_TYPES)
+
+    def file_type(self, file_path: Path) -> str:
+        """
+        获取文件类型（使用遍历时的检测结果）
+
+        Args:
+            file_path: 文件绝对路径
+
+        Returns:
+            文件类型字符串
+        """
+        self.build()
+        file_type = self._file_types.get(str(file_path))
+        return file_type if file_type is not None else detect_file_type(Path(file_path))
+
+    def __len__(self) -> int:
+        self.build()
+        return len(self._files)
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: file_catalog.py <project-path> [gitignore-path]")
+        sys.exit(1)
+
+    project_path = Path(sys.argv[1])
+    gitignore_path = Path(sys.argv[2]) if len(sys.argv) > 2 else project_path / ".gitignore"
+
+    catalog = FileCatalog(project_path, gitignore_path).build()
+    print(f"📂 {len(catalog)} files, {len(catalog.source_files())} source files")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,25 +14,30 @@ Phase 3 Features:
 - Performance optimizations
 """
 
-import json
-import os
-import shutil
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
-try:
-    from jinja2 import Template
-    HAS_JINJA2 = True
-except ImportError:
-    HAS_JINJA2 = False
-
-from scan_file_structure import scan_directory
+from file_catalog import FileCatalog
+from scan_file_structure import compute_file_stats, iter_tree_lines
+from template_engine import HAS_JINJA2, OutputWriter, TemplateEngine, render_simple
 from analyze_dependencies import DependencyAnalyzer
 from build_symbol_index import SymbolIndexBuilder
-from query_index import SymbolIndex
+from symbol_query import SymbolIndex
 from incremental_scanner import IncrementalScanner
 from config_manager import load_config
+from stage_timer import StageTimer
+from ast_extractors.ast_cache import ParsedModuleCache
+import metrics
+
+STAGE_SECONDS = metrics.gauge('stage_seconds', 'Wall time of each pipeline stage in the last run')
+PEAK_RSS_BYTES = metrics.gauge('peak_rss_bytes', 'Peak resident memory of the last run')
+LAST_RUN_TIMESTAMP = metrics.gauge('last_run_timestamp_seconds', 'Unix time the last run finished')
+LAST_RUN_SUCCESS = metrics.gauge('last_run_success', 'Whether the last run finished without error (1 or 0)')
+
+# 生成时间的占位符（页面写出时才替换为实际时间）
+GENERATED_AT_PLACEHOLDER = "\x00GENERATED_AT\x00"
 
 
 def load_template(template_path: Path) -> str:
@@ -42,34 +47,39 @@ def load_template(template_path: Path) -> str:
 
 
 def render_template(template: str, **kwargs) -> str:
-    """渲染模板（支持 Jinja2 或简单替换）"""
+    """渲染模板字符串（支持 Jinja2 或简单替换；生成文档时使用 TemplateEngine）"""
     if HAS_JINJA2:
-        # 使用 Jinja2
+        from jinja2 import Template
         return Template(template).render(**kwargs)
-    else:
-        # 降级到简单替换（只支持 {{ variable }}）
-        result = template
-        for key, value in kwargs.items():
-            placeholder = "{{ " + key + " }}"
-            result = result.replace(placeholder, str(value))
-
-        # 处理简单的 for 循环（仅用于基本支持）
-        import re
-        # 匹配 {% for ext, count in stats.by_extension.items() %}
-        for_loop_pattern = r'{%\s+for\s+(\w+),\s*(\w+)\s+in\s+(\w+)\.(\w+)\.items\(\)\s+%}([\s\S]*?){%\s+endfor\s+%}'
-
-        def replace_for_loop(match):
-            var1, var2, dict_name, dict_key, body = match.groups()
-            items = kwargs.get(dict_name, {}).items()
-            result_lines = []
-            for k, v in items:
-                body_replaced = body.replace(f"{{{{{var1}}}}}", str(k))
-                body_replaced = body_replaced.replace(f"{{{{{var2}}}}}", str(v))
-                result_lines.append(body_replaced)
-            return "\n".join(result_lines)
-
-        result = re.sub(for_loop_pattern, replace_for_loop, result)
-        return result
+    return render_simple(template, **kwargs)
+
+
+def record_stage_metrics(timer: StageTimer):
+    """将各阶段耗时与峰值内存记入指标"""
+    for name, stage in timer.stages.items():
+        STAGE_SECONDS.set(stage['wall'], stage=name)
+    STAGE_SECONDS.set(timer.total(), stage='total')
+    peak_kb = timer.summary()['peak_rss_kb']
+    if peak_kb is not None:
+        PEAK_RSS_BYTES.set(peak_kb * 1024)
+
+
+def write_run_metrics(success: bool, json_path: Optional[Path] = None,
+                      textfile_path: Optional[Path] = None):
+    """
+    记录本次运行的结果并写出指标
+
+    Args:
+        success: 运行是否成功
+        json_path: JSON 快照路径（None 表示不写）
+        textfile_path: Prometheus 文本文件路径（node exporter textfile collector 目录下的 .prom 文件）
+    """
+    LAST_RUN_TIMESTAMP.set(time.time())
+    LAST_RUN_SUCCESS.set(1 if success else 0)
+    if json_path is not None:
+        metrics.REGISTRY.write_json(json_path)
+    if textfile_path is not None:
+        metrics.REGISTRY.write_textfile(textfile_path)
 
 
 def generate_architecture_docs(
@@ -78,7 +88,13 @@ def generate_architecture_docs(
     gitignore_path: Path = None,
     max_depth: int = None,
     node_threshold: int = 25,
-    incremental: bool = True
+    incremental: bool = True,
+    jobs: int = 1,
+    collapse_threshold: int = None,
+    timer: StageTimer = None,
+    profile: bool = False,
+    profile_top: int = 10,
+    cprofile: bool = False
 ):
     """
     生成项目架构文档
@@ -90,7 +106,15 @@ def generate_architecture_docs(
         max_depth: 最大扫描深度
         node_threshold: 依赖图节点数阈值（默认: 25）
         incremental: 是否使用增量扫描（默认: True）
+        jobs: 符号索引并行进程数（默认: 1，0 表示 CPU 核数）
+        collapse_threshold: 文件树中每个目录最多列出的文件数（默认: 不折叠）
+        timer: 阶段计时器（记录 scan/dependencies/symbol_index/render/scan_cache 各阶段耗时）
+        profile: 是否输出性能剖析报告（各阶段 CPU 时间、分配峰值与每个提取器最慢的文件）
+        profile_top: 剖析报告中每个提取器列出的最慢文件数
+        cprofile: 是否为每个阶段写出 cProfile 结果（.cache/profile/<序号>-<阶段>.prof）
     """
+    if timer is None:
+        timer = StageTimer(profile=profile, cprofile=cprofile, top_n=profile_top)
     project_path = project_path.resolve()
 
     # 加载配置文件（Phase 3）
@@ -105,6 +129,8 @@ def generate_architecture_docs(
         node_threshold = config.get('node_threshold')
     if not incremental and config.get('incremental'):
         incremental = config.get('incremental')
+    if collapse_threshold is None and config.get('collapse_files'):
+        collapse_threshold = config.get('collapse_files')
 
     # 设置输出目录
     if output_dir is None:
@@ -128,12 +154,11 @@ def generate_architecture_docs(
     if gitignore_path is None:
         gitignore_path = project_path / ".gitignore"
 
-    # 检查是否需要全量扫描
-    from utils import get_default_excludes, should_include_file, detect_file_type
-
-    all_files = list(project_path.rglob('*'))
-    source_files = [f for f in all_files if f.is_file() and should_include_file(f, get_default_excludes(), project_path)]
+    # 单次遍历项目目录，后续各阶段共享
+    catalog = FileCatalog(project_path, gitignore_path).build()
+    source_files = catalog.files()
 
+    # 检查是否需要全量扫描
     use_incremental = incremental and not incremental_scanner.needs_full_scan(source_files)
 
     if use_incremental:
@@ -148,13 +173,24 @@ def generate_architecture_docs(
     else:
         print("   🔄 Performing full scan")
 
-    file_structure = scan_directory(project_path, gitignore_path, max_depth, project_path)
-    print(f"   ✅ Found {file_structure['stats']['total_files']} files\n")
+    # 只统计文件；文件树在生成文档时流式写入，不在内存中拼接
+    file_stats = compute_file_stats(catalog, max_depth)
+    print(f"   ✅ Found {file_stats['total_files']} files\n")
+    timer.lap('scan')
+
+    # 串行提取时依赖分析与符号索引共享同一份有界的 AST 解析缓存（LRU，内存随容量而非项目规模增长）；
+    # 并行提取时工作进程各自解析，不读取这份缓存，fork 出的进程只会继承它占用的内存，因此不共享
+    ast_cache = ParsedModuleCache() if jobs == 1 else None
 
     # 2. 分析依赖关系（支持分层）
     print("🔗 Step 2: Analyzing dependencies...")
-    dep_analyzer = DependencyAnalyzer(project_path, gitignore_path, node_threshold)
+    dep_analyzer = DependencyAnalyzer(
+        project_path, gitignore_path, node_threshold, catalog=catalog, ast_cache=ast_cache,
+        cache_dir=output_dir / ".cache", reuse_cache=incremental,
+        file_report=timer.file_report, source_roots=config.get('source_roots')
+    )
     dependencies = dep_analyzer.analyze_project()
+    print(f"   🗃️  Dependency cache: {dep_analyzer.cache_hits} reused, {dep_analyzer.cache_misses} analyzed")
 
     # 输出分层信息
     level_count = len([k for k in dependencies.keys() if k.startswith("level_")])
@@ -170,20 +206,32 @@ def generate_architecture_docs(
                     if isinstance(sub_data, dict) and "stats" in sub_data:
                         print(f"      - {level_key}/{sub_key}: {sub_data['stats']['node_count']} nodes, {sub_data['stats']['edge_count']} edges")
     print()
+    if ast_cache is None and dep_analyzer.ast_cache is not None:
+        # 依赖分析自建的缓存不再使用，在启动工作进程前释放
+        dep_analyzer.ast_cache.clear()
+    timer.lap('dependencies')
 
     # 3. 构建符号索引
     print("📊 Step 3: Building symbol index...")
     db_path = output_dir / ".cache" / "symbols.db"
 
-    # 使用自动降级模式（非交互环境）
     index_builder = SymbolIndexBuilder(
         project_path,
         str(db_path),
         gitignore_path,
-        auto_fallback=True  # 自动降级，不询问用户
+        catalog=catalog,
+        ast_cache=ast_cache,
+        jobs=jobs,
+        extraction_cache=output_dir / ".cache" / "extractions.db",
+        file_report=timer.file_report,
+        source_roots=config.get('source_roots')
     )
 
-    result_db_path = index_builder.build_index()
+    if use_incremental and db_path.exists():
+        # 只重新索引变更文件，并删除已删除文件的符号
+        result_db_path = index_builder.update_index(changed_files, deleted_files)
+    else:
+        result_db_path = index_builder.build_index()
 
     if result_db_path is None:
         print("   ⏭️  Symbol index generation skipped")
@@ -197,16 +245,28 @@ def generate_architecture_docs(
         # 获取统计信息
         index = SymbolIndex(str(project_path), str(db_path))
         stats = index.get_statistics()
-        print(f"   ✅ Indexed {stats['total_symbols']} symbols in {stats['total_files']} files\n")
+        print(f"   ✅ Indexed {stats['total_symbols']} symbols in {stats['total_files']} files")
         index.close()
 
+    if ast_cache is not None:
+        cache_stats = ast_cache.get_stats()
+        print(f"   🧠 AST cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['reads']} reads")
+        # 解析结果在渲染阶段不再使用
+        ast_cache.clear()
+    print()
+    timer.lap('symbol_index')
+
     # 4. 生成文档
     print("📝 Step 4: Generating documentation...")
 
-    # 获取模板目录
+    # 模板引擎与输出写入器：模板只编译一次，内容未变化的页面不重写
     script_dir = Path(__file__).parent
-    templates_dir = script_dir / ".." / "assets" / "templates"
-    templates_dir = templates_dir.resolve()
+    templates_dir = (script_dir / ".." / "assets" / "templates").resolve()
+    engine = TemplateEngine(templates_dir, cache_dir=output_dir / ".cache" / "templates")
+    writer = OutputWriter(
+        output_dir, output_dir / ".cache" / "render-manifest.json",
+        substitutions={GENERATED_AT_PLACEHOLDER: datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
+    )
 
     # 准备模板变量
     try:
@@ -218,11 +278,12 @@ def generate_architecture_docs(
     template_vars = {
         "project_name": project_path.name,
         "project_path": str(project_path),
-        "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        # 生成时间只在页面写出时替换，不影响内容是否变化的判断
+        "generated_at": GENERATED_AT_PLACEHOLDER,
         "docs_dir": str(relative_output),
         "index_db_path": str(relative_output / ".cache" / "symbols.db"),
         "scripts_dir": ".architecture-generator",  # 相对路径
-        "stats": file_structure["stats"],
+        "stats": file_stats,
         "max_depth": max_depth if max_depth else "无限制",
         "total_symbols": stats["total_symbols"],
         "total_files": stats["total_files"],
@@ -230,21 +291,25 @@ def generate_architecture_docs(
         "db_path": str(relative_output / ".cache" / "symbols.db"),
     }
 
+    def report(name: str, written: bool):
+        print(f"   ✅ Generated {name}" if written else f"   ⏭️  Unchanged {name}")
+
     # 生成 README.md
-    readme_template = load_template(templates_dir / "README.md.j2")
-    readme_content = render_template(readme_template, **template_vars)
-    (output_dir / "README.md").write_text(readme_content, encoding='utf-8')
-    print(f"   ✅ Generated README.md")
-
-    # 生成 file-structure.md
-    file_tree_template = load_template(templates_dir / "file-structure.md.j2")
-    template_vars["file_tree"] = file_structure["tree"]
-    file_tree_content = render_template(file_tree_template, **template_vars)
-    (output_dir / "file-structure.md").write_text(file_tree_content, encoding='utf-8')
-    print(f"   ✅ Generated file-structure.md")
+    readme_content = engine.render("README.md.j2", **template_vars)
+    report("README.md", writer.write(output_dir / "README.md", readme_content))
+
+    # 生成 file-structure.md（模板中的文件树位置先渲染为占位符，再流式写入文件树）
+    file_tree_placeholder = "\x00FILE_TREE\x00"
+    file_tree_document = engine.render(
+        "file-structure.md.j2", **template_vars, file_tree=file_tree_placeholder
+    )
+    report("file-structure.md", writer.write_document(
+        output_dir / "file-structure.md", file_tree_document, file_tree_placeholder,
+        lambda: iter_tree_lines(catalog, project_path.name, max_depth, collapse_threshold)
+    ))
 
     # 生成依赖关系文档（支持分层）
-    deps_template = load_template(templates_dir / "dependency-graph.md.j2")
+    deps_template = "dependency-graph.md.j2"
 
     # 生成 level-0（顶层依赖）
     if "level_0" in dependencies:
@@ -256,9 +321,8 @@ def generate_architecture_docs(
             "edges": level_0["edges"],
             "level": 0,
         })
-        deps_content = render_template(deps_template, **template_vars)
-        (output_dir / "dependencies" / "level-0.md").write_text(deps_content, encoding='utf-8')
-        print(f"   ✅ Generated dependencies/level-0.md")
+        deps_content = engine.render(deps_template, **template_vars)
+        report("dependencies/level-0.md", writer.write(output_dir / "dependencies" / "level-0.md", deps_content))
 
     # 生成 level-1（文件夹级依赖）
     if "level_1" in dependencies:
@@ -273,9 +337,9 @@ def generate_architecture_docs(
                     "level": 1,
                     "folder": folder,
                 })
-                deps_content = render_template(deps_template, **template_vars)
-                (output_dir / "dependencies" / f"level-1-{folder}.md").write_text(deps_content, encoding='utf-8')
-                print(f"   ✅ Generated dependencies/level-1-{folder}.md")
+                deps_content = engine.render(deps_template, **template_vars)
+                page = f"dependencies/level-1-{folder}.md"
+                report(page, writer.write(output_dir / page, deps_content))
 
     # 生成 level-2（子文件夹级依赖）
     if "level_2" in dependencies:
@@ -289,25 +353,37 @@ def generate_architecture_docs(
                     "level": 2,
                     "folder": subfolder,
                 })
-                deps_content = render_template(deps_template, **template_vars)
+                deps_content = engine.render(deps_template, **template_vars)
                 # 安全的文件名
                 safe_name = subfolder.replace("/", "-")
-                (output_dir / "dependencies" / f"level-2-{safe_name}.md").write_text(deps_content, encoding='utf-8')
-                print(f"   ✅ Generated dependencies/level-2-{safe_name}.md")
+                page = f"dependencies/level-2-{safe_name}.md"
+                report(page, writer.write(output_dir / page, deps_content))
 
     print()
 
     # 生成 symbols-index.md
-    symbols_template = load_template(templates_dir / "symbols-index.md.j2")
-    symbols_content = render_template(symbols_template, **template_vars)
-    (output_dir / "symbols-index.md").write_text(symbols_content, encoding='utf-8')
-    print(f"   ✅ Generated symbols-index.md\n")
-
-    # 更新增量扫描缓存
-    if use_incremental:
+    symbols_content = engine.render("symbols-index.md.j2", **template_vars)
+    report("symbols-index.md", writer.write(output_dir / "symbols-index.md", symbols_content))
+    writer.save()
+    print(f"   💾 {writer.written} page(s) written, {writer.unchanged} unchanged\n")
+    timer.lap('render')
+
+    # 更新增量扫描缓存（全量扫描后也需要记录，下次运行才能增量更新）
+    if incremental:
         print("💾 Updating scan cache...")
-        incremental_scanner.update_cache(source_files)
+        incremental_scanner.update_cache(source_files, prune=True)
         print("   ✅ Cache updated\n")
+        timer.lap('scan_cache')
+
+    # 性能剖析报告
+    timer.stop()
+    record_stage_metrics(timer)
+    if profile or cprofile:
+        print("⏱️  Profile:")
+        print(timer.format_report(profile_top))
+        profile_dir = output_dir / ".cache" / "profile"
+        written = timer.write_report(profile_dir)
+        print(f"   💾 Wrote {len(written)} file(s) to {profile_dir}\n")
 
     # 完成
     print("=" * 60)
@@ -365,6 +441,46 @@ def main():
         action="store_true",
         help="Disable incremental scanning"
     )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Worker processes for symbol indexing (default: 1, 0 = all CPUs)"
+    )
+    parser.add_argument(
+        "--collapse-files",
+        type=int,
+        default=None,
+        help="List at most N files per directory in the file tree (default: no collapsing)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report wall/CPU time and allocation peaks per stage and the slowest files per extractor"
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="Slowest files listed per extractor with --profile (default: 10)"
+    )
+    parser.add_argument(
+        "--cprofile",
+        action="store_true",
+        help="Write a cProfile dump per stage to <output>/.cache/profile/"
+    )
+    parser.add_argument(
+        "--metrics-json",
+        type=Path,
+        default=None,
+        help="Write counters, gauges and histograms of this run as JSON"
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        type=Path,
+        default=None,
+        help="Write metrics in Prometheus text format (a .prom file for the node exporter textfile collector)"
+    )
 
     args = parser.parse_args()
 
@@ -374,14 +490,26 @@ def main():
 
     incremental = not (args.full_scan or args.no_incremental)
 
-    generate_architecture_docs(
-        project_path=args.project_path,
-        output_dir=args.output,
-        gitignore_path=args.gitignore,
-        max_depth=args.max_depth,
-        node_threshold=args.threshold,
-        incremental=incremental
-    )
+    success = False
+    try:
+        generate_architecture_docs(
+            project_path=args.project_path,
+            output_dir=args.output,
+            gitignore_path=args.gitignore,
+            max_depth=args.max_depth,
+            node_threshold=args.threshold,
+            incremental=incremental,
+            jobs=args.jobs,
+            collapse_threshold=args.collapse_files,
+            profile=args.profile,
+            profile_top=args.profile_top,
+            cprofile=args.cprofile
+        )
+        success = True
+    finally:
+        # 失败时也写出指标（last_run_success 为 0）
+        if args.metrics_json or args.metrics_textfile:
+            write_run_metrics(success, args.metrics_json, args.metrics_textfile)
 
 
 if __name__ == "__main__":
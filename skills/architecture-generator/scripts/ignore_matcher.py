@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Compiled .gitignore matcher for architecture generator.
+
+Implements gitignore semantics:
+- Negation (`!pattern`), last matching pattern wins
+- Anchored patterns (leading or inner `/`) vs. basename patterns
+- Directory-only patterns (trailing `/`)
+- Wildcards `*`, `?`, `[...]` and `**` (leading, trailing and inner)
+- Nested .gitignore files (patterns relative to their directory)
+- Nothing below an excluded directory can be re-included
+
+Patterns are compiled once. Plain basename and `*.ext` patterns are
+bucketed by name / extension so most paths are decided with a couple of
+dictionary lookups; the remaining patterns are combined into a single
+alternation per .gitignore directory, and individual regexes are only
+consulted when that combined regex matches.
+Directory decisions are memoized, so a subtree whose directory is
+excluded costs one lookup.
+"""
+
+import re
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# gitignore 通配符（出现这些字符的模式需要正则匹配）
+_WILDCARD_CHARS = set('*?[\\')
+
+
+class IgnoreRule:
+    """单条编译后的 gitignore 规则"""
+
+    __slots__ = ('index', 'pattern', 'negate', 'dir_only', 'base', 'regex')
+
+    def __init__(self, index: int, pattern: str, negate: bool, dir_only: bool,
+                 base: str, regex: Optional['re.Pattern']):
+        self.index = index  # 规则顺序（越大优先级越高）
+        self.pattern = pattern
+        self.negate = negate
+        self.dir_only = dir_only
+        self.base = base  # 规则所在 .gitignore 的目录（'' 为根目录）
+        self.regex = regex  # None 表示由分桶查找直接判定
+
+
+class IgnoreMatcher:
+    """编译后的 gitignore 匹配器"""
+
+    def __init__(self, patterns: Iterable[str] = (), base: str = ''):
+        """
+        初始化匹配器
+
+        Args:
+            patterns: gitignore 模式（按出现顺序）
+            base: 模式所属目录（相对路径，'' 为根目录）
+        """
+        self._rules: List[IgnoreRule] = []
+        self._by_name: Dict[str, List[IgnoreRule]] = defaultdict(list)  # 纯文件名模式
+        self._by_suffix: Dict[str, List[Tuple[str, IgnoreRule]]] = defaultdict(list)  # *.ext 模式
+        self._by_path: Dict[str, List[IgnoreRule]] = defaultdict(list)  # 锚定的纯路径模式
+        self._generic: List[IgnoreRule] = []  # 需要正则匹配的模式
+        self._combined: Optional[Dict[str, 're.Pattern']] = None  # 目录 -> 合并后的正则
+        self._dir_cache: Dict[str, bool] = {}
+
+        self.add_patterns(patterns, base)
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def add_patterns(self, patterns: Iterable[str], base: str = ''):
+        """
+        追加模式（后追加的规则优先级更高，与嵌套 .gitignore 的覆盖关系一致）
+
+        Args:
+            patterns: gitignore 模式
+            base: 模式所属目录（相对路径，'' 为根目录）
+        """
+        base = base.strip('/')
+        for line in patterns:
+            self._add_rule(line, base)
+        self._dir_cache.clear()
+        self._combined = None
+
+    def add_gitignore(self, gitignore_path: Path, base: str = '') -> bool:
+        """
+        读取 .gitignore 文件并追加其模式
+
+        Args:
+            gitignore_path: .gitignore 文件路径
+            base: 文件所在目录（相对路径，'' 为根目录）
+
+        Returns:
+            文件存在且已读取时返回 True
+        """
+        try:
+            with open(gitignore_path, 'r', encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except (OSError, UnicodeDecodeError):
+            return False
+        self.add_patterns(lines, base)
+        return True
+
+    def _add_rule(self, line: str, base: str):
+        """解析并编译一行模式"""
+        # 去掉行尾空白（转义的空格除外）
+        pattern = line.rstrip('\n\r')
+        while pattern.endswith(' ') and not pattern.endswith('\\ '):
+            pattern = pattern[:-1]
+        if not pattern or pattern.startswith('#'):
+            return
+
+        negate = False
+        if pattern.startswith('!'):
+            negate = True
+            pattern = pattern[1:]
+        elif pattern.startswith('\\!') or pattern.startswith('\\#'):
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith('/')
+        body = pattern.rstrip('/')
+        if not body:
+            return
+
+        anchored = '/' in body
+        body = body.lstrip('/')
+        if not body:
+            return
+
+        rule = IgnoreRule(len(self._rules), line, negate, dir_only, base, None)
+        self._rules.append(rule)
+
+        has_wildcard = any(c in _WILDCARD_CHARS for c in body)
+        if not anchored and not has_wildcard:
+            self._by_name[body].append(rule)
+        elif (not anchored and body.startswith('*') and '.' in body
+              and not any(c in _WILDCARD_CHARS for c in body[1:])):
+            suffix = body[1:]
+            self._by_suffix[suffix.rsplit('.', 1)[1]].append((suffix, rule))
+        elif anchored and not has_wildcard:
+            full_path = f"{base}/{body}" if base else body
+            self._by_path[full_path].append(rule)
+        else:
+            rule.regex = re.compile(_translate(body, anchored))
+            self._generic.append(rule)
+
+    def match(self, rel_path: str, is_dir: Optional[bool] = False) -> Optional[bool]:
+        """
+        只看路径本身（不考虑父目录）的匹配结果
+
+        Args:
+            rel_path: 相对根目录的路径（/ 分隔）
+            is_dir: 是否为目录（None 表示未知，按目录处理目录专用模式）
+
+        Returns:
+            True 表示被忽略，False 表示被否定模式重新包含，None 表示没有规则匹配
+        """
+        name = rel_path.rsplit('/', 1)[-1]
+        best: Optional[IgnoreRule] = None
+
+        def consider(rule: IgnoreRule):
+            nonlocal best
+            if best is not None and rule.index <= best.index:
+                return False
+            if rule.dir_only and is_dir is False:
+                return False
+            if rule.base and not rel_path.startswith(rule.base + '/'):
+                return False
+            best = rule
+            return True
+
+        for rule in reversed(self._by_name.get(name, ())):
+            if consider(rule):
+                break
+
+        if '.' in name:
+            for suffix, rule in reversed(self._by_suffix.get(name.rsplit('.', 1)[1], ())):
+                if name.endswith(suffix) and consider(rule):
+                    break
+
+        for rule in reversed(self._by_path.get(rel_path, ())):
+            if consider(rule):
+                break
+
+        if self._generic and self._generic_may_match(rel_path):
+            best = self._match_generic(rel_path, is_dir, best)
+
+        if best is None:
+            return None
+        return not best.negate
+
+    def _generic_may_match(self, rel_path: str) -> bool:
+        """用合并后的正则快速判断是否可能有正则模式匹配"""
+        if self._combined is None:
+            grouped: Dict[str, List[str]] = defaultdict(list)
+            for rule in self._generic:
+                grouped[rule.base].append(rule.regex.pattern)
+            self._combined = {
+                base: re.compile('|'.join(f'(?:{pattern})' for pattern in patterns))
+                for base, patterns in grouped.items()
+            }
+
+        for base, combined in self._combined.items():
+            if base:
+                if not rel_path.startswith(base + '/'):
+                    continue
+                if combined.match(rel_path[len(base) + 1:]):
+                    return True
+            elif combined.match(rel_path):
+                return True
+        return False
+
+    def _match_generic(self, rel_path: str, is_dir: Optional[bool],
+                       best: Optional[IgnoreRule]) -> Optional[IgnoreRule]:
+        """在正则模式中查找优先级最高的匹配规则"""
+        for rule in reversed(self._generic):
+            if best is not None and rule.index <= best.index:
+                break
+            subject = rel_path[len(rule.base) + 1:] if rule.base else rel_path
+            if rule.base and not rel_path.startswith(rule.base + '/'):
+                continue
+            if rule.dir_only and is_dir is False:
+                continue
+            if rule.regex.match(subject):
+                return rule
+        return best
+
+    def is_dir_excluded(self, rel_dir: str) -> bool:
+        """
+        目录是否被排除（自身或任一父目录被排除），结果按目录缓存
+
+        Args:
+            rel_dir: 相对根目录的目录路径（'' 为根目录）
+
+        Returns:
+            被排除时返回 True
+        """
+        if not rel_dir:
+            return False
+
+        cached = self._dir_cache.get(rel_dir)
+        if cached is not None:
+            return cached
+
+        parent = rel_dir.rsplit('/', 1)[0] if '/' in rel_dir else ''
+        excluded = self.is_dir_excluded(parent) or self.match(rel_dir, True) is True
+        self._dir_cache[rel_dir] = excluded
+        return excluded
+
+    def is_excluded(self, rel_path: str, is_dir: Optional[bool] = False) -> bool:
+        """
+        路径是否被排除（考虑父目录：被排除目录下的内容不能被重新包含）
+
+        Args:
+            rel_path: 相对根目录的路径（/ 分隔）
+            is_dir: 是否为目录（None 表示未知）
+
+        Returns:
+            被排除时返回 True
+        """
+        rel_path = rel_path.strip('/')
+        if not rel_path:
+            return False
+        if is_dir:
+            return self.is_dir_excluded(rel_path)
+
+        parent = rel_path.rsplit('/', 1)[0] if '/' in rel_path else ''
+        if self.is_dir_excluded(parent):
+            return True
+        return self.match(rel_path, is_dir) is True
+
+
+def _translate(body: str, anchored: bool) -> str:
+    """将 gitignore 模式（不含前导 ! 与首尾 /）转换为匹配整条相对路径的正则"""
+    i, n = 0, len(body)
+    parts = ['^' if anchored else '^(?:.*/)?']
+
+    while i < n:
+        c = body[i]
+        at_segment_start = i == 0 or body[i - 1] == '/'
+
+        if c == '*' and body.startswith('**', i) and at_segment_start and (i + 2 == n or body[i + 2] == '/'):
+            if i + 2 == n:
+                parts.append('.*')  # 末尾 /**：目录下的全部内容
+                i += 2
+            else:
+                parts.append('(?:.*/)?')  # **/：零或多级目录
+                i += 3
+        elif c == '*':
+            parts.append('[^/]*')
+            i += 1
+        elif c == '?':
+            parts.append('[^/]')
+            i += 1
+        elif c == '[':
+            end = body.find(']', i + 2 if body.startswith('[!', i) or body.startswith('[^', i) else i + 1)
+            if end == -1:
+                parts.append(re.escape(c))
+                i += 1
+            else:
+                content = body[i + 1:end]
+                if content[:1] in ('!', '^'):
+                    content = '^' + content[1:].replace('\\', '\\\\')
+                else:
+                    content = content.replace('\\', '\\\\')
+                parts.append(f'[{content}]')
+                i = end + 1
+        elif c == '\\' and i + 1 < n:
+            parts.append(re.escape(body[i + 1]))
+            i += 2
+        else:
+            parts.append(re.escape(c))
+            i += 1
+
+    parts.append('$')
+    return ''.join(parts)
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: ignore_matcher.py <gitignore-path> <path> [path ...]")
+        print("\nExamples:")
+        print("  ignore_matcher.py .gitignore build/output.js src/main.py")
+        print("  ignore_matcher.py .gitignore node_modules/")
+        sys.exit(1)
+
+    matcher = IgnoreMatcher()
+    matcher.add_gitignore(Path(sys.argv[1]))
+    print(f"Compiled {len(matcher)} patterns")
+
+    for path in sys.argv[2:]:
+        is_dir = path.endswith('/')
+        status = "excluded" if matcher.is_excluded(path, is_dir) else "included"
+        print(f"  {path}: {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+import metrics
+
+SCAN_MODE = metrics.counter('scan_mode', 'Scans by mode (full or incremental)')
+INCREMENTAL_FILES = metrics.counter('incremental_files', 'Files classified by the incremental scanner')
+
 
 class IncrementalScanner:
     """增量扫描器（Phase 3）"""
@@ -92,6 +97,13 @@ class IncrementalScanner:
         Returns:
             修改过的文件列表
         """
+        changed_files = self._find_changed(file_list)
+        INCREMENTAL_FILES.inc(len(changed_files), status='changed')
+        INCREMENTAL_FILES.inc(len(file_list) - len(changed_files), status='unchanged')
+        return changed_files
+
+    def _find_changed(self, file_list: List[Path]) -> List[Path]:
+        """获取修改过的文件（不计入指标）"""
         changed_files = []
 
         for file_path in file_list:
@@ -131,15 +143,24 @@ class IncrementalScanner:
             if cached_file not in current_files:
                 deleted_files.append(cached_file)
 
+        INCREMENTAL_FILES.inc(len(deleted_files), status='deleted')
         return deleted_files
 
-    def update_cache(self, scanned_files: List[Path]):
+    def update_cache(self, scanned_files: List[Path], prune: bool = False):
         """
         更新缓存
 
         Args:
             scanned_files: 已扫描的文件列表
+            prune: 是否移除不在列表中的缓存记录（scanned_files 为完整文件列表时使用）
         """
+        if prune:
+            current_files = {str(file_path.relative_to(self.project_path)) for file_path in scanned_files}
+            self.file_hashes = {
+                rel_path: file_hash for rel_path, file_hash in self.file_hashes.items()
+                if rel_path in current_files
+            }
+
         for file_path in scanned_files:
             if file_path.exists():
                 rel_path = str(file_path.relative_to(self.project_path))
@@ -167,12 +188,15 @@ class IncrementalScanner:
         """
         if not self.file_hashes:
             # 首次扫描
+            SCAN_MODE.inc(mode='full')
             return True
 
-        changed_files = self.get_changed_files(file_list)
+        changed_files = self._find_changed(file_list)
         change_ratio = len(changed_files) / len(file_list) if file_list else 0
 
-        return change_ratio > threshold
+        full_scan = change_ratio > threshold
+        SCAN_MODE.inc(mode='full' if full_scan else 'incremental')
+        return full_scan
 
     def get_scan_stats(self) -> Dict:
         """
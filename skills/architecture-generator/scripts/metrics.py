@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for architecture generator.
+
+Modules declare their metrics once at import time on the shared REGISTRY
+and update them where the work happens:
+
+    FILES_SCANNED = metrics.counter('files_scanned', 'Files found by the scan')
+    FILES_SCANNED.inc(len(files))
+
+    QUERY_SECONDS = metrics.histogram('query_seconds', 'Query latency', LATENCY_BUCKETS)
+    with QUERY_SECONDS.time(method='find'):
+        ...
+
+The registry can be dumped as JSON or as a Prometheus text exposition file
+(for the node exporter textfile collector). Updates are thread-safe;
+worker processes send their updates to the parent with drain()/merge().
+"""
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# 所有指标名称的前缀（Prometheus 命名空间）
+NAMESPACE = 'archgen'
+
+# 默认直方图桶（秒）：查询延迟与单文件处理耗时
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label_value(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """指标基类（按标签组合分别计数）"""
+
+    kind = ''
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, object] = {}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def label_keys(self) -> List[LabelKey]:
+        with self._lock:
+            return sorted(self._values)
+
+
+class Counter(_Metric):
+    """单调递增计数器"""
+
+    kind = 'counter'
+
+    def inc(self, value: float = 1, **labels):
+        """增加计数（value 为 0 时不创建标签组合）"""
+        if not value:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + value
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def _merge(self, key: LabelKey, value):
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(_Metric):
+    """可任意设置的数值"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = value
+
+    def get(self, **labels) -> Optional[float]:
+        with self._lock:
+            return self._values.get(_label_key(labels))
+
+    def _merge(self, key: LabelKey, value):
+        self._values[key] = value
+
+
+class Histogram(_Metric):
+    """分桶直方图（桶上界升序，另含 +Inf 桶）"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """记录一次观测值"""
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        """记录代码块的耗时（秒）"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get(self, **labels) -> Dict:
+        """{'count', 'sum', 'buckets': {上界: 累计次数}}"""
+        with self._lock:
+            state = self._values.get(_label_key(labels))
+            if state is None:
+                return {'count': 0, 'sum': 0.0, 'buckets': {}}
+            return self._snapshot(state)
+
+    def _snapshot(self, state) -> Dict:
+        counts, total, count = state
+        cumulative, running = {}, 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            running += bucket_count
+            cumulative[_format_value(bound)] = running
+        return {'count': count, 'sum': total, 'buckets': cumulative}
+
+    def _merge(self, key: LabelKey, value):
+        counts, total, count = value
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        state[0] = [a + b for a, b in zip(state[0], counts)]
+        state[1] += total
+        state[2] += count
+
+
+class MetricsRegistry:
+    """指标注册表"""
+
+    def __init__(self, namespace: str = NAMESPACE):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, *args) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """获取或注册计数器（Prometheus 输出时名称追加 _total）"""
+        return self._get_or_create(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        """获取或注册数值指标"""
+        return self._get_or_create(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str,
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        """获取或注册直方图"""
+        return self._get_or_create(Histogram, name, help_text, buckets)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def reset(self):
+        """清空所有指标的数值（保留注册）"""
+        for metric in list(self._metrics.values()):
+            metric.clear()
+
+    def drain(self) -> Dict[str, List]:
+        """
+        取出自上次 drain 以来的数值并清空（工作进程把增量发给主进程）
+
+        Returns:
+            {指标名: [(标签, 数值), ...]}，只含有数值的指标
+        """
+        drained = {}
+        for name, metric in list(self._metrics.items()):
+            with metric._lock:
+                if metric._values:
+                    drained[name] = list(metric._values.items())
+                    metric._values = {}
+        return drained
+
+    def merge(self, drained: Dict[str, List]):
+        """合并 drain() 的结果（计数与直方图累加，数值指标覆盖）"""
+        for name, items in drained.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            with metric._lock:
+                for key, value in items:
+                    metric._merge(tuple(tuple(pair) for pair in key), value)
+
+    def to_dict(self) -> Dict:
+        """可序列化为 JSON 的快照 {指标名: {type, help, values: [{labels, value}]}}"""
+        result = {}
+        for name, metric in sorted(self._metrics.items()):
+            with metric._lock:
+                items = sorted(metric._values.items())
+                values = [
+                    {
+                        'labels': dict(key),
+                        'value': metric._snapshot(value) if isinstance(metric, Histogram) else value,
+                    }
+                    for key, value in items
+                ]
+            if values:
+                result[name] = {'type': metric.kind, 'help': metric.help, 'values': values}
+        return result
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（text exposition format 0.0.4）"""
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            full_name = f"{self.namespace}_{name}" if self.namespace else name
+            with metric._lock:
+                items = sorted(metric._values.items())
+                if not items:
+                    continue
+                sample_name = f"{full_name}_total" if isinstance(metric, Counter) else full_name
+                lines.append(f"# HELP {sample_name} {metric.help}")
+                lines.append(f"# TYPE {sample_name} {metric.kind}")
+                for key, value in items:
+                    if isinstance(metric, Histogram):
+                        snapshot = metric._snapshot(value)
+                        for bound, count in snapshot['buckets'].items():
+                            lines.append(f"{full_name}_bucket{_format_labels(key, (('le', bound),))} {count}")
+                        lines.append(f"{full_name}_sum{_format_labels(key)} {_format_value(snapshot['sum'])}")
+                        lines.append(f"{full_name}_count{_format_labels(key)} {snapshot['count']}")
+                    else:
+                        lines.append(f"{sample_name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write_json(self, path: 'Path'):
+        """写出 JSON 快照（原子替换）"""
+        import json
+
+        _atomic_write(path, json.dumps(self.to_dict(), indent=2) + "\n")
+
+    def write_textfile(self, path: 'Path'):
+        """
+        写出 Prometheus 文本文件（原子替换，供 node exporter textfile collector 读取）
+
+        文件名应以 .prom 结尾
+        """
+        _atomic_write(path, self.to_prometheus())
+
+
+def _atomic_write(path: 'Path', content: str):
+    """先写临时文件再替换，读取方不会看到写了一半的文件"""
+    from pathlib import Path
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(content, encoding='utf-8')
+    os.replace(tmp_path, path)
+
+
+# 进程内共享的注册表
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str) -> Counter:
+    return REGISTRY.counter(name, help_text)
+
+
+def gauge(name: str, help_text: str) -> Gauge:
+    return REGISTRY.gauge(name, help_text)
+
+
+def histogram(name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.histogram(name, help_text, buckets)
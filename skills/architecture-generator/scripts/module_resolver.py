@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Module resolver for dependency analysis.
+
+Maps import specifiers to project files using indexes built once per run:
+- Python: dotted module name -> file (package `__init__.py` maps to the
+  package name), relative imports resolved against the importing package,
+  and module names relative to source roots (configured, `src/`, or
+  directories holding top-level packages)
+- JavaScript/TypeScript: relative paths, root-absolute paths and
+  tsconfig/jsconfig `baseUrl`/`paths` aliases, with extension and
+  `index.*` probing
+
+Every lookup is a bounded number of dictionary/set probes, so graph
+building is linear in the number of import edges.
+"""
+
+import json
+import posixpath
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from utils import detect_file_type
+
+
+# JS/TS 模块解析时依次尝试的扩展名
+JS_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx', '.mjs', '.cjs', '.d.ts')
+
+# 读取别名配置时使用的配置文件（按顺序，第一个可用的生效）
+JS_CONFIG_FILES = ('tsconfig.json', 'jsconfig.json')
+
+# 存在时总是作为 Python 源码根目录的目录（src 布局）
+DEFAULT_SOURCE_ROOTS = ('src',)
+
+
+class ModuleResolver:
+    """模块解析器（导入说明符 -> 项目内文件）"""
+
+    def __init__(self, files: Iterable[str], root_path: Optional[Path] = None,
+                 source_roots: Optional[Iterable[str]] = None):
+        """
+        初始化模块解析器
+
+        Args:
+            files: 项目内文件的相对路径（使用 / 分隔）
+            root_path: 项目根目录（用于读取 tsconfig/jsconfig 别名，None 表示不读取）
+            source_roots: 额外的 Python 源码根目录（相对路径；src/ 与包含顶层包的目录会自动识别）
+        """
+        self.files = set(files)
+
+        # Python 模块索引
+        self._py_modules: Dict[str, str] = {}  # 完整模块名 -> 文件
+        self._py_root_modules: Dict[str, str] = {}  # 相对源码根目录的模块名 -> 文件
+        self._py_packages: Set[str] = set()  # 包目录（含 __init__.py）
+        self.source_roots: List[str] = []
+        self._build_python_index(source_roots or ())
+
+        # JS/TS 别名配置
+        self._js_base_url: Optional[str] = None
+        self._js_aliases: List[Tuple[str, str, bool, List[str]]] = []  # (前缀, 后缀, 是否通配, 目标模板)
+        if root_path is not None:
+            self._load_js_config(Path(root_path))
+
+    def _build_python_index(self, configured_roots: Iterable[str]):
+        """建立 Python 模块名索引（项目根目录与各源码根目录）"""
+        python_files = [f for f in self.files if detect_file_type(Path(f)) == 'python']
+        self._py_packages = {rel_path[:-len('/__init__.py')] for rel_path in python_files
+                             if rel_path.endswith('/__init__.py')}
+        self.source_roots = self._detect_source_roots(self._py_packages, python_files, configured_roots)
+
+        # 浅路径优先，保证冲突时结果确定
+        for rel_path in sorted(python_files, key=lambda p: (p.count('/'), p)):
+            parts = self._module_parts(rel_path)
+            if parts is None:
+                continue
+            self._py_modules.setdefault('.'.join(parts), rel_path)
+
+            # 只有源码根目录下的文件可以用相对根目录的模块名导入
+            for root in self.source_roots:
+                root_parts = root.split('/')
+                if len(parts) > len(root_parts) and parts[:len(root_parts)] == root_parts:
+                    self._py_root_modules.setdefault('.'.join(parts[len(root_parts):]), rel_path)
+
+    @staticmethod
+    def _module_parts(rel_path: str) -> Optional[List[str]]:
+        """文件对应的模块名各部分（包的 __init__.py 对应包名；不是合法模块名时返回 None）"""
+        parts = rel_path[:-len('.py')].split('/')
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        if not parts or not all(part.isidentifier() for part in parts):
+            return None
+        return parts
+
+    @staticmethod
+    def _detect_source_roots(packages: Set[str], python_files: List[str],
+                             configured_roots: Iterable[str]) -> List[str]:
+        """
+        确定 Python 源码根目录
+
+        - 配置的目录
+        - src/（src 布局）
+        - 包含顶层包的非包目录：如 lib/core/__init__.py 存在而 lib/__init__.py 不存在时为 lib
+
+        项目根目录本身不在其中（由完整模块名索引处理）。
+        """
+        roots = {root.strip('/') for root in configured_roots if root.strip('/') not in ('', '.')}
+        directories = {rel_path.rsplit('/', 1)[0] for rel_path in python_files if '/' in rel_path}
+        roots.update(root for root in DEFAULT_SOURCE_ROOTS
+                     if any(d == root or d.startswith(root + '/') for d in directories))
+
+        for package in packages:
+            parent = package.rsplit('/', 1)[0] if '/' in package else ''
+            if parent and parent not in packages:
+                roots.add(parent)
+
+        # 浅的根目录优先
+        return sorted(roots, key=lambda root: (root.count('/'), root))
+
+    def _load_js_config(self, root_path: Path):
+        """读取 tsconfig/jsconfig 中的 baseUrl 与 paths 别名"""
+        for config_name in JS_CONFIG_FILES:
+            config_path = root_path / config_name
+            if not config_path.exists():
+                continue
+
+            try:
+                content = config_path.read_text(encoding='utf-8')
+                # 允许常见的 // 注释与尾逗号
+                content = re.sub(r'^\s*//.*$', '', content, flags=re.MULTILINE)
+                content = re.sub(r',(\s*[}\]])', r'\1', content)
+                config = json.loads(content)
+            except (OSError, UnicodeDecodeError, ValueError):
+                continue
+
+            options = config.get('compilerOptions', {}) if isinstance(config, dict) else {}
+            base_url = options.get('baseUrl')
+            if isinstance(base_url, str):
+                self._js_base_url = posixpath.normpath(base_url.replace('\\', '/'))
+
+            paths = options.get('paths', {})
+            if isinstance(paths, dict):
+                for pattern, targets in paths.items():
+                    if not isinstance(targets, list):
+                        continue
+                    prefix, wildcard, suffix = pattern.partition('*')
+                    self._js_aliases.append((
+                        prefix, suffix, bool(wildcard), [t for t in targets if isinstance(t, str)]
+                    ))
+                # 最长前缀优先
+                self._js_aliases.sort(key=lambda alias: len(alias[0]), reverse=True)
+            return
+
+    def resolve(self, dep: str, from_file: str) -> Optional[str]:
+        """
+        解析依赖对应的项目文件
+
+        Args:
+            dep: 导入说明符（Python 模块名，可带前导点；或 JS/TS 模块路径）
+            from_file: 发起导入的文件（相对路径）
+
+        Returns:
+            目标文件的相对路径，外部依赖或无法解析时返回 None
+        """
+        resolved = self.resolve_module(dep, from_file)
+        return resolved[0] if resolved else None
+
+    def resolve_module(self, dep: str, from_file: str) -> Optional[Tuple[str, str]]:
+        """
+        解析依赖对应的项目文件及匹配到的模块名
+
+        Args:
+            dep: 导入说明符
+            from_file: 发起导入的文件（相对路径）
+
+        Returns:
+            (目标文件, 模块名)，外部依赖或无法解析时返回 None
+        """
+        if not dep:
+            return None
+        if detect_file_type(Path(from_file)) == 'python':
+            return self._resolve_python(dep, from_file)
+        return self._resolve_js(dep, from_file)
+
+    def _resolve_python(self, dep: str, from_file: str) -> Optional[Tuple[str, str]]:
+        """解析 Python 模块（`from a.b import c` 记为 a.b.c，按最长前缀匹配）"""
+        level = len(dep) - len(dep.lstrip('.'))
+        parts = [part for part in dep[level:].split('.') if part]
+        package = from_file.split('/')[:-1]
+
+        if level:
+            # 相对导入：从发起文件所在的包向上 level-1 层
+            if level - 1 > len(package):
+                return None
+            base = package[:len(package) - (level - 1)]
+            return self._longest_prefix(self._py_modules, base + parts, min_length=max(len(base), 1))
+
+        # 1. 以项目根目录为搜索路径
+        resolved = self._longest_prefix(self._py_modules, parts)
+        if resolved:
+            return resolved
+
+        # 2. 以发起文件所在目录为搜索路径（脚本目录式布局；包内没有隐式相对导入）
+        if package and '/'.join(package) not in self._py_packages:
+            resolved = self._longest_prefix(self._py_modules, package + parts, min_length=len(package) + 1)
+            if resolved:
+                return resolved
+
+        # 3. 其他源码根目录（如 src/ 布局）；不按任意后缀匹配，
+        # 否则 json、types 等标准库/第三方模块会解析到同名的项目文件
+        return self._longest_prefix(self._py_root_modules, parts)
+
+    def _longest_prefix(self, index: Dict[str, str], parts: List[str],
+                        min_length: int = 1) -> Optional[Tuple[str, str]]:
+        """按最长前缀在模块索引中查找"""
+        for length in range(len(parts), min_length - 1, -1):
+            name = '.'.join(parts[:length])
+            rel_path = index.get(name)
+            if rel_path is not None:
+                return rel_path, name
+        return None
+
+    def _resolve_js(self, dep: str, from_file: str) -> Optional[Tuple[str, str]]:
+        """解析 JS/TS 模块路径"""
+        spec = dep.split('?')[0].split('#')[0]
+
+        if spec.startswith('.'):
+            base = posixpath.dirname(from_file)
+            return self._probe_js(posixpath.join(base, spec), dep)
+        if spec.startswith('/'):
+            return self._probe_js(spec.lstrip('/'), dep)
+
+        # 别名（tsconfig/jsconfig paths）
+        base_url = self._js_base_url or '.'
+        for prefix, suffix, is_wildcard, targets in self._js_aliases:
+            if is_wildcard:
+                if len(spec) < len(prefix) + len(suffix) or not spec.startswith(prefix) or not spec.endswith(suffix):
+                    continue
+                wildcard = spec[len(prefix):len(spec) - len(suffix)]
+            elif spec == prefix:
+                wildcard = ''
+            else:
+                continue
+            for target in targets:
+                resolved = self._probe_js(posixpath.join(base_url, target.replace('*', wildcard)), dep)
+                if resolved:
+                    return resolved
+
+        # baseUrl 下的非相对导入
+        if self._js_base_url is not None:
+            return self._probe_js(posixpath.join(self._js_base_url, spec), dep)
+
+        # 外部包
+        return None
+
+    def _probe_js(self, path: str, label: str) -> Optional[Tuple[str, str]]:
+        """按 Node/TypeScript 规则尝试文件、扩展名与 index 文件"""
+        path = posixpath.normpath(path)
+        if path.startswith('..'):
+            return None
+        if path == '.':
+            path = ''
+
+        candidates = [path] if path else []
+        candidates.extend(path + ext for ext in JS_EXTENSIONS if path)
+        index_base = f"{path}/index" if path else 'index'
+        candidates.extend(index_base + ext for ext in JS_EXTENSIONS)
+
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate, label
+        return None
+
+    def folder_of(self, rel_path: str) -> str:
+        """文件所属的顶层文件夹（根目录下的文件为 '.'）"""
+        return rel_path.split('/')[0] if '/' in rel_path else '.'
+
+
+def main():
+    import sys
+
+    if len(sys.argv) < 4:
+        print("Usage: module_resolver.py <project-path> <from-file> <import> [import ...]")
+        print("\nExamples:")
+        print("  module_resolver.py /path/to/project src/app.py src.utils.helpers")
+        print("  module_resolver.py /path/to/project src/index.ts ./components/Button")
+        sys.exit(1)
+
+    from file_catalog import FileCatalog
+
+    project_path = Path(sys.argv[1])
+    catalog = FileCatalog(project_path, project_path / ".gitignore").build()
+    resolver = ModuleResolver((entry.rel_path for entry in catalog.entries()), project_path)
+
+    for dep in sys.argv[3:]:
+        print(f"{dep} -> {resolver.resolve(dep, sys.argv[2])}")
+
+
+if __name__ == "__main__":
+    main()
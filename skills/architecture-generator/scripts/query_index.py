@@ -11,187 +11,32 @@ Usage:
 Commands:
     find <name>           Find symbols by name
     file <path>           List all symbols in a file
-    search <keyword>      Search symbols by keyword
+    search <keyword>      Search symbols (ranked: exact, prefix, token, substring, fuzzy)
+    callers <name>        List symbols that call / instantiate a symbol
+    callees <name>        List symbols called / instantiated by a symbol
     stats                 Show index statistics
+    serve [--socket PATH] Run a persistent JSON-RPC query server
+
+The query API is defined in symbol_query.py and re-exported here. This
+file only holds the CLI: scripts run as __main__ are compiled from source
+on every invocation, so keeping it short keeps `find`/`stats` fast.
 """
 
 import json
-import sqlite3
 import sys
-from pathlib import Path
-from typing import Dict, List, Optional, Tuple
-
-
-class SymbolIndex:
-    """符号索引查询接口"""
-
-    def __init__(self, project_path: str, db_path: str = "symbols.db"):
-        """
-        初始化符号索引
-
-        Args:
-            project_path: 项目根目录
-            db_path: SQLite 数据库文件路径
-        """
-        self.project_path = Path(project_path)
-        self.db_path = db_path
-        self.conn: Optional[sqlite3.Connection] = None
-
-    def connect(self):
-        """连接到数据库"""
-        if not self.conn:
-            self.conn = sqlite3.connect(self.db_path)
-
-    def close(self):
-        """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
-
-    def find_symbol(self, name: str, kind: Optional[str] = None) -> List[Dict]:
-        """
-        查找符号（类、函数、变量）
-
-        Args:
-            name: 符号名称
-            kind: 符号类型过滤（'class', 'function', 'file' 等）
-
-        Returns:
-            符号列表
-        """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        if kind:
-            cursor.execute("""
-                SELECT id, name, kind, file_path, line_number, end_line_number, parent_id, metadata
-                FROM symbols
-                WHERE name = ? AND kind = ?
-                ORDER BY file_path, line_number
-            """, (name, kind))
-        else:
-            cursor.execute("""
-                SELECT id, name, kind, file_path, line_number, end_line_number, parent_id, metadata
-                FROM symbols
-                WHERE name = ?
-                ORDER BY file_path, line_number
-            """, (name,))
-
-        results = cursor.fetchall()
-        return [self._row_to_dict(row, cursor.description) for row in results]
-
-    def search_symbols(self, keyword: str, kind: Optional[str] = None) -> List[Dict]:
-        """
-        搜索符号（模糊匹配）
-
-        Args:
-            keyword: 关键词
-            kind: 符号类型过滤
-
-        Returns:
-            符号列表
-        """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        if kind:
-            cursor.execute("""
-                SELECT id, name, kind, file_path, line_number, end_line_number, parent_id, metadata
-                FROM symbols
-                WHERE name LIKE ? AND kind = ?
-                ORDER BY name, file_path, line_number
-            """, (f"%{keyword}%", kind))
-        else:
-            cursor.execute("""
-                SELECT id, name, kind, file_path, line_number, end_line_number, parent_id, metadata
-                FROM symbols
-                WHERE name LIKE ?
-                ORDER BY name, file_path, line_number
-            """, (f"%{keyword}%",))
-
-        results = cursor.fetchall()
-        return [self._row_to_dict(row, cursor.description) for row in results]
-
-    def get_file_symbols(self, file_path: str) -> List[Dict]:
-        """
-        获取文件中的所有符号
-
-        Args:
-            file_path: 文件路径（相对路径）
-
-        Returns:
-            符号列表
-        """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        cursor.execute("""
-            SELECT id, name, kind, file_path, line_number, end_line_number, parent_id, metadata
-            FROM symbols
-            WHERE file_path = ?
-            ORDER BY line_number
-        """, (file_path,))
-
-        results = cursor.fetchall()
-        return [self._row_to_dict(row, cursor.description) for row in results]
-
-    def get_statistics(self) -> Dict:
-        """
-        获取索引统计信息
-
-        Returns:
-            统计信息字典
-        """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        # 总符号数
-        cursor.execute("SELECT COUNT(*) FROM symbols")
-        total_symbols = cursor.fetchone()[0]
-
-        # 按类型统计
-        cursor.execute("""
-            SELECT kind, COUNT(*) as count
-            FROM symbols
-            GROUP BY kind
-            ORDER BY count DESC
-        """)
-        by_kind = {row[0]: row[1] for row in cursor.fetchall()}
-
-        # 文件数
-        cursor.execute("SELECT COUNT(DISTINCT file_path) FROM symbols")
-        total_files = cursor.fetchone()[0]
-
-        # 按文件统计
-        cursor.execute("""
-            SELECT file_path, COUNT(*) as count
-            FROM symbols
-            GROUP BY file_path
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        top_files = [{"path": row[0], "symbols": row[1]} for row in cursor.fetchall()]
-
-        return {
-            "total_symbols": total_symbols,
-            "total_files": total_files,
-            "by_kind": by_kind,
-            "top_files": top_files
-        }
-
-    def _row_to_dict(self, row: Tuple, description) -> Dict:
-        """将数据库行转换为字典"""
-        result = {}
-        for i, col in enumerate(description):
-            value = row[i]
-            # 解析 JSON metadata
-            if col[0] == 'metadata' and value:
-                try:
-                    value = json.loads(value)
-                except json.JSONDecodeError:
-                    pass
-            result[col[0]] = value
-        return result
+
+# 查询接口从 symbol_query 重新导出（保持 `from query_index import SymbolIndex` 可用）
+from symbol_query import (
+    FUZZY_CANDIDATES,
+    MATCH_SCORES,
+    SEARCH_MODES,
+    SUMMARY_FIELDS,
+    SYMBOL_FIELDS,
+    TRIGRAM_MIN_LENGTH,
+    SymbolIndex,
+    SymbolRow,
+    find_database,
+)
 
 
 def main():
@@ -200,13 +45,21 @@ def main():
         print("\nCommands:")
         print("  find <name>           Find symbols by name")
         print("  file <path>           List all symbols in a file")
-        print("  search <keyword>      Search symbols by keyword")
+        print("  search <keyword>      Search symbols (ranked: exact, prefix, token, substring, fuzzy)")
+        print("                        Options: [kind] --limit N --offset N --mode auto|exact|prefix|token|substring|fuzzy")
+        print("  callers <name> [kind] List symbols that call / instantiate a symbol")
+        print("  callees <name> [kind] List symbols called / instantiated by a symbol")
         print("  stats                 Show index statistics")
+        print("  serve [--socket PATH] Run a persistent JSON-RPC query server (stdin/stdout by default)")
         print("\nExamples:")
         print("  query_index.py /path/to/project find User")
         print("  query_index.py /path/to/project file src/main.py")
         print("  query_index.py /path/to/project search parse")
+        print("  query_index.py /path/to/project search hdrParser class --mode fuzzy --limit 5")
+        print("  query_index.py /path/to/project callers parse_config")
+        print("  query_index.py /path/to/project callees UserService class")
         print("  query_index.py /path/to/project stats")
+        print("  query_index.py /path/to/project serve --socket /tmp/symbols.sock")
         sys.exit(1)
 
     project_path = sys.argv[1]
@@ -214,16 +67,7 @@ def main():
     args = sys.argv[3:] if len(sys.argv) > 3 else []
 
     # 查找数据库文件
-    db_path = None
-    possible_paths = [
-        Path(project_path) / "symbols.db",
-        Path(project_path) / "docs" / "architecture" / ".cache" / "symbols.db",
-    ]
-
-    for path in possible_paths:
-        if path.exists():
-            db_path = str(path)
-            break
+    db_path, possible_paths = find_database(project_path)
 
     if not db_path:
         print(f"❌ Error: Symbol database not found in project")
@@ -232,6 +76,14 @@ def main():
             print(f"     - {path}")
         sys.exit(1)
 
+    if command == "serve":
+        # 常驻查询服务（stdin/stdout 或 Unix socket 上的 JSON-RPC）
+        from query_server import serve
+
+        socket_path = args[args.index("--socket") + 1] if "--socket" in args[:-1] else None
+        serve(project_path, db_path, socket_path)
+        return
+
     # 创建索引实例
     index = SymbolIndex(project_path, db_path)
 
@@ -258,24 +110,50 @@ def main():
                     print()
 
         elif command == "search":
-            if not args:
+            # search <keyword> [kind] [--limit N] [--offset N] [--mode MODE]
+            options = {'--limit': '20', '--offset': '0', '--mode': 'auto'}
+            positional = []
+            i = 0
+            while i < len(args):
+                if args[i] in options and i + 1 < len(args):
+                    options[args[i]] = args[i + 1]
+                    i += 2
+                else:
+                    positional.append(args[i])
+                    i += 1
+
+            # 只有选项（如 search --limit 5）时同样缺少关键字
+            if not positional:
                 print("❌ Error: 'search' command requires a keyword")
                 sys.exit(1)
 
-            keyword = args[0]
-            kind = args[1] if len(args) > 1 else None
+            keyword = positional[0]
+            kind = positional[1] if len(positional) > 1 else None
+            try:
+                limit = int(options['--limit'])
+                offset = int(options['--offset'])
+            except ValueError:
+                print("❌ Error: --limit and --offset must be integers")
+                sys.exit(1)
 
-            results = index.search_symbols(keyword, kind)
+            if options['--mode'] not in SEARCH_MODES:
+                print(f"❌ Error: Unknown search mode: {options['--mode']} "
+                      f"(choose from {', '.join(SEARCH_MODES)})")
+                sys.exit(1)
+
+            results = index.search(keyword, kind, mode=options['--mode'], limit=limit, offset=offset,
+                                   summary=True)
 
             if not results:
                 print(f"❌ No symbols found matching: {keyword}")
             else:
-                print(f"✅ Found {len(results)} symbol(s) matching: {keyword}\n")
-                for symbol in results[:20]:  # 限制输出数量
-                    print(f"  - {symbol['kind']}: {symbol['name']}")
+                print(f"✅ Showing {len(results)} symbol(s) matching: {keyword} "
+                      f"(offset {offset}, mode {options['--mode']})\n")
+                for symbol in results:
+                    print(f"  - {symbol['kind']}: {symbol['name']}  [{symbol['match']} {symbol['score']:.2f}]")
                     print(f"    Location: {symbol['file_path']}:{symbol['line_number']}")
-                if len(results) > 20:
-                    print(f"  ... and {len(results) - 20} more")
+                if len(results) == limit:
+                    print(f"  ... use --offset {offset + limit} for more")
 
         elif command == "file":
             if not args:
@@ -283,7 +161,7 @@ def main():
                 sys.exit(1)
 
             file_path = args[0]
-            results = index.get_file_symbols(file_path)
+            results = index.get_file_symbols(file_path, summary=True)
 
             if not results:
                 print(f"❌ No symbols found in file: {file_path}")
@@ -293,6 +171,25 @@ def main():
                     if symbol['kind'] != 'file':
                         print(f"  - {symbol['kind']}: {symbol['name']} (line {symbol['line_number']})")
 
+        elif command in ("callers", "callees"):
+            if not args:
+                print(f"❌ Error: '{command}' command requires a symbol name")
+                sys.exit(1)
+
+            symbol_name = args[0]
+            kind = args[1] if len(args) > 1 else None
+            finder = index.find_callers if command == "callers" else index.find_callees
+            results = finder(symbol_name, kind, summary=True)
+
+            relation = "calling" if command == "callers" else "called by"
+            if not results:
+                print(f"❌ No symbols found {relation}: {symbol_name}")
+            else:
+                print(f"✅ Found {len(results)} symbol(s) {relation}: {symbol_name}\n")
+                for symbol in results:
+                    print(f"  - {symbol['kind']}: {symbol['name']}  [{symbol['dep_type']}]")
+                    print(f"    Location: {symbol['file_path']}:{symbol['line_number']}")
+
         elif command == "stats":
             stats = index.get_statistics()
 
@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Persistent query server for the symbol index.
+
+Keeps a single SymbolIndex (connection, statement cache, schema info)
+open and answers JSON-RPC 2.0 requests, one JSON object per line, over
+stdin/stdout or a Unix domain socket.
+
+Usage:
+    query_server.py <project-path> [--socket PATH]
+
+Methods:
+    find(name, kind=None, fields=None, summary=False)
+    search(query, kind=None, mode='auto', limit=20, offset=0, fields=None, summary=False)
+    search_symbols(keyword, kind=None, fields=None, summary=False)
+    file(file_path, fields=None, summary=False)
+    callers(name, kind=None, fields=None, summary=False)
+    callees(name, kind=None, fields=None, summary=False)
+    stats()
+    metrics(format='json')   In-process metrics (format 'json' or 'prometheus')
+    status() / ping() / reload() / shutdown()
+
+Pass ``summary: true`` or a ``fields`` list to keep the (potentially large)
+metadata column out of the response.
+
+Serialized results are cached per request; the cache is dropped when the
+database changes (another connection committed, or the file was replaced),
+so clients always see the latest index without restarting the server.
+"""
+
+import inspect
+import json
+import os
+import socketserver
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, TextIO
+
+import metrics
+from symbol_query import SymbolIndex, SymbolRow, find_database
+
+
+# 结果缓存的最大条数（按请求方法与参数缓存序列化后的结果）
+RESULT_CACHE_SIZE = 1024
+
+# 结果可缓存的方法（只读查询）
+CACHEABLE_METHODS = ('find', 'search', 'search_symbols', 'file', 'callers', 'callees', 'stats')
+
+# JSON-RPC 2.0 错误码
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+SERVER_ERROR = -32000
+
+
+CACHE_REQUESTS = metrics.counter('cache_requests', 'Cache lookups by cache and result')
+
+
+class RpcError(Exception):
+    """JSON-RPC 错误（code 为 JSON-RPC 错误码）"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+class QueryServer:
+    """常驻符号查询服务（与传输方式无关的请求处理）"""
+
+    def __init__(self, project_path: str, db_path: str, cache_size: int = RESULT_CACHE_SIZE):
+        """
+        初始化查询服务
+
+        Args:
+            project_path: 项目根目录
+            db_path: 符号数据库路径
+            cache_size: 结果缓存的最大条数（0 表示不缓存）
+        """
+        self.index = SymbolIndex(project_path, db_path, check_same_thread=False)
+        self.cache_size = cache_size
+        self.running = True
+
+        self._cache: 'OrderedDict[Any, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._file_id: Optional[tuple] = None  # (st_dev, st_ino)
+        self._data_version: Optional[int] = None
+
+        # 统计
+        self.requests = 0
+        self.cache_hits = 0
+        self.reloads = 0
+
+        self._handlers: Dict[str, Callable] = {
+            'find': self.index.find_symbol,
+            'search': self.index.search,
+            'search_symbols': self.index.search_symbols,
+            'file': self.index.get_file_symbols,
+            'callers': self.index.find_callers,
+            'callees': self.index.find_callees,
+            'stats': self.index.get_statistics,
+            'status': self._status,
+            'metrics': self._metrics,
+            'ping': lambda: 'pong',
+            'reload': self._force_reload,
+            'shutdown': self._shutdown,
+        }
+        self._signatures = {
+            name: inspect.signature(handler) for name, handler in self._handlers.items()
+        }
+
+    def handle_line(self, line: str) -> Optional[str]:
+        """
+        处理一行请求
+
+        Args:
+            line: JSON-RPC 请求（单个 JSON 对象）
+
+        Returns:
+            JSON 编码的响应；通知（无 id）与空行返回 None
+        """
+        line = line.strip()
+        if not line:
+            return None
+
+        try:
+            request = json.loads(line)
+        except ValueError:
+            return _error_response(None, PARSE_ERROR, "Parse error")
+
+        if not isinstance(request, dict) or not isinstance(request.get('method'), str):
+            return _error_response(request.get('id') if isinstance(request, dict) else None,
+                                   INVALID_REQUEST, "Invalid request")
+
+        request_id = request.get('id')
+        try:
+            with self._lock:
+                result = self._call(request['method'], request.get('params'))
+        except RpcError as e:
+            return _error_response(request_id, e.code, e.message) if 'id' in request else None
+        except Exception as e:  # 查询失败不应终止服务
+            return _error_response(request_id, SERVER_ERROR, f"{type(e).__name__}: {e}") if 'id' in request else None
+
+        if 'id' not in request:
+            return None
+        return f'{{"jsonrpc": "2.0", "id": {json.dumps(request_id)}, "result": {result}}}'
+
+    def _call(self, method: str, params: Any) -> str:
+        """执行方法，返回 JSON 编码的结果（可缓存的方法先查缓存）"""
+        self.requests += 1
+        handler = self._handlers.get(method)
+        if handler is None:
+            raise RpcError(METHOD_NOT_FOUND, f"Method not found: {method}")
+
+        if params is None:
+            args, kwargs = (), {}
+        elif isinstance(params, list):
+            args, kwargs = tuple(params), {}
+        elif isinstance(params, dict):
+            args, kwargs = (), params
+        else:
+            raise RpcError(INVALID_PARAMS, "params must be an array or an object")
+
+        try:
+            self._signatures[method].bind(*args, **kwargs)
+        except TypeError as e:
+            raise RpcError(INVALID_PARAMS, f"Invalid params: {e}")
+
+        self._check_reload()
+
+        key = None
+        if method in CACHEABLE_METHODS and self.cache_size > 0:
+            key = (method, json.dumps(params, sort_keys=True))
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                CACHE_REQUESTS.inc(cache='query_server', result='hit')
+                return cached
+            CACHE_REQUESTS.inc(cache='query_server', result='miss')
+
+        try:
+            result = json.dumps(handler(*args, **kwargs), ensure_ascii=False, default=_encode)
+        except ValueError as e:
+            raise RpcError(INVALID_PARAMS, str(e))
+
+        if key is not None:
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _check_reload(self):
+        """数据库被替换时重新连接，内容变化时清空缓存"""
+        try:
+            stat = os.stat(self.index.db_path)
+        except OSError:
+            self._reset()
+            raise RpcError(SERVER_ERROR, f"Symbol database not found: {self.index.db_path}")
+
+        file_id = (stat.st_dev, stat.st_ino)
+        if file_id != self._file_id:
+            if self._file_id is not None:
+                self.reloads += 1
+            self._reset()
+            self._file_id = file_id
+
+        # data_version 在其他连接提交写入后变化（同一连接的读取不影响）
+        self.index.connect()
+        version = self.index.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            if self._data_version is not None:
+                self.reloads += 1
+            self._data_version = version
+            self._cache.clear()
+            self.index.clear_cache()
+
+    def _reset(self):
+        """关闭连接并清空缓存"""
+        self.index.close()
+        self._cache.clear()
+        self._file_id = None
+        self._data_version = None
+
+    def _force_reload(self) -> bool:
+        """reload 方法：强制重新连接"""
+        self._reset()
+        self.reloads += 1
+        return True
+
+    def _shutdown(self) -> bool:
+        """shutdown 方法：处理完当前请求后停止服务"""
+        self.running = False
+        return True
+
+    def _status(self) -> Dict:
+        """status 方法：服务状态"""
+        return {
+            'db_path': self.index.db_path,
+            'requests': self.requests,
+            'cache_hits': self.cache_hits,
+            'cache_entries': len(self._cache),
+            'reloads': self.reloads,
+        }
+
+    def _metrics(self, format: str = 'json') -> Any:
+        """metrics 方法：进程内指标（'json' 返回快照，'prometheus' 返回文本格式）"""
+        if format == 'json':
+            return metrics.REGISTRY.to_dict()
+        if format == 'prometheus':
+            return metrics.REGISTRY.to_prometheus()
+        raise ValueError(f"Invalid metrics format: {format}")
+
+    def close(self):
+        """关闭服务持有的连接"""
+        self._reset()
+
+
+def _encode(value: Any) -> Any:
+    """json.dumps 的 default：查询结果行转换为字典"""
+    if isinstance(value, SymbolRow):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _error_response(request_id: Any, code: int, message: str) -> str:
+    """构造 JSON-RPC 错误响应"""
+    return json.dumps({
+        'jsonrpc': '2.0',
+        'id': request_id,
+        'error': {'code': code, 'message': message}
+    }, ensure_ascii=False)
+
+
+def serve_stdio(server: QueryServer, stdin: TextIO = sys.stdin, stdout: TextIO = sys.stdout):
+    """
+    在 stdin/stdout 上提供服务（每行一个请求/响应，stdin 关闭或 shutdown 时退出）
+
+    Args:
+        server: 查询服务
+        stdin: 请求输入流
+        stdout: 响应输出流
+    """
+    for line in stdin:
+        response = server.handle_line(line)
+        if response is not None:
+            stdout.write(response + '\n')
+            stdout.flush()
+        if not server.running:
+            break
+
+
+class _SocketHandler(socketserver.StreamRequestHandler):
+    """Unix socket 连接处理（每个连接可发送多行请求）"""
+
+    def handle(self):
+        query_server: QueryServer = self.server.query_server
+        for raw_line in self.rfile:
+            response = query_server.handle_line(raw_line.decode('utf-8', errors='replace'))
+            if response is not None:
+                self.wfile.write((response + '\n').encode('utf-8'))
+                self.wfile.flush()
+            if not query_server.running:
+                # shutdown() 会等待 serve_forever 退出，不能在处理线程中直接调用
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                break
+
+
+def serve_unix(server: QueryServer, socket_path: str):
+    """
+    在 Unix domain socket 上提供服务（多个客户端并发连接，请求串行执行）
+
+    Args:
+        server: 查询服务
+        socket_path: socket 文件路径（已存在时覆盖）
+    """
+    if not hasattr(socketserver, 'ThreadingUnixStreamServer'):
+        raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+
+    with socketserver.ThreadingUnixStreamServer(socket_path, _SocketHandler) as unix_server:
+        unix_server.daemon_threads = True
+        unix_server.query_server = server
+        try:
+            unix_server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+
+def serve(project_path: str, db_path: str, socket_path: Optional[str] = None):
+    """
+    启动查询服务（日志输出到 stderr，stdout 只用于协议）
+
+    Args:
+        project_path: 项目根目录
+        db_path: 符号数据库路径
+        socket_path: Unix socket 路径（None 表示使用 stdin/stdout）
+    """
+    server = QueryServer(project_path, db_path)
+    transport = socket_path or 'stdin/stdout'
+    print(f"🚀 Symbol query server ready on {transport} ({db_path})", file=sys.stderr)
+
+    try:
+        if socket_path:
+            serve_unix(server, socket_path)
+        else:
+            serve_stdio(server)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        print(f"👋 Served {server.requests} request(s), {server.cache_hits} from cache, "
+              f"{server.reloads} reload(s)", file=sys.stderr)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: query_server.py <project-path> [--socket PATH]")
+        print("\nRequests (one JSON-RPC 2.0 object per line):")
+        print('  {"jsonrpc": "2.0", "id": 1, "method": "find", "params": ["User"]}')
+        print('  {"jsonrpc": "2.0", "id": 2, "method": "search", "params": {"query": "parse", "limit": 5}}')
+        print("\nExamples:")
+        print("  query_server.py /path/to/project")
+        print("  query_server.py /path/to/project --socket /tmp/symbols.sock")
+        sys.exit(1)
+
+    project_path = sys.argv[1]
+    args = sys.argv[2:]
+    socket_path = args[args.index("--socket") + 1] if "--socket" in args[:-1] else None
+
+    db_path, possible_paths = find_database(project_path)
+    if not db_path:
+        print(f"❌ Error: Symbol database not found in project", file=sys.stderr)
+        for path in possible_paths:
+            print(f"     - {path}", file=sys.stderr)
+        sys.exit(1)
+
+    serve(project_path, db_path, socket_path)
+
+
+if __name__ == "__main__":
+    main()
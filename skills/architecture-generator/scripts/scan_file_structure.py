@@ -3,37 +3,194 @@
 File structure scanner for architecture generator.
 
 Scans project directory and generates:
-- File tree structure (ASCII art)
+- File tree structure (ASCII art), as a string or streamed line by line
 - File statistics (by extension, total count)
 """
 
 import json
 from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
 
-from utils import (
-    parse_gitignore,
-    should_include_file,
-    get_relative_path,
-    normalize_path,
-)
+from utils import normalize_path
+from file_catalog import FileCatalog
+
+
+# 流式写入时的缓冲区大小（字符数）
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def iter_tree_lines(
+    catalog: FileCatalog,
+    root_name: str,
+    max_depth: Optional[int] = None,
+    collapse_threshold: Optional[int] = None
+) -> Iterator[str]:
+    """
+    逐行生成 ASCII 文件树（不累积输出）
+
+    使用显式栈遍历，内存占用只与目录深度有关（不含共享的文件目录本身）。
+
+    Args:
+        catalog: 已构建的文件目录
+        root_name: 根目录显示名称
+        max_depth: 最大渲染深度（None 表示无限制）
+        collapse_threshold: 单个目录最多列出的文件数，超出部分折叠为
+            "… N more files"（None 表示不折叠）
+
+    Yields:
+        文件树的每一行（不含换行符）
+    """
+    yield f"{root_name}/"
+
+    # 栈元素：(子项列表, 下一个下标, 行前缀, 深度)
+    stack = [(_visible_children(catalog, '', collapse_threshold), 0, "", 0)]
+    while stack:
+        entries, index, prefix, depth = stack.pop()
+        if index >= len(entries):
+            continue
+        stack.append((entries, index + 1, prefix, depth))
+
+        entry = entries[index]
+        # 计算树形前缀
+        is_last = (index == len(entries) - 1)
+        current_prefix = "└── " if is_last else "├── "
+        child_prefix = "    " if is_last else "│   "
+
+        if isinstance(entry, int):
+            # 折叠的文件
+            yield f"{prefix}{current_prefix}… {entry:,} more files"
+        elif entry.is_dir:
+            # 目录
+            yield f"{prefix}{current_prefix}{entry.name}/"
+            if max_depth is None or depth + 1 <= max_depth:
+                stack.append((
+                    _visible_children(catalog, entry.rel_path, collapse_threshold),
+                    0, prefix + child_prefix, depth + 1
+                ))
+        else:
+            # 文件
+            yield f"{prefix}{current_prefix}{entry.name}"
+
+
+def _visible_children(catalog: FileCatalog, rel_dir: str,
+                      collapse_threshold: Optional[int]) -> list:
+    """目录下需要渲染的子项（超出阈值的文件折叠为一个计数）"""
+    entries = catalog.children(rel_dir)
+    if collapse_threshold is None:
+        return entries
+
+    dirs = [entry for entry in entries if entry.is_dir]
+    files = [entry for entry in entries if not entry.is_dir]
+    if len(files) <= collapse_threshold:
+        return entries
+    return dirs + files[:collapse_threshold] + [len(files) - collapse_threshold]
+
+
+def compute_file_stats(catalog: FileCatalog, max_depth: Optional[int] = None) -> Dict:
+    """
+    统计文件数量与扩展名分布（与文件树使用相同的深度限制）
+
+    Args:
+        catalog: 已构建的文件目录
+        max_depth: 最大深度（None 表示无限制）
+
+    Returns:
+        {"total_files": 100, "by_extension": {".py": 50, ".md": 20}}
+    """
+    file_stats = Counter()
+    total_files = 0
+    for entry in catalog.entries():
+        if max_depth is not None and entry.depth > max_depth:
+            continue
+        total_files += 1
+        file_stats[entry.path.suffix.lower()] += 1
+
+    return {
+        "total_files": total_files,
+        "by_extension": dict(file_stats.most_common())
+    }
+
+
+def write_lines(f: TextIO, lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    按块写入行（缓冲区不超过 chunk_size 个字符加一行）
+
+    Args:
+        f: 文本文件对象
+        lines: 行迭代器（不含换行符）
+        chunk_size: 每次写入的字符数
+
+    Returns:
+        写入的行数
+    """
+    buffer: List[str] = []
+    buffered = 0
+    count = 0
+    for line in lines:
+        if count:
+            buffer.append("\n")
+            buffered += 1
+        buffer.append(line)
+        buffered += len(line)
+        count += 1
+        if buffered >= chunk_size:
+            f.write("".join(buffer))
+            buffer = []
+            buffered = 0
+    if buffer:
+        f.write("".join(buffer))
+    return count
+
+
+def write_tree_document(
+    output_path: Path,
+    document: str,
+    placeholder: str,
+    lines: Iterable[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    将文件树流式写入已渲染的文档（替换文档中的占位符）
+
+    Args:
+        output_path: 输出文件路径
+        document: 已渲染的文档（文件树位置为占位符）
+        placeholder: 占位符字符串
+        lines: 文件树行迭代器
+        chunk_size: 每次写入的字符数
+
+    Returns:
+        写入的文件树行数
+    """
+    head, _, tail = document.partition(placeholder)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(head)
+        count = write_lines(f, lines, chunk_size)
+        f.write(tail)
+    return count
 
 
 def scan_directory(
     root_path: Path,
     gitignore_path: Optional[Path] = None,
     max_depth: Optional[int] = None,
-    base_dir: Optional[Path] = None
+    base_dir: Optional[Path] = None,
+    catalog: Optional[FileCatalog] = None,
+    collapse_threshold: Optional[int] = None
 ) -> Dict:
     """
     递归扫描目录，生成文件树和统计信息
 
+    文件树会完整保存在内存中；大型项目请使用 iter_tree_lines + write_tree_document 流式写入。
+
     Args:
         root_path: 要扫描的目录路径
         gitignore_path: .gitignore 文件路径
         max_depth: 最大扫描深度（None 表示无限制）
         base_dir: 基础目录（用于相对路径计算）
+        catalog: 已构建的文件目录（None 时自行遍历一次）
+        collapse_threshold: 单个目录最多列出的文件数（None 表示不折叠）
 
     Returns:
         包含文件树和统计信息的字典
@@ -46,67 +203,14 @@ def scan_directory(
         }
     """
     root_path = normalize_path(root_path, base_dir)
-    if base_dir is None:
-        base_dir = root_path
-
-    # 解析 .gitignore
-    exclude_patterns = parse_gitignore(gitignore_path)
 
-    # 收集文件信息
-    file_stats = Counter()
-    total_files = 0
-    tree_lines = []
-
-    # 递归扫描
-    def _scan_dir(current_path: Path, depth: int, prefix: str = ""):
-        nonlocal total_files
-
-        if max_depth is not None and depth > max_depth:
-            return
-
-        try:
-            entries = sorted(current_path.iterdir(), key=lambda x: (not x.is_dir(), x.name))
-        except PermissionError:
-            return
-
-        for i, entry in enumerate(entries):
-            # 跳过不应包含的文件
-            if not should_include_file(entry, exclude_patterns, base_dir):
-                continue
-
-            # 计算树形前缀
-            is_last = (i == len(entries) - 1)
-            current_prefix = "└── " if is_last else "├── "
-            child_prefix = "    " if is_last else "│   "
-
-            rel_path = get_relative_path(entry, base_dir)
-
-            if entry.is_dir():
-                # 目录
-                tree_lines.append(f"{prefix}{current_prefix}{entry.name}/")
-                _scan_dir(entry, depth + 1, prefix + child_prefix)
-            else:
-                # 文件
-                tree_lines.append(f"{prefix}{current_prefix}{entry.name}")
-                total_files += 1
-                file_stats[entry.suffix.lower()] += 1
-
-    # 从根目录开始扫描
-    tree_lines.append(f"{root_path.name}/")
-    _scan_dir(root_path, 0)
-
-    # 生成文件树
-    tree_str = "\n".join(tree_lines)
-
-    # 生成统计信息
-    stats = {
-        "total_files": total_files,
-        "by_extension": dict(file_stats.most_common())
-    }
+    if catalog is None:
+        catalog = FileCatalog(root_path, gitignore_path)
+    catalog.build()
 
     return {
-        "tree": tree_str,
-        "stats": stats
+        "tree": "\n".join(iter_tree_lines(catalog, root_path.name, max_depth, collapse_threshold)),
+        "stats": compute_file_stats(catalog, max_depth)
     }
 
 
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Pipeline stage timer for architecture generator.
+
+Splits a run into consecutive stages with checkpoints: each `lap(name)`
+closes the stage that started at the previous checkpoint and records its
+wall time and the process peak RSS so far. Used by `generate.py` and the
+benchmark harness in `bench/`.
+
+With `profile=True` (generate.py --profile) each stage also records CPU
+time (including finished worker processes) and the peak of Python
+allocations traced by tracemalloc, and a SlowFileReport collects the
+slowest files per extractor. With `cprofile=True` every stage runs under
+its own cProfile profiler; `write_report` dumps them as pstats files.
+cProfile and tracemalloc are only imported when those options are on.
+"""
+
+import heapq
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_kb() -> Optional[int]:
+    """
+    当前进程（含已结束的子进程）的峰值常驻内存（KB）
+
+    Returns:
+        峰值 RSS；平台不支持时返回 None
+    """
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # macOS 上 ru_maxrss 单位为字节，Linux 上为 KB
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def cpu_seconds() -> float:
+    """当前进程与已结束子进程的 CPU 时间（用户态 + 内核态）"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class SlowFileReport:
+    """每个提取器耗时最长的前 N 个文件"""
+
+    def __init__(self, top_n: int = 10):
+        self.top_n = max(1, top_n)
+        self.totals: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._heaps: Dict[str, List[Tuple[float, str]]] = {}
+
+    def add(self, extractor: str, rel_path: str, seconds: float):
+        """记录 extractor 处理 rel_path 的耗时"""
+        self.totals[extractor] = self.totals.get(extractor, 0.0) + seconds
+        self.counts[extractor] = self.counts.get(extractor, 0) + 1
+        heap = self._heaps.setdefault(extractor, [])
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, (seconds, rel_path))
+        elif seconds > heap[0][0]:
+            heapq.heapreplace(heap, (seconds, rel_path))
+
+    def add_all(self, rel_path: str, timings: Dict[str, float]):
+        """记录单个文件的多个提取器耗时（extractor -> 秒）"""
+        for extractor, seconds in timings.items():
+            self.add(extractor, rel_path, seconds)
+
+    def top(self, extractor: str) -> List[Tuple[str, float]]:
+        """extractor 最慢的文件（耗时降序）"""
+        return [(path, seconds) for seconds, path in sorted(self._heaps.get(extractor, []), reverse=True)]
+
+    def summary(self) -> Dict:
+        """可序列化为 JSON 的报告（按总耗时降序）"""
+        return {
+            extractor: {
+                'total': self.totals[extractor],
+                'files': self.counts[extractor],
+                'slowest': [{'file': path, 'seconds': seconds} for path, seconds in self.top(extractor)],
+            }
+            for extractor in sorted(self.totals, key=self.totals.get, reverse=True)
+        }
+
+
+class StageTimer:
+    """流水线阶段计时器（按检查点划分连续阶段）"""
+
+    def __init__(self, profile: bool = False, cprofile: bool = False, top_n: int = 10):
+        """
+        初始化阶段计时器
+
+        Args:
+            profile: 是否记录 CPU 时间、分配峰值与最慢文件（tracemalloc 会拖慢运行）
+            cprofile: 是否为每个阶段运行 cProfile（write_report 时写出 .prof 文件）
+            top_n: 每个提取器报告的最慢文件数
+        """
+        self.profile = profile
+        self.stages: Dict[str, Dict] = {}
+        self.file_report = SlowFileReport(top_n) if profile else None
+        self._profiles: List[Tuple[str, 'cProfile.Profile']] = []
+        self._profiler: Optional['cProfile.Profile'] = None
+        self._owns_tracemalloc = False
+        if profile:
+            import tracemalloc
+
+            self._owns_tracemalloc = not tracemalloc.is_tracing()
+            if self._owns_tracemalloc:
+                tracemalloc.start()
+        if cprofile:
+            import cProfile
+
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        self._started = time.perf_counter()
+        self._last = self._started
+        self._last_cpu = cpu_seconds()
+
+    def lap(self, name: str):
+        """结束当前阶段并以 name 记录（同名阶段的耗时累加）"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiles.append((name, self._profiler))
+
+        now = time.perf_counter()
+        stage = self.stages.setdefault(name, {'wall': 0.0, 'peak_rss_kb': None})
+        stage['wall'] += now - self._last
+        stage['peak_rss_kb'] = peak_rss_kb()
+        self._last = now
+
+        if self.profile:
+            import tracemalloc
+
+            cpu = cpu_seconds()
+            stage['cpu'] = stage.get('cpu', 0.0) + cpu - self._last_cpu
+            self._last_cpu = cpu
+            if tracemalloc.is_tracing():
+                peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+                stage['alloc_peak_kb'] = max(stage.get('alloc_peak_kb', 0), peak_kb)
+                tracemalloc.reset_peak()
+
+        if self._profiler is not None:
+            self._profiler = type(self._profiler)()
+            self._profiler.enable()
+
+    def stop(self):
+        """停止 cProfile 与本计时器启动的 tracemalloc（之后不再调用 lap）"""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+        if self._owns_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._owns_tracemalloc = False
+
+    def total(self) -> float:
+        """从创建到最后一个检查点的总耗时（秒）"""
+        return self._last - self._started
+
+    def summary(self) -> Dict:
+        """可序列化为 JSON 的计时结果"""
+        result = {
+            'stages': {name: dict(stage) for name, stage in self.stages.items()},
+            'total': self.total(),
+            'peak_rss_kb': peak_rss_kb(),
+        }
+        if self.file_report is not None:
+            result['slow_files'] = self.file_report.summary()
+        return result
+
+    def format_report(self, top_n: Optional[int] = None) -> str:
+        """格式化为文本（各阶段耗时与每个提取器最慢的文件）"""
+        lines = [f"{'stage':<14} {'wall':>9} {'cpu':>9} {'alloc peak':>11} {'peak RSS':>10}"]
+        for name, stage in self.stages.items():
+            cpu = stage.get('cpu')
+            alloc = stage.get('alloc_peak_kb')
+            rss = stage.get('peak_rss_kb')
+            lines.append(
+                f"{name:<14} {stage['wall']:>8.3f}s "
+                f"{f'{cpu:.3f}s' if cpu is not None else '-':>9} "
+                f"{f'{alloc / 1024:.1f} MB' if alloc is not None else '-':>11} "
+                f"{f'{rss / 1024:.1f} MB' if rss is not None else '-':>10}"
+            )
+        lines.append(f"{'total':<14} {self.total():>8.3f}s")
+
+        if self.file_report is not None:
+            for extractor, data in self.file_report.summary().items():
+                lines.append(f"\n{extractor}: {data['total']:.3f}s in {data['files']} file(s)")
+                for item in data['slowest'][:top_n]:
+                    lines.append(f"   {item['seconds'] * 1000:9.1f} ms  {item['file']}")
+        return "\n".join(lines)
+
+    def write_report(self, directory: Path) -> List[Path]:
+        """
+        将报告写入 directory（report.json 与每个阶段的 <序号>-<阶段>.prof）
+
+        Returns:
+            写出的文件路径
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+
+        report_path = directory / "report.json"
+        report_path.write_text(json.dumps(self.summary(), indent=2) + "\n", encoding='utf-8')
+        written.append(report_path)
+
+        for index, (name, profiler) in enumerate(self._profiles, 1):
+            path = directory / f"{index:02d}-{name}.prof"
+            profiler.dump_stats(str(path))
+            written.append(path)
+        return written
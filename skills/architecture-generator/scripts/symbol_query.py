@@ -0,0 +1,707 @@
+#!/usr/bin/env python3
+"""
+Symbol index query interface for architecture generator.
+
+Provides a unified API for querying code symbols (SymbolIndex).
+Supports both Serena MCP and SQLite backends.
+
+The command line interface lives in query_index.py, which stays small so
+that a one-shot query does not pay for compiling this module on every run.
+"""
+
+import functools
+import json
+import os
+import sqlite3
+from functools import partial
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import metrics
+from symbol_store import MetadataReader
+
+
+# 排序搜索的匹配层级（按优先级）及其分数
+MATCH_SCORES = {
+    'exact': 1.0,
+    'prefix': 0.8,
+    'token': 0.6,
+    'substring': 0.4,
+    'fuzzy': 0.2,
+}
+
+# 各搜索模式启用的匹配层级
+SEARCH_MODES = {
+    'auto': ('exact', 'prefix', 'token', 'substring', 'fuzzy'),
+    'exact': ('exact',),
+    'prefix': ('exact', 'prefix'),
+    'token': ('token',),
+    'substring': ('exact', 'prefix', 'substring'),
+    'fuzzy': ('fuzzy',),
+}
+
+# trigram 索引可加速的最短关键词长度
+TRIGRAM_MIN_LENGTH = 3
+
+# 模糊匹配从 trigram 索引中取出的候选数上限
+FUZZY_CANDIDATES = 2000
+
+# 模糊匹配中计算编辑距离的不同名称数上限（按与查询共享的 trigram 数排序后截取）
+FUZZY_SCORED_NAMES = 200
+
+# 查询结果可包含的字段（按表结构顺序）
+SYMBOL_FIELDS = ('id', 'name', 'kind', 'file_path', 'line_number', 'end_line_number', 'parent_id', 'metadata')
+
+# 摘要模式的字段（不读取 metadata 列）
+SUMMARY_FIELDS = SYMBOL_FIELDS[:-1]
+
+_FIELD_INDEX = {field: i for i, field in enumerate(SYMBOL_FIELDS)}
+
+# 总是读取的小字段（排序与去重需要）；metadata 只在投影包含它时读取
+_BASE_COLUMNS = "s.id, s.name, s.kind, s.file_path, s.line_number, s.end_line_number, s.parent_id"
+
+# 模糊匹配候选读取的列（ID、名称与排序所需的位置）
+_CANDIDATE_COLUMNS = "s.id, s.name, s.file_path, s.line_number"
+
+QUERY_SECONDS = metrics.histogram('query_seconds', 'Symbol index query latency', metrics.LATENCY_BUCKETS)
+
+
+def _timed_query(method: Callable) -> Callable:
+    """记录查询方法的耗时（按方法名分别统计）"""
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with QUERY_SECONDS.time(method=method.__name__):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+class SymbolRow(MutableMapping):
+    """
+    查询结果行（按需解析 metadata）
+
+    用法与字典相同（也可用属性访问，如 row.name）。metadata 保存原始值，
+    第一次访问时才解析（规范化存储的索引由 loader 还原）；只读取名称、
+    位置等字段时不会解析 metadata。
+    """
+
+    __slots__ = ('_data', '_metadata_pending')
+
+    def __init__(self, data: Dict[str, Any], loader: Optional[Callable[[], Any]] = None):
+        self._data = data
+        self._metadata_pending: Optional[Callable[[], Any]] = None
+        if data.get('metadata'):
+            self._metadata_pending = loader or partial(_decode_metadata, data['metadata'])
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'metadata' and self._metadata_pending is not None:
+            self._data['metadata'] = self._metadata_pending()
+            self._metadata_pending = None
+        return self._data[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key == 'metadata':
+            self._metadata_pending = None
+        self._data[key] = value
+
+    def __delitem__(self, key: str):
+        del self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{key}={value!r}" for key, value in self._data.items() if key != 'metadata')
+        return f"SymbolRow({fields})"
+
+    @property
+    def metadata_decoded(self) -> bool:
+        """metadata 是否已解析（或不需要解析）"""
+        return self._metadata_pending is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为普通字典（会解析 metadata）"""
+        return {key: self[key] for key in self._data}
+
+
+class SymbolIndex:
+    """符号索引查询接口"""
+
+    def __init__(self, project_path: str, db_path: str = "symbols.db",
+                 check_same_thread: bool = True):
+        """
+        初始化符号索引
+
+        Args:
+            project_path: 项目根目录
+            db_path: SQLite 数据库文件路径
+            check_same_thread: 是否禁止跨线程使用连接（常驻服务由调用方加锁时设为 False）
+        """
+        # 保持为字符串：查询路径上不导入 pathlib（见 find_database）
+        self.project_path = project_path
+        self.db_path = db_path
+        self.check_same_thread = check_same_thread
+        self.conn: Optional[sqlite3.Connection] = None
+        self._tables: Optional[set] = None
+        self._metadata_reader: Optional[MetadataReader] = None
+
+    def connect(self):
+        """连接到数据库"""
+        if not self.conn:
+            self.conn = sqlite3.connect(
+                self.db_path, check_same_thread=self.check_same_thread, cached_statements=256
+            )
+
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+            self._tables = None
+            self._metadata_reader = None
+
+    def clear_cache(self):
+        """清空缓存的表结构信息与 metadata（数据库被其他连接修改或重建后调用）"""
+        self._tables = None
+        self._metadata_reader = None
+
+    def _has_table(self, name: str) -> bool:
+        """数据库中是否存在指定的表（旧版本构建的索引没有搜索辅助表）"""
+        self.connect()
+        if self._tables is None:
+            self._tables = {
+                row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+        return name in self._tables
+
+    def _make_row(self, row: Tuple, fields: Tuple[str, ...]) -> SymbolRow:
+        """由查询行构造结果行（只保留投影字段）"""
+        data = {field: row[_FIELD_INDEX[field]] for field in fields}
+        loader = None
+        if data.get('metadata') and self._has_table('symbol_strings'):
+            # 规范化存储：残余 metadata 与子符号、规范化表按文件批量还原
+            if self._metadata_reader is None:
+                self._metadata_reader = MetadataReader(self.conn)
+            loader = partial(self._metadata_reader.load, row[0], row[3])
+        return SymbolRow(data, loader)
+
+    @_timed_query
+    def find_symbol(self, name: str, kind: Optional[str] = None,
+                    fields: Optional[Sequence[str]] = None, summary: bool = False) -> List[SymbolRow]:
+        """
+        查找符号（类、函数、变量）
+
+        Args:
+            name: 符号名称
+            kind: 符号类型过滤（'class', 'function', 'file' 等）
+            fields: 返回的字段（见 SYMBOL_FIELDS，None 表示全部）
+            summary: 摘要模式（不读取 metadata，优先于 fields）
+
+        Returns:
+            符号列表
+        """
+        fields = _resolve_fields(fields, summary)
+        self.connect()
+        cursor = self.conn.cursor()
+
+        sql = f"SELECT {_columns_for(fields)} FROM symbols s WHERE s.name = ?"
+        params: List = [name]
+        if kind:
+            sql += " AND s.kind = ?"
+            params.append(kind)
+
+        cursor.execute(f"{sql} ORDER BY s.file_path, s.line_number", params)
+        return [self._make_row(row, fields) for row in cursor.fetchall()]
+
+    @_timed_query
+    def search_symbols(self, keyword: str, kind: Optional[str] = None,
+                       fields: Optional[Sequence[str]] = None, summary: bool = False) -> List[SymbolRow]:
+        """
+        搜索符号（模糊匹配）
+
+        Args:
+            keyword: 关键词
+            kind: 符号类型过滤
+            fields: 返回的字段（见 SYMBOL_FIELDS，None 表示全部）
+            summary: 摘要模式（不读取 metadata，优先于 fields）
+
+        Returns:
+            符号列表
+        """
+        fields = _resolve_fields(fields, summary)
+        self.connect()
+        cursor = self.conn.cursor()
+
+        # 关键词足够长时由 trigram 索引筛选候选，避免全表扫描
+        if len(keyword) >= TRIGRAM_MIN_LENGTH and self._has_table('symbols_fts'):
+            source = "symbols s WHERE s.id IN (SELECT rowid FROM symbols_fts WHERE name LIKE ?)"
+        else:
+            source = "symbols s WHERE s.name LIKE ?"
+        params: List = [f"%{keyword}%"]
+
+        if kind:
+            source += " AND s.kind = ?"
+            params.append(kind)
+
+        cursor.execute(f"""
+            SELECT {_columns_for(fields)}
+            FROM {source}
+            ORDER BY s.name, s.file_path, s.line_number
+        """, params)
+        return [self._make_row(row, fields) for row in cursor.fetchall()]
+
+    @_timed_query
+    def search(self, query: str, kind: Optional[str] = None, mode: str = 'auto',
+               limit: int = 20, offset: int = 0,
+               fields: Optional[Sequence[str]] = None, summary: bool = False) -> List[SymbolRow]:
+        """
+        排序搜索：精确 > 前缀 > 词元（camelCase/snake_case）> 子串 > 模糊（容错拼写）
+
+        同一层级内按名称长度、名称、文件、行号排序；每个符号只出现在最高层级。
+        模糊匹配只在前面的层级不足 offset + limit 条时才计算。
+
+        Args:
+            query: 查询字符串（不区分大小写）
+            kind: 符号类型过滤
+            mode: 搜索模式（见 SEARCH_MODES）
+            limit: 返回的最大条数
+            offset: 跳过的条数（分页）
+            fields: 返回的字段（见 SYMBOL_FIELDS，None 表示全部）
+            summary: 摘要模式（不读取 metadata，优先于 fields）
+
+        Returns:
+            符号列表，每项额外包含 'match'（匹配层级）与 'score'（分数）
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Invalid search mode: {mode}")
+        fields = _resolve_fields(fields, summary)
+        columns = _columns_for(fields)
+
+        query = query.strip()
+        need = offset + limit
+        if not query or limit <= 0:
+            return []
+
+        self.connect()
+        matches: List[Tuple[str, float, Tuple]] = []
+        seen = set()
+
+        for tier in SEARCH_MODES[mode]:
+            if len(matches) >= need:
+                break
+
+            # 多取 len(seen) 条以抵消与前面层级的重复
+            rows = self._search_tier(tier, query, kind, need - len(matches) + len(seen), columns)
+            for score, row in rows:
+                if row[0] in seen:
+                    continue
+                seen.add(row[0])
+                matches.append((tier, score, row))
+                if len(matches) >= need:
+                    break
+
+        results = []
+        for tier, score, row in matches[offset:need]:
+            result = self._make_row(row, fields)
+            result['match'] = tier
+            result['score'] = score
+            results.append(result)
+        return results
+
+    def _search_tier(self, tier: str, query: str, kind: Optional[str], limit: int,
+                     columns: str) -> List[Tuple[float, Tuple]]:
+        """执行单个匹配层级的查询，返回 [(分数, 行)]"""
+        cursor = self.conn.cursor()
+        order = "ORDER BY length(s.name), s.name, s.file_path, s.line_number LIMIT ?"
+        kind_clause = " AND s.kind = ?" if kind else ""
+        kind_params = [kind] if kind else []
+        escaped = _escape_like(query)
+
+        if tier == 'exact':
+            sql = f"SELECT {columns} FROM symbols s WHERE s.name = ? COLLATE NOCASE"
+            params = [query]
+        elif tier == 'prefix':
+            sql = f"SELECT {columns} FROM symbols s WHERE s.name LIKE ? ESCAPE '\\'"
+            params = [escaped + '%']
+        elif tier == 'token':
+            from utils import split_identifier
+
+            tokens = split_identifier(query)
+            if not tokens or not self._has_table('symbol_tokens'):
+                return []
+            # 每个查询词元都需作为某个名称词元的前缀出现
+            subqueries = " INTERSECT ".join(
+                "SELECT symbol_id FROM symbol_tokens WHERE token >= ? AND token < ?" for _ in tokens
+            )
+            sql = f"SELECT {columns} FROM symbols s WHERE s.id IN ({subqueries})"
+            params = [bound for token in tokens for bound in (token, _prefix_upper_bound(token))]
+        elif tier == 'substring':
+            sql = f"SELECT {columns} FROM symbols s WHERE s.name LIKE ? ESCAPE '\\'"
+            params = ['%' + escaped + '%']
+            if len(query) >= TRIGRAM_MIN_LENGTH and self._has_table('symbols_fts'):
+                # FTS5 不支持 ESCAPE：用未转义的模式（结果是超集）走 trigram 索引，再精确过滤
+                sql += " AND s.id IN (SELECT rowid FROM symbols_fts WHERE name LIKE ?)"
+                params.append(f"%{query}%")
+        else:
+            return self._search_fuzzy(cursor, query, kind, limit, columns)
+
+        score = MATCH_SCORES[tier]
+        cursor.execute(f"{sql}{kind_clause} {order}", params + kind_params + [limit])
+        return [(score, row) for row in cursor.fetchall()]
+
+    def _search_fuzzy(self, cursor: sqlite3.Cursor, query: str, kind: Optional[str],
+                      limit: int, columns: str) -> List[Tuple[float, Tuple]]:
+        """
+        容错拼写匹配：先收集候选，再按有界编辑距离筛选与排序
+
+        候选来源：
+        - 词元表：查询的每个词元都在词汇表中找到编辑距离在上限内的近似词元
+          （首字母相同、长度相近），取同时包含这些近似词元的符号
+        - trigram 索引：单个词元的查询（如全小写的连写名称）在词元候选不足 limit 条时
+          再取与其共享 trigram 的名称（bm25 排名靠前者）
+        两者都不可用时按名称长度过滤后扫描。
+
+        候选只读取 ID、名称与排序所需的列；同名符号只计算一次编辑距离，且只为
+        共享 trigram 最多的 FUZZY_SCORED_NAMES 个名称计算，最后只读取返回的行。
+        """
+        from utils import split_identifier
+
+        needle = query.lower()
+        query_tokens = split_identifier(query) or [needle]
+        max_distance = _max_typo_distance(needle)
+        kind_clause = " AND s.kind = ?" if kind else ""
+        kind_params = [kind] if kind else []
+        candidates: Dict[int, Tuple] = {}  # id -> (id, name, file_path, line_number)
+
+        if self._has_table('symbol_tokens'):
+            similar = [self._similar_tokens(cursor, token) for token in query_tokens]
+            if all(similar):
+                subqueries = " INTERSECT ".join(
+                    f"SELECT symbol_id FROM symbol_tokens WHERE token IN ({', '.join('?' for _ in tokens)})"
+                    for tokens in similar
+                )
+                cursor.execute(f"""
+                    SELECT {_CANDIDATE_COLUMNS} FROM symbols s
+                    WHERE s.id IN (SELECT symbol_id FROM ({subqueries}) LIMIT ?){kind_clause}
+                """, [token for tokens in similar for token in tokens] + [FUZZY_CANDIDATES] + kind_params)
+                candidates.update((row[0], row) for row in cursor.fetchall())
+
+        trigrams = sorted({needle[i:i + 3] for i in range(len(needle) - 2)})
+        if (len(query_tokens) == 1 and trigrams and len(candidates) < limit
+                and self._has_table('symbols_fts')):
+            match = " OR ".join('"' + gram.replace('"', '""') + '"' for gram in trigrams)
+            cursor.execute(f"""
+                SELECT {_CANDIDATE_COLUMNS} FROM symbols s
+                WHERE s.id IN (
+                    SELECT rowid FROM symbols_fts WHERE symbols_fts MATCH ? ORDER BY rank LIMIT ?
+                ){kind_clause}
+            """, [match, FUZZY_CANDIDATES] + kind_params)
+            candidates.update((row[0], row) for row in cursor.fetchall())
+
+        if not self._has_table('symbol_tokens') and not self._has_table('symbols_fts'):
+            cursor.execute(f"""
+                SELECT {_CANDIDATE_COLUMNS} FROM symbols s
+                WHERE length(s.name) BETWEEN ? AND ?{kind_clause}
+            """, [max(1, len(needle) - max_distance), len(needle) + max_distance] + kind_params)
+            candidates.update((row[0], row) for row in cursor.fetchall())
+
+        # 同名符号只计算一次距离；按共享 trigram 数与长度差排序后截取
+        rows_by_name: Dict[str, List[Tuple]] = {}
+        for row in candidates.values():
+            rows_by_name.setdefault(row[1], []).append(row)
+        query_grams = set(trigrams)
+        names = sorted(rows_by_name, key=lambda name: (
+            -len(query_grams.intersection(name.lower()[i:i + 3] for i in range(len(name) - 2))),
+            abs(len(name) - len(needle)),
+            name,
+        ))[:FUZZY_SCORED_NAMES]
+
+        scored = []
+        for name in names:
+            distance = _bounded_edit_distance(needle, name.lower(), max_distance)
+            if distance > max_distance:
+                # 逐词元比较：每个查询词元取与名称词元的最小距离之和
+                name_tokens = split_identifier(name)
+                distance = sum(
+                    min((_bounded_edit_distance(token, name_token, max_distance)
+                         for name_token in name_tokens), default=max_distance + 1)
+                    for token in query_tokens
+                )
+            if distance <= max_distance:
+                score = MATCH_SCORES['fuzzy'] * (1 - distance / (max_distance + 1))
+                for symbol_id, _, file_path, line_number in rows_by_name[name]:
+                    scored.append((distance, len(name), name, file_path, line_number or 0, score, symbol_id))
+
+        scored.sort(key=lambda item: item[:5])
+        top = scored[:limit]
+        if not top:
+            return []
+
+        # 只为返回的符号读取完整的列
+        cursor.execute(
+            f"SELECT {columns} FROM symbols s WHERE s.id IN ({', '.join('?' for _ in top)})",
+            [item[6] for item in top]
+        )
+        rows = {row[0]: row for row in cursor.fetchall()}
+        return [(item[5], rows[item[6]]) for item in top]
+
+    def _similar_tokens(self, cursor: sqlite3.Cursor, token: str) -> List[str]:
+        """词汇表中与 token 编辑距离在上限内的词元（首字母相同，走主键范围查询）"""
+        max_distance = _max_typo_distance(token)
+        cursor.execute("""
+            SELECT DISTINCT token FROM symbol_tokens
+            WHERE token >= ? AND token < ? AND length(token) BETWEEN ? AND ?
+        """, (token[0], _prefix_upper_bound(token[0]),
+              len(token) - max_distance, len(token) + max_distance))
+        return [row[0] for row in cursor.fetchall()
+                if _bounded_edit_distance(token, row[0], max_distance) <= max_distance]
+
+    @_timed_query
+    def get_file_symbols(self, file_path: str, fields: Optional[Sequence[str]] = None,
+                         summary: bool = False) -> List[SymbolRow]:
+        """
+        获取文件中的所有符号
+
+        Args:
+            file_path: 文件路径（相对路径）
+            fields: 返回的字段（见 SYMBOL_FIELDS，None 表示全部）
+            summary: 摘要模式（不读取 metadata，优先于 fields）
+
+        Returns:
+            符号列表
+        """
+        fields = _resolve_fields(fields, summary)
+        self.connect()
+        cursor = self.conn.cursor()
+
+        cursor.execute(f"""
+            SELECT {_columns_for(fields)}
+            FROM symbols s
+            WHERE s.file_path = ?
+            ORDER BY s.line_number, s.id
+        """, (file_path,))
+        return [self._make_row(row, fields) for row in cursor.fetchall()]
+
+    @_timed_query
+    def find_callers(self, name: str, kind: Optional[str] = None,
+                     fields: Optional[Sequence[str]] = None, summary: bool = False) -> List[SymbolRow]:
+        """
+        查找调用（或实例化）指定符号的符号
+
+        Args:
+            name: 被调用符号的名称
+            kind: 被调用符号的类型过滤（'function', 'class'）
+            fields: 返回的字段（见 SYMBOL_FIELDS，None 表示全部）
+            summary: 摘要模式（不读取 metadata，优先于 fields）
+
+        Returns:
+            调用方符号列表（额外包含 dep_type：'call' 或 'instantiation'）
+        """
+        return self._find_related(name, kind, fields, summary, 'to_symbol', 'from_symbol')
+
+    @_timed_query
+    def find_callees(self, name: str, kind: Optional[str] = None,
+                     fields: Optional[Sequence[str]] = None, summary: bool = False) -> List[SymbolRow]:
+        """
+        查找指定符号调用（或实例化）的符号
+
+        Args:
+            name: 调用方符号的名称
+            kind: 调用方符号的类型过滤（'function', 'class', 'file'）
+            fields: 返回的字段（见 SYMBOL_FIELDS，None 表示全部）
+            summary: 摘要模式（不读取 metadata，优先于 fields）
+
+        Returns:
+            被调用符号列表（额外包含 dep_type：'call' 或 'instantiation'）
+        """
+        return self._find_related(name, kind, fields, summary, 'from_symbol', 'to_symbol')
+
+    def _find_related(self, name: str, kind: Optional[str], fields: Optional[Sequence[str]],
+                      summary: bool, match_column: str, result_column: str) -> List[SymbolRow]:
+        """沿 dependencies 表查找相关符号（名称索引 + idx_deps_from/idx_deps_to）"""
+        fields = _resolve_fields(fields, summary)
+        self.connect()
+
+        sql = f"""
+            SELECT DISTINCT {_columns_for(fields)}, d.dep_type
+            FROM symbols t
+            JOIN dependencies d ON d.{match_column} = t.id
+            JOIN symbols s ON s.id = d.{result_column}
+            WHERE t.name = ?
+        """
+        params: List = [name]
+        if kind:
+            sql += " AND t.kind = ?"
+            params.append(kind)
+
+        results = []
+        for row in self.conn.execute(f"{sql} ORDER BY s.file_path, s.line_number, s.id", params):
+            result = self._make_row(row, fields)
+            result['dep_type'] = row[-1]
+            results.append(result)
+        return results
+
+    @_timed_query
+    def get_statistics(self) -> Dict:
+        """
+        获取索引统计信息
+
+        Returns:
+            统计信息字典
+        """
+        self.connect()
+        cursor = self.conn.cursor()
+
+        # 总符号数
+        cursor.execute("SELECT COUNT(*) FROM symbols")
+        total_symbols = cursor.fetchone()[0]
+
+        # 按类型统计
+        cursor.execute("""
+            SELECT kind, COUNT(*) as count
+            FROM symbols
+            GROUP BY kind
+            ORDER BY count DESC
+        """)
+        by_kind = {row[0]: row[1] for row in cursor.fetchall()}
+
+        # 文件数
+        cursor.execute("SELECT COUNT(DISTINCT file_path) FROM symbols")
+        total_files = cursor.fetchone()[0]
+
+        # 按文件统计
+        cursor.execute("""
+            SELECT file_path, COUNT(*) as count
+            FROM symbols
+            GROUP BY file_path
+            ORDER BY count DESC
+            LIMIT 10
+        """)
+        top_files = [{"path": row[0], "symbols": row[1]} for row in cursor.fetchall()]
+
+        return {
+            "total_symbols": total_symbols,
+            "total_files": total_files,
+            "by_kind": by_kind,
+            "top_files": top_files
+        }
+
+
+def _resolve_fields(fields: Optional[Sequence[str]], summary: bool) -> Tuple[str, ...]:
+    """校验并规范化字段投影"""
+    if summary:
+        return SUMMARY_FIELDS
+    if fields is None:
+        return SYMBOL_FIELDS
+    if isinstance(fields, str):
+        fields = [fields]
+
+    unknown = [field for field in fields if field not in _FIELD_INDEX]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)} (choose from {', '.join(SYMBOL_FIELDS)})")
+    return tuple(dict.fromkeys(fields))
+
+
+def _columns_for(fields: Tuple[str, ...]) -> str:
+    """字段投影对应的 SELECT 列（metadata 只在需要时读取）"""
+    return _BASE_COLUMNS + (", s.metadata" if 'metadata' in fields else "")
+
+
+def _decode_metadata(value: str) -> Any:
+    """解析 metadata JSON（无法解析时保留原文）"""
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+def _escape_like(text: str) -> str:
+    """转义 LIKE 通配符（配合 ESCAPE '\\' 使用）"""
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _prefix_upper_bound(prefix: str) -> str:
+    """前缀范围查询的上界（token >= prefix AND token < upper）"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def _max_typo_distance(text: str) -> int:
+    """按查询长度允许的最大编辑距离"""
+    if len(text) <= 4:
+        return 1
+    if len(text) <= 8:
+        return 2
+    return 3
+
+
+def _bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Levenshtein 编辑距离（超过 max_distance 时提前返回 max_distance + 1）
+
+    Args:
+        a: 字符串 a
+        b: 字符串 b
+        max_distance: 关心的最大距离
+
+    Returns:
+        编辑距离，超过上限时为 max_distance + 1
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+
+    # 只计算对角线两侧 max_distance 以内的单元格（带外的距离必然超过上限）
+    limit = max_distance + 1
+    previous = [j if j <= max_distance else limit for j in range(len(b) + 1)]
+    for i, char_a in enumerate(a, 1):
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        current = [limit] * (len(b) + 1)
+        current[0] = i if i <= max_distance else limit
+        best = current[0]
+        for j in range(low, high + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != b[j - 1])
+            )
+            current[j] = value if value < limit else limit
+            if current[j] < best:
+                best = current[j]
+        if best > max_distance:
+            return limit
+        previous = current
+
+    return previous[-1]
+
+
+def find_database(project_path: str) -> Tuple[Optional[str], List[str]]:
+    """
+    在项目中查找符号数据库（用 os.path 而非 pathlib，命令行启动时少导入一批模块）
+
+    Args:
+        project_path: 项目根目录
+
+    Returns:
+        (数据库路径或 None, 搜索过的路径)
+    """
+    possible_paths = [
+        os.path.join(project_path, "symbols.db"),
+        # generate.py 的默认输出目录
+        os.path.join(project_path, "docs", "static", "architecture", ".cache", "symbols.db"),
+        os.path.join(project_path, "docs", "architecture", ".cache", "symbols.db"),
+    ]
+
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path, possible_paths
+    return None, possible_paths
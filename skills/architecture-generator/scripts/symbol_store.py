@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+"""
+Normalized metadata storage for the symbol index.
+
+Each symbol row keeps only its own metadata (the "residual"): content that
+is already stored elsewhere is replaced by a marker and reassembled on read.
+- Children that have their own symbol rows (a file's classes/functions,
+  a class's methods/nested classes) are not repeated in the parent.
+- Parameters, decorators, bases, file dependencies and patterns live in
+  side tables whose strings are interned in `symbol_strings`.
+- The file path, repeated in every nested dict, is stored once on the row.
+
+The residual is compact JSON, optionally zlib-compressed (stored as BLOB).
+Reads reassemble exactly the dicts produced by EnhancedASTAnalyzer, one
+file at a time (a handful of queries per file, independent of its size).
+"""
+
+import json
+import sqlite3
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# 符号数据库的结构版本（PRAGMA user_version）；版本不同的旧索引需要重建
+SCHEMA_VERSION = 4
+
+# 残余 metadata 中的占位值（真实内容在子符号行或规范化表中）
+ROWS_MARKER = '@rows'
+FILE_MARKER = '@file'
+PARAMETERS_MARKER = '@parameters'
+DECORATORS_MARKER = '@decorators'
+BASES_MARKER = '@bases'
+DEPENDENCIES_MARKER = '@dependencies'
+PATTERNS_MARKER = '@patterns'
+
+# 子符号行对应的字段及其符号类型
+CHILD_ROW_KINDS = {
+    'classes': 'class',
+    'functions': 'function',
+    'methods': 'function',
+    'nested_classes': 'class',
+}
+
+# 可能含占位值的字段
+_MARKER_KEYS = tuple(CHILD_ROW_KINDS) + ('parameters', 'decorators', 'bases', 'dependencies', 'patterns')
+
+# 值为文件路径的字段
+FILE_PATH_KEYS = ('file_path', 'source_file')
+
+# 残余 metadata 达到该大小（字节）才尝试压缩
+COMPRESS_MIN_BYTES = 256
+
+# 可规范化存储的参数与依赖项（键及顺序必须完全一致，否则原样保留在残余中）
+_PARAMETER_KEYS = ('name', 'type_annotation', 'default_value', 'is_positional_only',
+                   'is_keyword_only', 'is_var_positional', 'is_var_keyword')
+_DEPENDENCY_KEYS = ('name', 'dep_type', 'line_number', 'is_external', 'module_path', 'source_file')
+
+# 参数标志位
+_PARAMETER_FLAGS = (
+    ('is_positional_only', 1),
+    ('is_keyword_only', 2),
+    ('is_var_positional', 4),
+    ('is_var_keyword', 8),
+)
+
+# 规范化表（都以 symbol_id 开头的主键组织，按符号删除与读取都是范围扫描）
+_SIDE_TABLES = ('symbol_parameters', 'symbol_decorators', 'symbol_bases',
+                'file_dependencies', 'file_patterns')
+
+
+def create_tables(cursor: sqlite3.Cursor):
+    """创建字符串表与规范化表"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symbol_strings (
+            id INTEGER PRIMARY KEY,
+            value TEXT NOT NULL UNIQUE
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS symbol_parameters (
+            symbol_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name_id INTEGER NOT NULL,
+            annotation_id INTEGER,
+            default_id INTEGER,
+            flags INTEGER NOT NULL,
+            PRIMARY KEY (symbol_id, position)
+        ) WITHOUT ROWID
+    """)
+    for table in ('symbol_decorators', 'symbol_bases'):
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                symbol_id INTEGER NOT NULL,
+                position INTEGER NOT NULL,
+                value_id INTEGER NOT NULL,
+                PRIMARY KEY (symbol_id, position)
+            ) WITHOUT ROWID
+        """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS file_dependencies (
+            symbol_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name_id INTEGER NOT NULL,
+            dep_type_id INTEGER NOT NULL,
+            line_number INTEGER,
+            is_external INTEGER NOT NULL,
+            module_id INTEGER,
+            PRIMARY KEY (symbol_id, category_id, position)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS file_patterns (
+            symbol_id INTEGER NOT NULL,
+            category_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            line_number INTEGER,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (symbol_id, category_id, position)
+        ) WITHOUT ROWID
+    """)
+
+
+def delete_metadata(conn: sqlite3.Connection, ids_table: str = 'stale_ids'):
+    """
+    删除符号的规范化 metadata（字符串表只增不减）
+
+    Args:
+        conn: 数据库连接（调用方负责事务）
+        ids_table: 存放待删除符号 ID 的表（列名 id）
+    """
+    for table in _SIDE_TABLES:
+        conn.execute(f"DELETE FROM {table} WHERE symbol_id IN (SELECT id FROM {ids_table})")
+
+
+class MetadataWriter:
+    """将符号 metadata 拆分为残余 JSON 与规范化表的行（批量写入）"""
+
+    def __init__(self, conn: sqlite3.Connection, compress: bool = True):
+        """
+        初始化写入器
+
+        Args:
+            conn: 数据库连接（表已创建）
+            compress: 是否压缩较大的残余 metadata
+        """
+        self.conn = conn
+        self.compress = compress
+        self._strings: Dict[str, int] = {}
+        self._next_string_id = conn.execute(
+            "SELECT COALESCE(MAX(id), 0) FROM symbol_strings"
+        ).fetchone()[0] + 1
+        self._strings_empty = self._next_string_id == 1
+
+        self._new_strings: List[Tuple[int, str]] = []
+        self._parameters: List[Tuple] = []
+        self._decorators: List[Tuple] = []
+        self._bases: List[Tuple] = []
+        self._dependencies: List[Tuple] = []
+        self._patterns: List[Tuple] = []
+
+    def intern(self, value: Optional[str]) -> Optional[int]:
+        """获取字符串的 ID（新字符串在 flush 时写入）"""
+        if value is None:
+            return None
+        string_id = self._strings.get(value)
+        if string_id is None:
+            row = None if self._strings_empty else self.conn.execute(
+                "SELECT id FROM symbol_strings WHERE value = ?", (value,)
+            ).fetchone()
+            if row is not None:
+                string_id = row[0]
+            else:
+                string_id = self._next_string_id
+                self._next_string_id += 1
+                self._new_strings.append((string_id, value))
+            self._strings[value] = string_id
+        return string_id
+
+    def encode(self, symbol_id: int, rel_path: str, metadata: Optional[Dict]) -> Optional[Any]:
+        """
+        拆分单个符号的 metadata
+
+        Args:
+            symbol_id: 符号 ID
+            rel_path: 符号所在文件（相对路径）
+            metadata: metadata 字典（子符号行已用 ROWS_MARKER 标记）
+
+        Returns:
+            残余 metadata（JSON 文本，或压缩后的 bytes；无 metadata 时为 None）
+        """
+        if metadata is None:
+            return None
+
+        residual = {}
+        for key, value in metadata.items():
+            if key == 'parameters' and _is_parameter_list(value):
+                self._add_parameters(symbol_id, value)
+                value = PARAMETERS_MARKER
+            elif key == 'decorators' and _is_string_list(value):
+                self._decorators.extend(
+                    (symbol_id, i, self.intern(item)) for i, item in enumerate(value)
+                )
+                value = DECORATORS_MARKER
+            elif key == 'bases' and _is_string_list(value):
+                self._bases.extend(
+                    (symbol_id, i, self.intern(item)) for i, item in enumerate(value)
+                )
+                value = BASES_MARKER
+            elif key == 'dependencies' and isinstance(value, dict):
+                value = self._add_dependencies(symbol_id, rel_path, value)
+            elif key == 'patterns' and isinstance(value, dict):
+                value = self._add_patterns(symbol_id, rel_path, value)
+            else:
+                value = _replace_file_path(value, rel_path, key)
+            residual[key] = value
+
+        text = json.dumps(residual, ensure_ascii=False, separators=(',', ':'))
+        if self.compress and len(text) >= COMPRESS_MIN_BYTES:
+            packed = zlib.compress(text.encode('utf-8'))
+            if len(packed) < len(text):
+                return packed
+        return text
+
+    def _add_parameters(self, symbol_id: int, parameters: List[Dict]):
+        """参数写入 symbol_parameters"""
+        for i, param in enumerate(parameters):
+            flags = 0
+            for key, bit in _PARAMETER_FLAGS:
+                if param[key]:
+                    flags |= bit
+            self._parameters.append((
+                symbol_id, i, self.intern(param['name']),
+                self.intern(param['type_annotation']),
+                self.intern(param['default_value']), flags
+            ))
+
+    def _add_dependencies(self, symbol_id: int, rel_path: str, dependencies: Dict) -> Dict:
+        """文件依赖写入 file_dependencies，返回保留分类顺序的占位字典"""
+        placeholder = {}
+        for category, items in dependencies.items():
+            if not _is_dependency_list(items, rel_path):
+                placeholder[category] = _replace_file_path(items, rel_path)
+                continue
+            category_id = self.intern(category)
+            for i, dep in enumerate(items):
+                self._dependencies.append((
+                    symbol_id, category_id, i, self.intern(dep['name']),
+                    self.intern(dep['dep_type']), dep['line_number'],
+                    1 if dep['is_external'] else 0, self.intern(dep['module_path'])
+                ))
+            placeholder[category] = DEPENDENCIES_MARKER
+        return placeholder
+
+    def _add_patterns(self, symbol_id: int, rel_path: str, patterns: Dict) -> Dict:
+        """代码模式写入 file_patterns，返回保留分类顺序的占位字典"""
+        placeholder = {}
+        for category, items in patterns.items():
+            if not (isinstance(items, list) and all(isinstance(item, dict) for item in items)):
+                placeholder[category] = _replace_file_path(items, rel_path)
+                continue
+            category_id = self.intern(category)
+            for i, item in enumerate(items):
+                payload = _replace_file_path(item, rel_path)
+                self._patterns.append((
+                    symbol_id, category_id, i, item.get('line_number'),
+                    json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+                ))
+            placeholder[category] = PATTERNS_MARKER
+        return placeholder
+
+    def flush(self):
+        """写入缓冲的字符串与规范化行（在调用方的事务中执行）"""
+        self.conn.executemany(
+            "INSERT INTO symbol_strings (id, value) VALUES (?, ?)", self._new_strings
+        )
+        self.conn.executemany(
+            "INSERT INTO symbol_parameters VALUES (?, ?, ?, ?, ?, ?)", self._parameters
+        )
+        self.conn.executemany("INSERT INTO symbol_decorators VALUES (?, ?, ?)", self._decorators)
+        self.conn.executemany("INSERT INTO symbol_bases VALUES (?, ?, ?)", self._bases)
+        self.conn.executemany(
+            "INSERT INTO file_dependencies VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._dependencies
+        )
+        self.conn.executemany("INSERT INTO file_patterns VALUES (?, ?, ?, ?, ?)", self._patterns)
+
+        self._strings_empty = False
+        self._new_strings = []
+        self._parameters = []
+        self._decorators = []
+        self._bases = []
+        self._dependencies = []
+        self._patterns = []
+
+
+class MetadataReader:
+    """从残余 metadata 与规范化表还原完整 metadata（按文件批量读取并缓存）"""
+
+    def __init__(self, conn: sqlite3.Connection, cache_files: int = 8):
+        """
+        初始化读取器
+
+        Args:
+            conn: 数据库连接
+            cache_files: 缓存的文件数（按最近使用淘汰）
+        """
+        self.conn = conn
+        self.cache_files = cache_files
+        self._files: 'OrderedDict[str, _FileBundle]' = OrderedDict()
+
+    def load(self, symbol_id: int, file_path: str) -> Any:
+        """
+        还原单个符号的 metadata
+
+        Args:
+            symbol_id: 符号 ID
+            file_path: 符号所在文件（相对路径）
+
+        Returns:
+            与构建时相同的 metadata（无 metadata 时为 None）
+        """
+        bundle = self._files.get(file_path)
+        if bundle is None:
+            bundle = _FileBundle(self.conn, file_path)
+            self._files[file_path] = bundle
+            if len(self._files) > self.cache_files:
+                self._files.popitem(last=False)
+        else:
+            self._files.move_to_end(file_path)
+        return bundle.metadata(symbol_id)
+
+    def clear(self):
+        """清空缓存"""
+        self._files.clear()
+
+
+class _FileBundle:
+    """单个文件的全部符号行与规范化数据（只缓存原始行，每次还原都构造新的字典）"""
+
+    def __init__(self, conn: sqlite3.Connection, file_path: str):
+        self.file_path = file_path
+        self._decoder = json.JSONDecoder(object_hook=self._restore_file_path)
+        self.rows: Dict[int, Tuple[str, Any]] = {}  # id -> (kind, residual)
+        self.children: Dict[int, List[int]] = defaultdict(list)
+
+        for symbol_id, kind, parent_id, residual in conn.execute("""
+            SELECT id, kind, parent_id, metadata FROM symbols WHERE file_path = ? ORDER BY id
+        """, (file_path,)):
+            self.rows[symbol_id] = (kind, residual)
+            if parent_id is not None:
+                self.children[parent_id].append(symbol_id)
+
+        # 字符串在查询中直接连接（每张表一次查询）
+        file_ids = "SELECT id FROM symbols WHERE file_path = ?"
+
+        self.parameters: Dict[int, List[Tuple]] = defaultdict(list)
+        for symbol_id, *param in conn.execute(f"""
+            SELECT p.symbol_id, n.value, a.value, d.value, p.flags
+            FROM symbol_parameters p
+            JOIN symbol_strings n ON n.id = p.name_id
+            LEFT JOIN symbol_strings a ON a.id = p.annotation_id
+            LEFT JOIN symbol_strings d ON d.id = p.default_id
+            WHERE p.symbol_id IN ({file_ids}) ORDER BY p.symbol_id, p.position
+        """, (file_path,)):
+            self.parameters[symbol_id].append(param)
+
+        self.decorators = self._load_values(conn, 'symbol_decorators', file_ids)
+        self.bases = self._load_values(conn, 'symbol_bases', file_ids)
+
+        self.dependencies: Dict[Tuple[int, str], List[Tuple]] = defaultdict(list)
+        for symbol_id, category, *dep in conn.execute(f"""
+            SELECT f.symbol_id, c.value, n.value, t.value, f.line_number, f.is_external, m.value
+            FROM file_dependencies f
+            JOIN symbol_strings c ON c.id = f.category_id
+            JOIN symbol_strings n ON n.id = f.name_id
+            JOIN symbol_strings t ON t.id = f.dep_type_id
+            LEFT JOIN symbol_strings m ON m.id = f.module_id
+            WHERE f.symbol_id IN ({file_ids}) ORDER BY f.symbol_id, f.category_id, f.position
+        """, (file_path,)):
+            self.dependencies[(symbol_id, category)].append(dep)
+
+        self.patterns: Dict[Tuple[int, str], List[str]] = defaultdict(list)
+        for symbol_id, category, payload in conn.execute(f"""
+            SELECT f.symbol_id, c.value, f.payload
+            FROM file_patterns f JOIN symbol_strings c ON c.id = f.category_id
+            WHERE f.symbol_id IN ({file_ids}) ORDER BY f.symbol_id, f.category_id, f.position
+        """, (file_path,)):
+            self.patterns[(symbol_id, category)].append(payload)
+
+    def _load_values(self, conn: sqlite3.Connection, table: str,
+                     file_ids: str) -> Dict[int, List[str]]:
+        """读取 (symbol_id, position, value_id) 形式的表"""
+        values: Dict[int, List[str]] = defaultdict(list)
+        for symbol_id, value in conn.execute(f"""
+            SELECT t.symbol_id, v.value FROM {table} t JOIN symbol_strings v ON v.id = t.value_id
+            WHERE t.symbol_id IN ({file_ids}) ORDER BY t.symbol_id, t.position
+        """, (self.file_path,)):
+            values[symbol_id].append(value)
+        return values
+
+    def metadata(self, symbol_id: int) -> Any:
+        """还原符号的 metadata"""
+        if symbol_id not in self.rows:
+            return None
+
+        _, residual = self.rows[symbol_id]
+        if residual is None:
+            return None
+        if isinstance(residual, bytes):
+            residual = zlib.decompress(residual).decode('utf-8')
+        return self._restore(symbol_id, self._decoder.decode(residual))
+
+    def _restore_file_path(self, obj: Dict) -> Dict:
+        """JSON object_hook：还原 FILE_MARKER"""
+        for key in FILE_PATH_KEYS:
+            if obj.get(key) == FILE_MARKER:
+                obj[key] = self.file_path
+        return obj
+
+    def _restore(self, symbol_id: int, residual: Dict) -> Dict:
+        """将占位值替换为真实内容（只检查可能含占位值的键）"""
+        for key in _MARKER_KEYS:
+            value = residual.get(key)
+            if value is None:
+                continue
+            if value == ROWS_MARKER and key in CHILD_ROW_KINDS:
+                kind = CHILD_ROW_KINDS[key]
+                residual[key] = [
+                    self.metadata(child) for child in self.children.get(symbol_id, ())
+                    if self.rows[child][0] == kind
+                ]
+            elif value == PARAMETERS_MARKER and key == 'parameters':
+                residual[key] = [
+                    _parameter_dict(*param) for param in self.parameters.get(symbol_id, ())
+                ]
+            elif value == DECORATORS_MARKER and key == 'decorators':
+                residual[key] = list(self.decorators.get(symbol_id, ()))
+            elif value == BASES_MARKER and key == 'bases':
+                residual[key] = list(self.bases.get(symbol_id, ()))
+            elif key == 'dependencies' and isinstance(value, dict):
+                for category, marker in value.items():
+                    if marker == DEPENDENCIES_MARKER:
+                        value[category] = [
+                            {
+                                'name': name,
+                                'dep_type': dep_type,
+                                'line_number': line_number,
+                                'is_external': bool(is_external),
+                                'module_path': module_path,
+                                'source_file': self.file_path,
+                            }
+                            for name, dep_type, line_number, is_external, module_path
+                            in self.dependencies.get((symbol_id, category), ())
+                        ]
+            elif key == 'patterns' and isinstance(value, dict):
+                for category, marker in value.items():
+                    if marker == PATTERNS_MARKER:
+                        value[category] = [
+                            self._decoder.decode(payload)
+                            for payload in self.patterns.get((symbol_id, category), ())
+                        ]
+        return residual
+
+
+def _parameter_dict(name: str, annotation: Optional[str], default: Optional[str], flags: int) -> Dict:
+    """由参数行构造参数字典"""
+    param = {'name': name, 'type_annotation': annotation, 'default_value': default}
+    for key, bit in _PARAMETER_FLAGS:
+        param[key] = bool(flags & bit)
+    return param
+
+
+def _is_string_list(value: Any) -> bool:
+    """是否为字符串列表"""
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _is_parameter_list(value: Any) -> bool:
+    """是否为可规范化存储的参数列表"""
+    return isinstance(value, list) and all(
+        isinstance(item, dict) and tuple(item) == _PARAMETER_KEYS
+        and isinstance(item['name'], str)
+        and all(item[key] is None or isinstance(item[key], str)
+                for key in ('type_annotation', 'default_value'))
+        and all(isinstance(item[key], bool) for key, _ in _PARAMETER_FLAGS)
+        for item in value
+    )
+
+
+def _is_dependency_list(value: Any, rel_path: str) -> bool:
+    """是否为可规范化存储的依赖列表（source_file 必须是当前文件）"""
+    return isinstance(value, list) and all(
+        isinstance(item, dict) and tuple(item) == _DEPENDENCY_KEYS
+        and isinstance(item['name'], str) and isinstance(item['dep_type'], str)
+        and (item['line_number'] is None or isinstance(item['line_number'], int))
+        and isinstance(item['is_external'], bool)
+        and (item['module_path'] is None or isinstance(item['module_path'], str))
+        and item['source_file'] == rel_path
+        for item in value
+    )
+
+
+def _replace_file_path(value: Any, rel_path: str, key: Optional[str] = None) -> Any:
+    """递归地把等于文件路径的 file_path/source_file 替换为 FILE_MARKER"""
+    if key in FILE_PATH_KEYS and value == rel_path:
+        return FILE_MARKER
+    if isinstance(value, dict):
+        return {k: _replace_file_path(v, rel_path, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_file_path(item, rel_path) for item in value]
+    return value
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Template rendering and output writing for architecture generator.
+
+TemplateEngine owns one Jinja2 Environment for the whole run: each
+template file is loaded and compiled once, and with a cache directory
+the compiled bytecode is kept on disk for later runs. Without Jinja2 it
+falls back to simple `{{ variable }}` substitution.
+
+OutputWriter only writes a page when its content changed since the last
+run (content hashes are kept in a manifest), so untouched pages keep
+their mtime and a run without changes writes nothing. Run-specific
+values such as the generation time are rendered as placeholders, left
+out of the hash and substituted only when the page is written.
+"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+# 只检查是否安装，jinja2 在创建 TemplateEngine 时才导入
+HAS_JINJA2 = importlib.util.find_spec('jinja2') is not None
+
+import metrics
+from scan_file_structure import write_lines, write_tree_document
+
+MANIFEST_VERSION = 1
+
+# 匹配 {% for ext, count in stats.by_extension.items() %}
+_FOR_LOOP_RE = re.compile(
+    r'{%\s+for\s+(\w+),\s*(\w+)\s+in\s+(\w+)\.(\w+)\.items\(\)\s+%}([\s\S]*?){%\s+endfor\s+%}'
+)
+
+PAGES = metrics.counter('pages', 'Documentation pages by write result (written or unchanged)')
+
+
+def render_simple(template: str, **kwargs) -> str:
+    """不依赖 Jinja2 的简单渲染（只支持 {{ variable }} 与基本的 for 循环）"""
+    result = template
+    for key, value in kwargs.items():
+        placeholder = "{{ " + key + " }}"
+        result = result.replace(placeholder, str(value))
+
+    # 处理简单的 for 循环（仅用于基本支持）
+    def replace_for_loop(match):
+        var1, var2, dict_name, dict_key, body = match.groups()
+        items = kwargs.get(dict_name, {}).items()
+        result_lines = []
+        for k, v in items:
+            body_replaced = body.replace(f"{{{{{var1}}}}}", str(k))
+            body_replaced = body_replaced.replace(f"{{{{{var2}}}}}", str(v))
+            result_lines.append(body_replaced)
+        return "\n".join(result_lines)
+
+    return _FOR_LOOP_RE.sub(replace_for_loop, result)
+
+
+class TemplateEngine:
+    """模板引擎（整个运行共用一个 Environment，模板只加载与编译一次）"""
+
+    def __init__(self, templates_dir: Path, cache_dir: Optional[Path] = None):
+        """
+        初始化模板引擎
+
+        Args:
+            templates_dir: 模板目录
+            cache_dir: 编译结果（字节码）的磁盘缓存目录（None 表示不缓存到磁盘）
+        """
+        self.templates_dir = Path(templates_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self._sources: Dict[str, str] = {}
+        self.env = None
+        if HAS_JINJA2:
+            from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+            bytecode_cache = None
+            if self.cache_dir is not None:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                bytecode_cache = FileSystemBytecodeCache(str(self.cache_dir))
+            # 模板在一次运行中不会变化，不需要检查修改时间
+            self.env = Environment(
+                loader=FileSystemLoader(str(self.templates_dir)),
+                bytecode_cache=bytecode_cache,
+                auto_reload=False,
+            )
+
+    def render(self, name: str, **kwargs) -> str:
+        """
+        渲染模板
+
+        Args:
+            name: 模板文件名（相对 templates_dir）
+            **kwargs: 模板变量
+
+        Returns:
+            渲染结果
+        """
+        if self.env is not None:
+            return self.env.get_template(name).render(**kwargs)
+        source = self._sources.get(name)
+        if source is None:
+            source = self._sources[name] = (self.templates_dir / name).read_text(encoding='utf-8')
+        return render_simple(source, **kwargs)
+
+
+class _HashSink:
+    """只计算哈希的写入目标（与 write_lines 配合，不在内存中拼接页面）"""
+
+    def __init__(self):
+        self.hash = hashlib.sha256()
+
+    def write(self, text: str):
+        self.hash.update(text.encode('utf-8'))
+
+
+class OutputWriter:
+    """只在内容变化时写出页面"""
+
+    def __init__(self, root: Path, manifest_path: Path,
+                 substitutions: Optional[Dict[str, str]] = None):
+        """
+        初始化输出写入器
+
+        Args:
+            root: 输出根目录（清单中的路径相对于它）
+            manifest_path: 内容哈希清单的路径
+            substitutions: 写出时才替换的占位符（占位符 -> 实际值，不参与哈希）
+        """
+        self.root = Path(root)
+        self.manifest_path = Path(manifest_path)
+        self.substitutions = substitutions or {}
+        self.written = 0
+        self.unchanged = 0
+        self._manifest: Dict[str, Dict] = {}
+        self._dirty = False
+        self._load_manifest()
+
+    def _load_manifest(self):
+        try:
+            data = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get('version') == MANIFEST_VERSION:
+            self._manifest = data.get('files', {})
+
+    def _is_current(self, key: str, digest: str, path: Path) -> bool:
+        """清单中的哈希相同，且文件仍是上次写出的大小"""
+        entry = self._manifest.get(key)
+        if entry is None or entry.get('sha256') != digest:
+            return False
+        try:
+            return path.stat().st_size == entry.get('size')
+        except OSError:
+            return False
+
+    def _record(self, key: str, digest: str, path: Path):
+        self._manifest[key] = {'sha256': digest, 'size': path.stat().st_size}
+        self._dirty = True
+        self.written += 1
+        PAGES.inc(result='written')
+
+    def _skip(self):
+        self.unchanged += 1
+        PAGES.inc(result='unchanged')
+
+    def _substitute(self, text: str) -> str:
+        for placeholder, value in self.substitutions.items():
+            text = text.replace(placeholder, value)
+        return text
+
+    def write(self, path: Path, content: str) -> bool:
+        """
+        写出页面（内容未变化时跳过）
+
+        Args:
+            path: 输出文件路径
+            content: 页面内容（可含 substitutions 中的占位符）
+
+        Returns:
+            是否写入了文件
+        """
+        path = Path(path)
+        key = path.relative_to(self.root).as_posix()
+        digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
+        if self._is_current(key, digest, path):
+            self._skip()
+            return False
+        path.write_text(self._substitute(content), encoding='utf-8')
+        self._record(key, digest, path)
+        return True
+
+    def write_document(self, path: Path, document: str, placeholder: str,
+                       lines: Callable[[], Iterable[str]]) -> bool:
+        """
+        写出在占位符处流式插入行的页面（见 write_tree_document）
+
+        先流式计算哈希，内容变化时再生成一次行并写出，整个页面不在内存中拼接。
+
+        Args:
+            path: 输出文件路径
+            document: 已渲染的页面（流式部分为 placeholder）
+            placeholder: 占位符字符串
+            lines: 返回行迭代器的函数（内容变化时调用两次）
+
+        Returns:
+            是否写入了文件
+        """
+        path = Path(path)
+        key = path.relative_to(self.root).as_posix()
+        head, _, tail = document.partition(placeholder)
+        sink = _HashSink()
+        sink.write(head)
+        write_lines(sink, lines())
+        sink.write(tail)
+        digest = sink.hash.hexdigest()
+        if self._is_current(key, digest, path):
+            self._skip()
+            return False
+        write_tree_document(path, self._substitute(document), placeholder, lines())
+        self._record(key, digest, path)
+        return True
+
+    def save(self):
+        """保存清单（没有写出任何页面时不写）"""
+        if not self._dirty:
+            return
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f".{self.manifest_path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(
+            json.dumps({'version': MANIFEST_VERSION, 'files': self._manifest}, indent=2, sort_keys=True) + "\n",
+            encoding='utf-8'
+        )
+        os.replace(tmp_path, self.manifest_path)
+        self._dirty = False
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+AST 解析缓存测试
+验证未变化的文件只读取、哈希与解析一次；generate 串行提取时依赖分析与符号索引两个阶段
+共享解析结果，缓存容量有界且在符号索引阶段后释放，并行提取时不创建共享缓存
+"""
+
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ast_extractors.ast_cache import ParsedModuleCache
+from bench.synthetic_project import ProjectSpec, generate_project
+import generate
+from enhanced_ast_analyzer import EnhancedASTAnalyzer
+
+
+def test_cache_reads_each_file_once():
+    """未变化的文件不重复读取；只改 mtime 时重新读取但不重新解析；内容变化时重新解析"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'mod.py'
+        path.write_text("x = 1\n", encoding='utf-8')
+        cache = ParsedModuleCache()
+
+        first = cache.get(path)
+        assert cache.get(path) is first and cache.get(path) is first
+        assert (cache.hits, cache.misses, cache.reads) == (2, 1, 1)
+
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.get(path) is first
+        assert (cache.hits, cache.misses, cache.reads) == (3, 1, 2)
+
+        path.write_text("x = 22\n", encoding='utf-8')
+        assert cache.get(path) is not first
+        assert (cache.hits, cache.misses, cache.reads) == (3, 2, 3)
+
+        # 调用方已读取的内容不再读取
+        other = Path(tmp) / 'other.py'
+        other.write_text("y = 2\n", encoding='utf-8')
+        assert cache.get(other, other.read_bytes()).source == "y = 2\n"
+        assert cache.reads == 3
+
+
+def test_extractors_share_one_lookup():
+    """一个文件的所有提取器共用一次缓存查找"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / 'mod.py').write_text(
+            "class A:\n    def m(self):\n        pass\n\ndef f():\n    return A()\n", encoding='utf-8'
+        )
+        cache = ParsedModuleCache()
+        analyzer = EnhancedASTAnalyzer(root, cache=cache)
+        result = analyzer.analyze_file(root / 'mod.py')
+        assert 'error' not in result and result['classes'][0]['methods']
+        assert (cache.hits, cache.misses, cache.reads) == (0, 1, 1)
+        analyzer.analyze_file(root / 'mod.py')
+        assert (cache.hits, cache.misses, cache.reads) == (1, 1, 1)
+
+
+class RecordingCache(ParsedModuleCache):
+    """记录 generate 创建的缓存实例及其条目数峰值"""
+
+    instances = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.peak_entries = 0
+        RecordingCache.instances.append(self)
+
+    def get(self, file_path, data=None):
+        module = super().get(file_path, data)
+        self.peak_entries = max(self.peak_entries, len(self._entries))
+        return module
+
+
+def run_generate(project: Path, output_dir: Path, jobs: int = 1):
+    """用 RecordingCache 运行 generate，返回 (创建的缓存, 输出)"""
+    RecordingCache.instances = []
+    original = generate.ParsedModuleCache
+    generate.ParsedModuleCache = RecordingCache
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            generate.generate_architecture_docs(project, output_dir=output_dir, incremental=False, jobs=jobs)
+    finally:
+        generate.ParsedModuleCache = original
+    return RecordingCache.instances, output.getvalue()
+
+
+def cache_counts(output: str):
+    match = re.search(r'AST cache: (\d+) hits, (\d+) misses, (\d+) reads', output)
+    assert match, output
+    return tuple(map(int, match.groups()))
+
+
+def test_generate_shares_parses():
+    """容量内的项目：符号索引阶段命中依赖分析阶段的解析结果，运行结束前释放缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=40, classes_per_file=1, js_ratio=0))
+        python_files = len(list(project.rglob('*.py')))
+
+        caches, output = run_generate(project, Path(tmp) / 'docs')
+        assert len(caches) == 1
+        assert caches[0].max_entries == ParsedModuleCache().max_entries
+        assert cache_counts(output) == (python_files, python_files, python_files)
+        assert caches[0].get_stats()['entries'] == 0
+
+
+def test_generate_cache_is_bounded():
+    """文件数超过容量时缓存条目数不超过上限；并行提取时不创建共享缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=300, classes_per_file=1, js_ratio=0))
+        python_files = len(list(project.rglob('*.py')))
+        capacity = ParsedModuleCache().max_entries
+        assert python_files > capacity
+
+        caches, output = run_generate(project, Path(tmp) / 'docs')
+        assert len(caches) == 1
+        assert caches[0].peak_entries == capacity
+        hits, misses, reads = cache_counts(output)
+        assert hits + misses == 2 * python_files
+        assert caches[0].get_stats()['entries'] == 0
+
+        caches, output = run_generate(project, Path(tmp) / 'docs_parallel', jobs=2)
+        assert caches == []
+        assert 'AST cache:' not in output
+
+
+if __name__ == "__main__":
+    test_cache_reads_each_file_once()
+    test_extractors_share_one_lookup()
+    test_generate_shares_parses()
+    test_generate_cache_is_bounded()
+    print("✅ AST 解析缓存测试通过")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+批量写入测试
+验证不同批大小写出相同的行与 parent_id（ID 在内存中分配），以及 PRAGMA 取值校验
+"""
+
+import contextlib
+import io
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench.synthetic_project import ProjectSpec, generate_project
+from build_symbol_index import SymbolIndexBuilder
+
+
+def build(project: Path, db_path: Path, **options):
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder = SymbolIndexBuilder(project, str(db_path), **options)
+        builder.build_index()
+    conn = sqlite3.connect(str(db_path))
+    try:
+        return {
+            'symbols': conn.execute("""
+                SELECT id, name, kind, file_path, line_number, end_line_number, parent_id, metadata
+                FROM symbols ORDER BY id
+            """).fetchall(),
+            'call_graph': sorted(conn.execute("SELECT * FROM call_graph").fetchall()),
+            'dependencies': sorted(conn.execute(
+                "SELECT from_symbol, to_symbol, dep_type FROM dependencies"
+            ).fetchall()),
+            'tokens': conn.execute("SELECT token, symbol_id FROM symbol_tokens ORDER BY 1, 2").fetchall(),
+        }, builder
+    finally:
+        conn.close()
+
+
+def test_batch_size_does_not_change_rows():
+    """batch_size=1 与默认批大小写出的行（含 parent_id）相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=15, classes_per_file=2, js_ratio=0.2))
+
+        batched, builder = build(project, Path(tmp) / 'batched.db')
+        single, single_builder = build(project, Path(tmp) / 'single.db', batch_size=1)
+        assert batched == single
+        assert builder.rows_inserted == single_builder.rows_inserted == len(batched['symbols'])
+
+        # parent_id 指向同一文件中先写入的符号；类/函数父符号的行号范围包含子符号
+        by_id = {row[0]: row for row in batched['symbols']}
+        children = [row for row in batched['symbols'] if row[6] is not None]
+        assert any(by_id[row[6]][2] == 'class' for row in children)
+        for symbol_id, name, kind, file_path, line, end_line, parent_id, _ in children:
+            parent = by_id[parent_id]
+            assert parent[3] == file_path and parent[0] < symbol_id
+            if parent[2] != 'file':
+                assert parent[4] <= line <= end_line <= parent[5]
+
+
+def test_pragma_values_are_validated():
+    """非法的 journal_mode / synchronous 在构造时被拒绝；大小写不敏感，None 表示不修改"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        project.mkdir()
+        (project / 'mod.py').write_text("def f():\n    pass\n", encoding='utf-8')
+        db_path = str(Path(tmp) / 'symbols.db')
+
+        for options in ({'journal_mode': 'WAL; DROP TABLE symbols'}, {'journal_mode': 'fast'},
+                        {'synchronous': 'SOMETIMES'}, {'synchronous': '0; PRAGMA x'}):
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    SymbolIndexBuilder(project, db_path, **options)
+                assert False, f"{options} must be rejected"
+            except ValueError:
+                pass
+
+        rows, _ = build(project, Path(db_path), journal_mode='delete', synchronous='off')
+        assert [row[1] for row in rows['symbols']] == ['mod.py', 'f']
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'delete'
+        conn.close()
+
+        rows_default, _ = build(project, Path(tmp) / 'default.db', journal_mode=None, synchronous=None)
+        assert rows_default == rows
+
+
+if __name__ == "__main__":
+    test_batch_size_does_not_change_rows()
+    test_pragma_values_are_validated()
+    print("✅ 批量写入测试通过")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+端到端基准套件测试
+验证合成项目生成的确定性与规格（语言比例、嵌套深度、导入扇出），
+基准结果包含各阶段耗时与峰值 RSS，以及与基线比较的回归判定
+"""
+
+import copy
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from analyze_dependencies import DependencyAnalyzer
+from bench.run_benchmark import compare_results, run_benchmark
+from bench.synthetic_project import ProjectSpec, generate_project, touch_files
+
+
+def snapshot(root: Path):
+    return {
+        path.relative_to(root).as_posix(): path.read_bytes()
+        for path in sorted(root.rglob('*')) if path.is_file()
+    }
+
+
+def test_synthetic_project():
+    """相同规格生成相同内容；导入都能解析到项目内文件"""
+    spec = ProjectSpec(files=40, classes_per_file=2, import_fanout=3, js_ratio=0.25, nesting_depth=3)
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = Path(tmp) / 'a', Path(tmp) / 'b'
+        stats = generate_project(first, spec)
+        generate_project(second, spec)
+        assert snapshot(first) == snapshot(second)
+
+        assert stats['python_files'] == 30
+        assert stats['js_files'] == 10
+        sources = [path for path in first.rglob('*') if path.suffix in ('.py', '.js', '.ts')
+                   and path.name != '__init__.py']
+        assert len(sources) == 40
+        assert max(len(path.relative_to(first).parts) - 1 for path in sources) == 3
+
+        # 每个文件的导入都解析为项目内依赖
+        analyzer = DependencyAnalyzer(first)
+        dependencies = analyzer.analyze_project()
+        assert dependencies['level_0']['stats']['edge_count'] > 0
+        resolved = sum(len(targets) for targets in analyzer.resolved_dependencies.values())
+        assert resolved == 40 * 3
+
+        touched = touch_files(first, spec, 3)
+        assert len(touched) == 3
+        assert all(path.endswith('.py') for path in touched)
+        assert 'def touched_' in (first / touched[0]).read_text(encoding='utf-8')
+
+
+def test_benchmark_results_and_baseline():
+    """各场景包含全部阶段；超过容差才判定回归"""
+    spec = ProjectSpec(files=12, classes_per_file=2, import_fanout=2)
+    result = run_benchmark(spec, repeat=1)
+
+    stages = ['scan', 'dependencies', 'symbol_index', 'render', 'scan_cache']
+    for scenario in ('full', 'incremental'):
+        data = result['scenarios'][scenario]
+        assert list(data['stages']) == stages
+        assert data['total'] >= sum(stage['wall'] for stage in data['stages'].values()) * 0.99
+        if sys.platform != 'win32':
+            assert data['peak_rss_kb'] > 0
+
+    assert compare_results(result, result) == []
+
+    slower = copy.deepcopy(result)
+    slower['scenarios']['full']['stages']['symbol_index']['wall'] += 1.0
+    slower['scenarios']['full']['total'] += 1.0
+    regressions = compare_results(slower, result)
+    assert [item.split(':')[0] for item in regressions] == ['full/symbol_index', 'full/total']
+
+    # 绝对差值很小的抖动不算回归
+    jitter = copy.deepcopy(result)
+    jitter['scenarios']['incremental']['stages']['render']['wall'] *= 1.5
+    assert compare_results(jitter, result) == []
+
+    other_spec = copy.deepcopy(result)
+    other_spec['spec']['files'] = 13
+    try:
+        compare_results(other_spec, result)
+        assert False, "different specs must not be compared"
+    except ValueError:
+        pass
+
+
+if __name__ == "__main__":
+    test_synthetic_project()
+    test_benchmark_results_and_baseline()
+    print("✅ 基准套件测试通过")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+索引阶段调用图测试
+验证构建索引时写入调用点并解析为符号边，callers/callees 查询，
+以及增量更新后其他文件指向变更文件的边被重新解析；跨文件调用按导入来源解析
+（as 别名、包的再导出、之后才新增的模块）；
+调用解析的开销随调用数线性增长（同名方法遍布各文件时不按调用数 × 定义数连接）
+"""
+
+import contextlib
+import io
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ast_extractors.call_graph_builder import CallGraphBuilder
+from ast_extractors.dependency_extractor import DependencyExtractor
+from bench.synthetic_project import ProjectSpec, generate_project
+from build_symbol_index import SymbolIndexBuilder
+from query_index import SymbolIndex
+
+
+HELPERS = '''
+class Config:
+    pass
+
+
+def load_config(path):
+    return Config()
+
+
+def helper():
+    pass
+'''
+
+APP = '''
+from helpers import load_config
+
+CONFIG = load_config("app.ini")
+
+
+def helper():
+    return 1
+
+
+class App:
+    def run(self):
+        config = load_config("run.ini")
+        return self.render(config)
+
+    def render(self, config):
+        return helper()
+'''
+
+
+def related(rows):
+    return sorted((row['name'], row['file_path'], row['dep_type']) for row in rows)
+
+
+def test_call_graph_indexing():
+    """调用点归属到最内层符号，同名函数优先解析到本文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "helpers.py").write_text(HELPERS, encoding='utf-8')
+        (project / "app.py").write_text(APP, encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).build_index()
+
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            assert related(index.find_callers('load_config')) == [
+                ('app.py', 'app.py', 'call'),  # 模块级调用归属到文件符号
+                ('run', 'app.py', 'call'),
+            ]
+            assert related(index.find_callers('Config', 'class')) == [
+                ('load_config', 'helpers.py', 'instantiation')
+            ]
+            # app.py 定义了自己的 helper，不连接到 helpers.py 中的同名函数
+            assert related(index.find_callees('render')) == [('helper', 'app.py', 'call')]
+            assert related(index.find_callees('run')) == [
+                ('load_config', 'helpers.py', 'call'),
+                ('render', 'app.py', 'call'),
+            ]
+            assert all('metadata' not in row for row in index.find_callees('run', summary=True))
+        finally:
+            index.close()
+
+        # CallGraphBuilder 直接使用索引阶段写入的调用表
+        conn = sqlite3.connect(db_path)
+        run_id, load_id = (
+            conn.execute("SELECT id FROM symbols WHERE name = ?", (name,)).fetchone()[0]
+            for name in ('run', 'load_config')
+        )
+        conn.close()
+        builder = CallGraphBuilder(str(db_path))
+        try:
+            assert builder.can_reach(run_id, load_id)
+        finally:
+            builder.close()
+
+        # 增量更新：被调用文件变更后，未变更文件发出的边指向新符号
+        (project / "helpers.py").write_text(
+            "\n\ndef load_config(path, strict=False):\n    return None\n", encoding='utf-8'
+        )
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).update_index(
+            [project / "helpers.py"], []
+        )
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            assert related(index.find_callers('load_config')) == [
+                ('app.py', 'app.py', 'call'),
+                ('run', 'app.py', 'call'),
+            ]
+            assert index.find_callers('Config') == []
+        finally:
+            index.close()
+
+        # 删除文件后不残留调用点与边
+        (project / "app.py").unlink()
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).update_index([], ['app.py'])
+        conn = sqlite3.connect(db_path)
+        dangling_calls = conn.execute("""
+            SELECT COUNT(*) FROM call_graph WHERE caller_id NOT IN (SELECT id FROM symbols)
+        """).fetchone()[0]
+        dangling_edges = conn.execute("""
+            SELECT COUNT(*) FROM dependencies
+            WHERE from_symbol NOT IN (SELECT id FROM symbols) OR to_symbol NOT IN (SELECT id FROM symbols)
+        """).fetchone()[0]
+        conn.close()
+        assert dangling_calls == 0
+        assert dangling_edges == 0
+
+
+IMPORT_FILES = {
+    "pkg/__init__.py": "from .helpers import load\n",
+    "pkg/helpers.py": "def load():\n    return 1\n",
+    "pkg/other.py": "def load():\n    return 2\n\n\ndef late():\n    return 3\n",
+    "pkg/app.py": (
+        "from pkg.helpers import load\n"
+        "from pkg.helpers import load as ld\n"
+        "from pkg.late import late\n"
+        "\n\n"
+        "def run2():\n    return load()\n"
+        "\n\n"
+        "def run3():\n    return ld()\n"
+        "\n\n"
+        "def run4():\n    return late()\n"
+    ),
+    "main.py": "from pkg import load\n\n\ndef main():\n    return load()\n",
+}
+
+
+def test_calls_resolve_through_imports():
+    """跨文件调用只连接到导入来源文件中的符号：别名按原名称解析，再导出跟随一层"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        for rel_path, source in IMPORT_FILES.items():
+            (project / rel_path).parent.mkdir(parents=True, exist_ok=True)
+            (project / rel_path).write_text(source, encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).build_index()
+
+        def check(index):
+            assert related(index.find_callees('run2')) == [('load', 'pkg/helpers.py', 'call')]
+            assert related(index.find_callees('run3')) == [('load', 'pkg/helpers.py', 'call')]
+            assert related(index.find_callees('main')) == [('load', 'pkg/helpers.py', 'call')]
+            callers = [row['name'] for row in index.find_callers('load')]
+            assert sorted(callers) == ['main', 'run2', 'run3']
+
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            check(index)
+            # pkg/late.py 还不存在：不按名称连接到 pkg/other.py 中的 late
+            assert index.find_callees('run4') == []
+        finally:
+            index.close()
+
+        # 被调用文件变更后，未变更文件发出的边（直接导入、别名与再导出）指向新符号；
+        # 新增的模块解析之前未能解析的导入
+        (project / "pkg/helpers.py").write_text("\n\ndef load(strict=False):\n    return 1\n", encoding='utf-8')
+        (project / "pkg/late.py").write_text("def late():\n    return 4\n", encoding='utf-8')
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).update_index(
+            [project / "pkg/helpers.py", project / "pkg/late.py"], []
+        )
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            check(index)
+            assert related(index.find_callees('run4')) == [('late', 'pkg/late.py', 'call')]
+        finally:
+            index.close()
+
+        fresh_db = tmp_dir / "fresh.db"
+        SymbolIndexBuilder(project, str(fresh_db), journal_mode=None).build_index()
+        assert edge_names(db_path) == edge_names(fresh_db)
+
+
+def edge_names(db_path: Path):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT f.name, f.file_path, t.name, t.file_path, d.dep_type
+        FROM dependencies d JOIN symbols f ON f.id = d.from_symbol JOIN symbols t ON t.id = d.to_symbol
+    """).fetchall()
+    conn.close()
+    return sorted(rows)
+
+
+def test_local_calls_are_separate():
+    """dependencies.calls 只含导入名称的调用；本文件定义的函数/类的调用在 local_calls 中"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "app.py").write_text(APP, encoding='utf-8')
+        dependencies = DependencyExtractor(root / "app.py", root).extract()
+
+    calls = sorted((d.name, d.line_number) for d in dependencies['calls'])
+    local_calls = sorted((d.name, d.line_number) for d in dependencies['local_calls'])
+    assert calls == [('load_config', 4), ('load_config', 13)]
+    assert local_calls == [('helper', 17), ('render', 14)]
+
+
+class CountingBuilder(SymbolIndexBuilder):
+    """统计调用解析执行的 SQLite 虚拟机指令数（与机器速度无关）"""
+
+    resolve_steps = 0
+
+    def _resolve_calls(self, first_new_id: int):
+        def count():
+            self.resolve_steps += 1
+            return 0
+
+        self.conn.set_progress_handler(count, 100)
+        try:
+            super()._resolve_calls(first_new_id)
+        finally:
+            self.conn.set_progress_handler(None, 0)
+
+
+def resolve_cost(tmp_dir: Path, files: int):
+    """在合成项目上构建索引，返回 (调用解析的指令数, 调用数, 边数)"""
+    project = tmp_dir / f"project_{files}"
+    generate_project(project, ProjectSpec(files=files, js_ratio=0.0))
+    db_path = tmp_dir / f"symbols_{files}.db"
+    builder = CountingBuilder(project, str(db_path), journal_mode=None)
+    with contextlib.redirect_stdout(io.StringIO()):
+        builder.build_index()
+
+    conn = sqlite3.connect(db_path)
+    calls = conn.execute("SELECT COUNT(*) FROM call_graph").fetchone()[0]
+    cross_file = conn.execute("""
+        SELECT COUNT(*) FROM dependencies d
+        JOIN symbols f ON f.id = d.from_symbol JOIN symbols t ON t.id = d.to_symbol
+        WHERE f.file_path != t.file_path
+    """).fetchone()[0]
+    conn.close()
+    return builder.resolve_steps, calls, cross_file
+
+
+def test_call_resolution_scales_linearly():
+    """每个文件都定义 transform 等同名方法：文件数 ×4 时解析开销约 ×4 而不是 ×16"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        small_steps, small_calls, small_cross = resolve_cost(tmp_dir, 100)
+        large_steps, large_calls, large_cross = resolve_cost(tmp_dir, 400)
+
+    assert large_calls == 4 * small_calls
+    # 同名方法只解析到本文件；跨文件的边只来自每个类 link() 中经别名导入的 Dep 类
+    assert small_cross == 100 * ProjectSpec().classes_per_file
+    assert large_cross == 4 * small_cross
+    assert large_steps < 6 * small_steps, (small_steps, large_steps)
+
+
+if __name__ == "__main__":
+    test_call_graph_indexing()
+    test_calls_resolve_through_imports()
+    test_local_calls_are_separate()
+    test_call_resolution_scales_linearly()
+    print("✅ 索引阶段调用图测试通过")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+调用图可达性测试
+验证 SCC 缩点后的 reachable_from / can_reach，传递闭包与逐层展开的结果一致，
+以及批量写入与整图加载接口
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ast_extractors.call_graph_builder import CallGraphBuilder
+
+
+def create_symbols(db_path: Path, names):
+    """创建符号表（ID 从 1 开始，按名称顺序）"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE symbols (id INTEGER PRIMARY KEY, name TEXT, kind TEXT)")
+    conn.executemany(
+        "INSERT INTO symbols (name, kind) VALUES (?, 'function')", ((name,) for name in names)
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_call_graph_reachability():
+    """环、自调用、无法解析的外部调用与长调用链"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "symbols.db"
+        # 1 main -> 2 parse <-> 3 tokenize -> 4 emit；5 loop 自调用；6 idle 无调用
+        create_symbols(db_path, ['main', 'parse', 'tokenize', 'emit', 'loop', 'idle'])
+
+        builder = CallGraphBuilder(str(db_path))
+        try:
+            for caller_id, callee_name in [
+                (1, 'parse'), (2, 'tokenize'), (3, 'parse'), (3, 'emit'),
+                (4, 'print'), (5, 'loop'), (1, 'len'),
+            ]:
+                builder.add_call(caller_id, callee_name, 1)
+
+            assert builder.reachable_from(1) == {2, 3, 4}
+            assert builder.reachable_from(2) == {2, 3, 4}  # 环内函数可到达自身
+            assert builder.reachable_from(4) == set()
+            assert builder.reachable_from(5) == {5}
+            assert builder.reachable_from(6) == set()
+
+            assert builder.can_reach(1, 4)
+            assert builder.can_reach(3, 3)
+            assert not builder.can_reach(4, 1)
+            assert not builder.can_reach(1, 1)
+            assert not builder.can_reach(6, 1)
+
+            assert builder.build_transitive_closure() == {
+                1: {'parse', 'tokenize', 'emit', 'print', 'len'},
+                2: {'parse', 'tokenize', 'emit', 'print'},
+                3: {'parse', 'tokenize', 'emit', 'print'},
+                4: {'print'},
+                5: {'loop'},
+            }
+
+            # 新增调用后内存中的图重新加载
+            builder.add_call(4, 'main', 2)
+            assert builder.can_reach(4, 1)
+            assert builder.reachable_from(1) == {1, 2, 3, 4}
+        finally:
+            builder.close()
+
+        # 长调用链（迭代实现，不受递归深度限制）
+        db_path = Path(tmp) / "chain.db"
+        count = 5000
+        create_symbols(db_path, [f"step_{i}" for i in range(count)])
+        builder = CallGraphBuilder(str(db_path))
+        try:
+            builder.conn.executemany(
+                "INSERT INTO call_graph (caller_id, callee_name, line_number) VALUES (?, ?, 1)",
+                ((i + 1, f"step_{i + 1}") for i in range(count - 1))
+            )
+            builder.conn.commit()
+            assert len(builder.reachable_from(1)) == count - 1
+            assert builder.can_reach(1, count)
+            assert not builder.can_reach(count, 1)
+        finally:
+            builder.close()
+
+
+def test_bulk_call_ingestion():
+    """add_calls 单事务批量写入；load_adjacency 与 resolve_callees 一次查询完成"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "symbols.db"
+        create_symbols(db_path, ['main', 'parse', 'parse', 'emit'])
+
+        builder = CallGraphBuilder(str(db_path))
+        try:
+            calls = ((1, name, line) for line, name in enumerate(['parse', 'emit', 'parse', 'print'], 1))
+            assert builder.add_calls(calls) == 4
+            assert builder.add_calls([(4, 'main', 9)]) == 1
+
+            assert builder.load_adjacency() == {1: ['parse', 'emit', 'print'], 4: ['main']}
+            assert builder.load_adjacency(resolve=True) == {1: [2, 3, 4], 4: [1]}
+            assert builder.resolve_callees(['parse', 'print', 'main', 'parse']) == {
+                'parse': [2, 3], 'main': [1]
+            }
+            assert builder.get_callers('parse') == [1]
+            assert builder.can_reach(4, 3)
+        finally:
+            builder.close()
+
+
+if __name__ == "__main__":
+    test_call_graph_reachability()
+    test_bulk_call_ingestion()
+    print("✅ 调用图可达性测试通过")
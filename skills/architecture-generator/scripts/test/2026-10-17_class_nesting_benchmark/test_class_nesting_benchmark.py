@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+ClassExtractor 嵌套检测性能回归测试
+在合成的 5000 个类的模块上验证类提取为线性复杂度
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ast_extractors import ClassExtractor
+
+# 5000 个类的时间预算（秒），旧实现需要数分钟
+TIME_BUDGET = 10.0
+
+
+def make_module(class_count: int) -> str:
+    """生成合成模块：每 10 个类中 1 个带嵌套类，另有函数内的类"""
+    lines = []
+    for i in range(class_count):
+        lines.append(f"class Message{i}(Base):")
+        lines.append(f"    field_{i}: int = {i}")
+        lines.append(f"    def method_{i}(self, value: int = 0) -> int:")
+        lines.append(f"        return value + {i}")
+        if i % 10 == 0:
+            lines.append(f"    class Meta{i}:")
+            lines.append(f"        table = 'message_{i}'")
+        lines.append("")
+    lines.append("def factory():")
+    lines.append("    class Local:")
+    lines.append("        pass")
+    lines.append("    return Local")
+    return "\n".join(lines) + "\n"
+
+
+def time_extraction(class_count: int, tmp_dir: Path):
+    """返回 (耗时秒数, 提取结果)"""
+    module_path = tmp_dir / f"generated_{class_count}.py"
+    module_path.write_text(make_module(class_count), encoding='utf-8')
+
+    start = time.perf_counter()
+    classes = ClassExtractor(module_path, tmp_dir).extract()
+    return time.perf_counter() - start, classes
+
+
+def test_class_nesting_benchmark():
+    """5000 个类的模块应在预算时间内完成，且耗时随类数量线性增长"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+
+        small_time, small_classes = time_extraction(1000, tmp_dir)
+        large_time, large_classes = time_extraction(5000, tmp_dir)
+
+    print(f"1000 个类: {small_time:.3f}s")
+    print(f"5000 个类: {large_time:.3f}s")
+
+    # 正确性：函数内的类与嵌套类不作为顶层类
+    assert len(small_classes) == 1000
+    assert len(large_classes) == 5000
+    assert len(large_classes[0].nested_classes) == 1
+    assert large_classes[0].nested_classes[0].name == "Meta0"
+    assert all(c.name != "Local" for c in large_classes)
+
+    # 性能：绝对预算 + 线性增长（5 倍规模，允许 15 倍耗时以容忍抖动）
+    assert large_time < TIME_BUDGET
+    assert large_time < max(small_time, 0.01) * 15
+
+
+if __name__ == "__main__":
+    test_class_nesting_benchmark()
+    print("✅ 基准测试通过")
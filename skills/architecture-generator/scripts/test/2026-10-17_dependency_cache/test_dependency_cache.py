@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+依赖缓存测试
+验证未变化的文件命中缓存、指纹（mtime_ns:size）变化时失效、已删除文件被清理，
+以及版本不符的缓存整体作废
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from analyze_dependencies import DEPENDENCY_CACHE_FILE, DEPENDENCY_CACHE_VERSION, DependencyAnalyzer
+
+FILES = {
+    'app.py': "import helpers\nfrom models import User\n",
+    'helpers.py': "import os\n",
+    'models.py': "class User:\n    pass\n",
+}
+
+
+def analyze(project: Path, cache_dir: Path) -> DependencyAnalyzer:
+    analyzer = DependencyAnalyzer(project, cache_dir=cache_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        analyzer.analyze_project()
+    return analyzer
+
+
+def read_cache(cache_dir: Path):
+    return json.loads((cache_dir / DEPENDENCY_CACHE_FILE).read_text(encoding='utf-8'))
+
+
+def make_project(root: Path) -> Path:
+    project = root / 'project'
+    project.mkdir()
+    for name, content in FILES.items():
+        (project / name).write_text(content, encoding='utf-8')
+    return project
+
+
+def test_unchanged_files_hit_cache():
+    """第二次运行全部命中，且直接使用缓存中的依赖（不重新分析）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project, cache_dir = make_project(Path(tmp)), Path(tmp) / 'cache'
+
+        first = analyze(project, cache_dir)
+        assert (first.cache_hits, first.cache_misses) == (0, 3)
+        data = read_cache(cache_dir)
+        assert data['version'] == DEPENDENCY_CACHE_VERSION
+        assert set(data['files']) == set(FILES)
+        assert data['files']['app.py']['dependencies'] == sorted(first.file_dependencies['app.py'])
+
+        # 改写缓存中的依赖：命中时结果来自缓存
+        data['files']['helpers.py']['dependencies'] = ['from_cache']
+        (cache_dir / DEPENDENCY_CACHE_FILE).write_text(json.dumps(data), encoding='utf-8')
+        second = analyze(project, cache_dir)
+        assert (second.cache_hits, second.cache_misses) == (3, 0)
+        assert second.file_dependencies['helpers.py'] == {'from_cache'}
+        assert second.file_dependencies['app.py'] == first.file_dependencies['app.py']
+
+        # reuse_cache=False 时全量分析，但仍写入新缓存
+        analyzer = DependencyAnalyzer(project, cache_dir=cache_dir, reuse_cache=False)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analyzer.analyze_project()
+        assert (analyzer.cache_hits, analyzer.cache_misses) == (0, 3)
+        assert read_cache(cache_dir)['files']['helpers.py']['dependencies'] == ['os']
+
+
+def test_fingerprint_change_invalidates_entry():
+    """修改时间或大小变化的文件重新分析，其余文件仍命中"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project, cache_dir = make_project(Path(tmp)), Path(tmp) / 'cache'
+        analyze(project, cache_dir)
+
+        # 只改 mtime（内容与大小不变）
+        helpers = project / 'helpers.py'
+        stat = helpers.stat()
+        os.utime(helpers, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        # 内容与大小都变化
+        (project / 'app.py').write_text("import helpers\nimport json\n", encoding='utf-8')
+
+        analyzer = analyze(project, cache_dir)
+        assert (analyzer.cache_hits, analyzer.cache_misses) == (1, 2)
+        assert 'json' in analyzer.file_dependencies['app.py']
+        assert 'models.User' not in analyzer.file_dependencies['app.py']
+
+        entry = read_cache(cache_dir)['files']['helpers.py']
+        assert entry['fingerprint'] == f"{helpers.stat().st_mtime_ns}:{helpers.stat().st_size}"
+
+
+def test_deleted_files_are_pruned():
+    """已删除文件的条目不再保存；新增文件加入缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project, cache_dir = make_project(Path(tmp)), Path(tmp) / 'cache'
+        analyze(project, cache_dir)
+
+        (project / 'models.py').unlink()
+        (project / 'views.py').write_text("import app\n", encoding='utf-8')
+        analyzer = analyze(project, cache_dir)
+        assert (analyzer.cache_hits, analyzer.cache_misses) == (2, 1)
+        assert set(read_cache(cache_dir)['files']) == {'app.py', 'helpers.py', 'views.py'}
+
+
+def test_other_version_is_rejected():
+    """版本不符或损坏的缓存不使用，并以当前版本重写"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project, cache_dir = make_project(Path(tmp)), Path(tmp) / 'cache'
+        analyze(project, cache_dir)
+
+        data = read_cache(cache_dir)
+        data['version'] = DEPENDENCY_CACHE_VERSION + 1
+        (cache_dir / DEPENDENCY_CACHE_FILE).write_text(json.dumps(data), encoding='utf-8')
+        analyzer = analyze(project, cache_dir)
+        assert (analyzer.cache_hits, analyzer.cache_misses) == (0, 3)
+        assert read_cache(cache_dir)['version'] == DEPENDENCY_CACHE_VERSION
+
+        (cache_dir / DEPENDENCY_CACHE_FILE).write_text("{not json", encoding='utf-8')
+        analyzer = analyze(project, cache_dir)
+        assert (analyzer.cache_hits, analyzer.cache_misses) == (0, 3)
+        assert analyze(project, cache_dir).cache_hits == 3
+
+
+if __name__ == "__main__":
+    test_unchanged_files_hit_cache()
+    test_fingerprint_change_invalidates_entry()
+    test_deleted_files_are_pruned()
+    test_other_version_is_rejected()
+    print("✅ 依赖缓存测试通过")
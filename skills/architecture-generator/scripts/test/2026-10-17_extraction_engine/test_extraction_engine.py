@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+单次遍历提取测试
+验证 ExtractionEngine 一次遍历喂给所有提取器的结果与各提取器单独 extract() 的结果相同
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ast_extractors.ast_cache import ParsedModuleCache
+from ast_extractors.base_extractor import BaseExtractor
+from ast_extractors.class_extractor import ClassExtractor
+from ast_extractors.dependency_extractor import DependencyExtractor
+from ast_extractors.extraction_engine import ExtractionEngine
+from ast_extractors.function_extractor import FunctionExtractor
+from ast_extractors.pattern_extractor import PatternExtractor
+from ast_extractors.variable_extractor import VariableExtractor
+
+EXTRACTORS = [ClassExtractor, FunctionExtractor, DependencyExtractor, VariableExtractor, PatternExtractor]
+
+# example_sample.py 没有覆盖的嵌套与异步情况
+NESTED_SOURCE = '''
+import os
+from typing import List
+
+LIMIT: int = 3
+
+class Outer:
+    class Inner:
+        value = 1
+
+        def get(self):
+            return self.value
+
+    def method(self):
+        class Local:
+            pass
+        return Local
+
+async def fetch(items: List[str]):
+    class InAsync:
+        pass
+    for item in items:
+        await os.fspath(item)
+
+def gen():
+    def helper():
+        yield 1
+    with open(__file__) as f:
+        yield f.read()
+    try:
+        return helper()
+    except OSError:
+        raise
+'''
+
+
+def assert_engine_matches_standalone(file_path: Path, root: Path):
+    cache = ParsedModuleCache()
+    extractors = [extractor_class(file_path, root, cache) for extractor_class in EXTRACTORS]
+    combined = ExtractionEngine(extractors[0].tree, extractors).run()
+
+    for extractor_class, result in zip(EXTRACTORS, combined):
+        standalone = extractor_class(file_path, root).extract()
+        assert result == standalone, extractor_class.__name__
+
+    # 同一组提取器再次遍历得到相同结果（begin 重置了状态）
+    assert ExtractionEngine(extractors[0].tree, extractors).run() == combined
+    return combined
+
+
+def test_engine_matches_standalone_extract():
+    """example_sample.py 上单次遍历与逐个提取结果一致"""
+    classes, functions, dependencies, variables, patterns = assert_engine_matches_standalone(
+        SCRIPTS_DIR / 'example_sample.py', SCRIPTS_DIR
+    )
+    assert classes and functions and dependencies and variables
+
+
+def test_engine_matches_standalone_nested():
+    """嵌套类、函数内的类与异步函数的结果一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'nested.py'
+        path.write_text(NESTED_SOURCE, encoding='utf-8')
+        classes = assert_engine_matches_standalone(path, Path(tmp))[0]
+        # 与原 ClassExtractor 一致：异步函数中的类视为顶层类
+        assert [c.name for c in classes] == ['Outer', 'InAsync']
+
+
+def test_finalize_is_abstract():
+    """未实现 finalize 的提取器不能实例化"""
+    class Incomplete(BaseExtractor):
+        def extract(self):
+            return self._extract_with_engine()
+
+    try:
+        Incomplete(SCRIPTS_DIR / 'example_sample.py', SCRIPTS_DIR)
+        assert False, "extractor without finalize must not be instantiable"
+    except TypeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_engine_matches_standalone_extract()
+    test_engine_matches_standalone_nested()
+    test_finalize_is_abstract()
+    print("✅ 单次遍历提取测试通过")
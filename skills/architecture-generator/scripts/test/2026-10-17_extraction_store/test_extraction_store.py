@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+提取结果持久化缓存测试
+验证按内容寻址（与 mtime 无关）、版本隔离以及 LRU 容量淘汰
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ast_extractors import ExtractionStore
+from enhanced_ast_analyzer import EnhancedASTAnalyzer, ANALYZER_VERSION
+
+
+def test_reuse_after_touch():
+    """只修改 mtime 时直接复用结果，不重新解析"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        module = root / "mod.py"
+        module.write_text("class A:\n    def run(self):\n        return 1\n", encoding='utf-8')
+
+        store = ExtractionStore(root / ".cache" / "extractions.db", ANALYZER_VERSION)
+        first = EnhancedASTAnalyzer(root, store=store).analyze_file(module)
+
+        os.utime(module, (1, 1))
+        analyzer = EnhancedASTAnalyzer(root, store=store)
+        second = analyzer.analyze_file(module)
+
+        assert second == first
+        assert store.get_stats()['hits'] == 1
+        assert analyzer.cache.get_stats()['misses'] == 0
+
+        # 其他版本的结果不会被复用
+        other = ExtractionStore(root / ".cache" / "extractions.db", ANALYZER_VERSION + "-next")
+        assert other.get(other.key_for("mod.py", module.read_bytes())) is None
+        store.close()
+        other.close()
+
+
+def test_lru_eviction():
+    """超出容量时淘汰最久未使用的条目"""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ExtractionStore(Path(tmp) / "extractions.db", "test", max_bytes=4000)
+        payload = {'data': os.urandom(600).hex()}
+
+        keys = [store.key_for(f"f{i}.py", b"x") for i in range(6)]
+        for key in keys[:3]:
+            store.put(key, payload)
+        assert store.get(keys[0]) is not None  # keys[0] 变为最近使用
+
+        for key in keys[3:]:
+            store.put(key, payload)
+
+        stats = store.get_stats()
+        assert stats['total_bytes'] <= 4000
+        assert stats['evictions'] > 0
+        assert store.get(keys[1]) is None
+        assert store.get(keys[0]) is not None
+        assert store.get(keys[5]) is not None
+        store.close()
+
+
+if __name__ == "__main__":
+    test_reuse_after_touch()
+    test_lru_eviction()
+    print("✅ 提取结果缓存测试通过")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+共享文件目录测试
+验证单次遍历时剪掉被排除的目录，以及各阶段得到的文件集合与原 should_include_file 规则一致
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from analyze_dependencies import DependencyAnalyzer
+from build_symbol_index import SymbolIndexBuilder
+from file_catalog import SOURCE_FILE_TYPES, FileCatalog
+from utils import detect_file_type, parse_gitignore, should_include_file
+
+FIXTURE = {
+    '.gitignore': "*.log\ngenerated/\n",
+    '.env': "KEY=1\n",
+    '.hidden.py': "x = 1\n",
+    'README.md': "# demo\n",
+    'main.min.js': "var a;\n",
+    'src/app.py': "import json\n",
+    'src/util.js': "export const a = 1;\n",
+    'src/types.ts': "export type A = number;\n",
+    'src/pkg/__init__.py': "",
+    'src/pkg/core.py': "def run():\n    pass\n",
+    'src/__pycache__/app.cpython-311.pyc': "",
+    'logs/run.log': "log\n",
+    'generated/gen.py': "x = 1\n",
+    'build/out.py': "x = 1\n",
+    'node_modules/pkg/index.js': "module.exports = 1;\n",
+    'node_modules/pkg/lib/deep.js': "module.exports = 2;\n",
+    '.git/config': "[core]\n",
+}
+
+# 遍历时不应进入的目录（相对项目根目录）
+PRUNED_DIRS = {'generated', 'build', 'node_modules', '.git', 'src/__pycache__'}
+
+
+def make_fixture(root: Path):
+    for rel_path, content in FIXTURE.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def legacy_files(root: Path):
+    """原实现：遍历所有文件后逐个用 should_include_file 过滤"""
+    patterns = parse_gitignore(root / '.gitignore')
+    return {
+        path.relative_to(root).as_posix()
+        for path in root.rglob('*')
+        if path.is_file() and should_include_file(path, patterns, root)
+    }
+
+
+def test_walk_prunes_excluded_directories():
+    """被排除的目录不会被 scandir 进入，其余目录各只遍历一次"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_fixture(root)
+
+        scanned = []
+        original_scandir = os.scandir
+
+        def recording_scandir(path):
+            scanned.append(Path(path).relative_to(root).as_posix())
+            return original_scandir(path)
+
+        os.scandir = recording_scandir
+        try:
+            catalog = FileCatalog(root, root / '.gitignore').build()
+            catalog.build()
+            catalog.source_files()
+        finally:
+            os.scandir = original_scandir
+
+        assert sorted(scanned) == ['.', 'logs', 'src', 'src/pkg']
+        assert not PRUNED_DIRS & set(scanned)
+
+
+def test_same_file_set_as_legacy_rules():
+    """扫描、依赖分析与符号索引得到的文件集合与原规则一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / 'project'
+        root.mkdir()
+        make_fixture(root)
+
+        expected = legacy_files(root)
+        assert expected == {'.gitignore', '.env', 'README.md', 'src/app.py', 'src/util.js',
+                            'src/types.ts', 'src/pkg/__init__.py', 'src/pkg/core.py'}
+        expected_sources = {rel for rel in expected if detect_file_type(Path(rel)) in SOURCE_FILE_TYPES}
+
+        catalog = FileCatalog(root, root / '.gitignore').build()
+        relative = lambda paths: {Path(path).relative_to(root).as_posix() for path in paths}
+        assert relative(catalog.files()) == expected
+        assert relative(catalog.source_files()) == expected_sources
+
+        analyzer = DependencyAnalyzer(root, root / '.gitignore', catalog=catalog)
+        assert relative(analyzer._collect_source_files()) == expected_sources
+        with contextlib.redirect_stdout(io.StringIO()):
+            builder = SymbolIndexBuilder(root, str(Path(tmp) / 'symbols.db'), root / '.gitignore', catalog=catalog)
+        assert relative(builder._collect_source_files()) == expected_sources
+
+        # 文件树的每一层与文件列表一致
+        tree_files = set()
+        stack = ['']
+        while stack:
+            for entry in catalog.children(stack.pop()):
+                if entry.is_dir:
+                    stack.append(entry.rel_path)
+                else:
+                    tree_files.add(entry.rel_path)
+        assert tree_files == expected
+
+
+if __name__ == "__main__":
+    test_walk_prunes_excluded_directories()
+    test_same_file_set_as_legacy_rules()
+    print("✅ 共享文件目录测试通过")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+gitignore 匹配器测试
+验证否定、锚定、**、目录专用模式与嵌套 .gitignore 的语义（结果与 git check-ignore 一致）
+"""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from ignore_matcher import IgnoreMatcher
+
+PATTERNS = [
+    "# comment",
+    "*.log",
+    "!important.log",
+    "build/",
+    "/dist",
+    "docs/**/*.tmp",
+    "**/cache",
+    "foo/**",
+    "a?c.txt",
+    "[Tt]emp*",
+    "node_modules/",
+    "*.egg-info/",
+]
+
+# (路径, 是否目录, 是否被排除)
+CASES = [
+    ("x.log", False, True),
+    ("important.log", False, False),
+    ("src/important.log", False, False),
+    ("build", True, True),
+    ("build", False, False),
+    ("src/build/y.py", False, True),
+    ("dist", True, True),
+    ("src/dist", True, False),
+    ("docs/a/b/c.tmp", False, True),
+    ("docs/c.tmp", False, True),
+    ("x/cache/y", False, True),
+    ("foo", True, False),
+    ("foo/bar", False, True),
+    ("abc.txt", False, True),
+    ("ab/abc.txt", False, True),
+    ("Temp1", False, True),
+    ("src/temp.py", False, True),
+    ("a/node_modules/b.js", False, True),
+    ("pkg.egg-info/PKG-INFO", False, True),
+    ("src/main.py", False, False),
+]
+
+
+def test_gitignore_semantics():
+    """各类模式的匹配结果与 git 一致"""
+    matcher = IgnoreMatcher(PATTERNS)
+    for path, is_dir, expected in CASES:
+        assert matcher.is_excluded(path, is_dir) == expected, path
+
+
+def test_nested_gitignore():
+    """嵌套 .gitignore 只作用于所在子树，且可被否定"""
+    matcher = IgnoreMatcher(["build/"])
+    matcher.add_patterns(["*.txt", "!keep.txt"], base="nested")
+
+    assert matcher.is_excluded("nested/a.txt")
+    assert matcher.is_excluded("nested/deep/b.txt")
+    assert not matcher.is_excluded("nested/keep.txt")
+    assert not matcher.is_excluded("other/a.txt")
+    # 被排除目录下的内容不能被重新包含
+    matcher.add_patterns(["!build/keep.py"])
+    assert matcher.is_excluded("build/keep.py")
+
+
+if __name__ == "__main__":
+    test_gitignore_semantics()
+    test_nested_gitignore()
+    print("✅ gitignore 匹配器测试通过")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+启动导入预算测试
+用 -X importtime 验证 query_index 的 find/stats 命令不导入重型模块，
+generate 在导入时不加载 jinja2、yaml 与各 AST 提取器，以及命令行查询的启动开销
+"""
+
+import contextlib
+import io
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench.synthetic_project import ProjectSpec, generate_project
+from generate import generate_architecture_docs
+
+# find/stats 不应导入的模块（提取器、构建、搜索分词与 pathlib 等）
+QUERY_FORBIDDEN = {
+    'ast', 'inspect', 'pathlib', 'multiprocessing', 'jinja2', 'yaml', 'utils', 'ignore_matcher',
+    'build_symbol_index', 'enhanced_ast_analyzer', 'ast_extractors', 'query_server',
+}
+
+# 导入 generate 时不应加载的模块（运行到对应阶段或开启对应选项时才导入）
+GENERATE_FORBIDDEN = {
+    'jinja2', 'yaml', 'multiprocessing', 'cProfile', 'tracemalloc', 'enhanced_ast_analyzer',
+    'ast_extractors.class_extractor', 'ast_extractors.function_extractor',
+    'ast_extractors.extraction_engine', 'ast_extractors.pattern_extractor',
+}
+
+# 查询路径必需的标准库（json 会导入 re 与 enum），作为计时基线
+QUERY_BASELINE_IMPORTS = 'import sqlite3, json, typing, threading, zlib'
+# 查询命令相对于基线的额外耗时上限（毫秒）：本仓库模块的导入与查询本身
+QUERY_OVERHEAD_BUDGET_MS = 50
+
+
+def imported_modules(args):
+    """运行 python -X importtime <args>，返回导入的模块名"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=SCRIPTS_DIR, capture_output=True, text=True, check=True
+    )
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith('import time:') and '|' in line:
+            name = line.rsplit('|', 1)[1].strip()
+            if name != 'imported package':
+                modules.add(name)
+    return modules, result.stdout
+
+
+def best_time_ms(args, runs: int = 5) -> float:
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, check=True)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+
+def build_project(tmp: Path) -> Path:
+    """生成合成项目并在默认输出目录构建索引（query_index 应能自动找到）"""
+    project = tmp / 'project'
+    generate_project(project, ProjectSpec(files=20, classes_per_file=2))
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_architecture_docs(project, incremental=False)
+    return project
+
+
+def test_query_imports():
+    """find/stats 只导入查询所需的模块"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = build_project(Path(tmp))
+        for command in (['find', 'Model0_0'], ['stats']):
+            modules, output = imported_modules(['query_index.py', str(project), *command])
+            assert 'Error' not in output, output
+            assert 'symbol_query' in modules
+            loaded = {name for name in modules if name.split('.')[0] in QUERY_FORBIDDEN}
+            assert not loaded, f"{command[0]} imported {sorted(loaded)}"
+
+        # 前缀命中不需要分词；落到模糊匹配时才导入分词函数
+        modules, output = imported_modules(['query_index.py', str(project), 'search', 'model'])
+        assert 'utils' not in modules and 'Model0_0' in output
+        modules, output = imported_modules(['query_index.py', str(project), 'search', 'modl'])
+        assert 'utils' in modules and 'fuzzy' in output
+
+
+def test_generate_imports():
+    """导入 generate 不加载模板引擎依赖、yaml 与提取器"""
+    modules, _ = imported_modules(['-c', 'import generate'])
+    loaded = GENERATE_FORBIDDEN & modules
+    assert not loaded, f"import generate loaded {sorted(loaded)}"
+
+
+def test_query_startup_budget():
+    """find/stats 的启动开销（扣除解释器启动与必需的标准库导入）在预算内"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = build_project(Path(tmp))
+        # 预热：生成字节码缓存并加载磁盘缓存
+        best_time_ms(['query_index.py', str(project), 'stats'], runs=1)
+
+        baseline = best_time_ms(['-c', QUERY_BASELINE_IMPORTS])
+        for command in (['find', 'Model0_0'], ['stats']):
+            elapsed = best_time_ms(['query_index.py', str(project), *command])
+            overhead = elapsed - baseline
+            assert overhead < QUERY_OVERHEAD_BUDGET_MS, \
+                f"{command[0]}: {elapsed:.1f} ms ({overhead:.1f} ms over baseline {baseline:.1f} ms)"
+
+
+if __name__ == "__main__":
+    test_query_imports()
+    test_generate_imports()
+    test_query_startup_budget()
+    print("✅ 启动导入预算测试通过")
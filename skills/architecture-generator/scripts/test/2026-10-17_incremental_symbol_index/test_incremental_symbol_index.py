@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+符号索引增量更新测试
+验证 update_index 只重新索引变更文件，且结果与全量重建一致；
+在已有索引上全量重建时不残留旧符号、旧 metadata 与旧调用边；
+结构版本过旧的索引在增量更新时被重建后包含全部文件
+"""
+
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_symbol_index import SymbolIndexBuilder
+
+
+def snapshot(db_path: Path):
+    """符号内容快照（按父符号名称比较，与 ID 无关）"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT s.name, s.kind, s.file_path, s.line_number, p.name
+        FROM symbols s LEFT JOIN symbols p ON s.parent_id = p.id
+    """).fetchall()
+    conn.close()
+    return sorted(rows, key=repr)
+
+
+def edge_snapshot(db_path: Path):
+    """依赖边与调用记录快照（按符号名称与行号比较）"""
+    conn = sqlite3.connect(db_path)
+    edges = conn.execute("""
+        SELECT f.name, f.line_number, t.name, t.line_number, d.dep_type
+        FROM dependencies d
+        JOIN symbols f ON f.id = d.from_symbol JOIN symbols t ON t.id = d.to_symbol
+    """).fetchall()
+    calls = conn.execute("""
+        SELECT s.name, s.line_number, c.callee_name, c.line_number
+        FROM call_graph c JOIN symbols s ON s.id = c.caller_id
+    """).fetchall()
+    orphans = conn.execute("""
+        SELECT (SELECT COUNT(*) FROM call_graph WHERE caller_id NOT IN (SELECT id FROM symbols))
+             + (SELECT COUNT(*) FROM dependencies
+                WHERE from_symbol NOT IN (SELECT id FROM symbols) OR to_symbol NOT IN (SELECT id FROM symbols))
+    """).fetchone()[0]
+    conn.close()
+    return sorted(edges), sorted(calls), orphans
+
+
+def build(project: Path, db_path: Path):
+    return SymbolIndexBuilder(project, str(db_path), journal_mode=None)
+
+
+def test_incremental_symbol_index():
+    """修改、删除文件后增量更新的结果应与全量重建一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "a.py").write_text("class A:\n    def run(self):\n        pass\n", encoding='utf-8')
+        (project / "b.py").write_text("def helper():\n    return 1\n", encoding='utf-8')
+        (project / "c.py").write_text("class C:\n    pass\n", encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        build(project, db_path).build_index()
+
+        # 调用边指向将被删除的符号（call_graph 表由构建器创建）
+        conn = sqlite3.connect(db_path)
+        conn.execute("""
+            INSERT INTO call_graph SELECT id, 'helper', 2 FROM symbols WHERE name = 'run'
+        """)
+        conn.commit()
+        conn.close()
+
+        # 修改 a.py，删除 c.py
+        (project / "a.py").write_text("class A2:\n    def start(self):\n        pass\n", encoding='utf-8')
+        (project / "c.py").unlink()
+
+        builder = build(project, db_path)
+        builder.update_index([project / "a.py"], ["c.py"])
+        assert builder.rows_inserted == 3
+
+        fresh_db = tmp_dir / "fresh.db"
+        build(project, fresh_db).build_index()
+
+        assert snapshot(db_path) == snapshot(fresh_db)
+
+        conn = sqlite3.connect(db_path)
+        orphans = conn.execute("""
+            SELECT COUNT(*) FROM call_graph WHERE caller_id NOT IN (SELECT id FROM symbols)
+        """).fetchone()[0]
+        conn.close()
+        assert orphans == 0
+
+
+def test_full_rebuild_over_existing_index():
+    """所有文件都变化后在同一数据库上全量重建，结果与新建索引相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "a.py").write_text("def foo():\n    return bar()\n\n\ndef bar():\n    return 1\n", encoding='utf-8')
+        (project / "b.py").write_text("def baz(x):\n    return x\n", encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        build(project, db_path).build_index()
+
+        # 两个文件都修改：foo/bar 行号改变，baz 的参数（metadata）改变
+        (project / "a.py").write_text(
+            "import os\n\n\ndef bar():\n    return 1\n\n\ndef foo():\n    return bar()\n", encoding='utf-8'
+        )
+        (project / "b.py").write_text("def baz(x, y=2):\n    return foo()\n", encoding='utf-8')
+        build(project, db_path).build_index()
+
+        fresh_db = tmp_dir / "fresh.db"
+        build(project, fresh_db).build_index()
+
+        rows = snapshot(db_path)
+        assert rows == snapshot(fresh_db)
+        assert ('foo', 'function', 'a.py', 8, 'a.py') in rows
+        assert not any(row[0] == 'foo' and row[3] == 1 for row in rows)
+        assert edge_snapshot(db_path) == edge_snapshot(fresh_db)
+        assert edge_snapshot(db_path)[2] == 0
+
+        conn = sqlite3.connect(db_path)
+        fresh = sqlite3.connect(fresh_db)
+        query = "SELECT name, line_number, metadata FROM symbols ORDER BY name, line_number"
+        assert conn.execute(query).fetchall() == fresh.execute(query).fetchall()
+        conn.close()
+        fresh.close()
+
+
+def test_update_over_outdated_schema():
+    """结构版本过旧的索引被删除重建后，增量更新改为全量索引，未变更的文件不丢失"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "a.py").write_text("def foo():\n    return bar()\n", encoding='utf-8')
+        (project / "b.py").write_text("def bar():\n    return 1\n", encoding='utf-8')
+        (project / "c.py").write_text("class C:\n    pass\n", encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        build(project, db_path).build_index()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("PRAGMA user_version = 1")
+        conn.close()
+
+        (project / "a.py").write_text("def foo2():\n    return bar()\n", encoding='utf-8')
+        build(project, db_path).update_index([project / "a.py"], [])
+
+        fresh_db = tmp_dir / "fresh.db"
+        build(project, fresh_db).build_index()
+
+        rows = snapshot(db_path)
+        assert rows == snapshot(fresh_db)
+        assert {row[2] for row in rows} == {'a.py', 'b.py', 'c.py'}
+        assert edge_snapshot(db_path) == edge_snapshot(fresh_db)
+
+
+if __name__ == "__main__":
+    test_incremental_symbol_index()
+    test_full_rebuild_over_existing_index()
+    test_update_over_outdated_schema()
+    print("✅ 增量更新测试通过")
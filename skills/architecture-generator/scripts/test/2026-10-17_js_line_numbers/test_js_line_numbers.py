@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+JavaScript/TypeScript 符号提取基准测试
+验证单次扫描 + 行起始偏移二分查找的结果与逐模式统计前缀换行数一致，
+且在 5 MB 的打包文件上每个匹配的耗时不随文件大小增长
+"""
+
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_symbol_index import FileSymbolExtractor
+
+# 5 MB 文件的时间预算（秒），旧实现为平方复杂度，需要数小时
+TIME_BUDGET = 10.0
+
+SAMPLE = '''export default class Widget extends Base {
+  render() { return helper(this); }
+}
+class Panel {}
+function helper(value) {
+  const inner = (a, b) => a + b;
+  return inner(value, 1);
+}
+export function load (path) {}
+let single = x => x * 2;
+var noop = () =>
+  null;
+'''
+
+
+def naive_records(content: str):
+    """旧实现：三个模式分别扫描，每个匹配统计前缀中的换行数"""
+    records = []
+    for pattern, kind in [
+        (r'(?:export\s+)?(?:default\s+)?class\s+(\w+)', 'class'),
+        (r'function\s+(\w+)\s*\(', 'function'),
+        (r'(?:const|let|var)\s+(\w+)\s*=\s*(?:\([^)]*\)|\w+)\s*=>', 'function'),
+    ]:
+        for match in re.finditer(pattern, content):
+            line_num = content[:match.start()].count('\n') + 1
+            records.append((match.group(1), kind, line_num, None, 0, None))
+    return records
+
+
+def make_bundle(target_bytes: int) -> str:
+    """生成合成的打包文件：重复的模块块，附带长单行（压缩代码）"""
+    blocks = []
+    size = 0
+    i = 0
+    while size < target_bytes:
+        block = (
+            f"class Component{i} extends Base {{\n"
+            f"  render() {{ return renderItem{i}(this.props); }}\n"
+            f"}}\n"
+            f"function renderItem{i}(props) {{\n"
+            f"  const format{i} = (value) => String(value);\n"
+            f"  return format{i}(props.value);\n"
+            f"}}\n"
+            f"var a{i}=function(){{return {i}}},b{i}=c=>c+{i};" + "x" * 40 + "\n"
+        )
+        blocks.append(block)
+        size += len(block)
+        i += 1
+    return "".join(blocks)
+
+
+def time_extraction(content: str, tmp_dir: Path, name: str):
+    """返回 (每个匹配的耗时秒数, 记录)"""
+    path = tmp_dir / name
+    path.write_text(content, encoding='utf-8')
+    extractor = FileSymbolExtractor(tmp_dir)
+
+    start = time.perf_counter()
+    records = extractor._extract_js_file(path, name)
+    elapsed = time.perf_counter() - start
+    return elapsed / max(len(records) - 1, 1), elapsed, records
+
+
+def test_js_line_numbers():
+    """与旧实现结果一致；5 MB 文件在预算内完成，单个匹配耗时基本不变"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+
+        # 正确性：记录顺序、行号与旧实现相同
+        _, _, records = time_extraction(SAMPLE, tmp_dir, "sample.js")
+        assert records[0] == ("sample.js", 'file', 1, 12, None, None)
+        assert records[1:] == naive_records(SAMPLE)
+        assert ('Widget', 'class', 1, None, 0, None) in records
+        assert ('noop', 'function', 11, None, 0, None) in records
+
+        small = make_bundle(512 * 1024)
+        large = make_bundle(5 * 1024 * 1024)
+        _, _, small_records = time_extraction(small[:20000], tmp_dir, "prefix.js")
+        assert small_records[1:] == naive_records(small[:20000])
+
+        small_cost, small_time, small_records = time_extraction(small, tmp_dir, "small.js")
+        large_cost, large_time, large_records = time_extraction(large, tmp_dir, "large.js")
+
+    print(f"0.5 MB: {len(small_records)} 条记录, {small_time:.3f}s, {small_cost * 1e6:.2f}µs/匹配")
+    print(f"5 MB: {len(large_records)} 条记录, {large_time:.3f}s, {large_cost * 1e6:.2f}µs/匹配")
+
+    assert len(large_records) > 9 * len(small_records)
+    # 性能：绝对预算 + 每个匹配耗时平稳（10 倍规模，允许 3 倍单位耗时以容忍抖动）
+    assert large_time < TIME_BUDGET
+    assert large_cost < max(small_cost, 1e-6) * 3
+
+
+if __name__ == "__main__":
+    test_js_line_numbers()
+    print("✅ 基准测试通过")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+查询结果行测试
+验证 metadata 按需解析、字段投影与摘要模式
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_symbol_index import SymbolIndexBuilder
+from query_index import SUMMARY_FIELDS, SymbolIndex
+
+
+def test_lazy_symbol_rows():
+    """metadata 只在访问时解析；投影与摘要模式不返回 metadata"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "models.py").write_text(
+            "class User:\n    def save(self):\n        pass\n", encoding='utf-8'
+        )
+
+        db_path = tmp_dir / "symbols.db"
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).build_index()
+
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            # 默认返回全部字段，metadata 在第一次访问时解析
+            file_row = index.find_symbol('models.py', 'file')[0]
+            assert not file_row.metadata_decoded
+            assert file_row.name == 'models.py'
+            assert not file_row.metadata_decoded
+            assert isinstance(file_row['metadata'], dict)
+            assert file_row.metadata_decoded
+            assert file_row.to_dict()['metadata'] is file_row['metadata']
+
+            # 摘要模式：没有 metadata 键
+            rows = index.get_file_symbols('models.py', summary=True)
+            assert [r['name'] for r in rows] == ['models.py', 'User', 'save']
+            assert all(tuple(r) == SUMMARY_FIELDS for r in rows)
+
+            # 字段投影（排序搜索额外包含 match/score）
+            rows = index.search('user', fields=['name', 'line_number'])
+            assert [r.to_dict() for r in rows] == [
+                {'name': 'User', 'line_number': 1, 'match': 'exact', 'score': 1.0}
+            ]
+            assert [dict(r) for r in index.search_symbols('sav', fields=['kind'])] == [{'kind': 'function'}]
+
+            try:
+                index.find_symbol('User', fields=['name', 'body'])
+                raise AssertionError("unknown field should be rejected")
+            except ValueError:
+                pass
+        finally:
+            index.close()
+
+
+if __name__ == "__main__":
+    test_lazy_symbol_rows()
+    print("✅ 查询结果行测试通过")
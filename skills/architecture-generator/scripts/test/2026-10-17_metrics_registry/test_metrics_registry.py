@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+指标注册表测试
+验证计数器/数值/直方图、Prometheus 文本格式与原子写出、工作进程指标的合并，
+以及 generate 运行与查询服务产生的指标
+"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import metrics
+from bench.synthetic_project import ProjectSpec, generate_project
+from generate import generate_architecture_docs, write_run_metrics
+from query_server import QueryServer
+
+
+def test_registry_and_prometheus_format():
+    """计数器追加 _total，直方图输出累计桶、_sum 与 _count"""
+    registry = metrics.MetricsRegistry()
+    files = registry.counter('files', 'Files seen')
+    files.inc(kind='py')
+    files.inc(2, kind='py')
+    files.inc(0, kind='js')  # 0 不创建标签组合
+    assert registry.counter('files', 'Files seen') is files
+    assert files.get(kind='py') == 3 and files.get(kind='js') == 0
+
+    registry.gauge('edges', 'Edges').set(7)
+    latency = registry.histogram('latency', 'Latency', buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, method='find')
+
+    try:
+        registry.gauge('files', 'Files seen')
+        assert False, "registering a counter name as gauge must fail"
+    except ValueError:
+        pass
+
+    assert latency.get(method='find') == {
+        'count': 4, 'sum': 4.05, 'buckets': {'0.1': 1, '1': 3, '+Inf': 4}
+    }
+    text = registry.to_prometheus()
+    assert text.splitlines() == [
+        '# HELP archgen_edges Edges',
+        '# TYPE archgen_edges gauge',
+        'archgen_edges 7',
+        '# HELP archgen_files_total Files seen',
+        '# TYPE archgen_files_total counter',
+        'archgen_files_total{kind="py"} 3',
+        '# HELP archgen_latency Latency',
+        '# TYPE archgen_latency histogram',
+        'archgen_latency_bucket{method="find",le="0.1"} 1',
+        'archgen_latency_bucket{method="find",le="1"} 3',
+        'archgen_latency_bucket{method="find",le="+Inf"} 4',
+        'archgen_latency_sum{method="find"} 4.05',
+        'archgen_latency_count{method="find"} 4',
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'textfile' / 'archgen.prom'
+        registry.write_textfile(path)
+        assert path.read_text(encoding='utf-8') == text
+        assert [p.name for p in path.parent.iterdir()] == ['archgen.prom']  # 无残留临时文件
+
+        registry.write_json(Path(tmp) / 'metrics.json')
+        data = json.loads((Path(tmp) / 'metrics.json').read_text(encoding='utf-8'))
+        assert data['files']['values'] == [{'labels': {'kind': 'py'}, 'value': 3}]
+        assert data['latency']['values'][0]['value']['count'] == 4
+
+
+def test_drain_and_merge():
+    """drain 取出增量并清空；merge 累加计数与直方图"""
+    parent, worker = metrics.MetricsRegistry(), metrics.MetricsRegistry()
+    for registry in (parent, worker):
+        registry.counter('rows', 'Rows')
+        registry.histogram('seconds', 'Seconds', buckets=(1.0,))
+
+    parent.get('rows').inc(5)
+    worker.get('rows').inc(2)
+    worker.get('seconds').observe(0.5)
+    parent.merge(worker.drain())
+    assert worker.drain() == {}
+
+    worker.get('rows').inc(1)
+    parent.merge(worker.drain())
+    assert parent.get('rows').get() == 8
+    assert parent.get('seconds').get()['buckets'] == {'1': 1, '+Inf': 1}
+
+
+def run_generate(project: Path, output: Path, jobs: int):
+    metrics.REGISTRY.reset()
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_architecture_docs(project, output_dir=output, jobs=jobs)
+    return metrics.REGISTRY.to_dict()
+
+
+def test_generate_metrics():
+    """并行提取时工作进程的指标合并后与串行相同；增量运行只统计变化的文件"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=12, classes_per_file=2))
+        python_files = len(list(project.rglob('*.py')))
+
+        serial = run_generate(project, Path(tmp) / 'docs_1', jobs=1)
+        parallel = run_generate(project, Path(tmp) / 'docs_2', jobs=2)
+
+        for name in ('files_indexed', 'symbol_rows', 'call_edges_resolved', 'scan_mode', 'cache_requests'):
+            assert serial[name]['values'] == parallel[name]['values'], name
+        counters = metrics.REGISTRY
+        assert counters.get('files_indexed').get(language='python') == python_files
+        assert counters.get('scan_mode').get(mode='full') == 1
+        assert counters.get('parse_failures').get(stage='symbols') == 0
+        assert counters.get('file_analysis_seconds').get(stage='symbols')['count'] == python_files
+        assert counters.get('query_seconds').get(method='get_statistics')['count'] == 1
+        stages = {item['labels']['stage'] for item in parallel['stage_seconds']['values']}
+        assert stages == {'scan', 'dependencies', 'symbol_index', 'render', 'scan_cache', 'total'}
+
+        # 修改一个文件后增量运行
+        module = next(project.rglob('module_*.py'))
+        module.write_text(module.read_text(encoding='utf-8') + "\n\ndef added():\n    pass\n", encoding='utf-8')
+        run_generate(project, Path(tmp) / 'docs_2', jobs=2)
+        assert counters.get('scan_mode').get(mode='incremental') == 1
+        assert counters.get('incremental_files').get(status='changed') == 1
+        assert counters.get('cache_requests').get(cache='extraction', result='miss') == 1
+        assert counters.get('cache_requests').get(cache='dependency', result='miss') == 1
+
+        textfile = Path(tmp) / 'archgen.prom'
+        write_run_metrics(False, textfile_path=textfile)
+        text = textfile.read_text(encoding='utf-8')
+        assert 'archgen_last_run_success 0\n' in text
+        assert 'archgen_files_indexed_total{language="python"} 1\n' in text
+
+
+def test_query_server_metrics():
+    """查询延迟按方法统计；metrics 方法返回 JSON 或 Prometheus 文本"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=3, js_ratio=0))
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_architecture_docs(project, output_dir=Path(tmp) / 'docs', incremental=False)
+
+        metrics.REGISTRY.reset()
+        server = QueryServer(str(project), str(Path(tmp) / 'docs' / '.cache' / 'symbols.db'))
+        try:
+            for _ in range(2):
+                server.handle_line(json.dumps({'id': 1, 'method': 'find', 'params': ['Model0_0']}))
+            server.handle_line(json.dumps({'id': 2, 'method': 'search', 'params': {'query': 'model'}}))
+
+            response = json.loads(server.handle_line(json.dumps({'id': 3, 'method': 'metrics'})))
+            result = response['result']
+            latency = {item['labels']['method']: item['value']['count']
+                       for item in result['query_seconds']['values']}
+            assert latency == {'find_symbol': 1, 'search': 1}  # 第二次 find 命中结果缓存
+            assert metrics.REGISTRY.get('cache_requests').get(cache='query_server', result='hit') == 1
+
+            response = json.loads(server.handle_line(
+                json.dumps({'id': 4, 'method': 'metrics', 'params': {'format': 'prometheus'}})
+            ))
+            assert 'archgen_query_seconds_count{method="search"} 1\n' in response['result']
+            response = json.loads(server.handle_line(
+                json.dumps({'id': 5, 'method': 'metrics', 'params': ['xml']})
+            ))
+            assert 'error' in response
+        finally:
+            server.close()
+
+
+if __name__ == "__main__":
+    test_registry_and_prometheus_format()
+    test_drain_and_merge()
+    test_generate_metrics()
+    test_query_server_metrics()
+    print("✅ 指标注册表测试通过")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+模块解析器测试
+验证 Python 模块名、相对导入、包 __init__、源码根目录与 JS 相对路径/别名的解析，
+以及标准库/第三方模块名不会解析到同名的项目文件
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from module_resolver import ModuleResolver
+
+FILES = [
+    "app/__init__.py",
+    "app/models.py",
+    "app/api/__init__.py",
+    "app/api/views.py",
+    "scripts/run.py",
+    "scripts/helpers.py",
+    "src/components/Button.tsx",
+    "src/components/index.ts",
+    "src/lib/format.js",
+    "src/main.ts",
+]
+
+
+def test_python_resolution():
+    """Python：完整模块名、from 导入、相对导入与脚本目录"""
+    resolver = ModuleResolver(FILES)
+
+    assert resolver.resolve("app.models", "scripts/run.py") == "app/models.py"
+    # from app.models import User -> app.models.User
+    assert resolver.resolve("app.models.User", "scripts/run.py") == "app/models.py"
+    # from app import api -> 子包
+    assert resolver.resolve("app.api", "scripts/run.py") == "app/api/__init__.py"
+    # from . import views / from ..models import User
+    assert resolver.resolve(".views", "app/api/__init__.py") == "app/api/views.py"
+    assert resolver.resolve("..models.User", "app/api/views.py") == "app/models.py"
+    # 同目录脚本
+    assert resolver.resolve("helpers", "scripts/run.py") == "scripts/helpers.py"
+    # 外部依赖与子串误匹配
+    assert resolver.resolve("requests", "scripts/run.py") is None
+    assert resolver.resolve("model", "scripts/run.py") is None
+
+
+def test_stdlib_names_do_not_resolve_to_project_files():
+    """json、types 等模块名不按后缀匹配到任意目录下的同名文件"""
+    files = [
+        "app/main.py",
+        "app/handlers/json.py",
+        "app/handlers/logging.py",
+        "lib/core/__init__.py",
+        "lib/core/types.py",
+        "tools/typing/helpers.py",
+    ]
+    resolver = ModuleResolver(files)
+    for name in ("json", "json.decoder", "types", "logging", "typing", "os"):
+        assert resolver.resolve(name, "app/main.py") is None, name
+        assert resolver.resolve(name, "lib/core/types.py") is None, name
+
+    # 包含顶层包的目录（lib）是源码根目录：core.types 可解析，但 types 不可
+    assert resolver.source_roots == ["lib"]
+    assert resolver.resolve("core.types", "app/main.py") == "lib/core/types.py"
+    # 完整路径与同目录导入不受影响
+    assert resolver.resolve("app.handlers.json", "app/main.py") == "app/handlers/json.py"
+    assert resolver.resolve("json", "app/handlers/logging.py") == "app/handlers/json.py"
+
+
+def test_source_roots():
+    """src 布局、配置的源码根目录"""
+    files = [
+        "src/mypkg/__init__.py",
+        "src/mypkg/cli.py",
+        "src/standalone.py",
+        "services/api/handlers.py",
+        "tests/test_cli.py",
+    ]
+    resolver = ModuleResolver(files)
+    assert resolver.resolve("mypkg.cli", "tests/test_cli.py") == "src/mypkg/cli.py"
+    assert resolver.resolve("standalone", "tests/test_cli.py") == "src/standalone.py"
+    assert resolver.resolve("handlers", "tests/test_cli.py") is None
+    assert resolver.resolve("api.handlers", "tests/test_cli.py") is None
+
+    resolver = ModuleResolver(files, source_roots=["services/"])
+    assert resolver.source_roots == ["services", "src"]
+    assert resolver.resolve("api.handlers", "tests/test_cli.py") == "services/api/handlers.py"
+
+
+def test_js_resolution():
+    """JS/TS：相对路径、index 文件与 tsconfig 别名"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "tsconfig.json").write_text(json.dumps({
+            "compilerOptions": {"baseUrl": ".", "paths": {"@/*": ["src/*"]}}
+        }), encoding='utf-8')
+        resolver = ModuleResolver(FILES, root)
+
+    assert resolver.resolve("./components/Button", "src/main.ts") == "src/components/Button.tsx"
+    assert resolver.resolve("./components", "src/main.ts") == "src/components/index.ts"
+    assert resolver.resolve("../lib/format", "src/components/Button.tsx") == "src/lib/format.js"
+    assert resolver.resolve("@/lib/format", "src/main.ts") == "src/lib/format.js"
+    assert resolver.resolve("react", "src/main.ts") is None
+
+
+if __name__ == "__main__":
+    test_python_resolution()
+    test_stdlib_names_do_not_resolve_to_project_files()
+    test_source_roots()
+    test_js_resolution()
+    print("✅ 模块解析测试通过")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+规范化 metadata 存储测试
+验证还原后的 metadata 与分析器输出完全一致（压缩与否结果相同），
+增量更新不残留规范化行，以及旧结构版本的索引会被重建
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_symbol_index import SymbolIndexBuilder
+from enhanced_ast_analyzer import EnhancedASTAnalyzer
+from query_index import SymbolIndex
+from symbol_store import SCHEMA_VERSION
+
+
+SOURCE = '''
+import os
+from typing import List
+
+
+@decorator(option=True)
+class Repository(Base, metaclass=Meta):
+    """Stores things."""
+
+    limit: int = 10
+
+    def find(self, key: str, *args, default=None, **kwargs) -> List[str]:
+        try:
+            return [os.path.join(key, item) for item in args]
+        except (KeyError, ValueError) as e:
+            return default
+
+    class Meta:
+        def nested(self):
+            pass
+
+
+async def load(path, /, *, retries: int = 3):
+    with open(path) as f:
+        return sorted(f, key=lambda line: len(line))
+'''
+
+
+def load_all(project: Path, db_path: Path):
+    """读取所有符号的 metadata（name -> metadata）"""
+    index = SymbolIndex(str(project), str(db_path))
+    try:
+        return {row['name']: row['metadata'] for row in index.get_file_symbols('models.py')}
+    finally:
+        index.close()
+
+
+def test_normalized_symbol_store():
+    """metadata 还原无损，子符号与规范化表在增量更新时同步删除"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "models.py").write_text(SOURCE, encoding='utf-8')
+
+        # 期望值：分析器输出经 JSON 往返（与旧版逐行 JSON 存储相同）
+        analyzed = EnhancedASTAnalyzer(project, str(tmp_dir / "unused.db")).analyze_file(project / "models.py")
+        expected_file = json.loads(json.dumps(analyzed))
+        expected_class = expected_file['classes'][0]
+
+        results = []
+        for compress in (True, False):
+            db_path = tmp_dir / f"symbols_{compress}.db"
+            SymbolIndexBuilder(
+                project, str(db_path), journal_mode=None, compress_metadata=compress
+            ).build_index()
+            results.append(load_all(project, db_path))
+
+        compressed, plain = results
+        assert compressed == plain
+        assert compressed['models.py'] == expected_file
+        assert compressed['Repository'] == expected_class
+        assert compressed['find'] == expected_class['methods'][0]
+        assert compressed['Meta'] == expected_class['nested_classes'][0]
+        assert compressed['load'] == expected_file['functions'][0]
+
+        # 子符号的内容不重复存储在父符号行中
+        db_path = tmp_dir / "symbols_True.db"
+        conn = sqlite3.connect(db_path)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        raw_sizes = [len(row[0]) for row in conn.execute(
+            "SELECT metadata FROM symbols WHERE metadata IS NOT NULL"
+        )]
+        conn.close()
+        assert sum(raw_sizes) < len(json.dumps(analyzed))
+
+        # 增量更新：删除的符号不应残留规范化行
+        (project / "models.py").write_text("def plain():\n    pass\n", encoding='utf-8')
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).update_index(
+            [project / "models.py"], []
+        )
+        conn = sqlite3.connect(db_path)
+        for table in ('symbol_parameters', 'symbol_decorators', 'symbol_bases',
+                      'file_dependencies', 'file_patterns'):
+            orphans = conn.execute(f"""
+                SELECT COUNT(*) FROM {table} WHERE symbol_id NOT IN (SELECT id FROM symbols)
+            """).fetchone()[0]
+            assert orphans == 0, table
+        conn.close()
+        assert load_all(project, db_path)['plain']['parameters'] == []
+
+        # 旧结构版本（逐行 JSON）的索引会被删除重建
+        old_db = tmp_dir / "old.db"
+        conn = sqlite3.connect(old_db)
+        conn.execute("""
+            CREATE TABLE symbols (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, kind TEXT NOT NULL,
+                file_path TEXT NOT NULL, line_number INTEGER, end_line_number INTEGER,
+                parent_id INTEGER, metadata TEXT, UNIQUE(name, kind, file_path, line_number)
+            )
+        """)
+        conn.execute("""
+            INSERT INTO symbols (name, kind, file_path, line_number, metadata)
+            VALUES ('stale', 'function', 'models.py', 1, '{"legacy": true}')
+        """)
+        conn.commit()
+        conn.close()
+
+        SymbolIndexBuilder(project, str(old_db), journal_mode=None).build_index()
+        assert set(load_all(project, old_db)) == {'models.py', 'plain'}
+
+
+if __name__ == "__main__":
+    test_normalized_symbol_store()
+    print("✅ 规范化 metadata 存储测试通过")
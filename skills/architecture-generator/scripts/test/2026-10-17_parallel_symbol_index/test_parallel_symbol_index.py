@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+并行符号提取测试
+验证 --jobs 1 与 --jobs N 构建出的索引逐表完全相同（符号 ID、metadata、调用边与搜索表）
+"""
+
+import contextlib
+import io
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench.synthetic_project import ProjectSpec, generate_project
+from build_symbol_index import SymbolIndexBuilder
+
+
+def dump_tables(db_path: Path):
+    """按表导出全部行（排序后比较，与页内存储顺序无关）"""
+    conn = sqlite3.connect(str(db_path))
+    try:
+        tables = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND sql NOT LIKE 'CREATE VIRTUAL%' "
+            "ORDER BY name"
+        )]
+        return {
+            table: sorted(conn.execute(f'SELECT * FROM "{table}"').fetchall(), key=repr)
+            for table in tables
+        }
+    finally:
+        conn.close()
+
+
+def build(project: Path, db_path: Path, jobs: int):
+    with contextlib.redirect_stdout(io.StringIO()):
+        SymbolIndexBuilder(project, str(db_path), jobs=jobs).build_index()
+    return dump_tables(db_path)
+
+
+def test_parallel_build_matches_serial():
+    """串行与多进程构建的每张表逐行相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=40, classes_per_file=2, js_ratio=0.3))
+
+        serial = build(project, Path(tmp) / 'serial.db', jobs=1)
+        parallel = build(project, Path(tmp) / 'parallel.db', jobs=3)
+
+        assert serial['symbols'] and serial['call_graph'] and serial['dependencies']
+        assert serial.keys() == parallel.keys()
+        for table in serial:
+            assert serial[table] == parallel[table], table
+
+
+if __name__ == "__main__":
+    test_parallel_build_matches_serial()
+    print("✅ 并行符号提取测试通过")
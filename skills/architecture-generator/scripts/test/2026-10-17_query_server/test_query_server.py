@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+常驻查询服务测试
+验证 JSON-RPC 请求处理、错误码、结果缓存，以及数据库变化后的自动重新加载
+"""
+
+import io
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_symbol_index import SymbolIndexBuilder
+from query_server import INVALID_PARAMS, METHOD_NOT_FOUND, PARSE_ERROR, QueryServer, serve_stdio
+
+
+def request(request_id, method, params=None):
+    return json.dumps({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': params})
+
+
+def test_query_server():
+    """同一服务实例应缓存结果，并在其他连接写入后返回最新数据"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "app.py").write_text("class User:\n    pass\n\ndef load_user():\n    pass\n", encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).build_index()
+
+        server = QueryServer(str(project), str(db_path))
+        try:
+            find = request(1, 'find', ['User'])
+            response = json.loads(server.handle_line(find))
+            assert response['id'] == 1
+            assert [s['name'] for s in response['result']] == ['User']
+
+            server.handle_line(find)
+            assert server.cache_hits == 1
+
+            search = json.loads(server.handle_line(request(2, 'search', {'query': 'user', 'limit': 5})))
+            assert [s['name'] for s in search['result']] == ['User', 'load_user']
+
+            # 错误码
+            assert json.loads(server.handle_line('not json'))['error']['code'] == PARSE_ERROR
+            assert json.loads(server.handle_line(request(3, 'nope')))['error']['code'] == METHOD_NOT_FOUND
+            assert json.loads(server.handle_line(request(4, 'find', [])))['error']['code'] == INVALID_PARAMS
+            assert json.loads(server.handle_line(
+                request(5, 'search', {'query': 'user', 'mode': 'bogus'})
+            ))['error']['code'] == INVALID_PARAMS
+
+            # 通知（无 id）不返回响应
+            assert server.handle_line('{"jsonrpc": "2.0", "method": "ping"}') is None
+
+            # 其他连接写入后，缓存失效并返回新数据
+            conn = sqlite3.connect(db_path)
+            conn.execute("""
+                INSERT INTO symbols (name, kind, file_path, line_number) VALUES ('User', 'class', 'other.py', 1)
+            """)
+            conn.commit()
+            conn.close()
+
+            response = json.loads(server.handle_line(find))
+            assert [s['file_path'] for s in response['result']] == ['app.py', 'other.py']
+            assert server.reloads == 1
+        finally:
+            server.close()
+
+        # stdin/stdout 传输：shutdown 后停止读取
+        server = QueryServer(str(project), str(db_path))
+        stdin = io.StringIO("\n".join([request(1, 'ping'), request(2, 'shutdown'), request(3, 'ping')]) + "\n")
+        stdout = io.StringIO()
+        serve_stdio(server, stdin, stdout)
+        server.close()
+
+        responses = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert [r['result'] for r in responses] == ['pong', True]
+
+
+if __name__ == "__main__":
+    test_query_server()
+    print("✅ 查询服务测试通过")
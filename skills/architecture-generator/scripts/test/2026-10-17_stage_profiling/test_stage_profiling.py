@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+阶段性能剖析测试
+验证 ExtractionEngine 计时不改变提取结果，SlowFileReport 的前 N 排序，
+以及 generate --profile 写出的报告（含并行提取时工作进程中的耗时）
+"""
+
+import contextlib
+import io
+import json
+import pstats
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench.synthetic_project import ProjectSpec, generate_project
+from enhanced_ast_analyzer import EnhancedASTAnalyzer
+from generate import generate_architecture_docs
+from stage_timer import SlowFileReport, StageTimer
+
+EXTRACTORS = {'ClassExtractor', 'FunctionExtractor', 'DependencyExtractor',
+              'VariableExtractor', 'PatternExtractor'}
+
+
+def test_extractor_timings():
+    """带计时与不带计时的分析结果相同；耗时按提取器类名记录"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        generate_project(project, ProjectSpec(files=3, js_ratio=0))
+        module = next(path for path in project.rglob('module_*.py'))
+
+        timings = {}
+        timed = EnhancedASTAnalyzer(project).analyze_file(module, timings)
+        plain = EnhancedASTAnalyzer(project).analyze_file(module)
+
+    assert timed == plain
+    assert EXTRACTORS | {'parse', 'traversal', 'to_dict'} == set(timings)
+    assert all(seconds >= 0 for seconds in timings.values())
+
+
+def test_slow_file_report():
+    """每个提取器只保留最慢的 N 个文件，按耗时降序"""
+    report = SlowFileReport(top_n=2)
+    for i, seconds in enumerate([0.3, 0.1, 0.5, 0.2]):
+        report.add('ClassExtractor', f"f{i}.py", seconds)
+    report.add_all('g.py', {'ClassExtractor': 0.05, 'parse': 0.4})
+
+    assert report.top('ClassExtractor') == [('f2.py', 0.5), ('f0.py', 0.3)]
+    summary = report.summary()
+    assert list(summary) == ['ClassExtractor', 'parse']
+    assert summary['ClassExtractor']['files'] == 5
+    assert abs(summary['ClassExtractor']['total'] - 1.15) < 1e-9
+
+
+def test_stage_timer_profile():
+    """CPU 时间、分配峰值按阶段记录；每个阶段一个 cProfile 结果"""
+    timer = StageTimer(profile=True, cprofile=True)
+    try:
+        sum(range(1000))
+        timer.lap('idle')
+        data = [str(i) * 10 for i in range(100000)]
+        del data
+        timer.lap('allocate')
+    finally:
+        timer.stop()
+
+    # 阶段内分配后释放的内存计入该阶段的峰值
+    idle, allocate = timer.stages['idle'], timer.stages['allocate']
+    assert allocate['alloc_peak_kb'] > idle['alloc_peak_kb'] + 5 * 1024
+    assert allocate['cpu'] >= 0 and idle['cpu'] >= 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        written = timer.write_report(Path(tmp))
+        assert [path.name for path in written] == ['report.json', '01-idle.prof', '02-allocate.prof']
+        stats = pstats.Stats(str(written[1]))
+        assert stats.total_calls > 0
+        report = json.loads(written[0].read_text(encoding='utf-8'))
+        assert list(report['stages']) == ['idle', 'allocate']
+        assert report['slow_files'] == {}
+
+
+def test_generate_profile():
+    """--profile 报告各阶段与每个提取器最慢的文件（并行提取时同样记录）"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        generate_project(project, ProjectSpec(files=12, classes_per_file=2))
+        python_files = len(list(project.rglob('*.py')))  # 含 __init__.py
+
+        for jobs in (1, 2):
+            output = Path(tmp) / f'docs_{jobs}'
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_architecture_docs(project, output_dir=output, jobs=jobs,
+                                           profile=True, profile_top=3, cprofile=True)
+
+            profile_dir = output / '.cache' / 'profile'
+            report = json.loads((profile_dir / 'report.json').read_text(encoding='utf-8'))
+            stages = ['scan', 'dependencies', 'symbol_index', 'render', 'scan_cache']
+            assert list(report['stages']) == stages
+            for stage in report['stages'].values():
+                assert {'wall', 'cpu', 'alloc_peak_kb', 'peak_rss_kb'} <= set(stage)
+
+            slow_files = report['slow_files']
+            assert EXTRACTORS | {'DependencyAnalyzer', 'js_symbols'} <= set(slow_files)
+            assert slow_files['ClassExtractor']['files'] == python_files
+            assert slow_files['js_symbols']['files'] == 3
+            assert len(slow_files['DependencyAnalyzer']['slowest']) == 3
+
+            assert sorted(path.name for path in profile_dir.glob('*.prof')) == [
+                f"{i:02d}-{name}.prof" for i, name in enumerate(stages, 1)
+            ]
+
+
+if __name__ == "__main__":
+    test_extractor_timings()
+    test_slow_file_report()
+    test_stage_timer_profile()
+    test_generate_profile()
+    print("✅ 阶段性能剖析测试通过")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+流式文件树测试
+验证流式写入与一次性渲染结果一致、目录折叠以及写入阶段的内存上限
+"""
+
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from file_catalog import FileCatalog
+from scan_file_structure import iter_tree_lines, scan_directory, write_tree_document
+
+
+def make_project(root: Path, dirs: int, files_per_dir: int):
+    """生成合成项目：dirs 个目录，每个目录 files_per_dir 个文件"""
+    for d in range(dirs):
+        package = root / f"pkg_{d:03d}" / "sub"
+        package.mkdir(parents=True)
+        for f in range(files_per_dir):
+            (package / f"module_{f:04d}.py").touch()
+    (root / "README.md").touch()
+
+
+def test_stream_matches_full_render():
+    """流式写入的文档与整体渲染的文件树一致"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "project"
+        make_project(root, 3, 5)
+        catalog = FileCatalog(root).build()
+
+        expected = scan_directory(root, catalog=catalog)["tree"]
+        output = Path(tmp) / "file-structure.md"
+        write_tree_document(output, "head\n<TREE>\ntail\n", "<TREE>",
+                            iter_tree_lines(catalog, root.name), chunk_size=16)
+
+        assert output.read_text(encoding='utf-8') == f"head\n{expected}\ntail\n"
+
+
+def test_collapse_files():
+    """目录内文件超过阈值时折叠为计数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "project"
+        make_project(root, 1, 12)
+        catalog = FileCatalog(root).build()
+
+        lines = list(iter_tree_lines(catalog, root.name, collapse_threshold=5))
+        assert sum("module_" in line for line in lines) == 5
+        # 最后一行是根目录下的 README.md，折叠行是 sub/ 的最后一项
+        assert lines[-2].endswith("└── … 7 more files")
+
+
+def test_bounded_memory():
+    """写入阶段的内存峰值与输出大小无关"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "project"
+        make_project(root, 40, 250)
+        catalog = FileCatalog(root).build()
+        output = Path(tmp) / "file-structure.md"
+
+        tracemalloc.start()
+        write_tree_document(output, "<TREE>", "<TREE>", iter_tree_lines(catalog, root.name),
+                            chunk_size=4096)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        size = output.stat().st_size
+        assert size > 300_000
+        assert peak < 64 * 1024
+
+
+if __name__ == "__main__":
+    test_stream_matches_full_render()
+    test_collapse_files()
+    test_bounded_memory()
+    print("✅ 流式文件树测试通过")
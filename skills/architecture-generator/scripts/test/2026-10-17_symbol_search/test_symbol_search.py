@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+符号搜索测试
+验证排序搜索的各匹配层级、分页，增量更新后搜索辅助表与符号表保持同步，
+模糊匹配的候选截断，以及命令行缺少关键字时的错误
+"""
+
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import symbol_query
+from build_symbol_index import SymbolIndexBuilder
+from query_index import SymbolIndex
+from utils import split_identifier
+
+
+SOURCE = '''
+class HTTPServerConfig:
+    pass
+
+class ServerConfigLoader:
+    pass
+
+def parse_config():
+    pass
+
+def config():
+    pass
+
+def reconfigure():
+    pass
+'''
+
+
+def names(results):
+    return [(r['name'], r['match']) for r in results]
+
+
+def test_symbol_search():
+    """精确 > 前缀 > 词元 > 子串 > 模糊，分页稳定，增量更新后索引一致"""
+    assert split_identifier('HTTPServerConfig') == ['http', 'server', 'config']
+    assert split_identifier('parse_json_v2') == ['parse', 'json', 'v', '2']
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        (project / "server.py").write_text(SOURCE, encoding='utf-8')
+
+        db_path = tmp_dir / "symbols.db"
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).build_index()
+
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            assert names(index.search('config', limit=5)) == [
+                ('config', 'exact'),
+                ('parse_config', 'token'),
+                ('HTTPServerConfig', 'token'),
+                ('ServerConfigLoader', 'token'),
+                ('reconfigure', 'substring'),
+            ]
+            assert names(index.search('ServerConf', mode='prefix')) == [('ServerConfigLoader', 'prefix')]
+            assert names(index.search('http server', mode='token')) == [('HTTPServerConfig', 'token')]
+            assert names(index.search('SrverConfig', mode='fuzzy'))[0] == ('HTTPServerConfig', 'fuzzy')
+            assert names(index.search('parse_confg'))[0] == ('parse_config', 'fuzzy')
+
+            # 分页与完整结果一致
+            assert index.search('config', limit=2, offset=2) == index.search('config', limit=5)[2:4]
+
+            # 兼容接口：trigram 索引与 LIKE 扫描结果相同
+            assert [r['name'] for r in index.search_symbols('onfig')] == [
+                'HTTPServerConfig', 'ServerConfigLoader', 'config', 'parse_config', 'reconfigure'
+            ]
+        finally:
+            index.close()
+
+        # 增量更新：删除的符号不应残留在搜索辅助表中
+        (project / "server.py").write_text("def parse_settings():\n    pass\n", encoding='utf-8')
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).update_index(
+            [project / "server.py"], []
+        )
+
+        conn = sqlite3.connect(db_path)
+        stale_tokens = conn.execute("""
+            SELECT COUNT(*) FROM symbol_tokens WHERE symbol_id NOT IN (SELECT id FROM symbols)
+        """).fetchone()[0]
+        fts_rows = conn.execute(
+            "SELECT COUNT(*) FROM symbols_fts WHERE name LIKE '%config%'"
+        ).fetchone()[0]
+        conn.execute("INSERT INTO symbols_fts (symbols_fts) VALUES ('integrity-check')")
+        conn.close()
+        assert stale_tokens == 0
+        assert fts_rows == 0
+
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            assert names(index.search('settings')) == [('parse_settings', 'token')]
+        finally:
+            index.close()
+
+
+def test_fuzzy_scoring_is_capped():
+    """同名符号只计算一次编辑距离，计算距离的名称数不超过 FUZZY_SCORED_NAMES"""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        project = tmp_dir / "project"
+        project.mkdir()
+        for i in range(300):
+            (project / f"mod_{i}.py").write_text(
+                f"def process_data():\n    pass\n\ndef process_data_{i}():\n    pass\n", encoding='utf-8'
+            )
+
+        db_path = tmp_dir / "symbols.db"
+        SymbolIndexBuilder(project, str(db_path), journal_mode=None).build_index()
+
+        needle = 'proces_data'
+        scored_names = []
+        original = symbol_query._bounded_edit_distance
+
+        def counting(a, b, max_distance):
+            if a == needle:
+                scored_names.append(b)
+            return original(a, b, max_distance)
+
+        symbol_query._bounded_edit_distance = counting
+        index = SymbolIndex(str(project), str(db_path))
+        try:
+            results = index.search(needle, mode='fuzzy', limit=5)
+            assert [r['name'] for r in results] == ['process_data'] * 5
+            assert all(r['match'] == 'fuzzy' and 'metadata' in r for r in results)
+        finally:
+            index.close()
+            symbol_query._bounded_edit_distance = original
+
+        assert scored_names and len(scored_names) == len(set(scored_names))
+        assert len(scored_names) <= symbol_query.FUZZY_SCORED_NAMES
+
+
+def test_cli_search_requires_keyword():
+    """search 只带选项时报告缺少关键字并以非零状态退出"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp)
+        (project / "server.py").write_text(SOURCE, encoding='utf-8')
+        SymbolIndexBuilder(project, str(project / "symbols.db"), journal_mode=None).build_index()
+
+        for args in (['search'], ['search', '--limit', '5'], ['search', 'config', '--limit', 'x']):
+            result = subprocess.run(
+                [sys.executable, 'query_index.py', str(project), *args],
+                cwd=SCRIPTS_DIR, capture_output=True, text=True
+            )
+            assert result.returncode == 1, (args, result.stdout, result.stderr)
+            assert 'Error' in result.stdout and 'Traceback' not in result.stderr, args
+
+
+if __name__ == "__main__":
+    test_symbol_search()
+    test_fuzzy_scoring_is_capped()
+    test_cli_search_requires_keyword()
+    print("✅ 符号搜索测试通过")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+模板引擎与输出写入测试
+验证模板只加载一次、内容未变化的页面不重写（占位符不参与哈希），
+以及 generate 在没有变化的重复运行中不重写任何页面
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).resolve().parents[2]
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from bench.synthetic_project import ProjectSpec, generate_project
+from generate import generate_architecture_docs, render_template
+from template_engine import HAS_JINJA2, OutputWriter, TemplateEngine
+
+TEMPLATES_DIR = SCRIPTS_DIR.parent / "assets" / "templates"
+
+
+def test_template_engine():
+    """与逐次编译模板字符串的渲染结果相同；带缓存目录时写出字节码"""
+    variables = {'project_name': 'demo', 'generated_at': 'now', 'stats': {'by_extension': {'.py': 3}}}
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = TemplateEngine(TEMPLATES_DIR, cache_dir=Path(tmp) / 'templates')
+        for _ in range(2):
+            rendered = engine.render('README.md.j2', **variables)
+            source = (TEMPLATES_DIR / 'README.md.j2').read_text(encoding='utf-8')
+            assert rendered == render_template(source, **variables)
+            assert '# demo' in rendered
+
+        if HAS_JINJA2:
+            assert list((Path(tmp) / 'templates').iterdir())
+
+
+def test_output_writer():
+    """相同内容不重写；占位符只在写出时替换；文件被改动或删除后重写"""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        manifest = root / '.cache' / 'manifest.json'
+        page = root / 'page.md'
+
+        writer = OutputWriter(root, manifest, substitutions={'@TIME@': '10:00'})
+        assert writer.write(page, "generated @TIME@\n")
+        writer.save()
+        assert page.read_text(encoding='utf-8') == "generated 10:00\n"
+        os.utime(page, (1, 1))
+        os.utime(manifest, (1, 1))
+
+        # 只有占位符的值变化：不写页面，也不写清单
+        writer = OutputWriter(root, manifest, substitutions={'@TIME@': '11:00'})
+        assert not writer.write(page, "generated @TIME@\n")
+        writer.save()
+        assert page.stat().st_mtime == 1 and manifest.stat().st_mtime == 1
+        assert (writer.written, writer.unchanged) == (0, 1)
+
+        assert writer.write(page, "changed @TIME@\n")
+        assert page.read_text(encoding='utf-8') == "changed 11:00\n"
+
+        page.write_text("edited by hand\n\nmore\n", encoding='utf-8')
+        assert writer.write(page, "changed @TIME@\n")
+        page.unlink()
+        assert writer.write(page, "changed @TIME@\n")
+
+        # 流式页面与一次性写出的页面使用相同的哈希判断
+        tree = root / 'tree.md'
+        lines = lambda: iter(['a', 'b', 'c'])
+        assert writer.write_document(tree, "head\n@TREE@\ntail @TIME@\n", '@TREE@', lines)
+        assert tree.read_text(encoding='utf-8') == "head\na\nb\nc\ntail 11:00\n"
+        assert not writer.write_document(tree, "head\n@TREE@\ntail @TIME@\n", '@TREE@', lines)
+        assert writer.write_document(tree, "head\n@TREE@\ntail @TIME@\n", '@TREE@', lambda: iter(['a']))
+
+
+def test_generate_skips_unchanged_pages():
+    """没有变化的重复运行不重写页面（包括带生成时间的 README）；修改源文件后只重写受影响的页面"""
+    with tempfile.TemporaryDirectory() as tmp:
+        project = Path(tmp) / 'project'
+        output = Path(tmp) / 'docs'
+        generate_project(project, ProjectSpec(files=30, classes_per_file=2, nesting_depth=2))
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_architecture_docs(project, output_dir=output, node_threshold=5)
+
+        def page_mtimes():
+            return {
+                path.relative_to(output).as_posix(): path.stat().st_mtime_ns
+                for path in output.rglob('*.md') if '.cache' not in path.parts
+            }
+
+        run()
+        pages = page_mtimes()
+        assert len(pages) > 4
+        for path in output.rglob('*.md'):
+            os.utime(path, ns=(1, 1))
+        readme = (output / 'README.md').read_text(encoding='utf-8')
+        manifest = output / '.cache' / 'render-manifest.json'
+        os.utime(manifest, ns=(1, 1))
+
+        run()
+        assert set(page_mtimes().values()) == {1}
+        assert manifest.stat().st_mtime_ns == 1
+        assert (output / 'README.md').read_text(encoding='utf-8') == readme
+
+        # 新增一个模块：文件树与符号数变化的页面被重写
+        (project / 'extra.py').write_text("class Extra:\n    pass\n", encoding='utf-8')
+        run()
+        rewritten = {path for path, mtime in page_mtimes().items() if mtime != 1}
+        assert {'file-structure.md', 'symbols-index.md'} <= rewritten
+        assert rewritten != set(pages)
+
+
+if __name__ == "__main__":
+    test_template_engine()
+    test_output_writer()
+    test_generate_skips_unchanged_pages()
+    print("✅ 模板引擎与输出写入测试通过")
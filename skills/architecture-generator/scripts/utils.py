@@ -9,9 +9,19 @@ Provides common functionality for:
 """
 
 import re
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+import metrics
+from ignore_matcher import IgnoreMatcher
+
+PATHS_IGNORED = metrics.counter('paths_ignored', 'Paths skipped by hidden-file or ignore rules')
+
+
+# 以 . 开头但仍需保留的配置文件
+ALLOWED_HIDDEN_FILES = {'.gitignore', '.env', '.eslintrc', '.prettierrc'}
+
 
 def parse_gitignore(gitignore_path: Optional[Path] = None) -> List[str]:
     """
@@ -43,14 +53,16 @@ def parse_gitignore(gitignore_path: Optional[Path] = None) -> List[str]:
     return patterns
 
 
-def is_excluded(path: Path, patterns: List[str], base_dir: Optional[Path] = None) -> bool:
+def is_excluded(path: Path, patterns: List[str], base_dir: Optional[Path] = None,
+                is_dir: Optional[bool] = None) -> bool:
     """
-    检查路径是否匹配任何排除模式
+    检查路径是否匹配任何排除模式（完整 gitignore 语义，见 ignore_matcher）
 
     Args:
         path: 要检查的路径
         patterns: .gitignore 风格的排除模式列表
         base_dir: 基础目录，用于相对路径计算
+        is_dir: 路径是否为目录（None 表示未知，目录专用模式也参与匹配）
 
     Returns:
         如果路径被排除则返回 True
@@ -78,55 +90,21 @@ def is_excluded(path: Path, patterns: List[str], base_dir: Optional[Path] = None
     # 标准化路径分隔符
     rel_path = rel_path.replace('\\', '/')
 
-    for pattern in patterns:
-        if _match_pattern(rel_path, pattern):
-            return True
+    return compile_patterns(tuple(patterns)).is_excluded(rel_path, is_dir)
 
-    return False
 
-
-def _match_pattern(path: str, pattern: str) -> bool:
+@lru_cache(maxsize=32)
+def compile_patterns(patterns: Tuple[str, ...]) -> IgnoreMatcher:
     """
-    匹配路径与 .gitignore 模式
+    编译排除模式（相同的模式列表只编译一次）
 
-    简化版实现，支持常见模式：
-    - *.ext: 文件扩展名匹配
-    - dir/: 目录匹配
-    - /path: 根路径匹配
-    - **/: 递归匹配
-    """
-    # 标准化模式
-    pattern = pattern.strip()
-    if not pattern:
-        return False
-
-    # 目录模式（以 / 结尾）
-    if pattern.endswith('/'):
-        # 检查是否在该目录下
-        dir_name = pattern.rstrip('/')
-        return path.startswith(dir_name + '/') or path == dir_name
-
-    # 根路径模式（以 / 开头）
-    if pattern.startswith('/'):
-        # 精确匹配从根开始的路径
-        pattern = pattern[1:]
-        return path == pattern or path.startswith(pattern + '/')
-
-    # 递归目录模式 (**/)
-    if '**/' in pattern:
-        # 简化处理：匹配任意层级
-        sub_pattern = pattern.replace('**/', '(.*/)?')
-        return bool(re.match(sub_pattern, path))
-
-    # 通配符模式
-    if '*' in pattern:
-        # 转换为正则表达式
-        regex_pattern = pattern.replace('.', r'\.').replace('*', '.*')
-        # 匹配完整路径或路径的任何部分
-        return bool(re.match(regex_pattern, path)) or bool(re.search(f'/({regex_pattern})', path))
+    Args:
+        patterns: .gitignore 风格的排除模式
 
-    # 精确匹配或前缀匹配
-    return path == pattern or path.startswith(pattern + '/')
+    Returns:
+        编译后的匹配器
+    """
+    return IgnoreMatcher(patterns)
 
 
 def detect_file_type(file_path: Path) -> str:
@@ -254,7 +232,8 @@ def should_include_file(file_path: Path, patterns: Optional[List[str]] = None,
         如果文件应该被包含则返回 True
     """
     # 跳过隐藏文件（除了特定配置文件）
-    if file_path.name.startswith('.') and file_path.name not in {'.gitignore', '.env', '.eslintrc', '.prettierrc'}:
+    if file_path.name.startswith('.') and file_path.name not in ALLOWED_HIDDEN_FILES:
+        PATHS_IGNORED.inc(kind='file', reason='hidden')
         return False
 
     # 合并默认排除模式和用户提供的模式
@@ -264,11 +243,40 @@ def should_include_file(file_path: Path, patterns: Optional[List[str]] = None,
 
     # 检查是否被排除
     if is_excluded(file_path, all_patterns, base_dir):
+        PATHS_IGNORED.inc(kind='file', reason='pattern')
         return False
 
     return True
 
 
+# 标识符分词：连续大写（缩写）、首字母大写单词、小写单词、数字
+_IDENTIFIER_TOKEN_RE = re.compile(r'[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+')
+
+
+def split_identifier(name: str) -> List[str]:
+    """
+    将标识符拆分为小写词元（支持 camelCase、PascalCase、snake_case 与缩写）
+
+    Args:
+        name: 标识符
+
+    Returns:
+        去重后的小写词元列表（保持出现顺序）
+
+    Examples:
+        >>> split_identifier('HTTPServerConfig')
+        ['http', 'server', 'config']
+        >>> split_identifier('parse_json_v2')
+        ['parse', 'json', 'v', '2']
+    """
+    tokens = []
+    for token in _IDENTIFIER_TOKEN_RE.findall(name):
+        token = token.lower()
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
 def normalize_path(path: Path, base_dir: Optional[Path] = None) -> Path:
     """
     标准化路径，解析相对路径和绝对路径